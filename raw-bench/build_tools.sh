@@ -0,0 +1,52 @@
+#!/bin/bash
+set -e
+
+# Build the experiments' fill tools and the shared tools next to this script,
+# skipping any whose source, the shared loghist.h and compiler flags hash to
+# the same value as at its last build (stamp in .<tool>.sha256). Called by
+# run.sh before the experiments and by each experiment script, so a warm guest
+# (run.sh WARM_START=1) only recompiles what actually changed.
+#
+# Usage: build_tools.sh [<experiment dir>|<tool>...]   (default: all of them)
+
+declare -A FLAGS=(
+  [exp_allocation]="-O2 -Wall -lzbd -lm -lpthread"
+  [exp_interference]="-Wall -lzbd -lpthread"
+  [exp_occupancy]="-O2 -Wall -lzbd -lpthread"
+)
+
+# Shared tools: <tool>.c in this directory
+declare -A TOOLS=(
+  [zonestat]="-O2 -Wall -lzbd"
+  [zappend]="-O2 -Wall -lzbd -lpthread"
+  [replay]="-O2 -Wall -lzbd -lpthread"
+)
+
+cd "$(dirname "$0")"
+
+TARGETS=("$@")
+if [[ ${#TARGETS[@]} -eq 0 ]]; then
+    TARGETS=("${!FLAGS[@]}" "${!TOOLS[@]}")
+fi
+
+for target in "${TARGETS[@]}"; do
+    if [[ -n "${FLAGS[$target]+x}" ]]; then
+        src="$target/fill.c" bin="$target/fill" stamp="$target/.fill.sha256" flags="${FLAGS[$target]}"
+    elif [[ -n "${TOOLS[$target]+x}" ]]; then
+        src="$target.c" bin="$target" stamp=".$target.sha256" flags="${TOOLS[$target]}"
+    else
+        echo "ERROR: no build flags for '$target'"
+        exit 1
+    fi
+    [[ -f "$src" ]] || continue
+
+    hash=$( { sha256sum < "$src"; sha256sum < loghist.h; echo "$flags"; } | sha256sum | cut -d' ' -f1)
+    if [[ -x "$bin" && "$(cat "$stamp" 2>/dev/null)" == "$hash" ]]; then
+        echo "[build] $bin is up to date"
+        continue
+    fi
+
+    echo "[build] $bin"
+    gcc -o "$bin" "$src" $flags
+    echo "$hash" > "$stamp"
+done
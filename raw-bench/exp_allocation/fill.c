@@ -6,26 +6,95 @@
 #include <stdint.h>
 #include <string.h>
 #include <errno.h>
+#include <time.h>
+#include <pthread.h>
 #include <libzbd/zbd.h>
 #include <math.h>
 
+#include "../loghist.h"
+
+/*
+ * Latency histograms: log-linear buckets in microseconds (../loghist.h);
+ * plotting/alloc_hist.py decodes them.
+ */
+
+enum { OP_WRITE, OP_RESET, NR_OPS };
+static const char *op_names[NR_OPS] = { "write", "reset" };
+
+struct latency_hist {
+    uint64_t count;
+    uint64_t sum_us;
+    uint64_t max_us;
+    uint32_t buckets[LOGHIST_BUCKETS];
+};
+
 /**
- * Write one request-sized page at zone start.
+ * One timed first-write or reset.
  */
-ssize_t write_one_page_to_zone(int fd, struct zbd_zone *zone, size_t request_size) {
-    void *buffer;
-    if (posix_memalign(&buffer, request_size, request_size) != 0) {
-        perror("posix_memalign failed");
-        return -1;
+struct alloc_event {
+    int round;
+    int thread;
+    int zone;
+    int op;
+    uint64_t start_us;
+    uint64_t lat_us;
+};
+
+/**
+ * State shared by the benchmark threads. Thread t owns zones t, t + threads,
+ * t + 2 * threads, ...; all threads write their zones, meet at the barrier,
+ * then reset them, so up to `threads` zones are being opened at once. The
+ * threads wait for `go` before the first barrier: main sets it to 1 once every
+ * thread exists, or to -1 when one could not be created.
+ */
+struct alloc_bench {
+    int fd;
+    struct zbd_zone *zones;
+    int *zone_indices;
+    int nr_zones;
+    int threads;
+    int rounds;
+    size_t request_size;
+    uint64_t t0_us;
+    pthread_barrier_t barrier;
+    struct latency_hist *thread_hist; /* [threads][NR_OPS] */
+    struct latency_hist *zone_hist;   /* [nr_zones][NR_OPS] */
+    struct alloc_event *events;       /* [rounds][nr_zones][NR_OPS] */
+    int failures;
+    int failed_threads;
+    int go;
+    pthread_mutex_t lock;
+    pthread_cond_t go_cond;
+};
+
+struct alloc_thread {
+    struct alloc_bench *bench;
+    int id;
+};
+
+static uint64_t now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000 + ts.tv_nsec / 1000;
+}
+
+static void hist_add(struct latency_hist *h, uint64_t us) {
+    h->count++;
+    h->sum_us += us;
+    if (us > h->max_us) {
+        h->max_us = us;
     }
-    memset(buffer, 0xAC, request_size);
+    h->buckets[loghist_index(us)]++;
+}
 
+/**
+ * Write one request-sized page at zone start.
+ */
+ssize_t write_one_page_to_zone(int fd, struct zbd_zone *zone, void *buffer, size_t request_size) {
     ssize_t ret = pwrite(fd, buffer, request_size, zone->start);
     if (ret < 0) {
         perror("pwrite");
     }
-
-    free(buffer);
     return ret;
 }
 
@@ -41,9 +110,148 @@ int reset_zone(int fd, struct zbd_zone *zone) {
     return ret;
 }
 
+/**
+ * Time one operation on the i-th benchmark zone and record it.
+ */
+static void timed_op(struct alloc_bench *b, int thread, int round, int i, int op, void *buffer) {
+    struct zbd_zone *zone = &b->zones[b->zone_indices[i]];
+    uint64_t start = now_us();
+    int ok = op == OP_WRITE
+        ? write_one_page_to_zone(b->fd, zone, buffer, b->request_size) > 0
+        : reset_zone(b->fd, zone) == 0;
+    uint64_t lat = now_us() - start;
+
+    if (!ok) {
+        pthread_mutex_lock(&b->lock);
+        b->failures++;
+        pthread_mutex_unlock(&b->lock);
+        return;
+    }
+
+    hist_add(&b->thread_hist[thread * NR_OPS + op], lat);
+    hist_add(&b->zone_hist[i * NR_OPS + op], lat);
+    struct alloc_event *ev = &b->events[((size_t)round * b->nr_zones + i) * NR_OPS + op];
+    ev->round = round;
+    ev->thread = thread;
+    ev->zone = b->zone_indices[i];
+    ev->op = op;
+    ev->start_us = start - b->t0_us;
+    ev->lat_us = lat;
+}
+
+static void *alloc_worker(void *arg) {
+    struct alloc_thread *self = arg;
+    struct alloc_bench *b = self->bench;
+
+    void *buffer = NULL;
+    int err = posix_memalign(&buffer, b->request_size, b->request_size);
+    int failed = err != 0;
+    if (failed) {
+        fprintf(stderr, "posix_memalign failed: %s\n", strerror(err));
+        buffer = NULL;
+    } else {
+        memset(buffer, 0xAC, b->request_size);
+    }
+
+    pthread_mutex_lock(&b->lock);
+    b->failed_threads += failed;
+    while (b->go == 0) {
+        pthread_cond_wait(&b->go_cond, &b->lock);
+    }
+    int go = b->go;
+    pthread_mutex_unlock(&b->lock);
+    if (go < 0) {
+        free(buffer);
+        return NULL;
+    }
+
+    // Every thread has counted its failure before this barrier, so all of
+    // them agree on whether to run
+    pthread_barrier_wait(&b->barrier);
+    pthread_mutex_lock(&b->lock);
+    failed = b->failed_threads;
+    pthread_mutex_unlock(&b->lock);
+    if (failed) {
+        free(buffer);
+        return NULL;
+    }
+
+    for (int round = 0; round < b->rounds; round++) {
+        // === WRITE STAGE: first write opens (allocates) the zone ===
+        for (int i = self->id; i < b->nr_zones; i += b->threads) {
+            timed_op(b, self->id, round, i, OP_WRITE, buffer);
+        }
+        pthread_barrier_wait(&b->barrier);
+
+        // === RESET STAGE ===
+        for (int i = self->id; i < b->nr_zones; i += b->threads) {
+            timed_op(b, self->id, round, i, OP_RESET, buffer);
+        }
+        pthread_barrier_wait(&b->barrier);
+    }
+
+    free(buffer);
+    return NULL;
+}
+
+static void write_hist(FILE *f, const char *scope, int id, int op, const struct latency_hist *h) {
+    if (h->count == 0) {
+        return;
+    }
+    fprintf(f, "hist,%s,%d,%s,%llu,%llu,%llu,", scope, id, op_names[op],
+            (unsigned long long)h->count, (unsigned long long)h->sum_us,
+            (unsigned long long)h->max_us);
+    const char *sep = "";
+    for (int k = 0; k < LOGHIST_BUCKETS; k++) {
+        if (h->buckets[k]) {
+            fprintf(f, "%s%d:%u", sep, k, h->buckets[k]);
+            sep = " ";
+        }
+    }
+    fputc('\n', f);
+}
+
+/**
+ * Write events and histograms:
+ *   # alloc-hist v1 threads=<T> zones=<N> rounds=<R> request_size=<S> unit=us sub_bits=<B>
+ *   event,<round>,<thread>,<zone>,<op>,<start_us>,<lat_us>
+ *   hist,<thread|zone>,<id>,<op>,<count>,<sum_us>,<max_us>,<bucket>:<n> <bucket>:<n> ...
+ */
+static int write_hist_file(const char *path, const struct alloc_bench *b) {
+    FILE *f = fopen(path, "w");
+    if (!f) {
+        perror("Failed to open histogram file");
+        return -1;
+    }
+    fprintf(f, "# alloc-hist v1 threads=%d zones=%d rounds=%d request_size=%zu unit=us sub_bits=%d\n",
+            b->threads, b->nr_zones, b->rounds, b->request_size, LOGHIST_SUB_BITS);
+
+    size_t nr_events = (size_t)b->rounds * b->nr_zones * NR_OPS;
+    for (size_t k = 0; k < nr_events; k++) {
+        const struct alloc_event *ev = &b->events[k];
+        if (ev->thread < 0) {
+            continue;  // failed operation
+        }
+        fprintf(f, "event,%d,%d,%d,%s,%llu,%llu\n", ev->round, ev->thread, ev->zone,
+                op_names[ev->op], (unsigned long long)ev->start_us, (unsigned long long)ev->lat_us);
+    }
+    for (int t = 0; t < b->threads; t++) {
+        for (int op = 0; op < NR_OPS; op++) {
+            write_hist(f, "thread", t, op, &b->thread_hist[t * NR_OPS + op]);
+        }
+    }
+    for (int i = 0; i < b->nr_zones; i++) {
+        for (int op = 0; op < NR_OPS; op++) {
+            write_hist(f, "zone", b->zone_indices[i], op, &b->zone_hist[i * NR_OPS + op]);
+        }
+    }
+    fclose(f);
+    return 0;
+}
+
 int main(int argc, char *argv[]) {
-    if (argc != 5) {
-        fprintf(stderr, "Usage: %s <device> <request_size> <result_file> <percentage>\n", argv[0]);
+    if (argc < 5 || argc > 8) {
+        fprintf(stderr, "Usage: %s <device> <request_size> <result_file> <percentage> [<threads> [<rounds> [<hist_file>]]]\n", argv[0]);
         return EXIT_FAILURE;
     }
 
@@ -51,11 +259,18 @@ int main(int argc, char *argv[]) {
     size_t req_size = strtoull(argv[2], NULL, 10);
     const char *result_file = argv[3];
     int pct = atoi(argv[4]);
+    int threads = argc > 5 ? atoi(argv[5]) : 1;
+    int rounds = argc > 6 ? atoi(argv[6]) : 1;
+    const char *hist_file = argc > 7 ? argv[7] : NULL;
 
     if (pct <= 0 || pct > 100) {
         fprintf(stderr, "❌ Invalid percentage: %d%%\n", pct);
         return EXIT_FAILURE;
     }
+    if (threads <= 0 || rounds <= 0) {
+        fprintf(stderr, "❌ Invalid threads (%d) or rounds (%d)\n", threads, rounds);
+        return EXIT_FAILURE;
+    }
 
     struct zbd_info info;
     int fd = zbd_open(dev_path, O_WRONLY | O_DIRECT, &info);
@@ -73,51 +288,140 @@ int main(int argc, char *argv[]) {
     }
 
     int zones_to_write = (int)ceil(nr_zones * (pct / 100.0));
-    printf("ℹ️  Writing to first %d of %u zones (%d%%)\n", zones_to_write, nr_zones, pct);
+    printf("ℹ️  Writing to first %d of %u zones (%d%%) with %d threads, %d rounds\n",
+           zones_to_write, nr_zones, pct, threads, rounds);
 
-    int *written_zone_indices = calloc(zones_to_write, sizeof(int));
-    if (!written_zone_indices) {
+    int *zone_indices = calloc(zones_to_write, sizeof(int));
+    if (!zone_indices) {
         perror("calloc failed");
         free(zones);
         zbd_close(fd);
         return EXIT_FAILURE;
     }
 
-    int written_count = 0;
-
+    int bench_zones = 0;
     for (int i = 0; i < zones_to_write; i++) {
-        struct zbd_zone *zone = &zones[i];
-
-        if (!zbd_zone_seq(zone)) {
+        if (!zbd_zone_seq(&zones[i])) {
             printf("⚠️  Skipping non-sequential zone %d\n", i);
             continue;
         }
+        zone_indices[bench_zones++] = i;
+    }
+    if (bench_zones == 0) {
+        fprintf(stderr, "❌ No sequential zones in the first %d%% of the device\n", pct);
+        fprintf(stderr, "Usage: %s <device> <request_size> <result_file> <percentage> [<threads> [<rounds> [<hist_file>]]]\n", argv[0]);
+        free(zone_indices);
+        free(zones);
+        zbd_close(fd);
+        return EXIT_FAILURE;
+    }
+    if (threads > bench_zones) {
+        threads = bench_zones;
+    }
 
-        ssize_t written = write_one_page_to_zone(fd, zone, req_size);
-        if (written > 0) {
-            printf("✅ Zone %d at 0x%llx: Wrote %zd bytes\n",
-                   i, (unsigned long long)zone->start, written);
-            written_zone_indices[written_count++] = i;
-        } else {
-            printf("❌ Write failed at zone %d\n", i);
-        }
+    struct alloc_bench bench = {
+        .fd = fd,
+        .zones = zones,
+        .zone_indices = zone_indices,
+        .nr_zones = bench_zones,
+        .threads = threads,
+        .rounds = rounds,
+        .request_size = req_size,
+        .thread_hist = calloc((size_t)threads * NR_OPS, sizeof(struct latency_hist)),
+        .zone_hist = calloc((size_t)bench_zones * NR_OPS, sizeof(struct latency_hist)),
+        .events = calloc((size_t)rounds * bench_zones * NR_OPS, sizeof(struct alloc_event)),
+    };
+    struct alloc_thread *args = calloc(threads, sizeof(*args));
+    pthread_t *tids = calloc(threads, sizeof(*tids));
+    int ret = EXIT_FAILURE;
+    if (!bench.thread_hist || !bench.zone_hist || !bench.events || !args || !tids) {
+        perror("calloc failed");
+        goto out;
+    }
+    for (size_t k = 0; k < (size_t)rounds * bench_zones * NR_OPS; k++) {
+        bench.events[k].thread = -1;
     }
+    pthread_mutex_init(&bench.lock, NULL);
+    pthread_cond_init(&bench.go_cond, NULL);
+    pthread_barrier_init(&bench.barrier, NULL, threads);
 
+    bench.t0_us = now_us();
+    int started = 0;
+    for (; started < threads; started++) {
+        args[started].bench = &bench;
+        args[started].id = started;
+        int err = pthread_create(&tids[started], NULL, alloc_worker, &args[started]);
+        if (err != 0) {
+            // Thread t owns every threads-th zone, so the others cannot cover it
+            fprintf(stderr, "❌ pthread_create: %s (%d of %d threads started)\n", strerror(err), started, threads);
+            break;
+        }
+    }
+    pthread_mutex_lock(&bench.lock);
+    bench.go = started == threads ? 1 : -1;
+    pthread_cond_broadcast(&bench.go_cond);
+    pthread_mutex_unlock(&bench.lock);
+    for (int t = 0; t < started; t++) {
+        pthread_join(tids[t], NULL);
+    }
+    if (bench.go < 0 || bench.failed_threads) {
+        fprintf(stderr, "❌ Benchmark aborted, no result recorded\n");
+        goto destroy;
+    }
+    double elapsed_s = (now_us() - bench.t0_us) / 1e6;
 
-    // === RESET STAGE ===
-    printf("🔁 Resetting %d zones...\n", written_count);
-    for (int i = 0; i < written_count; i++) {
-        int idx = written_zone_indices[i];
-        struct zbd_zone *zone = &zones[idx];
+    // === SUMMARY ===
+    struct latency_hist total[NR_OPS] = {0};
+    for (int t = 0; t < threads; t++) {
+        for (int op = 0; op < NR_OPS; op++) {
+            struct latency_hist *h = &bench.thread_hist[t * NR_OPS + op];
+            total[op].count += h->count;
+            total[op].sum_us += h->sum_us;
+            if (h->max_us > total[op].max_us) {
+                total[op].max_us = h->max_us;
+            }
+        }
+    }
+    for (int op = 0; op < NR_OPS; op++) {
+        double mean = total[op].count ? (double)total[op].sum_us / total[op].count : 0;
+        printf("✅ %s: %llu ops, mean %.1f us, max %llu us\n", op_names[op],
+               (unsigned long long)total[op].count, mean, (unsigned long long)total[op].max_us);
+    }
+    printf("⏱️  %d zones × %d rounds in %.3f s, %d failed operations\n",
+           bench_zones, rounds, elapsed_s, bench.failures);
 
-        if (reset_zone(fd, zone) == 0) {
-            printf("♻️  Reset zone %d at offset 0x%llx\n", idx, (unsigned long long)zone->start);
+    // threads,<T>,zones,<N>,rounds,<R>,write_mean_us,<m>,reset_mean_us,<m>,failed,<n>
+    FILE *log = fopen(result_file, "a");
+    if (!log) {
+        perror("Failed to open result file");
+    } else {
+        fprintf(log, "threads,%d,zones,%d,rounds,%d", threads, bench_zones, rounds);
+        for (int op = 0; op < NR_OPS; op++) {
+            double mean = total[op].count ? (double)total[op].sum_us / total[op].count : 0;
+            fprintf(log, ",%s_mean_us,%.1f", op_names[op], mean);
         }
+        fprintf(log, ",failed,%d\n", bench.failures);
+        fclose(log);
     }
 
-    free(written_zone_indices);
+    if (hist_file && write_hist_file(hist_file, &bench) == 0) {
+        printf("📊 Histograms written to %s\n", hist_file);
+    }
+    ret = bench.failures ? EXIT_FAILURE : EXIT_SUCCESS;
+
+destroy:
+    pthread_barrier_destroy(&bench.barrier);
+    pthread_cond_destroy(&bench.go_cond);
+    pthread_mutex_destroy(&bench.lock);
+out:
+    free(tids);
+    free(args);
+    free(bench.events);
+    free(bench.zone_hist);
+    free(bench.thread_hist);
+    free(zone_indices);
     free(zones);
     zbd_close(fd);
 
-    return EXIT_SUCCESS;
+    return ret;
 }
@@ -15,25 +15,35 @@ REQUEST_SIZE="$3"
 # Fill percentages to test
 PERCENTAGES=(99)
 
+# Concurrency: threads opening zones at once (may be overridden by run.sh), and
+# write/reset rounds per thread count (more rounds fill the per-zone histograms)
+JOBS=(${THREADS:-1})
+ROUNDS=${ALLOC_ROUNDS:-1}
+
 # Output directory and log file
 RESULT_DIR="results"
 RESULT_FILE="${RESULT_DIR}/${EXPERIMENT_NAME}_fill.txt"
+# Per-operation latencies and histograms; copied back to the host by run.sh
+HIST_DIR="new_results"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
 
 # Build
-mkdir -p "$RESULT_DIR"
-gcc -o fill fill.c -lzbd -lm -Wall
-if [ $? -ne 0 ]; then
+mkdir -p "$RESULT_DIR" "$HIST_DIR"
+if ! bash ../build_tools.sh exp_allocation; then
     echo "Compilation failed. Aborting."
     exit 1
 fi
 
-# Run fill for each percentage
+# Run fill for each percentage and thread count
 for PCT in "${PERCENTAGES[@]}"; do
-    echo "▶️  Running fill for ${PCT}%"
-    ./fill "$DEVICE_PATH" "$REQUEST_SIZE" "$RESULT_FILE" "$PCT"
-    if [ $? -ne 0 ]; then
-        echo "Fill failed at ${PCT}%"
-    fi
+    for JOB in "${JOBS[@]}"; do
+        HIST_FILE="${HIST_DIR}/${EXPERIMENT_NAME}_alloc_t${JOB}${REP_SUFFIX}.txt"
+        echo "▶️  Running fill for ${PCT}% with ${JOB} threads"
+        ./fill "$DEVICE_PATH" "$REQUEST_SIZE" "$RESULT_FILE" "$PCT" "$JOB" "$ROUNDS" "$HIST_FILE"
+        if [ $? -ne 0 ]; then
+            echo "Fill failed at ${PCT}% with ${JOB} threads"
+        fi
+    done
 done
 
 echo "✅ All fill runs complete. Results saved in $RESULT_FILE"
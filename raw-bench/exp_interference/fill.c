@@ -6,8 +6,37 @@
 #include <stdint.h>
 #include <string.h>
 #include <errno.h>
+#include <time.h>
+#include <pthread.h>
 #include <libzbd/zbd.h>
 
+/**
+ * One (zone, percentage) fill target and what happened to it.
+ */
+struct fill_target {
+    int zone_index;
+    int pct;
+    ssize_t written;
+    double seconds;
+};
+
+/**
+ * State shared by the writer threads. Targets are handed out in order through
+ * `next`; each zone is written start to end by a single thread, so writes stay
+ * sequential within a zone while different zones are filled concurrently.
+ */
+struct fill_pool {
+    int fd;
+    struct zbd_zone *zones;
+    unsigned int nr_zones;
+    size_t block_size;
+    size_t request_size;
+    struct fill_target *targets;
+    int nr_targets;
+    int next;
+    pthread_mutex_t lock;
+};
+
 /**
  * Round up `n` to the nearest multiple of `align`
  */
@@ -15,11 +44,17 @@ static size_t round_up(size_t n, size_t align) {
     return ((n + align - 1) / align) * align;
 }
 
+static double now_seconds(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
 /**
  * @brief Write percentage of a zone using direct I/O with aligned buffer.
  */
 ssize_t write_zone_percentage(int fd, struct zbd_zone *zone, size_t block_size,
-                              size_t request_size, int pct) {
+                              size_t request_size, int pct, void *buffer) {
     if (pct <= 0 || pct > 100) {
         fprintf(stderr, "Invalid percentage: %d%%\n", pct);
         return -1;
@@ -29,49 +64,123 @@ ssize_t write_zone_percentage(int fd, struct zbd_zone *zone, size_t block_size,
     size_t bytes_to_write = round_up(raw_bytes, request_size);
     off_t wp = zone->start;
 
-    printf("zone capacity %llu, raw %lu, aligned to write %lu: ",
-           zone->capacity, raw_bytes, bytes_to_write);
-
-    void *buffer;
-    if (posix_memalign(&buffer, request_size, request_size) != 0) {
-        perror("posix_memalign failed");
-        return -1;
-    }
-    memset(buffer, 0xAC, request_size);  // Dummy data
-
     size_t written = 0;
     while (written < bytes_to_write) {
         ssize_t ret = pwrite(fd, buffer, request_size, wp + written);
         if (ret < 0) {
             perror("pwrite");
-            free(buffer);
             return -1;
         }
         written += ret;
     }
 
-    printf("Zone at offset 0x%llx: Wrote approx. %d%% (%zu bytes)\n",
-           (unsigned long long)zone->start, pct, written);
-    free(buffer);
     return written;
 }
 
+/**
+ * Writer thread: fill targets until none are left.
+ */
+static void *fill_worker(void *arg) {
+    struct fill_pool *pool = arg;
+
+    void *buffer;
+    if (posix_memalign(&buffer, pool->request_size, pool->request_size) != 0) {
+        perror("posix_memalign failed");
+        return NULL;
+    }
+    memset(buffer, 0xAC, pool->request_size);  // Dummy data
+
+    for (;;) {
+        pthread_mutex_lock(&pool->lock);
+        int i = pool->next++;
+        pthread_mutex_unlock(&pool->lock);
+        if (i >= pool->nr_targets) {
+            break;
+        }
+
+        struct fill_target *t = &pool->targets[i];
+        struct zbd_zone *zone = &pool->zones[t->zone_index];
+
+        double start = now_seconds();
+        t->written = write_zone_percentage(pool->fd, zone, pool->block_size,
+                                           pool->request_size, t->pct, buffer);
+        t->seconds = now_seconds() - start;
+
+        if (t->written < 0) {
+            fprintf(stderr, "Write failed at zone %d\n", t->zone_index);
+        } else {
+            printf("Zone %d at offset 0x%llx: Wrote approx. %d%% (%zd bytes) in %.3f s\n",
+                   t->zone_index, (unsigned long long)zone->start, t->pct, t->written, t->seconds);
+        }
+    }
+
+    free(buffer);
+    return NULL;
+}
+
+/**
+ * Parse "<zone>:<percentage>" into a target.
+ */
+static int parse_target(const char *arg, struct fill_target *t) {
+    char *end;
+    long zone = strtol(arg, &end, 10);
+    if (end == arg || *end != ':') {
+        return -1;
+    }
+    const char *pct_str = end + 1;
+    long pct = strtol(pct_str, &end, 10);
+    if (end == pct_str || *end != '\0') {
+        return -1;
+    }
+    t->zone_index = (int)zone;
+    t->pct = (int)pct;
+    t->written = -1;
+    t->seconds = 0;
+    return 0;
+}
+
 int main(int argc, char *argv[]) {
-    if (argc != 6) {
-        fprintf(stderr, "Usage: %s <device> <request_size> <zone_index> <result_file> <percentage>\n", argv[0]);
+    if (argc < 6) {
+        fprintf(stderr, "Usage: %s <device> <request_size> <result_file> <workers> <zone>:<percentage>...\n", argv[0]);
+        fprintf(stderr, "Example: %s /dev/nvme0n1 4096 fill.txt 4 0:40 1:40 2:40 3:40\n", argv[0]);
         return EXIT_FAILURE;
     }
 
     const char *dev_path = argv[1];
     size_t req_size = strtoull(argv[2], NULL, 10);
-    int zone_index = atoi(argv[3]);
-    const char *result_file = argv[4];
-    int pct = atoi(argv[5]);
+    const char *result_file = argv[3];
+    int workers = atoi(argv[4]);
+    int nr_targets = argc - 5;
+
+    struct fill_target *targets = calloc(nr_targets, sizeof(*targets));
+    if (!targets) {
+        perror("calloc failed");
+        return EXIT_FAILURE;
+    }
+    for (int i = 0; i < nr_targets; i++) {
+        if (parse_target(argv[5 + i], &targets[i]) < 0) {
+            fprintf(stderr, "Invalid target '%s' (expected <zone>:<percentage>)\n", argv[5 + i]);
+            free(targets);
+            return EXIT_FAILURE;
+        }
+        // Two writers in one zone would collide on its write pointer
+        for (int j = 0; j < i; j++) {
+            if (targets[j].zone_index == targets[i].zone_index) {
+                fprintf(stderr, "Zone %d is listed more than once\n", targets[i].zone_index);
+                free(targets);
+                return EXIT_FAILURE;
+            }
+        }
+    }
+    if (workers <= 0 || workers > nr_targets) {
+        workers = nr_targets;
+    }
 
     struct zbd_info info;
     int fd = zbd_open(dev_path, O_WRONLY | O_DIRECT, &info);
     if (fd < 0) {
         perror("zbd_open");
+        free(targets);
         return EXIT_FAILURE;
     }
 
@@ -80,39 +189,105 @@ int main(int argc, char *argv[]) {
     if (zbd_list_zones(fd, 0, 0, ZBD_RO_ALL, &zones, &nr_zones) < 0) {
         perror("zbd_list_zones");
         zbd_close(fd);
+        free(targets);
         return EXIT_FAILURE;
     }
 
-    if (zone_index >= nr_zones || zone_index < 0) {
-        fprintf(stderr, "Invalid zone index %d (max: %u)\n", zone_index, nr_zones - 1);
+    for (int i = 0; i < nr_targets; i++) {
+        int zone_index = targets[i].zone_index;
+        if (zone_index >= (int)nr_zones || zone_index < 0) {
+            fprintf(stderr, "Invalid zone index %d (max: %u)\n", zone_index, nr_zones - 1);
+            free(zones);
+            zbd_close(fd);
+            free(targets);
+            return EXIT_FAILURE;
+        }
+        if (!zbd_zone_seq(&zones[zone_index])) {
+            fprintf(stderr, "Zone %d is not sequential\n", zone_index);
+            free(zones);
+            zbd_close(fd);
+            free(targets);
+            return EXIT_FAILURE;
+        }
+    }
+
+    struct fill_pool pool = {
+        .fd = fd,
+        .zones = zones,
+        .nr_zones = nr_zones,
+        .block_size = info.lblock_size,
+        .request_size = req_size,
+        .targets = targets,
+        .nr_targets = nr_targets,
+        .next = 0,
+    };
+    pthread_mutex_init(&pool.lock, NULL);
+
+    printf("Filling %d zones with %d writer threads\n", nr_targets, workers);
+
+    pthread_t *threads = calloc(workers, sizeof(*threads));
+    if (!threads) {
+        perror("calloc failed");
         free(zones);
         zbd_close(fd);
+        free(targets);
         return EXIT_FAILURE;
     }
 
-    struct zbd_zone *zone = &zones[zone_index];
-
-    if (!zbd_zone_seq(zone)) {
-        printf("Skipping non-sequential zone at index %d\n", zone_index);
+    double start = now_seconds();
+    int started = 0;
+    for (; started < workers; started++) {
+        int err = pthread_create(&threads[started], NULL, fill_worker, &pool);
+        if (err != 0) {
+            // The started writers still take every target from the pool
+            fprintf(stderr, "pthread_create: %s (%d of %d writers started)\n", strerror(err), started, workers);
+            break;
+        }
+    }
+    if (started == 0) {
+        pthread_mutex_destroy(&pool.lock);
+        free(threads);
         free(zones);
         zbd_close(fd);
+        free(targets);
         return EXIT_FAILURE;
     }
+    for (int i = 0; i < started; i++) {
+        pthread_join(threads[i], NULL);
+    }
+    double elapsed = now_seconds() - start;
+    pthread_mutex_destroy(&pool.lock);
 
-    ssize_t written = write_zone_percentage(fd, zone, info.lblock_size, req_size, pct);
-    if (written < 0) {
-        fprintf(stderr, "Write failed at zone %d\n", zone_index);
-    } else {
-        FILE *log = fopen(result_file, "a");
-        if (!log) {
-            perror("Failed to open result file");
-        } else {
-            fprintf(log, "zone_%d,%d%%,%zd\n", zone_index, pct, written);
-            fclose(log);
+    // zone_<index>,<pct>%,<bytes>,<seconds>,<MiB/s>
+    int failed = 0;
+    size_t total = 0;
+    FILE *log = fopen(result_file, "a");
+    if (!log) {
+        perror("Failed to open result file");
+    }
+    for (int i = 0; i < nr_targets; i++) {
+        struct fill_target *t = &targets[i];
+        if (t->written < 0) {
+            failed++;
+            continue;
+        }
+        total += t->written;
+        if (log) {
+            double mibps = t->seconds > 0 ? t->written / t->seconds / (1024.0 * 1024.0) : 0;
+            fprintf(log, "zone_%d,%d%%,%zd,%.3f,%.1f\n", t->zone_index, t->pct, t->written, t->seconds, mibps);
         }
     }
+    if (log) {
+        fclose(log);
+    }
+
+    printf("Filled %d/%d zones (%zu bytes) in %.3f s, %.1f MiB/s aggregate\n",
+           nr_targets - failed, nr_targets, total, elapsed,
+           elapsed > 0 ? total / elapsed / (1024.0 * 1024.0) : 0);
 
+    free(threads);
     free(zones);
     zbd_close(fd);
-    return EXIT_SUCCESS;
+    free(targets);
+    return failed ? EXIT_FAILURE : EXIT_SUCCESS;
 }
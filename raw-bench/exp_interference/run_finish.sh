@@ -14,9 +14,12 @@ DEVICE_PATH="$2"
 REQUEST_SIZE="$3"
 ZONE_INCREMENT="$4"
 
+source ../lib.sh # shared driver helpers
 
 RESULT_DIR="results"
 PERCENTAGE=40
+FILL_WORKERS=${FILL_WORKERS:-0} # fill writer threads, 0: one per zone
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
 
 # Starting zone LBAs
 FILL_ZONE_START=0
@@ -25,28 +28,68 @@ FIO_ZONE_START=30
 
 # Prepare environment
 mkdir -p "$RESULT_DIR"
-gcc -o fill fill.c -lzbd -Wall
+bash ../build_tools.sh exp_interference
+build_zonestat
+
+# Optional time series: FIO_TIMESERIES=1 adds per-I/O bw/lat/iops logs
+# (unix-epoch ms timestamps) plus the start/end time of every finish-zone
+# command, so throughput dips can be lined up with the finishes
+TIMESERIES_DIR="${RESULT_DIR}/timeseries"
+MARKER_FILE=""
+if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+    mkdir -p "$TIMESERIES_DIR"
+fi
+
+# Finish one zone, logging "start|end,<slba>,<epoch_ms>" when MARKER_FILE is set
+finish_zone() {
+    local slba="$1"
+    if [[ -n "$MARKER_FILE" ]]; then
+        echo "start,${slba},$(date +%s%3N)" >> "$MARKER_FILE"
+    fi
+    sudo nvme zns finish-zone "$DEVICE_PATH" --start-lba="$slba"
+    if [[ -n "$MARKER_FILE" ]]; then
+        echo "end,${slba},$(date +%s%3N)" >> "$MARKER_FILE"
+    fi
+}
 
-JOBS=(1 2 3 4 5 6 7)
+JOBS=(${THREADS:-1 2 3 4 5 6 7}) # thread counts, may be overridden by run.sh
 
 for JOB in "${JOBS[@]}"; do
 
-    # Fill the first JOB zones with $PERCENTAGE%
+    # Fill the next JOB zones with $PERCENTAGE%, all zones at once
+    TARGETS=()
     for ((zone=0; zone<JOB; zone++)); do
-        echo "Filling zone $FILL_ZONE_START to ${PERCENTAGE}%"
-        ./fill "$DEVICE_PATH" "$REQUEST_SIZE" "$FILL_ZONE_START" "${RESULT_DIR}/${EXPERIMENT_NAME}_fill.txt" "$PERCENTAGE"
+        TARGETS+=("${FILL_ZONE_START}:${PERCENTAGE}")
         FILL_ZONE_START=$((FILL_ZONE_START + 1))
     done
+    echo "Filling zones ${TARGETS[*]} (zone:percent)"
+    ./fill "$DEVICE_PATH" "$REQUEST_SIZE" "${RESULT_DIR}/${EXPERIMENT_NAME}_fill.txt" "$FILL_WORKERS" "${TARGETS[@]}"
+
+    TIMESERIES_PREFIX="${TIMESERIES_DIR}/${EXPERIMENT_NAME}_finish_${JOB}jobs${REP_SUFFIX}"
+    if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+        MARKER_FILE="${TIMESERIES_PREFIX}_finish.csv"
+        : > "$MARKER_FILE"
+    fi
+
+    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_finish_${JOB}jobs${REP_SUFFIX}.json"
+
+    # Zones in use: the filled zones, the finished ones (by LBA) and fio's
+    ZONES=("$((FILL_ZONE_START - JOB))-$((FILL_ZONE_START - 1))" "${FIO_ZONE_START}-$((FIO_ZONE_START + JOB - 1))")
+    for ((i=0; i<JOB; i++)); do
+        ZONES+=("@$((FINISH_ZONE_START + i * ZONE_INCREMENT))")
+    done
+    start_zonestat "$JSON_OUTPUT" "${ZONES[@]}"
 
+    FINISH_PIDS=()
     for ((i=0; i<JOB; i++)); do
         echo "Running finish at LBA offset 0x$(printf '%X' "$FINISH_ZONE_START")..."
-        sudo nvme zns finish-zone "$DEVICE_PATH" --start-lba="$FINISH_ZONE_START" &
+        finish_zone "$FINISH_ZONE_START" &
+        FINISH_PIDS+=($!)
         FINISH_ZONE_START=$((FINISH_ZONE_START + ZONE_INCREMENT))
     done
 
-    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_finish_${JOB}jobs.json"
-
     echo "Running fio with ${JOB} jobs starting at zone ${FIO_ZONE_START}..."
+    start_sampler "${JSON_OUTPUT%.json}.guest.csv"
     sudo fio --name=write \
         --filename="$DEVICE_PATH" \
         --rw=write \
@@ -59,10 +102,13 @@ for JOB in "${JOBS[@]}"; do
         --numjobs="$JOB" \
         --zonemode=zbd \
         --group_reporting \
+        $(fio_log_args "$TIMESERIES_PREFIX") \
         --output-format=json \
         --output="$JSON_OUTPUT"
+    stop_sampler
 
-    wait  # Wait for background 'finish' commands to complete
+    wait "${FINISH_PIDS[@]}"  # Wait for background 'finish' commands to complete
+    stop_zonestat
 done
 
 echo "All experiments completed. Fio results saved in ${RESULT_DIR}/"
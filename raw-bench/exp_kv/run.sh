@@ -0,0 +1,110 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 3 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE>"
+    echo "Example: $0 ZN540 /dev/nvme0n1 4096"
+    exit 1
+fi
+
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+
+source ../lib.sh # shared driver helpers
+
+# Application stage: RocksDB db_bench on ZenFS (both installed in the guest;
+# DB_BENCH / ZENFS point at the binaries). A fresh ZenFS is created on the
+# reset device, then the workloads run in order on the same database:
+#
+#   fillseq     sequential load of KV_NUM keys (1 thread)
+#   overwrite   random overwrites, KV_THREADS threads for KV_DURATION s
+#   readrandom  random point reads, same
+#   mixed       readrandomwriterandom with KV_READ_PCT % reads, same
+#
+# db_bench's report (with per-op latency histograms) goes to
+# results/<EXP_NAME>_kv_<workload>.log, followed by its db_bench arguments
+# and the sectors the guest wrote to the device during the workload.
+# plotting/kv_results.py turns the logs into fio-shaped JSON; device-level
+# DLWA comes from those sectors and the FEMU finish-log, which run.sh
+# enables for this EXP_ID.
+RESULT_DIR="results"
+WORKLOADS="${KV_WORKLOADS:-fillseq overwrite readrandom mixed}"
+NUM="${KV_NUM:-4000000}"
+VALUE_SIZE="${KV_VALUE_SIZE:-1000}"
+THREADS="${KV_THREADS:-4}"
+DURATION="${KV_DURATION:-60}"
+READ_PCT="${KV_READ_PCT:-50}"
+DB_BENCH="${DB_BENCH:-db_bench}"
+ZENFS="${ZENFS:-zenfs}"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+# The other workloads open the database fillseq creates (--use_existing_db=1)
+read -r FIRST_WORKLOAD _ <<< "$WORKLOADS"
+if [[ "$FIRST_WORKLOAD" != "fillseq" ]]; then
+    echo "ERROR: KV_WORKLOADS must start with fillseq, which creates the database the others use (got '$WORKLOADS')"
+    exit 1
+fi
+
+DEV_NAME=$(basename "$DEVICE_PATH")
+AUX_PATH="/tmp/zenfs-aux-${DEV_NAME}"
+
+for tool in "$DB_BENCH" "$ZENFS"; do
+    if ! command -v "$tool" >/dev/null; then
+        echo "ERROR: '$tool' not found; install RocksDB with the ZenFS plugin in the guest (or set DB_BENCH / ZENFS)"
+        exit 1
+    fi
+done
+
+mkdir -p "$RESULT_DIR"
+
+# Sectors written to the device so far (field 7 of /sys/block/<dev>/stat)
+sectors_written() {
+    awk '{ print $7 }' "/sys/block/${DEV_NAME}/stat"
+}
+
+# Reset the device and create ZenFS on it
+echo "Resetting all zones on $DEVICE_PATH..."
+sudo nvme zns reset-zone "$DEVICE_PATH" -a
+sudo rm -rf "$AUX_PATH"
+sudo "$ZENFS" mkfs --zbd="$DEV_NAME" --aux_path="$AUX_PATH" --force
+
+declare -A BENCHMARKS=(
+  [fillseq]="--benchmarks=fillseq --use_existing_db=0 --threads=1"
+  [overwrite]="--benchmarks=overwrite --use_existing_db=1 --threads=${THREADS} --duration=${DURATION}"
+  [readrandom]="--benchmarks=readrandom --use_existing_db=1 --threads=${THREADS} --duration=${DURATION}"
+  [mixed]="--benchmarks=readrandomwriterandom --use_existing_db=1 --threads=${THREADS} --duration=${DURATION} --readwritepercent=${READ_PCT}"
+)
+
+for WORKLOAD in $WORKLOADS; do
+    if [[ -z "${BENCHMARKS[$WORKLOAD]+x}" ]]; then
+        echo "ERROR: unknown workload '$WORKLOAD' (${!BENCHMARKS[*]})"
+        exit 1
+    fi
+    LOG_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_kv_${WORKLOAD}${REP_SUFFIX}.log"
+
+    echo "Running db_bench ${WORKLOAD} on ZenFS (${DEV_NAME})..."
+    start_sampler "${LOG_OUTPUT%.log}.guest.csv"
+    BEFORE=$(sectors_written)
+    if ! sudo "$DB_BENCH" \
+        --fs_uri="zenfs://dev:${DEV_NAME}" \
+        --db=/kv/dbbench \
+        ${BENCHMARKS[$WORKLOAD]} \
+        --num="$NUM" \
+        --value_size="$VALUE_SIZE" \
+        --key_size=16 \
+        --compression_type=none \
+        --histogram=1 \
+        --seed=42 > "$LOG_OUTPUT"; then
+        stop_sampler
+        echo "ERROR: db_bench ${WORKLOAD} failed (see ${LOG_OUTPUT}); later workloads need its database, stopping"
+        exit 1
+    fi
+    {
+        echo "benchmark_args: ${BENCHMARKS[$WORKLOAD]}"
+        echo "device_sectors_written: $(( $(sectors_written) - BEFORE ))"
+    } >> "$LOG_OUTPUT"
+    stop_sampler
+done
+
+echo "🎉 All experiments completed. Results saved in ${RESULT_DIR}/"
@@ -7,8 +7,35 @@
 #include <string.h>
 #include <errno.h>
 #include <time.h>
+#include <pthread.h>
 #include <libzbd/zbd.h>
 
+/**
+ * One zone to fill to `pct` and then finish.
+ */
+struct occupancy_job {
+    int zone_index;
+    double pct;
+};
+
+/**
+ * State shared by the worker threads. Jobs are handed out in order through
+ * `next`; each worker fills and finishes one zone at a time, so at most
+ * `workers` zones are open at once. Result lines are appended under `lock`.
+ */
+struct occupancy_pool {
+    int fd;
+    struct zbd_zone *zones;
+    size_t block_size;
+    size_t request_size;
+    struct occupancy_job *jobs;
+    int nr_jobs;
+    int next;
+    int failures;
+    FILE *log;
+    pthread_mutex_t lock;
+};
+
 /**
  * Round up value `n` to the nearest multiple of `align`.
  */
@@ -77,15 +104,80 @@ double finish_zone_and_record(int fd, struct zbd_zone *zone, size_t block_size)
 }
 
 
+static void *occupancy_worker(void *arg) {
+    struct occupancy_pool *pool = arg;
+
+    for (;;) {
+        pthread_mutex_lock(&pool->lock);
+        int j = pool->next++;
+        pthread_mutex_unlock(&pool->lock);
+        if (j >= pool->nr_jobs) {
+            break;
+        }
+
+        int i = pool->jobs[j].zone_index;
+        double pct = pool->jobs[j].pct;
+        struct zbd_zone *zone = &pool->zones[i];
+
+        if (write_zone_percentage(pool->fd, zone, pool->block_size, pool->request_size, pct) < 0) {
+            fprintf(stderr, "Write failed at zone %d\n", i);
+            pthread_mutex_lock(&pool->lock);
+            pool->failures++;
+            pthread_mutex_unlock(&pool->lock);
+            continue;
+        }
+
+        double finish_time = finish_zone_and_record(pool->fd, zone, pool->block_size);
+
+        pthread_mutex_lock(&pool->lock);
+        if (finish_time >= 0) {
+            fprintf(pool->log, "zone_%d,%.6f%%,%.6f(s)\n", i, pct, finish_time);
+            fflush(pool->log);
+            printf("Zone %d finished in %.6f seconds.\n", i, finish_time);
+        } else {
+            fprintf(stderr, "Failed to finish zone %d\n", i);
+            pool->failures++;
+        }
+        pthread_mutex_unlock(&pool->lock);
+    }
+    return NULL;
+}
+
+
+static void usage(const char *prog) {
+    fprintf(stderr, "Usage: %s [-n zones_per_pct] [-j workers] <device> <request_size> <result_file> <pct1> [pct2 pct3 ...]\n", prog);
+    fprintf(stderr, "  -n  zones filled and finished per percentage (default 1)\n");
+    fprintf(stderr, "  -j  worker threads, each filling and finishing one zone at a time (default 1)\n");
+}
+
+
 int main(int argc, char *argv[]) {
-    if (argc < 5) {
-        fprintf(stderr, "Usage: %s <device> <request_size> <result_file> <pct1> [pct2 pct3 ...]\n", argv[0]);
+    int zones_per_pct = 1;
+    int workers = 1;
+    int opt;
+    while ((opt = getopt(argc, argv, "n:j:")) != -1) {
+        switch (opt) {
+        case 'n':
+            zones_per_pct = atoi(optarg);
+            break;
+        case 'j':
+            workers = atoi(optarg);
+            break;
+        default:
+            usage(argv[0]);
+            return EXIT_FAILURE;
+        }
+    }
+    if (argc - optind < 4 || zones_per_pct <= 0 || workers <= 0) {
+        usage(argv[0]);
         return EXIT_FAILURE;
     }
 
-    const char *dev_path = argv[1];
-    size_t req_size = strtoull(argv[2], NULL, 10);
-    const char *result_file = argv[3];
+    const char *dev_path = argv[optind];
+    size_t req_size = strtoull(argv[optind + 1], NULL, 10);
+    const char *result_file = argv[optind + 2];
+    char **pct_args = &argv[optind + 3];
+    int nr_pcts = argc - optind - 3;
 
     struct zbd_info info;
     int fd = zbd_open(dev_path, O_WRONLY | O_DIRECT, &info);
@@ -94,51 +186,103 @@ int main(int argc, char *argv[]) {
         return EXIT_FAILURE;
     }
 
-    struct zbd_zone *zones;
+    int ret = EXIT_FAILURE;
+    struct zbd_zone *zones = NULL;
+    struct occupancy_job *jobs = NULL;
+    pthread_t *threads = NULL;
+    FILE *log = NULL;
     unsigned int nr_zones;
     if (zbd_list_zones(fd, 0, 0, ZBD_RO_ALL, &zones, &nr_zones) < 0) {
         perror("zbd_list_zones");
-        zbd_close(fd);
-        return EXIT_FAILURE;
+        goto out;
     }
 
-    FILE *log = fopen(result_file, "a");
+    log = fopen(result_file, "a");
     if (!log) {
         perror("Failed to open result file");
-        free(zones);
-        zbd_close(fd);
-        return EXIT_FAILURE;
+        goto out;
     }
 
-    for (int i = 0; i < argc - 4; ++i) {
-        double pct = atof(argv[i + 4]);
-        if (i >= nr_zones) {
-            fprintf(stderr, "No more zones to write (index %d)\n", i);
-            break;
+    // Percentage k uses zones k * zones_per_pct ... (k + 1) * zones_per_pct - 1
+    jobs = calloc((size_t)nr_pcts * zones_per_pct, sizeof(*jobs));
+    if (!jobs) {
+        perror("calloc failed");
+        goto out;
+    }
+    int nr_jobs = 0;
+    for (int k = 0; k < nr_pcts; ++k) {
+        double pct = atof(pct_args[k]);
+        for (int r = 0; r < zones_per_pct; ++r) {
+            int i = k * zones_per_pct + r;
+            if (i >= (int)nr_zones) {
+                fprintf(stderr, "No more zones to write (index %d)\n", i);
+                break;
+            }
+            if (!zbd_zone_seq(&zones[i])) {
+                printf("Skipping non-sequential zone at index %d\n", i);
+                continue;
+            }
+            jobs[nr_jobs].zone_index = i;
+            jobs[nr_jobs].pct = pct;
+            nr_jobs++;
         }
+    }
+    if (workers > nr_jobs) {
+        workers = nr_jobs > 0 ? nr_jobs : 1;
+    }
 
-        struct zbd_zone *zone = &zones[i];
-        if (!zbd_zone_seq(zone)) {
-            printf("Skipping non-sequential zone at index %d\n", i);
-            continue;
-        }
+    struct occupancy_pool pool = {
+        .fd = fd,
+        .zones = zones,
+        .block_size = info.lblock_size,
+        .request_size = req_size,
+        .jobs = jobs,
+        .nr_jobs = nr_jobs,
+        .next = 0,
+        .failures = 0,
+        .log = log,
+    };
+    pthread_mutex_init(&pool.lock, NULL);
 
-        if (write_zone_percentage(fd, zone, info.lblock_size, req_size, pct) < 0) {
-            fprintf(stderr, "Write failed at zone %d\n", i);
-            continue;
-        }
+    printf("Filling and finishing %d zones (%d per percentage) with %d workers\n",
+           nr_jobs, zones_per_pct, workers);
 
-        double finish_time = finish_zone_and_record(fd, zone, info.lblock_size);
-        if (finish_time >= 0) {
-            fprintf(log, "zone_%d,%.6f%%,%.6f(s)\n", i, pct, finish_time);
-            printf("Zone %d finished in %.6f seconds.\n", i, finish_time);
-        } else {
-            fprintf(stderr, "Failed to finish zone %d\n", i);
+    threads = calloc(workers, sizeof(*threads));
+    if (!threads) {
+        perror("calloc failed");
+        pthread_mutex_destroy(&pool.lock);
+        goto out;
+    }
+    struct timespec start, end;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    int started = 0;
+    for (; started < workers; started++) {
+        int err = pthread_create(&threads[started], NULL, occupancy_worker, &pool);
+        if (err != 0) {
+            // The started workers still take every job from the pool
+            fprintf(stderr, "pthread_create: %s (%d of %d workers started)\n", strerror(err), started, workers);
+            break;
         }
     }
+    for (int t = 0; t < started; t++) {
+        pthread_join(threads[t], NULL);
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    pthread_mutex_destroy(&pool.lock);
+    if (started == 0) {
+        goto out;
+    }
+    printf("Done in %.3f s, %d failed zones\n",
+           (end.tv_sec - start.tv_sec) + (end.tv_nsec - start.tv_nsec) / 1e9, pool.failures);
+    ret = EXIT_SUCCESS;
 
-    fclose(log);
+out:
+    free(threads);
+    free(jobs);
+    if (log) {
+        fclose(log);
+    }
     free(zones);
     zbd_close(fd);
-    return EXIT_SUCCESS;
+    return ret;
 }
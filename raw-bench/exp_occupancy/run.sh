@@ -11,17 +11,23 @@ EXPERIMENT_NAME="$1"
 DEVICE_PATH="$2"
 REQUEST_SIZE="$3"
 
-RESULT_FILE="results/${EXPERIMENT_NAME}-time"
+# REP is the repetition tag set by run_matrix.py --repeat
+RESULT_FILE="results/${EXPERIMENT_NAME}-time${REP:+_r${REP}}"
 PERCENTAGES=(10 25 50 75 95)
 
+# Zones filled and finished per percentage, and worker threads doing so
+# concurrently; more zones per level give latency/DLWA distributions
+ZONES_PER_PCT=${OCC_ZONES:-1}
+WORKERS=${OCC_WORKERS:-1}
+
 # Reset all zones
 echo "Resetting all zones on ${DEVICE_PATH}..."
 sudo nvme zns reset-zone "$DEVICE_PATH" -a
 
 # Build fill tool (uses libzbd and handles everything inside)
-gcc -o fill fill.c -lzbd -O2 -Wall
+bash ../build_tools.sh exp_occupancy
 
 # Run the fill experiment
-./fill "$DEVICE_PATH" "$REQUEST_SIZE" "$RESULT_FILE" "${PERCENTAGES[@]}"
+./fill -n "$ZONES_PER_PCT" -j "$WORKERS" "$DEVICE_PATH" "$REQUEST_SIZE" "$RESULT_FILE" "${PERCENTAGES[@]}"
 
 echo "🎉 All experiments completed. Results saved in ${RESULT_FILE}"
@@ -0,0 +1,56 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 3 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE>"
+    echo "Example: $0 ZN540 /dev/nvme0n1 4096"
+    exit 1
+fi
+
+# Input arguments
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+
+source ../lib.sh # shared driver helpers
+
+# Configuration: K writer threads × QD REQUEST_SIZE commands in flight each,
+# all writing into APPEND_ZONES shared zones, once with Zone Append and once
+# with regular writes serialized per zone (../zappend.c; fio cannot issue
+# Zone Append). Every run starts from reset zones and stops after
+# APPEND_RUNTIME seconds or when the device is full. Lists may be overridden
+# by run.sh.
+RESULT_DIR="results"
+THREADS="${APPEND_THREADS:-1 2 4 8}"
+QDEPTHS="${APPEND_QDEPTHS:-1 2 4 8}"
+ZONES="${APPEND_ZONES:-1}"
+RUNTIME="${APPEND_RUNTIME:-30}"
+OPS="append write"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+# One CSV line per run (op,threads,qd,active_zones,...; see ../zappend.c)
+CSV_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_append${REP_SUFFIX}.csv"
+
+mkdir -p "$RESULT_DIR"
+rm -f "$CSV_OUTPUT"
+bash ../build_tools.sh zappend
+
+# The zones of the whole device: active zones move on to the next ones when full
+NR_ZONES=$(cat "/sys/block/$(basename "$DEVICE_PATH")/queue/nr_zones")
+ZONE_RANGE="0-$((NR_ZONES - 1))"
+
+for OP in $OPS; do
+    for T in $THREADS; do
+        for QD in $QDEPTHS; do
+            echo "Resetting all zones on $DEVICE_PATH..."
+            sudo nvme zns reset-zone "$DEVICE_PATH" -a
+
+            echo "Running zappend: ${OP} from ${T} threads at qdepth=${QD} into ${ZONES} shared zone(s)..."
+            start_sampler "${CSV_OUTPUT%.csv}_${OP}_${T}t_${QD}qd.guest.csv"
+            sudo ../zappend "$DEVICE_PATH" "$OP" "$T" "$QD" "$ZONES" "$REQUEST_SIZE" "$RUNTIME" "$CSV_OUTPUT" "$ZONE_RANGE"
+            stop_sampler
+        done
+    done
+done
+
+echo "All experiments completed. Results saved in '${CSV_OUTPUT}'"
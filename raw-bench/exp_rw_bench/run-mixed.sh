@@ -0,0 +1,120 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 4 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE> <ZONE_INCREMENT>"
+    echo "Example: $0 ZN540 /dev/nvme0n1 4096 131072"
+    exit 1
+fi
+
+# Input arguments
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+ZONE_INCREMENT="$4"
+
+source ../lib.sh # shared driver helpers
+
+# Configuration: N sequential writers and M readers run at the same time, one
+# fio run per "N:M" ratio and read access. Readers read the zones prefilled
+# below (sequential or random within their zone, looping); writers write their
+# own empty zones. Every job stops at MIX_RUNTIME or as soon as the first
+# writer reaches the end of its zone (--exitall), so both classes are measured
+# over the same interval. Lists may be overridden by run.sh.
+RESULT_DIR="results"
+RATIOS="${MIX_RATIOS:-4:0 3:1 2:2 1:3 0:4 6:1 4:3 1:6}"
+READS="${MIX_READS:-read_seq read_rand}"
+RUNTIME="${MIX_RUNTIME:-30}"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+MAX_READERS=0
+MAX_WRITERS=0
+for RATIO in $RATIOS; do
+    (( ${RATIO%%:*} > MAX_WRITERS )) && MAX_WRITERS=${RATIO%%:*}
+    (( ${RATIO##*:} > MAX_READERS )) && MAX_READERS=${RATIO##*:}
+done
+
+# Zones: readers use 0..MAX_READERS-1, writers the ones after them
+READ_ZONE_START=0
+WRITE_ZONE_START=$MAX_READERS
+
+declare -A READ_RW=([read_seq]=read [read_rand]=randread)
+
+mkdir -p "$RESULT_DIR"
+
+# Optional time series: FIO_TIMESERIES=1 adds per-I/O bw/lat/iops logs
+# (unix-epoch ms timestamps) under ${RESULT_DIR}/timeseries/
+TIMESERIES_DIR="${RESULT_DIR}/timeseries"
+if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+    mkdir -p "$TIMESERIES_DIR"
+fi
+
+build_zonestat
+
+# Reset the device and pre-fill the reader zones
+echo "Resetting all zones on $DEVICE_PATH..."
+sudo nvme zns reset-zone "$DEVICE_PATH" -a
+
+if (( MAX_READERS > 0 )); then
+    echo "Pre-filling zones ${READ_ZONE_START}-$((READ_ZONE_START + MAX_READERS - 1)) for the readers..."
+    sudo fio --name=prefill \
+        --filename="$DEVICE_PATH" \
+        --rw=write \
+        --direct=1 \
+        --ioengine=sync \
+        --bs=16K \
+        --size=1z \
+        --offset="${READ_ZONE_START}z" \
+        --offset_increment=1z \
+        --numjobs="$MAX_READERS" \
+        --zonemode=zbd \
+        --group_reporting
+fi
+
+for READ in $READS; do
+    for RATIO in $RATIOS; do
+        WRITERS=${RATIO%%:*}
+        READERS=${RATIO##*:}
+        if (( WRITERS + READERS == 0 )); then
+            continue
+        fi
+        JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_mixed_${WRITERS}w${READERS}r_${READ}${REP_SUFFIX}.json"
+
+        # Writers start from empty zones every run
+        for ((zone=WRITE_ZONE_START; zone<WRITE_ZONE_START + WRITERS; zone++)); do
+            sudo nvme zns reset-zone "$DEVICE_PATH" --start-lba=$((zone * ZONE_INCREMENT))
+        done
+
+        # One fio group per class: jobs[0] writers, jobs[1] readers (or the only one)
+        JOBS=()
+        if (( WRITERS > 0 )); then
+            JOBS+=(--name=write --rw=write --size=1z
+                   --offset="${WRITE_ZONE_START}z" --offset_increment=1z --numjobs="$WRITERS")
+        fi
+        if (( READERS > 0 )); then
+            JOBS+=(--name=read --new_group --rw="${READ_RW[$READ]}" --time_based --size=1z
+                   --offset="${READ_ZONE_START}z" --offset_increment=1z --numjobs="$READERS")
+        fi
+
+        echo "Running fio with ${WRITERS} writers and ${READERS} ${READ} readers..."
+        start_sampler "${JSON_OUTPUT%.json}.guest.csv"
+        start_zonestat "$JSON_OUTPUT" "${READ_ZONE_START}-$((WRITE_ZONE_START + MAX_WRITERS - 1))"
+        sudo fio \
+            --filename="$DEVICE_PATH" \
+            --direct=1 \
+            --ioengine=sync \
+            --bs=16K \
+            --zonemode=zbd \
+            --runtime="$RUNTIME" \
+            --exitall \
+            --group_reporting \
+            $(fio_log_args "${TIMESERIES_DIR}/$(basename "$JSON_OUTPUT" .json)") \
+            --output-format=json \
+            --output="$JSON_OUTPUT" \
+            "${JOBS[@]}"
+        stop_sampler
+        stop_zonestat
+    done
+done
+
+echo "All experiments completed. Results saved in '${RESULT_DIR}/'"
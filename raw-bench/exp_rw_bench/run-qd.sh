@@ -12,9 +12,13 @@ EXPERIMENT_NAME="$1"
 DEVICE_PATH="$2"
 REQUEST_SIZE="$3"
 
+source ../lib.sh # shared driver helpers
+
 # Configuration
 FIO_ZONE_START=0
 RESULT_DIR="results"
+QDEPTHS="${QDEPTHS:-2 4 8 16 32 64}" # queue depths, may be overridden by run.sh
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
 
 # Prepare result directory
 mkdir -p "$RESULT_DIR"
@@ -24,10 +28,11 @@ echo "Resetting all zones on $DEVICE_PATH..."
 sudo nvme zns reset-zone "$DEVICE_PATH" -a
 
 # Run experiment for each queue depth
-for QD in 2 4 8 16 32 64; do
-    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_qd_${QD}.json"
+for QD in $QDEPTHS; do
+    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_qd_${QD}${REP_SUFFIX}.json"
     echo "Running fio with qdepth=${QD} on 1 job (zone ${FIO_ZONE_START})..."
 
+    start_sampler "${JSON_OUTPUT%.json}.guest.csv"
     fio --name=write \
         --filename="$DEVICE_PATH" \
         --rw=write \
@@ -42,6 +47,7 @@ for QD in 2 4 8 16 32 64; do
         --group_reporting \
         --output-format=json \
         --output="$JSON_OUTPUT"
+    stop_sampler
 
     wait
 done
@@ -0,0 +1,72 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 3 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE>"
+    echo "Example: REPLAY_TRACES=/data/app.blkparse.gz $0 ZN540 /dev/nvme0n1 4096"
+    exit 1
+fi
+
+# Input arguments
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+
+source ../lib.sh # shared driver helpers
+
+# Configuration: every trace of REPLAY_TRACES (paths in the guest; blkparse
+# output or timestamp_s,op,zone,offset,size CSV, optionally gzipped) is
+# replayed onto the first REPLAY_ZONES zones (default: all) by ../replay.c,
+# once per mode (open: at the trace's timestamps / REPLAY_SPEED, closed: as
+# fast as possible) and worker count. Traces are streamed, never copied.
+# Lists may be overridden by run.sh.
+RESULT_DIR="results"
+TRACES="${REPLAY_TRACES:-}"
+MODES="${REPLAY_MODES:-open closed}"
+WORKERS="${REPLAY_WORKERS:-1 4 16}"
+SPEED="${REPLAY_SPEED:-1}"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+if [[ -z "$TRACES" ]]; then
+    echo "ERROR: set REPLAY_TRACES to the trace file(s) to replay"
+    exit 1
+fi
+
+mkdir -p "$RESULT_DIR"
+bash ../build_tools.sh replay
+
+NR_ZONES=$(cat "/sys/block/$(basename "$DEVICE_PATH")/queue/nr_zones")
+ZONES="${REPLAY_ZONES:-$NR_ZONES}"
+ZONE_RANGE="0-$((ZONES - 1))"
+
+for TRACE in $TRACES; do
+    if [[ ! -f "$TRACE" ]]; then
+        echo "ERROR: trace '$TRACE' not found"
+        exit 1
+    fi
+    # Trace name without directory and .gz/.csv/.blkparse/.txt extensions
+    TRACE_NAME=$(basename "$TRACE")
+    TRACE_NAME="${TRACE_NAME%.gz}"
+    TRACE_NAME="${TRACE_NAME%.*}"
+    TRACE_NAME="${TRACE_NAME//_/-}" # keep "_" as the field separator of the result names
+
+    for MODE in $MODES; do
+        for W in $WORKERS; do
+            STEM="${RESULT_DIR}/${EXPERIMENT_NAME}_replay_${TRACE_NAME}_${MODE}_${W}w${REP_SUFFIX}"
+
+            echo "Resetting all zones on $DEVICE_PATH..."
+            sudo nvme zns reset-zone "$DEVICE_PATH" -a
+
+            echo "Replaying ${TRACE} (${MODE} loop, ${W} workers) onto zones ${ZONE_RANGE}..."
+            start_sampler "$STEM.guest.csv"
+            if [[ "$TRACE" == *.gz ]]; then
+                zcat "$TRACE" | sudo ../replay "$DEVICE_PATH" - "$MODE" "$W" "$STEM" "$ZONE_RANGE" "$SPEED"
+            else
+                sudo ../replay "$DEVICE_PATH" "$TRACE" "$MODE" "$W" "$STEM" "$ZONE_RANGE" "$SPEED"
+            fi
+            stop_sampler
+        done
+    done
+done
+
+echo "All experiments completed. Results saved in '${RESULT_DIR}/'"
@@ -0,0 +1,66 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 3 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE>"
+    echo "Example: $0 ZN540 /dev/nvme0n1 4096"
+    exit 1
+fi
+
+# Input arguments
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+
+source ../lib.sh # shared driver helpers
+
+# Configuration: every combination of engine × block size × queue depth × jobs
+# is one fio run, each job writing its own zone. Lists may be overridden by
+# run.sh; sync has no queue, so it only runs at queue depth 1.
+FIO_ZONE_START=0
+RESULT_DIR="new_results"
+ENGINES="${SCALE_ENGINES:-sync libaio io_uring}"
+BLOCK_SIZES="${SCALE_BLOCK_SIZES:-4K 16K 64K 128K}"
+QDEPTHS="${QDEPTHS:-1 2 4 8 16 32 64}"
+JOBS="${THREADS:-1 2 4 8}"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+mkdir -p "$RESULT_DIR"
+
+RUNS=0
+for ENGINE in $ENGINES; do
+  for BS in $BLOCK_SIZES; do
+    for QD in $QDEPTHS; do
+      if [[ "$ENGINE" == "sync" && "$QD" -ne 1 ]]; then
+          continue
+      fi
+      for JOB in $JOBS; do
+        JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_scale_${ENGINE}_bs${BS}_qd${QD}_j${JOB}${REP_SUFFIX}.json"
+        # Every run starts from empty zones
+        sudo nvme zns reset-zone "$DEVICE_PATH" -a
+
+        echo "Running fio: ioengine=${ENGINE} bs=${BS} iodepth=${QD} numjobs=${JOB}..."
+        start_sampler "${JSON_OUTPUT%.json}.guest.csv"
+        sudo fio --name=write \
+            --filename="$DEVICE_PATH" \
+            --rw=write \
+            --direct=1 \
+            --ioengine="$ENGINE" \
+            --bs="$BS" \
+            --iodepth="$QD" \
+            --size=1z \
+            --offset="${FIO_ZONE_START}z" \
+            --offset_increment=1z \
+            --numjobs="$JOB" \
+            --zonemode=zbd \
+            --group_reporting \
+            --output-format=json \
+            --output="$JSON_OUTPUT"
+        stop_sampler
+        RUNS=$((RUNS + 1))
+      done
+    done
+  done
+done
+
+echo "All ${RUNS} scaling runs completed. Results saved in '${RESULT_DIR}/'"
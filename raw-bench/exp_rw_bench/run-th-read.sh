@@ -12,13 +12,25 @@ EXPERIMENT_NAME="$1"
 DEVICE_PATH="$2"
 REQUEST_SIZE="$3"
 
+source ../lib.sh # shared driver helpers
+
 # Configuration
 FIO_ZONE_START=0
 RESULT_DIR="results"
+THREADS="${THREADS:-1 2 3 4 5 6 7}" # thread counts, may be overridden by run.sh
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+MAX_JOBS=$(printf '%s\n' $THREADS | sort -n | tail -1)
 
 # Create result directory if not present
 mkdir -p "$RESULT_DIR"
 
+# Optional time series: FIO_TIMESERIES=1 adds per-I/O bw/lat/iops logs
+# (unix-epoch ms timestamps) under ${RESULT_DIR}/timeseries/
+TIMESERIES_DIR="${RESULT_DIR}/timeseries"
+if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+    mkdir -p "$TIMESERIES_DIR"
+fi
+
 # Reset the device
 echo "Resetting all zones on $DEVICE_PATH..."
 sudo nvme zns reset-zone "$DEVICE_PATH" -a
@@ -33,17 +45,18 @@ sudo fio --name=write \
     --size=1z \
     --offset="${FIO_ZONE_START}z" \
     --offset_increment=1z \
-    --numjobs=7 \
+    --numjobs="$MAX_JOBS" \
     --zonemode=zbd \
     --group_reporting \
 
 wait
 
-# Run experiment from 1 to 14 threads (jobs)
-for JOB in {1..7}; do
-    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}_read_seq.json"
+# Run experiment for each thread (job) count
+for JOB in $THREADS; do
+    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}_read_seq${REP_SUFFIX}.json"
     echo "Running fio with ${JOB} jobs (starting at zone ${FIO_ZONE_START})..."
 
+    start_sampler "${JSON_OUTPUT%.json}.guest.csv"
     sudo fio --name=read \
         --filename="$DEVICE_PATH" \
         --rw=read \
@@ -56,15 +69,18 @@ for JOB in {1..7}; do
         --numjobs="$JOB" \
         --zonemode=zbd \
         --group_reporting \
+        $(fio_log_args "${TIMESERIES_DIR}/$(basename "$JSON_OUTPUT" .json)") \
         --output-format=json \
         --output="$JSON_OUTPUT"
+    stop_sampler
     wait
 done
 
-for JOB in {1..7}; do
-    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}_read_rand.json"
+for JOB in $THREADS; do
+    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}_read_rand${REP_SUFFIX}.json"
     echo "Running fio with ${JOB} jobs (starting at zone ${FIO_ZONE_START})..."
 
+    start_sampler "${JSON_OUTPUT%.json}.guest.csv"
     sudo fio --name=randread \
         --filename="$DEVICE_PATH" \
         --rw=randread \
@@ -77,8 +93,10 @@ for JOB in {1..7}; do
         --numjobs="$JOB" \
         --zonemode=zbd \
         --group_reporting \
+        $(fio_log_args "${TIMESERIES_DIR}/$(basename "$JSON_OUTPUT" .json)") \
         --output-format=json \
         --output="$JSON_OUTPUT"
+    stop_sampler
     wait
 done
 
@@ -12,22 +12,37 @@ EXPERIMENT_NAME="$1"
 DEVICE_PATH="$2"
 REQUEST_SIZE="$3"
 
+source ../lib.sh # shared driver helpers
+
 # Configuration
 FIO_ZONE_START=0
 RESULT_DIR="new_results"
+THREADS="${THREADS:-1 2 4 8 16 32}" # thread counts, may be overridden by run.sh
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
 
 # Create result directory if not present
 mkdir -p "$RESULT_DIR"
 
+# Optional time series: FIO_TIMESERIES=1 adds per-I/O bw/lat/iops logs
+# (unix-epoch ms timestamps) under ${RESULT_DIR}/timeseries/
+TIMESERIES_DIR="${RESULT_DIR}/timeseries"
+if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+    mkdir -p "$TIMESERIES_DIR"
+fi
+
+build_zonestat
+
 # Reset the device
 echo "Resetting all zones on $DEVICE_PATH..."
 sudo nvme zns reset-zone "$DEVICE_PATH" -a
 
-# Run experiment from 1 to 14 threads (jobs)
-for JOB in 1, 2, 4, 8, 16, 32; do
-    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}.json"
+# Run experiment for each thread (job) count
+for JOB in $THREADS; do
+    JSON_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_threads_${JOB}${REP_SUFFIX}.json"
     echo "Running fio with ${JOB} jobs (starting at zone ${FIO_ZONE_START})..."
 
+    start_sampler "${JSON_OUTPUT%.json}.guest.csv"
+    start_zonestat "$JSON_OUTPUT" "${FIO_ZONE_START}-$((FIO_ZONE_START + JOB - 1))"
     sudo fio --name=write \
         --filename="$DEVICE_PATH" \
         --rw=write \
@@ -40,8 +55,11 @@ for JOB in 1, 2, 4, 8, 16, 32; do
         --numjobs="$JOB" \
         --zonemode=zbd \
         --group_reporting \
+        $(fio_log_args "${TIMESERIES_DIR}/$(basename "$JSON_OUTPUT" .json)") \
         --output-format=json \
         --output="$JSON_OUTPUT"
+    stop_sampler
+    stop_zonestat
     wait
 done
 
@@ -0,0 +1,77 @@
+#!/bin/bash
+
+# Check arguments
+if [ "$#" -ne 4 ]; then
+    echo "Usage: $0 <EXPERIMENT_NAME> <DEVICE_PATH> <REQUEST_SIZE> <PARALLEL_ZONES>"
+    echo "Example: $0 ZN540 /dev/nvme0n1 4096 32"
+    exit 1
+fi
+
+# Input arguments
+EXPERIMENT_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+PARALLEL_ZONES="$4"
+
+source ../lib.sh # shared driver helpers
+
+# Configuration: a fixed number of sync writers (ZONES_WRITERS, default
+# PARALLEL_ZONES from run.sh) keeps P zones open at once, writer t writing
+# REQUEST_SIZE requests to open zone t % P (../zappend.c, regular writes at
+# the write pointer); a full zone is replaced by the next empty one, so every
+# P also measures zone allocation (the first write into each zone). P runs
+# over ZONES_OPEN, default 1, 2, 4, ... up to the device's open/active zone
+# limit (sysfs) or the writer count, whichever is lower. Every run starts from
+# reset zones and stops after ZONES_RUNTIME seconds or when the device is
+# full. Lists may be overridden by run.sh.
+RESULT_DIR="results"
+WRITERS="${ZONES_WRITERS:-$PARALLEL_ZONES}"
+RUNTIME="${ZONES_RUNTIME:-30}"
+REP_SUFFIX="${REP:+_r${REP}}" # repetition tag set by run_matrix.py --repeat
+
+# One CSV line per P (op,threads,qd,active_zones,...; see ../zappend.c)
+CSV_OUTPUT="${RESULT_DIR}/${EXPERIMENT_NAME}_zones${REP_SUFFIX}.csv"
+
+mkdir -p "$RESULT_DIR"
+rm -f "$CSV_OUTPUT"
+bash ../build_tools.sh zappend
+
+QUEUE="/sys/block/$(basename "$DEVICE_PATH")/queue"
+NR_ZONES=$(cat "${QUEUE}/nr_zones")
+ZONE_RANGE="0-$((NR_ZONES - 1))"
+
+# Open/active zone limit of the device (0 in sysfs: no limit)
+LIMIT=$NR_ZONES
+for attr in max_open_zones max_active_zones; do
+    value=$(cat "${QUEUE}/${attr}" 2>/dev/null || echo 0)
+    if (( value > 0 && value < LIMIT )); then
+        LIMIT=$value
+    fi
+done
+MAX_OPEN=$(( LIMIT < WRITERS ? LIMIT : WRITERS ))
+echo "Device limit: ${LIMIT} open/active zones; ${WRITERS} writers, up to ${MAX_OPEN} open zones"
+
+if [[ -z "${ZONES_OPEN:-}" ]]; then
+    ZONES_OPEN=""
+    for ((p=1; p<MAX_OPEN; p*=2)); do
+        ZONES_OPEN+="$p "
+    done
+    ZONES_OPEN+="$MAX_OPEN"
+fi
+
+for P in $ZONES_OPEN; do
+    if (( P > WRITERS || P > LIMIT )); then
+        echo "⚠️ Skipping ${P} open zones (${WRITERS} writers, device limit ${LIMIT})"
+        continue
+    fi
+
+    echo "Resetting all zones on $DEVICE_PATH..."
+    sudo nvme zns reset-zone "$DEVICE_PATH" -a
+
+    echo "Running zappend: ${WRITERS} writers round-robin over ${P} open zone(s)..."
+    start_sampler "${CSV_OUTPUT%.csv}_${P}z.guest.csv"
+    sudo ../zappend "$DEVICE_PATH" write "$WRITERS" 1 "$P" "$REQUEST_SIZE" "$RUNTIME" "$CSV_OUTPUT" "$ZONE_RANGE"
+    stop_sampler
+done
+
+echo "All experiments completed. Results saved in '${CSV_OUTPUT}'"
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import signal
+import argparse
+
+# Host-side resource sampler for FEMU runs (run.sh RESOURCE_STATS=1).
+#
+#   sample: every --interval seconds, record the CPU ticks of every thread of
+#           the QEMU process (<prefix>_qemu.csv) and host CPU / memory
+#           (<prefix>_host.csv) until the process exits or SIGTERM.
+#   split:  after the results are copied back, cut the samples to the window
+#           of every fio JSON written since --since and store them next to it
+#           as <json stem>.qemu.csv / <json stem>.host.csv.
+#
+# Windows come from the fio JSON (timestamp_ms is the end of the run, in the
+# guest clock, which kvm-clock keeps within well under a sample of the host).
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+# Extra time kept on both sides of a fio run when splitting
+SPLIT_MARGIN_MS = 1000
+
+QEMU_FIELDS = ["epoch_ms", "tid", "comm", "utime_ticks", "stime_ticks"]
+HOST_FIELDS = ["epoch_ms", "cpu_busy_ticks", "cpu_total_ticks", "mem_total_kb", "mem_available_kb"]
+
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def thread_ticks(pid):
+    """[(tid, comm, utime, stime)] of every thread of `pid` (empty once it exited)."""
+    rows = []
+    for task in glob.glob(f"/proc/{pid}/task/*/stat"):
+        try:
+            with open(task) as f:
+                stat = f.read()
+        except OSError:
+            continue  # thread exited between glob and open
+        # comm may contain spaces and parentheses: split around the last ')'
+        tid, rest = stat.split(" (", 1)
+        comm, fields = rest.rsplit(") ", 1)
+        fields = fields.split()
+        rows.append((int(tid), comm, int(fields[11]), int(fields[12])))
+    return rows
+
+
+def host_cpu_mem():
+    """(busy ticks, total ticks, MemTotal kB, MemAvailable kB) of the host."""
+    with open("/proc/stat") as f:
+        ticks = [int(v) for v in f.readline().split()[1:]]
+    idle = ticks[3] + ticks[4]  # idle + iowait
+    mem = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            mem[key] = int(value.split()[0])
+    return sum(ticks) - idle, sum(ticks), mem.get("MemTotal", 0), mem.get("MemAvailable", 0)
+
+
+def sample(pid, prefix, interval):
+    stop = []
+    signal.signal(signal.SIGTERM, lambda *_: stop.append(1))
+    signal.signal(signal.SIGINT, lambda *_: stop.append(1))
+
+    os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+    header = f"# clk_tck={CLK_TCK} host_cpus={os.cpu_count()} pid={pid} interval_s={interval}\n"
+    with open(prefix + "_qemu.csv", "w", newline="") as qf, open(prefix + "_host.csv", "w", newline="") as hf:
+        qf.write(header)
+        hf.write(header)
+        qemu, host = csv.writer(qf), csv.writer(hf)
+        qemu.writerow(QEMU_FIELDS)
+        host.writerow(HOST_FIELDS)
+        while not stop:
+            start = time.monotonic()
+            ts = now_ms()
+            threads = thread_ticks(pid)
+            if not threads:
+                break  # QEMU is gone
+            qemu.writerows((ts, *t) for t in threads)
+            host.writerow((ts, *host_cpu_mem()))
+            qf.flush()
+            hf.flush()
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def fio_window(path):
+    """(start_ms, end_ms) of a fio JSON run, or None."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        end = int(data["timestamp_ms"])
+        runtime = max(max(job["read"]["runtime"], job["write"]["runtime"]) for job in data["jobs"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return end - int(runtime), end
+
+
+def split_samples(path, out_path, start_ms, end_ms):
+    """Copy the header and the rows of `path` within [start_ms, end_ms]."""
+    kept = 0
+    with open(path) as src, open(out_path, "w") as dst:
+        for line in src:
+            if line.startswith("#") or line.startswith("epoch_ms"):
+                dst.write(line)
+                continue
+            ts = int(line.split(",", 1)[0])
+            if start_ms <= ts <= end_ms:
+                dst.write(line)
+                kept += 1
+    return kept
+
+
+def split(prefix, result_dirs, since_ms):
+    for result_dir in result_dirs:
+        for path in sorted(glob.glob(os.path.join(result_dir, "*.json"))):
+            if os.path.getmtime(path) * 1000 < since_ms:
+                continue
+            window = fio_window(path)
+            if window is None:
+                continue
+            start, end = window[0] - SPLIT_MARGIN_MS, window[1] + SPLIT_MARGIN_MS
+            stem = path[:-len(".json")]
+            for kind in ("qemu", "host"):
+                if os.path.exists(f"{prefix}_{kind}.csv"):
+                    split_samples(f"{prefix}_{kind}.csv", f"{stem}.{kind}.csv", start, end)
+            print(f"📎 Host samples for {os.path.basename(path)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample or split host resource usage of a FEMU run.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("sample", help="sample until the QEMU process exits or SIGTERM")
+    p.add_argument("pid", type=int, help="QEMU process id")
+    p.add_argument("prefix", help="output prefix (<prefix>_qemu.csv, <prefix>_host.csv)")
+    p.add_argument("--interval", type=float, default=0.5, help="seconds between samples")
+    p = sub.add_parser("split", help="store the samples of each new fio JSON next to it")
+    p.add_argument("prefix", help="prefix given to 'sample'")
+    p.add_argument("result_dirs", nargs="+", help="directories with fio JSON results")
+    p.add_argument("--since", type=int, default=0, help="only JSONs modified after this epoch ms")
+    args = parser.parse_args()
+
+    if args.command == "sample":
+        sample(args.pid, args.prefix, args.interval)
+    else:
+        split(args.prefix, args.result_dirs, args.since)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
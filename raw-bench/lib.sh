@@ -0,0 +1,57 @@
+#!/bin/bash
+
+# Helpers shared by the experiment drivers, sourced from their experiment
+# directory (source ../lib.sh) after DEVICE_PATH is set.
+
+# fio arguments of the optional time series: FIO_TIMESERIES=1 adds per-I/O
+# bw/lat/iops logs (unix-epoch ms timestamps) with the given prefix
+fio_log_args() {
+    if [[ "${FIO_TIMESERIES:-0}" -eq 1 ]]; then
+        echo "--write_bw_log=$1 --write_lat_log=$1 --write_iops_log=$1 --log_avg_msec=0 --log_unix_epoch=1"
+    fi
+}
+
+# Optional resource samples: RESOURCE_STATS=1 records guest CPU and device
+# counters (../sample_guest.sh) to the given CSV until stop_sampler
+SAMPLER_PID=""
+start_sampler() {
+    if [[ "${RESOURCE_STATS:-0}" -eq 1 ]]; then
+        bash ../sample_guest.sh "$DEVICE_PATH" "$1" "${RESOURCE_INTERVAL:-0.5}" &
+        SAMPLER_PID=$!
+    fi
+}
+
+stop_sampler() {
+    if [[ -n "$SAMPLER_PID" ]]; then
+        kill "$SAMPLER_PID"
+        wait "$SAMPLER_PID" 2>/dev/null
+        SAMPLER_PID=""
+    fi
+}
+
+# Optional zone telemetry: ZONE_STATS=1 reports the zones a run uses every
+# ZONE_INTERVAL_MS and logs their state changes and write pointers to
+# <json stem>.zones.csv (../zonestat.c); build_zonestat once before the runs
+build_zonestat() {
+    if [[ "${ZONE_STATS:-0}" -eq 1 ]]; then
+        bash ../build_tools.sh zonestat
+    fi
+}
+
+ZONESTAT_PID=""
+start_zonestat() {
+    if [[ "${ZONE_STATS:-0}" -eq 1 ]]; then
+        local json="$1"
+        shift
+        ../zonestat "$DEVICE_PATH" "${json%.json}.zones.csv" "${ZONE_INTERVAL_MS:-100}" "$@" &
+        ZONESTAT_PID=$!
+    fi
+}
+
+stop_zonestat() {
+    if [[ -n "$ZONESTAT_PID" ]]; then
+        kill "$ZONESTAT_PID"
+        wait "$ZONESTAT_PID" 2>/dev/null
+        ZONESTAT_PID=""
+    fi
+}
@@ -0,0 +1,40 @@
+#ifndef LOGHIST_H
+#define LOGHIST_H
+
+#include <stdint.h>
+
+/*
+ * Log-linear histogram buckets shared by replay.c and exp_allocation/fill.c.
+ * Values below LOGHIST_LINEAR get one bucket each; above that every power of
+ * two is split into 2^LOGHIST_SUB_BITS buckets (< 2% wide), up to 2^64 - 1.
+ * Bucket indices written to files are decoded by bucket_bounds in
+ * plotting/alloc_hist.py, which takes LOGHIST_SUB_BITS from the file header.
+ */
+#define LOGHIST_SUB_BITS 6
+#define LOGHIST_SUB (1 << LOGHIST_SUB_BITS)
+#define LOGHIST_LINEAR (2 * LOGHIST_SUB)
+#define LOGHIST_BUCKETS (LOGHIST_LINEAR + (64 - LOGHIST_SUB_BITS - 1) * LOGHIST_SUB)
+
+static inline unsigned int loghist_index(uint64_t v) {
+    if (v < LOGHIST_LINEAR) {
+        return (unsigned int)v;
+    }
+    unsigned int e = 63 - __builtin_clzll(v);
+    return LOGHIST_LINEAR + (e - LOGHIST_SUB_BITS - 1) * LOGHIST_SUB +
+           (unsigned int)((v >> (e - LOGHIST_SUB_BITS)) & (LOGHIST_SUB - 1));
+}
+
+/**
+ * Representative value of bucket `i`: the value itself in the linear range,
+ * the middle of the bucket above it.
+ */
+static inline double loghist_value(unsigned int i) {
+    if (i < LOGHIST_LINEAR) {
+        return i;
+    }
+    unsigned int log_idx = i - LOGHIST_LINEAR;
+    double width = (double)(1ULL << (log_idx / LOGHIST_SUB + 1));
+    return (LOGHIST_SUB + log_idx % LOGHIST_SUB) * width + width / 2;
+}
+
+#endif
@@ -0,0 +1,164 @@
+import os
+import re
+import glob
+import numpy as np
+
+# Reader for the allocation benchmark output of exp_allocation/fill
+# (<EXP_NAME>_alloc_t<threads>.txt): per-operation events plus per-thread and
+# per-zone latency histograms in log-linear microsecond buckets.
+#
+#   # alloc-hist v1 threads=<T> zones=<N> rounds=<R> request_size=<S> unit=us sub_bits=<B>
+#   event,<round>,<thread>,<zone>,<op>,<start_us>,<lat_us>
+#   hist,<thread|zone>,<id>,<op>,<count>,<sum_us>,<max_us>,<bucket>:<n> <bucket>:<n> ...
+
+OPS = ("write", "reset")
+
+EVENT_DTYPE = np.dtype([
+    ("round", np.int32),
+    ("thread", np.int32),
+    ("zone", np.int32),
+    ("op", np.int8),      # index into OPS
+    ("start_us", np.int64),
+    ("lat_us", np.int64),
+])
+
+# <EXP_NAME>_alloc_t<threads>[_r<rep>].txt, _r<rep> from run_matrix.py --repeat
+HIST_FILE_RE = re.compile(r"^(?P<exp>.+)_alloc_t(?P<threads>\d+)(?:_r(?P<rep>\d+))?\.txt$")
+EXP_MODE_RE = re.compile(r"vt-(?P<mode>\d+)_chnk-(?P<chunk>\d+)")
+
+
+def bucket_bounds(n_buckets, sub_bits=6):
+    """[lower, upper) in µs of every histogram bucket (see loghist_index in ../loghist.h)."""
+    sub = 1 << sub_bits
+    linear = 2 * sub
+    idx = np.arange(n_buckets, dtype=np.int64)
+    lower = idx.astype(np.float64)
+    upper = lower + 1
+
+    log_idx = idx[idx >= linear] - linear
+    exp = log_idx // sub + sub_bits + 1
+    width = np.ldexp(1.0, (exp - sub_bits).astype(int))
+    lower[linear:] = (sub + log_idx % sub) * width
+    upper[linear:] = lower[linear:] + width
+    return lower, upper
+
+
+def _parse_buckets(field):
+    pairs = [p.split(":") for p in field.split()]
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    data = np.array(pairs, dtype=np.int64)
+    return data[:, 0], data[:, 1]
+
+
+def read_alloc_hist(path):
+    """
+    Parse one histogram file.
+
+    Returns {"meta": {...}, "events": EVENT_DTYPE array,
+             "hists": {(scope, id, op): {"count", "sum_us", "max_us", "buckets"}}}
+    where "buckets" is a dense count array.
+    """
+    meta, events, hists = {}, [], {}
+    sparse = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                meta.update(kv.split("=", 1) for kv in line.split() if "=" in kv)
+                continue
+            kind, rest = line.split(",", 1)
+            if kind == "event":
+                rnd, thread, zone, op, start, lat = rest.split(",")
+                events.append((int(rnd), int(thread), int(zone), OPS.index(op), int(start), int(lat)))
+            elif kind == "hist":
+                scope, ident, op, count, total, peak, buckets = rest.split(",", 6)
+                idx, counts = _parse_buckets(buckets)
+                sparse.append((idx, counts))
+                hists[(scope, int(ident), op)] = {
+                    "count": int(count), "sum_us": int(total), "max_us": int(peak),
+                    "buckets": (idx, counts),
+                }
+
+    meta = {k: int(v) if v.isdigit() else v for k, v in meta.items()}
+    n_buckets = max((int(idx.max()) + 1 for idx, _ in sparse if len(idx)), default=0)
+    for h in hists.values():
+        idx, counts = h["buckets"]
+        dense = np.zeros(n_buckets, dtype=np.int64)
+        dense[idx] = counts
+        h["buckets"] = dense
+    return {"meta": meta, "events": np.array(events, dtype=EVENT_DTYPE), "hists": hists}
+
+
+def merge_hists(hists, scope="thread", op="write"):
+    """Sum the histograms of one scope and op: (count, sum_us, max_us, buckets)."""
+    selected = [h for (s, _, o), h in hists.items() if s == scope and o == op]
+    if not selected:
+        return 0, 0, 0, np.zeros(0, dtype=np.int64)
+    n_buckets = max(len(h["buckets"]) for h in selected)
+    buckets = np.zeros(n_buckets, dtype=np.int64)
+    for h in selected:
+        buckets[:len(h["buckets"])] += h["buckets"]
+    return (sum(h["count"] for h in selected), sum(h["sum_us"] for h in selected),
+            max(h["max_us"] for h in selected), buckets)
+
+
+def hist_percentiles(buckets, pcts, sub_bits=6):
+    """Percentiles (µs) of a bucket histogram, interpolated linearly inside buckets."""
+    total = buckets.sum()
+    if total == 0:
+        return np.full(len(pcts), np.nan)
+    lower, upper = bucket_bounds(len(buckets), sub_bits)
+    cum = np.cumsum(buckets)
+    ranks = np.asarray(pcts, dtype=np.float64) / 100.0 * total
+    b = np.minimum(np.searchsorted(cum, ranks, side="left"), len(buckets) - 1)
+    before = np.where(b > 0, cum[b - 1], 0)
+    frac = np.clip((ranks - before) / np.maximum(buckets[b], 1), 0, 1)
+    return lower[b] + frac * (upper[b] - lower[b])
+
+
+def mode_key(exp_name):
+    """'<mode>_<chunk>' key (as in the FEMU allocation log) of an EXP_NAME."""
+    m = EXP_MODE_RE.search(exp_name)
+    return f"{m.group('mode')}_{m.group('chunk')}" if m else None
+
+
+def concurrency_stats(results_dir, op="write", pcts=(50, 99)):
+    """
+    Scan <EXP_NAME>_alloc_t<threads>[_r<rep>].txt files and return
+    {mode_key: (threads, mean_ms, pct_ms)} with threads sorted ascending and
+    pct_ms of shape (len(threads), len(pcts)), from the thread histograms
+    merged over all repetitions.
+    """
+    merged = {}  # (mode_key, threads) → [count, sum_us, buckets, sub_bits]
+    for path in sorted(glob.glob(os.path.join(results_dir, "*_alloc_t*.txt"))):
+        m = HIST_FILE_RE.match(os.path.basename(path))
+        key = mode_key(m.group("exp")) if m else None
+        if key is None:
+            continue
+        data = read_alloc_hist(path)
+        count, total_us, _, buckets = merge_hists(data["hists"], "thread", op)
+        if count == 0:
+            continue
+        acc = merged.setdefault((key, int(m.group("threads"))),
+                                [0, 0, np.zeros(0, dtype=np.int64), data["meta"].get("sub_bits", 6)])
+        acc[0] += count
+        acc[1] += total_us
+        if len(buckets) > len(acc[2]):
+            acc[2] = np.pad(acc[2], (0, len(buckets) - len(acc[2])))
+        acc[2][:len(buckets)] += buckets
+
+    points = {}
+    for (key, threads), (count, total_us, buckets, sub_bits) in merged.items():
+        pct_us = hist_percentiles(buckets, pcts, sub_bits)
+        points.setdefault(key, []).append((threads, total_us / count / 1000.0, pct_us / 1000.0))
+
+    stats = {}
+    for key, rows in points.items():
+        rows.sort(key=lambda r: r[0])
+        stats[key] = (np.array([r[0] for r in rows]),
+                      np.array([r[1] for r in rows]),
+                      np.array([r[2] for r in rows]))
+    return stats
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import argparse
+
+from fio_results import load_sweep
+from regression import (WINDOW, NOISE_K, REL_FLOOR, connect, fio_metrics, dlwa_metrics,
+                        fingerprint, last_run, record_run, baseline_values, compare)
+
+# Records the current results as one run in the performance history and
+# checks it against the previous runs (see regression.py). Meant to run after
+# every sweep, e.g. when the FEMU build changes:
+#
+#   python check_regressions.py --label nightly-$(date +%F) --build <femu commit>
+#
+# Writes a JSON report and exits 1 if any metric regressed.
+
+RESULT_DIRS = ["../exp_rw_bench/results", "../exp_interference/results"]
+FINISH_LOG = "../exp_occupancy/results/finish-log-new"
+OCCUPANCY_PERCENTAGES = [10, 25, 50, 75, 95]
+
+DEFAULT_DB = "../regression-history.sqlite"
+DEFAULT_REPORT = "results/regression_report.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the current results and flag regressions.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="history database (SQLite)")
+    parser.add_argument("--report", default=DEFAULT_REPORT, help="JSON report path")
+    parser.add_argument("--label", default=time.strftime("run-%Y%m%d-%H%M%S"), help="name of this run")
+    parser.add_argument("--build", help="FEMU build identifier, e.g. its git commit")
+    parser.add_argument("--window", type=int, default=WINDOW, help="previous runs in the baseline")
+    parser.add_argument("--noise-k", type=float, default=NOISE_K, help="robust sigmas a change must exceed")
+    parser.add_argument("--rel-floor", type=float, default=REL_FLOOR,
+                        help="minimum relative change that counts")
+    parser.add_argument("--no-record", action="store_true", help="compare only, do not store this run")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # paths are relative to plotting/
+
+    # === Current metrics ===
+    rows = fio_metrics(load_sweep([d for d in RESULT_DIRS if os.path.isdir(d)]))
+    if os.path.exists(FINISH_LOG):
+        rows += dlwa_metrics(FINISH_LOG, OCCUPANCY_PERCENTAGES)
+    if not rows:
+        sys.exit("❌ No results to record")
+
+    conn = connect(args.db)
+    previous = last_run(conn)
+    if previous and previous[2] == fingerprint(rows):
+        print(f"⚠️ Results unchanged since run '{previous[1]}', comparing without recording")
+        args.no_record = True
+
+    if args.no_record:
+        run_id = None
+    else:
+        run_id = record_run(conn, rows, args.label, args.build)
+        print(f"🗄️  Recorded run '{args.label}' ({len(rows)} metrics) in {args.db}")
+
+    baseline = baseline_values(conn, run_id, args.window)
+    findings = compare(rows, baseline, args.noise_k, args.rel_floor)
+    conn.close()
+
+    # === Report ===
+    summary = {}
+    for f in findings:
+        summary[f["status"]] = summary.get(f["status"], 0) + 1
+    order = {"regression": 0, "improvement": 1, "new": 2, "ok": 3}
+    findings.sort(key=lambda f: (order[f["status"]], f["experiment"], f["strategy"], f["access"],
+                                 f["point"], f["metric"]))
+    report = {
+        "label": args.label,
+        "build": args.build,
+        "recorded": not args.no_record,
+        "window": args.window,
+        "noise_k": args.noise_k,
+        "rel_floor": args.rel_floor,
+        "summary": summary,
+        "findings": findings,
+    }
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=1)
+
+    print("\n📊 " + ", ".join(f"{n} {status}" for status, n in sorted(summary.items())))
+    for f in findings:
+        if f["status"] not in ("regression", "improvement"):
+            continue
+        icon = "🔻" if f["status"] == "regression" else "🔺"
+        change = "n/a" if f["change_pct"] is None else f"{f['change_pct']:+.1f}%"  # zero baseline median
+        print(f"  {icon} {f['experiment']:<12s} {f['strategy']:<14s} {f['access']:<9s} "
+              f"{f['point']:>5g} {f['metric']:<8s} {f['value']:10.3f} vs {f['baseline_median']:10.3f} "
+              f"({change})")
+    print(f"\n✅ Report saved to {args.report}")
+    return 1 if summary.get("regression") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import os
+import sys
+import csv
+import numpy as np
+
+from fio_results import load_results, select, cell_ids, CELL_COLUMNS
+from scaling import strategy_label
+from stats import reject_outliers, welch_t_test, mann_whitney_u, bootstrap_ci
+
+# Pairwise significance of strategy differences from repeated runs
+# (run_matrix.py --repeat K). Every strategy is compared with the baseline at
+# each cell (same experiment, access, threads, qd, engine, block size), using
+# one sample per repetition after outlier rejection.
+#
+# Usage: python compare_strategies.py [<results dir>] [<baseline strategy>] [<experiment>]
+
+RESULTS_DIR = sys.argv[1] if len(sys.argv) > 1 else "../exp_rw_bench/results"
+BASELINE = sys.argv[2] if len(sys.argv) > 2 else "0"
+EXPERIMENT = sys.argv[3] if len(sys.argv) > 3 else "threads"
+ALPHA = 0.05
+
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, f"significance_{EXPERIMENT}.csv")
+
+table = select(load_results(RESULTS_DIR), experiment=EXPERIMENT, job=0)
+if len(table["filename"]) == 0:
+    sys.exit(f"❌ No '{EXPERIMENT}' results in {RESULTS_DIR}")
+
+# === Group repetitions by cell, ignoring the strategy ===
+cells = cell_ids(table, [c for c in CELL_COLUMNS if c != "strategy"])
+
+mb_s = table["bw_bytes"] / (1024 ** 2)
+rows = []
+for cell in np.unique(cells):
+    idx = np.flatnonzero(cells == cell)
+    first = idx[0]
+    baseline = reject_outliers(mb_s[idx[table["strategy"][idx] == BASELINE]])[0]
+    if len(baseline) == 0:
+        continue
+    base_mean = bootstrap_ci(baseline)[0]
+    for strategy in sorted(set(table["strategy"][idx].tolist()) - {BASELINE}, key=strategy_label):
+        values = reject_outliers(mb_s[idx[table["strategy"][idx] == strategy]])[0]
+        mean, low, high = bootstrap_ci(values)
+        _, _, p_welch = welch_t_test(values, baseline)
+        _, p_mwu = mann_whitney_u(values, baseline)
+        rows.append({
+            "strategy": strategy,
+            "baseline": BASELINE,
+            "access": table["access"][first],
+            "threads": int(table["threads"][first]),
+            "qd": int(table["qd"][first]),
+            "engine": table["engine"][first],
+            "bs_bytes": int(table["bs_bytes"][first]),
+            "n": len(values),
+            "n_baseline": len(baseline),
+            "mb_s": mean,
+            "mb_s_low": low,
+            "mb_s_high": high,
+            "baseline_mb_s": base_mean,
+            "speedup": mean / base_mean if base_mean else np.nan,
+            "p_welch": p_welch,
+            "p_mannwhitney": p_mwu,
+            "note": "single run" if len(values) < 2 or len(baseline) < 2 else "",
+        })
+
+if not rows:
+    sys.exit(f"❌ No cells with baseline '{BASELINE}' in {RESULTS_DIR}")
+
+# === Report ===
+print(f"\n📊 Bandwidth vs. {strategy_label(BASELINE)} ({EXPERIMENT}, * p < {ALPHA}):")
+print(f"{'Strategy':<24s}{'access':<11s}{'T':>3s}{'QD':>4s}{'n':>4s}{'speedup':>9s}{'Welch p':>10s}{'MWU p':>9s}")
+for r in rows:
+    significant = "*" if r["p_welch"] < ALPHA or r["p_mannwhitney"] < ALPHA else ""
+    print(f"{strategy_label(r['strategy']):<24s}{r['access']:<11s}{r['threads']:>3d}{r['qd']:>4d}"
+          f"{r['n']:>4d}{r['speedup']:>9.3f}{r['p_welch']:>10.4f}{r['p_mannwhitney']:>9.4f} {significant}")
+
+with open(OUTPUT_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+print(f"\n✅ Significance table saved to {OUTPUT_CSV}")
@@ -0,0 +1,275 @@
+import os
+import argparse
+import numpy as np
+
+# Streaming parser for the FEMU key,value logs written through zns_log_path
+# (finish-log) and zns_log_path_time (allocation-log):
+#
+#   mode,0,chunk_size,0,zone_slba,0,wptr,216288,stripe_pages_written,6759,pages_finished,60825,max_pages,67584
+#   mode,2,chunk,1,time,15490(us)
+#
+# Logs are read in bounded chunks of lines and each chunk is converted
+# straight into a typed NumPy structured array; aggregates are vectorized.
+#
+# A text log can also be converted once into a fixed-width binary event file
+# (<log>.bin) that is opened with numpy.memmap, so analysis slices events in
+# place instead of re-parsing text.
+
+# Bytes of text read per chunk (whole lines, see io.IOBase.readlines)
+CHUNK_BYTES = 16 * 1024 * 1024
+
+# LBAs per flash page, used to turn (wptr - zone_slba) into pages written
+LBAS_PER_PAGE = 32
+
+# === Record layouts ===
+# Explicit little-endian so the binary event files are portable between hosts
+FINISH_DTYPE = np.dtype([
+    ("mode", "<i4"),
+    ("chunk_size", "<i4"),
+    ("zone_slba", "<i8"),
+    ("wptr", "<i8"),
+    ("stripe_pages_written", "<i8"),
+    ("pages_finished", "<i8"),
+    ("max_pages", "<i8"),
+])
+
+ALLOCATION_DTYPE = np.dtype([
+    ("mode", "<i4"),
+    ("chunk_size", "<i4"),
+    ("time_us", "<i8"),
+])
+
+# Log key → record field, where the FEMU key differs from the field name
+KEY_ALIASES = {
+    "chunk": "chunk_size",
+    "time": "time_us",
+}
+
+
+def _line_layout(line):
+    """Return the record field for each value position of a log line."""
+    keys = line.split(",")[0::2]
+    return tuple(KEY_ALIASES.get(k, k) for k in keys)
+
+
+def _parse_slow(lines, dtype, stats):
+    """Per-line fallback for chunks that mix layouts or contain bad lines."""
+    records = []
+    for line in lines:
+        parts = line.split(",")
+        if len(parts) % 2 != 0:
+            stats["malformed"] += 1
+            continue
+        entry = {KEY_ALIASES.get(parts[i], parts[i]): parts[i + 1]
+                 for i in range(0, len(parts), 2)}
+        try:
+            records.append(tuple(int(entry.get(name, 0)) for name in dtype.names))
+        except ValueError:
+            stats["malformed"] += 1
+    return np.array(records, dtype=dtype)
+
+
+def _parse_chunk(lines, dtype, stats):
+    """Convert one chunk of 'mode,...' lines into a structured array."""
+    layout = _line_layout(lines[0])
+    try:
+        values = np.loadtxt(lines, delimiter=",", dtype=np.int64, ndmin=2,
+                            usecols=range(1, 2 * len(layout), 2))
+    except ValueError:
+        return _parse_slow(lines, dtype, stats)
+
+    records = np.zeros(len(values), dtype=dtype)
+    for col, name in enumerate(layout):
+        if name in dtype.names:
+            records[name] = values[:, col]
+    return records
+
+
+def iter_log_chunks(path, dtype, chunk_bytes=CHUNK_BYTES, stats=None):
+    """Yield structured arrays of `dtype`, one per bounded chunk of the log."""
+    stats = stats if stats is not None else {"malformed": 0}
+    stats.setdefault("malformed", 0)
+    with open(path, "r") as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            text = "".join(l for l in lines if l.startswith("mode"))
+            if not text:
+                continue
+            text = text.replace("(us)", "").replace("(s)", "")
+            yield _parse_chunk(text.splitlines(), dtype, stats)
+
+
+def read_log(path, dtype, chunk_bytes=CHUNK_BYTES):
+    """Read a whole FEMU log into one structured array of `dtype`."""
+    stats = {"malformed": 0}
+    chunks = list(iter_log_chunks(path, dtype, chunk_bytes, stats))
+    if stats["malformed"]:
+        print(f"⚠️ Skipped {stats['malformed']} malformed line(s) in {path}")
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def read_finish_log(path, chunk_bytes=CHUNK_BYTES):
+    return read_log(path, FINISH_DTYPE, chunk_bytes)
+
+
+def read_allocation_log(path, chunk_bytes=CHUNK_BYTES):
+    return read_log(path, ALLOCATION_DTYPE, chunk_bytes)
+
+
+# === Binary event files ===
+# 16-byte header followed by packed records of the kind's dtype:
+#   magic (8 bytes) | kind (uint32) | record size in bytes (uint32)
+EVENT_MAGIC = b"ZNSEVT\x00\x01"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("kind", "<u4"), ("record_size", "<u4")])
+EVENT_KINDS = {
+    1: FINISH_DTYPE,
+    2: ALLOCATION_DTYPE,
+}
+KIND_NAMES = {"finish": 1, "allocation": 2}
+BIN_SUFFIX = ".bin"
+
+# Records per block when walking a memory-mapped event file
+BLOCK_RECORDS = 1 << 20
+
+
+def _kind_of(dtype):
+    for kind, kind_dtype in EVENT_KINDS.items():
+        if kind_dtype == dtype:
+            return kind
+    raise ValueError(f"No binary event kind for dtype {dtype}")
+
+
+def detect_dtype(path):
+    """Guess the record layout of a text log from its first 'mode' line."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("mode"):
+                layout = _line_layout(line.strip())
+                return FINISH_DTYPE if "zone_slba" in layout else ALLOCATION_DTYPE
+    raise ValueError(f"No 'mode' lines in {path}")
+
+
+def convert_log(text_path, bin_path=None, dtype=None, chunk_bytes=CHUNK_BYTES):
+    """Convert a FEMU text log into a binary event file, one chunk at a time."""
+    bin_path = bin_path or text_path + BIN_SUFFIX
+    dtype = dtype or detect_dtype(text_path)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = EVENT_MAGIC
+    header["kind"] = _kind_of(dtype)
+    header["record_size"] = dtype.itemsize
+
+    stats = {"malformed": 0}
+    count = 0
+    tmp_path = f"{bin_path}.{os.getpid()}.tmp"  # concurrent plot scripts may race
+    with open(tmp_path, "wb") as f:
+        header.tofile(f)
+        for records in iter_log_chunks(text_path, dtype, chunk_bytes, stats):
+            records.tofile(f)
+            count += len(records)
+    os.replace(tmp_path, bin_path)
+
+    if stats["malformed"]:
+        print(f"⚠️ Skipped {stats['malformed']} malformed line(s) in {text_path}")
+    return bin_path, count
+
+
+def open_events(bin_path):
+    """Memory-map a binary event file as a read-only structured array."""
+    header = np.fromfile(bin_path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header["magic"][0] != EVENT_MAGIC:
+        raise ValueError(f"{bin_path} is not a binary event file")
+    dtype = EVENT_KINDS.get(int(header["kind"][0]))
+    if dtype is None or int(header["record_size"][0]) != dtype.itemsize:
+        raise ValueError(f"{bin_path} has an unknown record layout")
+
+    if os.path.getsize(bin_path) == HEADER_DTYPE.itemsize:
+        return np.zeros(0, dtype=dtype)  # np.memmap refuses empty mappings
+    return np.memmap(bin_path, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize)
+
+
+def load_events(path, dtype=None):
+    """
+    Return the events of a FEMU log as a memory-mapped structured array.
+
+    `path` may be a binary event file or a text log; a text log is converted
+    to <log>.bin on first use and whenever it is newer than its .bin.
+    """
+    if path.endswith(BIN_SUFFIX):
+        return open_events(path)
+
+    bin_path = path + BIN_SUFFIX
+    if not os.path.exists(bin_path) or os.path.getmtime(bin_path) < os.path.getmtime(path):
+        convert_log(path, bin_path, dtype)
+    return open_events(bin_path)
+
+
+def iter_blocks(records, block=BLOCK_RECORDS):
+    """Yield consecutive slices of at most `block` records (views, no copies)."""
+    for start in range(0, len(records), block):
+        yield records[start:start + block]
+
+
+# === Vectorized aggregates ===
+def dlwa(records):
+    """Finish-induced device-level write amplification per finish record."""
+    pages_written = (records["wptr"] - records["zone_slba"]) / LBAS_PER_PAGE
+    pages_finished = records["pages_finished"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wa = (pages_written + pages_finished) / pages_written
+    return np.where(pages_written == 0, 0.0, wa)
+
+
+def mode_keys(records):
+    """Return the '<mode>_<chunk_size>' label key of every record."""
+    return np.char.add(np.char.add(records["mode"].astype(str), "_"),
+                       records["chunk_size"].astype(str))
+
+
+def _mode_chunk_codes(records):
+    """Pack (mode, chunk_size) into one int64 per record for fast grouping."""
+    return (records["mode"].astype(np.int64) << 32) | records["chunk_size"].astype(np.int64)
+
+
+def _code_key(code):
+    return f"{code >> 32}_{code & 0xFFFFFFFF}"
+
+
+def group_stats(keys, values):
+    """Return {key: (count, mean)} of `values` grouped by `keys`, vectorized."""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(uniq))
+    sums = np.bincount(inverse, weights=values, minlength=len(uniq))
+    return {k.item(): (int(c), float(s / c)) for k, c, s in zip(uniq, counts, sums)}
+
+
+def allocation_latency_stats(path, block=BLOCK_RECORDS):
+    """
+    Return {'<mode>_<chunk>': (count, mean_ms)} for an allocation log.
+
+    The log is memory-mapped (see load_events) and walked in blocks, keeping
+    only per-group sums and counts, so memory does not grow with its size.
+    """
+    totals = {}
+    for records in iter_blocks(load_events(path, ALLOCATION_DTYPE), block):
+        latency_ms = records["time_us"] / 1000.0
+        for code, (count, mean) in group_stats(_mode_chunk_codes(records), latency_ms).items():
+            n, s = totals.get(code, (0, 0.0))
+            totals[code] = (n + count, s + mean * count)
+    return {_code_key(code): (n, s / n) for code, (n, s) in sorted(totals.items())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert FEMU text logs to binary event files.")
+    parser.add_argument("logs", nargs="+", help="finish-log / allocation-log text files")
+    parser.add_argument("--kind", choices=sorted(KIND_NAMES), help="record layout (default: detect)")
+    args = parser.parse_args()
+
+    for log_path in args.logs:
+        dtype = EVENT_KINDS[KIND_NAMES[args.kind]] if args.kind else None
+        bin_path, count = convert_log(log_path, dtype=dtype)
+        print(f"✅ {log_path} → {bin_path} ({count} records)")
@@ -0,0 +1,200 @@
+import heapq
+from collections import deque
+import numpy as np
+
+import model
+
+# Discrete-event simulator of finish-zone interference: sync sequential
+# writers (fio's jobs in exp_interference) compete with the padding of
+# concurrent finish-zone commands for FEMU's FTL and the flash media.
+#
+#   host   a writer thinks emulator["host_write"] between its I/Os
+#   FTL    one FIFO server: a write costs ftl_write; a finish pads `batch`
+#          pages per pass (batch × ftl_write) and then goes back to the tail
+#          of the queue, so writers that arrived meanwhile get in between
+#   media  channel and LUN timelines (NumPy arrays of the time each is free)
+#          as FEMU advances them: a page is transferred on its channel, then
+#          programmed on its LUN; a pass reserves all its pages at once
+#
+# The model of the closed network (model.py) gives the constants; the pages a
+# finish pads follow from the zone's fill (model.finish_pages). Fixed layouts
+# place consecutive writes of the device on consecutive LUNs (one write
+# pointer over all channels), flexible allocation on random LUNs.
+#
+# The events are (time, seq, kind, id) tuples on a heapq; per I/O there is
+# one arrival at the FTL and one FTL completion, and a finish pass is a
+# single event however many pages it pads.
+
+# Pages a finish pads per pass over the FTL queue (fitted by
+# simulate_interference.py on the exp_interference results)
+FINISH_BATCH = 16
+
+# LUNs drawn at once for random placement
+RANDOM_POOL = 1 << 16
+
+_ARRIVE, _FINISH, _DONE = 0, 1, 2
+
+
+def page_luns(mode, n, media, rng):
+    """LUNs of the next `n` pages written under vtable `mode`."""
+    if int(mode) in model.FLEXIBLE_MODES:
+        return rng.integers(0, media.luns, size=n)
+    return media.next_luns(n)
+
+
+class Media:
+    """Channel and LUN timelines: the time (us) each one is free again."""
+
+    def __init__(self, geometry=model.GEOMETRY, timing=model.TIMING_US):
+        self.channels = geometry["channels"]
+        self.luns = geometry["channels"] * geometry["ways"]
+        self.transfer = timing["transfer"]
+        self.program = timing["page_write"]
+        self.channel_free = np.zeros(self.channels)
+        self.lun_free = np.zeros(self.luns)
+        self.lun_pages = np.zeros(self.luns, dtype=np.int64)
+        self.pointer = 0
+
+    def next_luns(self, n):
+        """Next `n` LUNs of the device-wide write pointer (channel first)."""
+        luns = (self.pointer + np.arange(n)) % self.luns
+        self.pointer = (self.pointer + n) % self.luns
+        return luns
+
+    def write(self, now, lun):
+        """Write one page to `lun` at `now`; returns its completion time."""
+        channel = lun % self.channels
+        sent = max(now, self.channel_free[channel]) + self.transfer
+        self.channel_free[channel] = sent
+        done = max(sent, self.lun_free[lun]) + self.program
+        self.lun_free[lun] = done
+        self.lun_pages[lun] += 1
+        return done
+
+    def write_batch(self, now, luns):
+        """Write pages to `luns` at `now`, back to back per LUN; returns the last completion."""
+        per_lun = np.bincount(luns, minlength=self.luns)
+        # LUN l sits on channel l % channels
+        per_channel = per_lun.reshape(-1, self.channels).sum(axis=0)
+        self.channel_free = np.where(per_channel > 0, np.maximum(self.channel_free, now)
+                                     + per_channel * self.transfer, self.channel_free)
+        self.lun_free = np.where(per_lun > 0, np.maximum(self.lun_free, now + self.transfer)
+                                 + per_lun * self.program, self.lun_free)
+        self.lun_pages += per_lun
+        return float(self.lun_free.max(where=per_lun > 0, initial=now))
+
+
+def simulate(mode, writers, finishes, fill=40.0, chunk=1, units=model.UNITS_PER_ZONE,
+             zone_pages=model.ZONE_PAGES, write_pages=None, finish_start_us=0.0, batch=FINISH_BATCH,
+             geometry=model.GEOMETRY, timing=model.TIMING_US, emulator=model.EMULATOR_US, seed=0):
+    """
+    Run `writers` sync writers, each writing `write_pages` pages (a whole
+    zone by default) to its own empty zone from time 0, while `finishes`
+    zones filled to `fill` % (scalar or one per finish) are finished, issued
+    at `finish_start_us` (scalar or one per finish).
+
+    Returns a dict: iops and runtime_s of the writers, lat_us (every write,
+    issue to completion), finish_s (each finish, issue to last padded page),
+    pad_pages, events and lun_util (program time / runtime per LUN).
+    """
+    rng = np.random.default_rng(seed)
+    media = Media(geometry, timing)
+    think, ftl = emulator["host_write"], emulator["ftl_write"]
+    write_pages = zone_pages if write_pages is None else int(write_pages)
+
+    fill = np.broadcast_to(np.asarray(fill, dtype=np.float64), (finishes,))
+    written = np.ceil(fill / 100 * zone_pages).astype(np.int64)
+    pad = model.finish_pages(written, model.finish_granularity(mode, chunk, units, zone_pages))
+    pad = np.broadcast_to(pad, (finishes,)).astype(np.int64)
+    starts = np.broadcast_to(np.asarray(finish_start_us, dtype=np.float64), (finishes,))
+    # Random placement draws a writer's LUNs from a pre-drawn pool
+    random = int(mode) in model.FLEXIBLE_MODES
+    pool = rng.integers(0, media.luns, size=RANDOM_POOL).tolist() if random else None
+    drawn = 0
+
+    next_page = [0] * writers
+    issued = np.zeros(writers)
+    lat = np.zeros((writers, write_pages))
+    padded = np.zeros(finishes, dtype=np.int64)
+    finish_done = np.full(finishes, np.nan)
+    finish_last = np.zeros(finishes)
+
+    events, seq = [], 0
+    for j in range(finishes):
+        events.append((float(starts[j]), seq, _FINISH, j))
+        seq += 1
+    for i in range(writers):
+        events.append((think, seq, _ARRIVE, i))
+        seq += 1
+    heapq.heapify(events)
+
+    # FTL queue: writer i as i, finish j as -(j + 1)
+    queue, ftl_busy = deque(), False
+    end, count = 0.0, 0
+
+    while events:
+        now, _, kind, ident = heapq.heappop(events)
+        count += 1
+        if kind == _DONE:
+            ftl_busy = False
+            if ident >= 0:
+                page = next_page[ident]
+                if random:
+                    lun = pool[drawn % RANDOM_POOL]
+                    drawn += 1
+                else:
+                    lun = media.pointer
+                    media.pointer = (lun + 1) % media.luns
+                done = media.write(now, lun)
+                lat[ident, page] = done - issued[ident]
+                next_page[ident] = page + 1
+                end = max(end, done)
+                if page + 1 < write_pages:
+                    issued[ident] = done
+                    heapq.heappush(events, (done + think, seq, _ARRIVE, ident))
+                    seq += 1
+            else:
+                j = -ident - 1
+                n = min(batch, pad[j] - padded[j])
+                finish_last[j] = max(finish_last[j], media.write_batch(now, page_luns(mode, n, media, rng)))
+                padded[j] += n
+                if padded[j] < pad[j]:
+                    queue.append(ident)
+                else:
+                    finish_done[j] = finish_last[j]
+        elif kind == _FINISH:
+            if pad[ident] == 0:
+                finish_done[ident] = now
+            else:
+                queue.append(-ident - 1)
+        else:
+            queue.append(ident)
+
+        if not ftl_busy and queue:
+            job = queue.popleft()
+            service = ftl if job >= 0 else min(batch, pad[-job - 1] - padded[-job - 1]) * ftl
+            heapq.heappush(events, (now + service, seq, _DONE, job))
+            seq += 1
+            ftl_busy = True
+
+    runtime = end / 1e6
+    return {
+        "iops": writers * write_pages / runtime if runtime > 0 else 0.0,
+        "runtime_s": runtime,
+        "lat_us": lat.ravel(),
+        "finish_s": (finish_done - starts) / 1e6,
+        "pad_pages": pad.copy(),
+        "events": count,
+        "lun_util": media.lun_pages * timing["page_write"] / max(end, 1.0),
+    }
+
+
+def interference_ratio(mode, jobs, fill=40.0, chunk=1, baseline=None, **kwargs):
+    """
+    IOPS of `jobs` writers next to `jobs` finishes over IOPS of the writers
+    alone (the metric of plot_interference.py); `baseline` skips re-running
+    the writers alone.
+    """
+    if baseline is None:
+        baseline = simulate(mode, jobs, 0, chunk=chunk, **kwargs)["iops"]
+    return simulate(mode, jobs, jobs, fill=fill, chunk=chunk, **kwargs)["iops"] / baseline
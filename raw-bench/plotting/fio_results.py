@@ -0,0 +1,378 @@
+import os
+import re
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Shared loader for the fio JSON results consumed by the plot_*.py scripts.
+#
+# Every fio JSON is parsed once into a columnar table (dict of NumPy arrays,
+# one row per fio job). The table is cached as .npz under CACHE_DIR, keyed on
+# each file's mtime and size, so a re-plot only parses new or changed files.
+# Large batches of new files are parsed in a process pool.
+
+CACHE_DIR = "cache"
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+# === Result filename patterns ===
+# <strategy>_threads_<N>[_read_seq|_read_rand].json  (exp_rw_bench, run-th*.sh)
+# <strategy>_finish_<N>jobs.json                     (exp_interference, run_finish.sh)
+# <strategy>_qd_<N>.json                             (exp_rw_bench, run-qd.sh)
+# <strategy>_scale_<engine>_bs<BS>_qd<N>_j<N>.json  (exp_rw_bench, run-scaling.sh)
+# <strategy>_mixed_<W>w<R>r_read_seq|_read_rand.json (exp_rw_bench, run-mixed.sh)
+# <strategy>_kv_<workload>.json                      (exp_kv, normalized by kv_results.py)
+# Each may end in _r<N> before .json: repetition N of the cell (run_matrix.py
+# --repeat), stored as the "rep" column (0 for the first run, which has no tag).
+# <strategy> is either a short key ("2-chnk-2-22") or a run.sh EXP_NAME
+# ("vt-5_chnk-2_maxc-1_minl-128_..."), which itself contains underscores.
+# A mixed run holds one fio group per class (writers, then readers); each row
+# takes its access and thread count from its group's job options, and the
+# run's "<W>w<R>r_<read access>" is stored as the "mix" column ("" otherwise).
+# A KV run holds one job per op class; its db_bench workload (fillseq,
+# overwrite, readrandom, mixed) is the "workload" column ("" otherwise).
+REP = r"(?:_r(?P<rep>\d+))?"
+
+FILENAME_PATTERNS = [
+    ("scale", re.compile(r"(?P<strategy>[\w\-.]+?)_scale_(?P<engine>sync|libaio|io_uring)_bs(?P<bs>\d+[kKmM]?)"
+                         r"_qd(?P<qd>\d+)_j(?P<threads>\d+)" + REP + r"\.json$")),
+    ("threads", re.compile(r"(?P<strategy>[\w\-.]+?)_threads_(?P<threads>\d+)(?:_(?P<access>read_(?:seq|rand)))?" + REP + r"\.json$")),
+    ("finish", re.compile(r"(?P<strategy>[\w\-.]+?)_finish_(?P<threads>\d+)jobs" + REP + r"\.json$")),
+    ("qd", re.compile(r"(?P<strategy>[\w\-.]+?)_qd_(?P<qd>\d+)" + REP + r"\.json$")),
+    ("mixed", re.compile(r"(?P<strategy>[\w\-.]+?)_mixed_(?P<writers>\d+)w(?P<readers>\d+)r"
+                         r"_(?P<mix_access>read_(?:seq|rand))" + REP + r"\.json$")),
+    ("kv", re.compile(r"(?P<strategy>[\w\-.]+?)_kv_(?P<workload>fillseq|overwrite|readrandom|mixed)" + REP + r"\.json$")),
+]
+
+# fio's default completion-latency percentiles (clat_ns.percentile keys)
+PERCENTILES = np.array([1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95,
+                        99, 99.5, 99.9, 99.95, 99.99])
+
+# fio's latency_ns / latency_us / latency_ms buckets as (section, key, upper
+# bound in ns). Each bucket holds the % of I/Os at or below its bound and
+# above the previous one; the last bucket is open-ended.
+LATENCY_BUCKETS = (
+    [("latency_ns", k, int(k)) for k in ("2", "4", "10", "20", "50", "100", "250", "500", "750", "1000")]
+    + [("latency_us", k, int(k) * 1000) for k in ("2", "4", "10", "20", "50", "100", "250", "500", "750", "1000")]
+    + [("latency_ms", k, int(k) * 1000000) for k in ("2", "4", "10", "20", "50", "100", "250", "500", "750", "1000", "2000")]
+    + [("latency_ms", ">=2000", np.inf)]
+)
+LATENCY_BUCKET_EDGES_NS = np.array([edge for _, _, edge in LATENCY_BUCKETS], dtype=np.float64)
+
+# fio "rw" option → access type, used when the filename does not say
+RW_ACCESS = {
+    "write": "write",
+    "randwrite": "write",
+    "read": "read_seq",
+    "randread": "read_rand",
+}
+
+# fio size suffixes (kb_base=1024, fio's default)
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+# === Table columns (name → dtype) ===
+COLUMNS = {
+    "filename": str,
+    "experiment": str,
+    "strategy": str,
+    "access": str,
+    "threads": np.int32,
+    "qd": np.int32,
+    "engine": str,
+    "mix": str,
+    "workload": str,
+    "bs_bytes": np.int64,
+    "rep": np.int32,
+    "job": np.int32,
+    "iops": np.float64,
+    "bw_bytes": np.float64,
+    "runtime_ms": np.float64,
+    "clat_mean_ns": np.float64,
+    "lat_mean_ns": np.float64,
+    "clat_max_ns": np.float64,
+    "clat_pct_ns": np.float64,   # shape (rows, len(PERCENTILES))
+    "lat_hist_pct": np.float64,  # shape (rows, len(LATENCY_BUCKETS))
+    "mtime_ns": np.int64,
+    "size": np.int64,
+}
+
+
+def match_filename(filename):
+    """Return (experiment, match) for a known result filename, else None."""
+    for experiment, pattern in FILENAME_PATTERNS:
+        match = pattern.match(filename)
+        if match:
+            return experiment, match
+    return None
+
+
+def empty_table():
+    table = {name: np.array([], dtype=dtype) for name, dtype in COLUMNS.items()}
+    table["clat_pct_ns"] = np.empty((0, len(PERCENTILES)), dtype=np.float64)
+    table["lat_hist_pct"] = np.empty((0, len(LATENCY_BUCKETS)), dtype=np.float64)
+    return table
+
+
+def rows_to_table(rows):
+    """Turn a list of row dicts into a columnar table."""
+    if not rows:
+        return empty_table()
+    return {name: np.array([row[name] for row in rows], dtype=dtype)
+            for name, dtype in COLUMNS.items()}
+
+
+def concat_tables(tables):
+    tables = [t for t in tables if len(t["filename"])]
+    if not tables:
+        return empty_table()
+    return {name: np.concatenate([t[name] for t in tables]) for name in COLUMNS}
+
+
+def parse_size(text):
+    """fio size string ("16K", "4k", "131072") → bytes; 0 if absent or unparsable."""
+    match = re.fullmatch(r"(\d+)([kKmMgG]?)[iI]?[bB]?", str(text or "").strip())
+    if not match:
+        return 0
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+
+def clat_percentiles(clat_ns):
+    """Return clat_ns.percentile as a list aligned with PERCENTILES (NaN if absent)."""
+    pct = clat_ns.get("percentile", {})
+    return [float(pct.get(f"{p:.6f}", np.nan)) for p in PERCENTILES]
+
+
+def latency_histogram(job):
+    """Return the job's latency buckets as a list aligned with LATENCY_BUCKETS."""
+    return [float(job.get(section, {}).get(key, 0.0)) for section, key, _ in LATENCY_BUCKETS]
+
+
+def parse_fio_json(path):
+    """Parse one fio JSON into a list of row dicts, one per job."""
+    filename = os.path.basename(path)
+    experiment, match = match_filename(filename)
+    groups = match.groupdict()
+    st = os.stat(path)
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    rows = []
+    for job_idx, job in enumerate(data["jobs"]):
+        # Options given before the first --name are fio's global options
+        options = {**data.get("global options", {}), **job.get("job options", {})}
+        access = groups.get("access") or RW_ACCESS.get(options.get("rw"), "write")
+        metric_key = "read" if access.startswith("read") else "write"
+        metrics = job[metric_key]
+
+        rows.append({
+            "filename": filename,
+            "experiment": experiment,
+            "strategy": groups["strategy"],
+            "access": access,
+            "threads": int(groups.get("threads") or options.get("numjobs", 1)),
+            "qd": int(groups.get("qd") or options.get("iodepth", 1)),
+            "engine": groups.get("engine") or options.get("ioengine", ""),
+            "mix": (f"{groups['writers']}w{groups['readers']}r_{groups['mix_access']}"
+                    if experiment == "mixed" else ""),
+            "workload": groups.get("workload") or "",
+            "bs_bytes": parse_size(groups.get("bs") or options.get("bs")),
+            "rep": int(groups.get("rep") or 0),
+            "job": job_idx,
+            "iops": float(metrics["iops"]),
+            "bw_bytes": float(metrics["bw_bytes"]),
+            "runtime_ms": float(metrics["runtime"]),
+            "clat_mean_ns": float(metrics["clat_ns"]["mean"]),
+            "lat_mean_ns": float(metrics["lat_ns"]["mean"]),
+            "clat_max_ns": float(metrics["clat_ns"]["max"]),
+            "clat_pct_ns": clat_percentiles(metrics["clat_ns"]),
+            "lat_hist_pct": latency_histogram(job),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+        })
+    return rows
+
+
+def scan_results(results_dir):
+    """Return {filename: (mtime_ns, size)} for every known result file."""
+    entries = {}
+    for entry in os.scandir(results_dir):
+        if entry.is_file() and match_filename(entry.name):
+            st = entry.stat()
+            entries[entry.name] = (st.st_mtime_ns, st.st_size)
+    return entries
+
+
+def _parse_one(path):
+    """Pool worker: never raises, so one bad file cannot sink the batch."""
+    try:
+        return path, parse_fio_json(path), None
+    except Exception as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+
+def parse_many(paths, workers=None):
+    """
+    Parse many fio JSONs, spreading them over a process pool when the batch
+    is large enough. Returns ({path: rows}, [(path, error), ...]).
+    """
+    workers = workers or os.cpu_count() or 1
+    # The plot scripts run at module level without a __main__ guard, so only
+    # use the pool where workers are forked rather than re-importing __main__.
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+
+    if workers <= 1 or len(paths) < PARALLEL_MIN_FILES or not can_fork:
+        results = map(_parse_one, paths)
+    else:
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("fork")) as pool:
+            results = list(pool.map(_parse_one, paths, chunksize=chunksize))
+
+    parsed, errors = {}, []
+    for path, rows, error in results:
+        if error:
+            errors.append((path, error))
+        else:
+            parsed[path] = rows
+    return parsed, errors
+
+
+def report_errors(errors):
+    """Print one summary block for all files that failed to parse."""
+    if not errors:
+        return
+    print(f"⚠️ Skipped {len(errors)} result file(s) that failed to parse:")
+    for path, error in sorted(errors):
+        print(f"    {path}: {error}")
+
+
+def cache_path(results_dir, cache_dir=CACHE_DIR):
+    real = os.path.realpath(results_dir)
+    digest = hashlib.md5(real.encode()).hexdigest()[:10]
+    parent = os.path.basename(os.path.dirname(real))
+    return os.path.join(cache_dir, f"{parent}-{os.path.basename(real)}-{digest}.npz")
+
+
+def read_cache(path):
+    if not os.path.exists(path):
+        return empty_table()
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            if set(npz.files) != set(COLUMNS):
+                return empty_table()  # written by an older layout
+            return {name: npz[name] for name in COLUMNS}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable cache {path}: {e}")
+        return empty_table()
+
+
+def write_cache(path, table):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # concurrent plot scripts may race
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **table)
+    os.replace(tmp_path, path)
+
+
+def load_sweep(results_dirs, cache_dir=CACHE_DIR, use_cache=True, workers=None):
+    """
+    Load every fio JSON under several results directories as one table.
+
+    Rows whose file is unchanged (same mtime and size) come from each
+    directory's cache; new or modified files from all directories are
+    parsed together in one process pool. Deleted files drop out.
+    """
+    plans = []
+    stale_paths = []
+    for results_dir in results_dirs:
+        entries = scan_results(results_dir)
+        path = cache_path(results_dir, cache_dir)
+        cached = read_cache(path) if use_cache else empty_table()
+
+        fresh = np.array([
+            entries.get(str(name)) == (int(mtime), int(size))
+            for name, mtime, size in zip(cached["filename"], cached["mtime_ns"], cached["size"])
+        ], dtype=bool)
+        kept = {name: col[fresh] for name, col in cached.items()}
+        kept_files = set(kept["filename"].tolist())
+
+        stale = [os.path.join(results_dir, f) for f in sorted(entries) if f not in kept_files]
+        plans.append((path, kept, stale, not fresh.all()))
+        stale_paths.extend(stale)
+
+    parsed, errors = parse_many(stale_paths, workers)
+    report_errors(errors)
+
+    tables = []
+    for path, kept, stale, dropped in plans:
+        new_rows = [row for p in stale for row in parsed.get(p, [])]
+        table = concat_tables([kept, rows_to_table(new_rows)])
+        if use_cache and (new_rows or dropped):
+            write_cache(path, table)
+        tables.append(table)
+    return concat_tables(tables)
+
+
+def load_results(results_dir, cache_dir=CACHE_DIR, use_cache=True, workers=None):
+    """Load every fio JSON in `results_dir` as a columnar table (see load_sweep)."""
+    return load_sweep([results_dir], cache_dir, use_cache, workers)
+
+
+def select(table, **conditions):
+    """Filter a table by column equality, e.g. select(t, experiment="threads")."""
+    mask = np.ones(len(table["filename"]), dtype=bool)
+    for name, value in conditions.items():
+        mask &= table[name] == value
+    return {name: col[mask] for name, col in table.items()}
+
+
+# Columns that identify a measurement; rows differing only in "rep" (and file
+# metadata) are repetitions of the same cell
+CELL_COLUMNS = ("experiment", "strategy", "access", "threads", "qd", "engine", "mix", "workload", "bs_bytes",
+                "job")
+METRIC_COLUMNS = ("iops", "bw_bytes", "runtime_ms", "clat_mean_ns", "lat_mean_ns",
+                  "clat_max_ns", "clat_pct_ns", "lat_hist_pct")
+
+
+def cell_ids(table, columns=CELL_COLUMNS):
+    """Integer id per row, equal for rows that agree on `columns` (a cell)."""
+    if len(table["filename"]) == 0:
+        return np.array([], dtype=np.int64)
+    keys = np.full(len(table["filename"]), "|")
+    for name in columns:
+        keys = np.char.add(np.char.add(keys, table[name].astype(str)), "|")
+    _, ids = np.unique(keys, return_inverse=True)
+    return ids
+
+
+def rep_means(table):
+    """
+    Collapse repetitions: one row per cell with the metric columns averaged
+    over its reps (fio percentiles are averaged, not re-derived) and "rep"
+    holding the number of repetitions. Rows keep the order of each cell's
+    first repetition.
+    """
+    ids = cell_ids(table)
+    if len(ids) == 0:
+        return table
+    _, first, counts = np.unique(ids, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    out = {name: col[first[order]] for name, col in table.items()}
+    for name in METRIC_COLUMNS:
+        col = table[name]
+        sums = np.zeros((len(counts),) + col.shape[1:])
+        np.add.at(sums, ids, col)
+        out[name] = (sums / counts.reshape((-1,) + (1,) * (col.ndim - 1)))[order]
+    out["rep"] = counts[order].astype(np.int32)
+    return out
+
+
+def iter_rows(table):
+    """Yield one dict per row (plain Python scalars)."""
+    names = list(table)
+    for values in zip(*(table[name].tolist() for name in names)):
+        yield dict(zip(names, values))
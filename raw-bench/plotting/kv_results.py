@@ -0,0 +1,150 @@
+import os
+import re
+import glob
+import json
+
+# Normalizes the KV stage (exp_kv/run.sh) into the layout of the fio results:
+# each db_bench report <strategy>_kv_<workload>[_r<N>].log becomes a
+# <strategy>_kv_<workload>[_r<N>].json next to it, shaped like fio's JSON
+# output (one job per op class, "write" then "read"), so fio_results.py loads
+# it as experiment "kv" with the workload in the "workload" column.
+#
+#   iops / bw_bytes  db_bench ops/sec split over the classes by their share
+#                    of the histogram counts; bytes are key + value size
+#   clat_ns          the class's "Microseconds per read/write" histogram:
+#                    Average, Max and P50 / P99 / P99.9 / P99.99
+#
+# The report's trailing "device_sectors_written:" line (guest block-layer
+# sectors written during the workload) is kept under "kv" for the DLWA of
+# plot_kv.py. A JSON is rewritten whenever its log is newer.
+
+# <strategy>_kv_<workload>[_r<N>].log
+LOG_RE = re.compile(r"^(?P<stem>(?P<strategy>[\w\-.]+?)_kv_(?P<workload>[a-z]+)(?:_r\d+)?)\.log$")
+
+# fillseq        :       2.345 micros/op 426439 ops/sec 2.345 seconds 1000000 operations;   47.2 MB/s
+RESULT_RE = re.compile(r"^(?P<bench>\w+)\s*:\s*(?P<micros>[\d.]+) micros/op (?P<ops>[\d.]+) ops/sec"
+                       r"(?: (?P<seconds>[\d.]+) seconds (?P<operations>\d+) operations)?")
+HIST_RE = re.compile(r"^Microseconds per (?P<cls>read|write):")
+COUNT_RE = re.compile(r"^Count: (?P<count>\d+) Average: (?P<avg>[\d.]+)")
+MAX_RE = re.compile(r"Max: (?P<max>[\d.]+)")
+PCT_RE = re.compile(r"P(?P<p>[\d.]+): (?P<v>[\d.]+)")
+VALUES_RE = re.compile(r"^Values:\s+(?P<bytes>\d+) bytes each")
+KEYS_RE = re.compile(r"^Keys:\s+(?P<bytes>\d+) bytes each")
+THREADS_RE = re.compile(r"--threads=(?P<threads>\d+)")
+SECTORS_RE = re.compile(r"^device_sectors_written: (?P<sectors>-?\d+)")
+
+# Access of each class per workload, as fio's "rw" option
+RW = {
+    "fillseq": {"write": "write"},
+    "overwrite": {"write": "randwrite"},
+    "readrandom": {"read": "randread"},
+    "mixed": {"write": "randwrite", "read": "randread"},
+}
+
+
+def parse_db_bench(path):
+    """
+    Parse one db_bench report into a dict: bench, ops_per_sec, seconds,
+    key_bytes, value_bytes, threads, device_sectors_written and per class
+    ("read"/"write") {count, avg_us, max_us, pct_us: {percentile: us}}.
+    """
+    out = {"bench": None, "ops_per_sec": 0.0, "seconds": 0.0, "key_bytes": 16, "value_bytes": 0,
+           "threads": 1, "device_sectors_written": 0, "classes": {}}
+    cls = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if m := RESULT_RE.match(line):
+                out["bench"] = m["bench"]
+                out["ops_per_sec"] = float(m["ops"])
+                if m["seconds"]:
+                    out["seconds"] = float(m["seconds"])
+            elif m := HIST_RE.match(line):
+                cls = out["classes"].setdefault(m["cls"], {"count": 0, "avg_us": 0.0, "max_us": 0.0, "pct_us": {}})
+            elif cls is not None and (m := COUNT_RE.match(line)):
+                cls["count"], cls["avg_us"] = int(m["count"]), float(m["avg"])
+            elif cls is not None and line.startswith("Min:") and (m := MAX_RE.search(line)):
+                cls["max_us"] = float(m["max"])
+            elif cls is not None and line.startswith("Percentiles:"):
+                cls["pct_us"] = {float(p): float(v) for p, v in PCT_RE.findall(line)}
+                cls = None
+            elif m := VALUES_RE.match(line):
+                out["value_bytes"] = int(m["bytes"])
+            elif m := KEYS_RE.match(line):
+                out["key_bytes"] = int(m["bytes"])
+            elif m := THREADS_RE.search(line):
+                out["threads"] = int(m["threads"])
+            elif m := SECTORS_RE.match(line):
+                out["device_sectors_written"] = int(m["sectors"])
+    return out
+
+
+def _empty_metrics():
+    return {"iops": 0.0, "bw_bytes": 0.0, "runtime": 0.0,
+            "clat_ns": {"mean": 0.0, "max": 0.0, "percentile": {}}, "lat_ns": {"mean": 0.0}}
+
+
+def to_fio_json(report, workload):
+    """fio-shaped JSON dict of a parsed db_bench report."""
+    classes = [c for c in ("write", "read") if c in RW[workload]]
+    counts = {c: report["classes"].get(c, {}).get("count", 0) for c in classes}
+    total = sum(counts.values()) or 1
+    seconds = report["seconds"] or (total / report["ops_per_sec"] if report["ops_per_sec"] else 0.0)
+    record_bytes = report["key_bytes"] + report["value_bytes"]
+
+    jobs = []
+    for c in classes:
+        hist = report["classes"].get(c, {"avg_us": 0.0, "max_us": 0.0, "pct_us": {}})
+        iops = report["ops_per_sec"] * counts[c] / total if len(classes) > 1 else report["ops_per_sec"]
+        metrics = {
+            "iops": iops,
+            "bw_bytes": iops * record_bytes,
+            "runtime": seconds * 1000.0,
+            "clat_ns": {"mean": hist["avg_us"] * 1000.0, "max": hist["max_us"] * 1000.0,
+                        "percentile": {f"{p:.6f}": v * 1000.0 for p, v in hist["pct_us"].items()}},
+            "lat_ns": {"mean": hist["avg_us"] * 1000.0},
+        }
+        other = "read" if c == "write" else "write"
+        jobs.append({"jobname": c, "job options": {"rw": RW[workload][c]}, c: metrics, other: _empty_metrics()})
+
+    return {
+        "kv": {"workload": workload, "bench": report["bench"], "ops_per_sec": report["ops_per_sec"],
+               "device_sectors_written": report["device_sectors_written"]},
+        "global options": {"bs": str(record_bytes), "numjobs": str(report["threads"])},
+        "jobs": jobs,
+    }
+
+
+def normalize(results_dir):
+    """Write the JSON of every KV log in `results_dir` that is newer than it; returns the JSON paths."""
+    paths = []
+    for log_path in sorted(glob.glob(os.path.join(results_dir, "*_kv_*.log"))):
+        match = LOG_RE.match(os.path.basename(log_path))
+        if not match or match["workload"] not in RW:
+            continue
+        json_path = os.path.join(results_dir, match["stem"] + ".json")
+        if not os.path.exists(json_path) or os.path.getmtime(json_path) < os.path.getmtime(log_path):
+            report = parse_db_bench(log_path)
+            if report["bench"] is None:
+                print(f"⚠️ No db_bench result in {log_path}, skipped")
+                continue
+            tmp_path = json_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(to_fio_json(report, match["workload"]), f, indent=1)
+            os.replace(tmp_path, json_path)
+        paths.append(json_path)
+    return paths
+
+
+def device_sectors(results_dir):
+    """{(strategy, workload, rep tag): guest sectors written} of the normalized KV results."""
+    out = {}
+    for json_path in sorted(glob.glob(os.path.join(results_dir, "*_kv_*.json"))):
+        match = LOG_RE.match(os.path.basename(json_path)[:-len(".json")] + ".log")
+        if not match:
+            continue
+        with open(json_path) as f:
+            kv = json.load(f).get("kv", {})
+        rep = match["stem"][len(f"{match['strategy']}_kv_{match['workload']}"):]
+        out[(match["strategy"], match["workload"], rep)] = int(kv.get("device_sectors_written", 0))
+    return out
@@ -0,0 +1,76 @@
+import numpy as np
+
+from fio_results import PERCENTILES, LATENCY_BUCKET_EDGES_NS
+
+# Latency-distribution helpers over fio_results tables. Everything works on
+# whole columns at once: a table of N runs yields (N, P) percentile matrices
+# and (N, B) CDF matrices rather than per-run Python lists.
+
+# Tail percentiles reported by the latency plots
+TAIL_PERCENTILES = (50, 99, 99.9, 99.99)
+
+
+def percentile_columns(pcts):
+    """Return the clat_pct_ns column index of each requested percentile."""
+    cols = []
+    for p in pcts:
+        idx = np.flatnonzero(np.isclose(PERCENTILES, p))
+        if len(idx) == 0:
+            raise ValueError(f"fio does not report the {p} percentile by default")
+        cols.append(int(idx[0]))
+    return cols
+
+
+def tail_latencies(table, pcts=TAIL_PERCENTILES):
+    """Completion latency (ns) at each percentile, shape (rows, len(pcts))."""
+    return table["clat_pct_ns"][:, percentile_columns(pcts)]
+
+
+def percentile_cdf(table):
+    """
+    CDF points from the clat percentiles: x is (rows, P) latency in ns and
+    y is the (P,) cumulative fraction shared by every row.
+    """
+    return table["clat_pct_ns"], PERCENTILES / 100.0
+
+
+def histogram_cdf(table):
+    """
+    CDF from fio's latency buckets: returns the (B,) bucket upper edges in ns
+    and the (rows, B) cumulative fraction of I/Os at or below each edge.
+    Unlike the percentiles it reaches the slowest I/O.
+    """
+    cdf = np.cumsum(table["lat_hist_pct"], axis=1)
+    total = cdf[:, -1:]
+    cdf /= np.where(total > 0, total, 1.0)
+    return LATENCY_BUCKET_EDGES_NS, cdf
+
+
+def run_keys(table):
+    """One '<strategy>|<threads>' key per row, used to match runs across tables."""
+    return np.char.add(np.char.add(table["strategy"], "|"), table["threads"].astype(str))
+
+
+def tail_inflation(baseline, interfered, pcts=TAIL_PERCENTILES):
+    """
+    Ratio of interfered to baseline tail latency for runs present in both
+    tables, matched on (strategy, threads).
+
+    Returns (strategy, threads, ratios) with ratios shaped (runs, len(pcts)).
+    """
+    common, base_idx, int_idx = np.intersect1d(
+        run_keys(baseline), run_keys(interfered), return_indices=True)
+    base = tail_latencies(baseline, pcts)[base_idx]
+    inter = tail_latencies(interfered, pcts)[int_idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.where(base > 0, inter / base, np.nan)
+    return interfered["strategy"][int_idx], interfered["threads"][int_idx], ratios
+
+
+def curves_by_strategy(strategies, threads, values):
+    """Split per-run values into {strategy: (threads_sorted, values_sorted)}."""
+    order = np.lexsort((threads, strategies))
+    strategies, threads, values = strategies[order], threads[order], values[order]
+    uniq, starts = np.unique(strategies, return_index=True)
+    bounds = list(starts[1:]) + [len(strategies)]
+    return {str(s): (threads[a:b], values[a:b]) for s, a, b in zip(uniq, starts, bounds)}
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+import os
+import ast
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# make-like entry point for the plot scripts: every target below lists the
+# result/log files it reads and the files it writes. A target is re-rendered
+# only when one of its inputs, its script or a local module the script
+# imports changed since its last successful run, or an output is missing.
+#
+# Before any script runs, the shared intermediate tables are brought up to
+# date once (fio_results .npz caches, femu_logs .bin event files), so the
+# scripts only read caches. Targets are independent of each other and run as
+# separate processes, up to -j at a time.
+#
+# Usage: python make_plots.py [<target> ...] [-j N] [--force] [--dry-run] [--list]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STAMP_FILE = os.path.join("cache", "make_plots.json")
+
+RW_THREADS = "../exp_rw_bench/results/*_threads_*.json"
+RW_THREADS_RESOURCES = "../exp_rw_bench/results/*_threads_*.*.csv"
+RW_QD = "../exp_rw_bench/results/*_qd_*.json"
+RW_SCALE = "../exp_rw_bench/results/*_scale_*.json"
+RW_MIXED = "../exp_rw_bench/results/*_mixed_*.json"
+RW_APPEND = "../exp_rw_bench/results/*_append*.csv"
+REPLAY = "../exp_rw_bench/results/*_replay_*.csv"
+OPEN_ZONES = "../exp_rw_bench/results/*_zones*.csv"
+KV_LOGS = "../exp_kv/results/*_kv_*.log"
+KV_FINISH = "../exp_kv/results/finish-log"
+FINISH = "../exp_interference/results/*_finish_*jobs*.json"
+# fio per-I/O logs and finish markers of FIO_TIMESERIES=1 runs
+TIMESERIES = "../exp_*/*/timeseries/*"
+
+# === Targets ===
+# script, extra argv, input globs, output globs; fio_dirs / femu_logs are the
+# inputs whose parsed form is cached and shared between targets
+TARGETS = {
+    "rw_th": {
+        "script": "plot_rw_th.py",
+        "inputs": [RW_THREADS, RW_THREADS_RESOURCES],
+        "outputs": ["results/exp_rw-all-iops.pdf", "results/exp_rw-all-bw.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "flex_th": {
+        "script": "plot_flex_th.py",
+        "inputs": [RW_THREADS],
+        "outputs": ["results/mode3_chnk1_maxchunks_plot.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "rw_qd": {
+        "script": "plot_rw_qd.py",
+        "inputs": [RW_QD],
+        "outputs": ["results/rw-qd-io.pdf", "results/rw-qd-bw.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "interference": {
+        "script": "plot_interference.py",
+        "inputs": [RW_THREADS, FINISH],
+        "outputs": ["results/exp_interference_iops_ratio.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results", "../exp_interference/results"],
+    },
+    "latency": {
+        "script": "plot_latency.py",
+        "inputs": [RW_THREADS, FINISH],
+        "outputs": ["results/exp_interference_tail_inflation.pdf", "results/exp_interference_clat_cdf.pdf",
+                    "results/exp_interference_lat_tail.pdf", "results/exp_rw-write-p*.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results", "../exp_interference/results"],
+    },
+    "occupancy": {
+        "script": "plot_occupancy.py",
+        "inputs": ["../exp_occupancy/results/finish-log-new", "../exp_occupancy/results/*-time*"],
+        "outputs": ["results/exp_occupancy_dlwa_barplot.pdf", "results/exp_occupancy_finish_latency.pdf"],
+        "femu_logs": ["../exp_occupancy/results/finish-log-new"],
+    },
+    "allocation": {
+        "script": "plot_allocation.py",
+        "inputs": ["../exp_allocation/results/allocation-log", "../exp_allocation/new_results/*_alloc_t*.txt"],
+        "outputs": ["results/exp_allocation_latency_means.pdf"],
+        "femu_logs": ["../exp_allocation/results/allocation-log"],
+    },
+    "scaling": {
+        "script": "plot_scaling.py",
+        "inputs": [RW_SCALE],
+        "outputs": ["results/scaling_summary.csv", "results/scaling_knees.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "significance": {
+        "script": "compare_strategies.py",
+        "inputs": [RW_THREADS],
+        "outputs": ["results/significance_threads.csv"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "zones": {
+        "script": "plot_zones.py",
+        "inputs": ["../exp_interference/results/0_finish_4jobs.zones.csv",
+                   "../exp_interference/results/timeseries/0_finish_4jobs_bw.*.log"],
+        "outputs": ["results/zones_0_finish_4jobs.pdf"],
+    },
+    "timeseries": {
+        "script": "plot_timeseries.py",
+        "inputs": [TIMESERIES],
+        "outputs": ["results/timeseries_0_finish_4jobs.pdf"],
+        "args": ["../exp_interference/results/timeseries/0_finish_4jobs"],
+    },
+    "resources": {
+        "script": "plot_resources.py",
+        "inputs": [RW_THREADS_RESOURCES],
+        "outputs": ["results/resources_threads_write.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "rw_mixed": {
+        "script": "plot_rw_mixed.py",
+        "inputs": [RW_MIXED],
+        "outputs": ["results/exp_rw-mixed-iops.pdf", "results/exp_rw-mixed-p99.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+    },
+    "rw_append": {
+        "script": "plot_rw_append.py",
+        "inputs": [RW_APPEND],
+        "outputs": ["results/rw-append-io.pdf", "results/rw-append-p99.pdf"],
+    },
+    "replay": {
+        "script": "plot_replay.py",
+        "inputs": [REPLAY],
+        "outputs": ["results/replay_summary.csv", "results/replay_lat_cdf.pdf"],
+    },
+    "kv": {
+        "script": "plot_kv.py",
+        "inputs": [KV_LOGS, KV_FINISH],
+        "outputs": ["results/kv_summary.csv", "results/kv_workloads.pdf"],
+        "fio_dirs": ["../exp_kv/results"],
+        "femu_logs": [KV_FINISH],
+    },
+    "open_zones": {
+        "script": "plot_open_zones.py",
+        "inputs": [OPEN_ZONES],
+        "outputs": ["results/open_zones_summary.csv", "results/open-zones-throughput.pdf"],
+    },
+    "model": {
+        "script": "validate_model.py",
+        "inputs": [RW_THREADS, "../exp_occupancy/results/finish-log-new", "../exp_occupancy/results/*-time",
+                   "../exp_allocation/results/allocation-log"],
+        "outputs": ["results/model_validation.csv", "results/model_validation.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results"],
+        "femu_logs": ["../exp_occupancy/results/finish-log-new", "../exp_allocation/results/allocation-log"],
+    },
+    "finish_sim": {
+        "script": "simulate_interference.py",
+        "inputs": [RW_THREADS, FINISH],
+        "outputs": ["results/finish_sim_validation.csv", "results/finish_sim_sweep.csv", "results/finish_sim.pdf"],
+        "fio_dirs": ["../exp_rw_bench/results", "../exp_interference/results"],
+    },
+}
+
+
+def expand_inputs(patterns):
+    """Sorted input files matching the target's globs (directories skipped)."""
+    files = set()
+    for pattern in patterns:
+        files.update(p for p in glob.glob(pattern) if os.path.isfile(p) and not p.endswith(".bin"))
+    return sorted(files)
+
+
+def local_modules(script):
+    """The script and every module of this directory it imports, transitively."""
+    seen, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            names = []
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            for name in names:
+                module = name.split(".")[0] + ".py"
+                if os.path.exists(module):
+                    todo.append(module)
+    return sorted(seen)
+
+
+def fingerprint(target):
+    """
+    Hash of (path, mtime, size) of every input and code file, plus argv.
+    Returns (digest, number of input files).
+    """
+    digest = hashlib.sha1()
+    inputs = expand_inputs(target["inputs"])
+    for path in inputs + local_modules(target["script"]):
+        st = os.stat(path)
+        digest.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    digest.update(json.dumps(target.get("args", [])).encode())
+    return digest.hexdigest(), len(inputs)
+
+
+def outputs_exist(target):
+    return all(glob.glob(pattern) for pattern in target["outputs"])
+
+
+def read_stamps():
+    try:
+        with open(STAMP_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_stamps(stamps):
+    os.makedirs(os.path.dirname(STAMP_FILE), exist_ok=True)
+    tmp_path = STAMP_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stamps, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STAMP_FILE)
+
+
+def warm_caches(targets):
+    """Bring the shared fio and FEMU caches up to date before the scripts run."""
+    fio_dirs = sorted({d for t in targets for d in t.get("fio_dirs", []) if os.path.isdir(d)})
+    femu_logs = sorted({p for t in targets for p in t.get("femu_logs", []) if os.path.exists(p)})
+    if fio_dirs:
+        from fio_results import load_sweep
+        load_sweep(fio_dirs)
+    if femu_logs:
+        from femu_logs import load_events
+        for path in femu_logs:
+            load_events(path)
+
+
+def render(name, target):
+    """Run one plot script; returns (name, ok, seconds, output)."""
+    env = dict(os.environ, MPLBACKEND=os.environ.get("MPLBACKEND", "Agg"))
+    start = time.time()
+    proc = subprocess.run([sys.executable, target["script"], *target.get("args", [])],
+                          env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return name, proc.returncode == 0, time.time() - start, proc.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render the figures whose inputs changed.")
+    parser.add_argument("targets", nargs="*", help=f"targets to consider (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="scripts run at once")
+    parser.add_argument("--force", action="store_true", help="re-render even if nothing changed")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would be re-rendered")
+    parser.add_argument("--list", action="store_true", help="list targets with their inputs and outputs")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every script's output")
+    args = parser.parse_args()
+
+    os.chdir(HERE)  # the scripts use paths relative to plotting/
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s) {', '.join(unknown)}; known: {', '.join(TARGETS)}")
+    names = args.targets or list(TARGETS)
+
+    if args.list:
+        for name in names:
+            t = TARGETS[name]
+            print(f"{name}: {t['script']}\n  in:  {' '.join(t['inputs'])}\n  out: {' '.join(t['outputs'])}")
+        return 0
+
+    stamps = read_stamps()
+    todo = {}
+    print("📋 Targets:")
+    for name in names:
+        target = TARGETS[name]
+        digest, n_inputs = fingerprint(target)
+        if n_inputs == 0:
+            print(f"  {name:<14s} skipped (no input files)")
+            continue
+        if args.force:
+            reason = "forced"
+        elif not outputs_exist(target):
+            reason = "missing output"
+        elif stamps.get(name) != digest:
+            reason = "inputs changed"
+        else:
+            print(f"  {name:<14s} up to date ({n_inputs} input files)")
+            continue
+        print(f"  {name:<14s} render ({reason})")
+        todo[name] = digest
+
+    if args.dry_run or not todo:
+        return 0
+
+    start = time.time()
+    warm_caches([TARGETS[name] for name in todo])
+    print(f"🗄️  Caches up to date in {time.time() - start:.1f}s")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for name, ok, seconds, output in pool.map(lambda n: render(n, TARGETS[n]), todo):
+            if ok:
+                stamps[name] = todo[name]
+                print(f"✅ {name} in {seconds:.1f}s")
+            else:
+                stamps.pop(name, None)
+                failed.append(name)
+                print(f"❌ {name} failed after {seconds:.1f}s")
+            if args.verbose or not ok:
+                print("    " + output.strip().replace("\n", "\n    "))
+    write_stamps(stamps)
+
+    print(f"\n🎉 {len(todo) - len(failed)}/{len(todo)} targets rendered in {time.time() - start:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import re
+import numpy as np
+
+# Offline analytical model of the vtable mapping strategies, to screen FEMU
+# configurations before emulating them with run.sh.
+#
+# The device is the one run-zns-exp.sh builds (GEOMETRY, TIMING_US). Every
+# worker keeps one I/O in flight (the sync engine of the experiments), so a
+# run is a closed queueing network solved exactly by mean value analysis:
+#
+#   host   think time per I/O (delay)
+#   FTL    FEMU's single-threaded FTL, one queue; it also sets the speed of
+#          the page padding done by a finish
+#   media  the LUNs (channels × ways): page program/read plus transfer
+#
+# How the media behaves depends on where concurrent I/Os land. Zones mapped
+# by a fixed layout (direct, lazy, full chunk, stripe) and sequential reads
+# spread evenly and never collide; with deterministic service times such a
+# run scales linearly until the FTL or the LUNs saturate (the balanced-job
+# bound). Random reads, and zones whose chunks the flexible allocator places
+# on arbitrary LUNs, land on a random LUN each and queue behind each other:
+# single-server queues solved by MVA. Collisions are more frequent than
+# uniform placement over all LUNs predicts (a page read occupies more than
+# its LUN), so their number is the fitted "random_luns".
+#
+# A finish pads the zone up to the end of the allocation unit being written:
+# the whole zone for direct/lazy, chunk × unit pages for the chunked modes
+# and one unit for stripe, where a zone holds `units` units (the "-22" of the
+# strategy keys). Zone allocation (full/flexible) erases the zone's blocks in
+# parallel and then sets up its chunks one by one.
+#
+# The constants of FEMU itself (EMULATOR_US) are not part of the
+# configuration; calibrate() fits them from direct-mode results.
+
+GEOMETRY = {
+    "channels": 8,
+    "ways": 1,
+    "planes_per_die": 2,
+    "block_pages": 2048,
+    "page_bytes": 16384,
+}
+
+TIMING_US = {
+    "page_write": 500.0,
+    "page_read": 50.0,
+    "transfer": 25.0,
+    "block_erase": 5000.0,
+}
+
+# Host think time and FTL time per I/O, setup time per allocated chunk, and
+# the number of queues random placement behaves like (not a time)
+EMULATOR_US = {
+    "host_write": 32.0,
+    "host_read": 0.0,
+    "ftl_write": 175.9,
+    "ftl_read": 15.0,
+    "chunk_alloc": 219.0,
+    "random_luns": 4,
+}
+
+# Zone of the existing results: pages and allocation units per zone
+ZONE_PAGES = 67584
+UNITS_PER_ZONE = 22
+
+# vtable modes (run-zns-exp.sh; run.sh's custom configs also use 5 for flexible)
+MODE_NAMES = {0: "direct", 1: "lazy", 2: "chunk", 3: "flex", 4: "stripe", 5: "flex"}
+FLEXIBLE_MODES = (3, 5)
+ALLOCATING_MODES = (2, 3, 5)
+
+# Strategy keys of the result files ("2-chnk-2-22", "3", ...) and run.sh EXP_NAMEs
+STRATEGY_RE = re.compile(r"^(?P<mode>\d+)(?:-chnk-?(?P<chunk>\d+)(?:-(?P<units>\d+))?)?$")
+EXP_NAME_RE = re.compile(r"^vt-(?P<mode>\d+)_chnk-(?P<chunk>\d+)_")
+
+
+def parse_strategy(key):
+    """(mode, chunk, units) of a strategy key or EXP_NAME, or None."""
+    m = STRATEGY_RE.match(key) or EXP_NAME_RE.match(key)
+    if not m:
+        return None
+    groups = m.groupdict()
+    chunk = int(groups["chunk"] or 1)
+    units = int(groups.get("units") or UNITS_PER_ZONE)
+    return int(groups["mode"]), max(chunk, 1), units
+
+
+def strategy_name(mode, chunk):
+    name = MODE_NAMES.get(int(mode), f"vt-{mode}")
+    return f"{name}-{chunk}" if int(mode) in (2, 3, 5) else name
+
+
+def strategy_label(key):
+    """Plot label of a strategy key or EXP_NAME; the key itself if it is neither."""
+    parsed = parse_strategy(key)
+    if parsed is None:
+        return key
+    mode, chunk, _ = parsed
+    return strategy_name(mode, chunk)
+
+
+# === Finish ===
+def finish_granularity(mode, chunk, units=UNITS_PER_ZONE, zone_pages=ZONE_PAGES):
+    """Pages a finish pads up to a multiple of, per (mode, chunk); vectorized."""
+    mode, chunk = np.asarray(mode), np.asarray(chunk)
+    unit = zone_pages // np.asarray(units)
+    return np.where(np.isin(mode, (0, 1)), zone_pages,
+                    np.where(mode == 4, unit, np.minimum(chunk * unit, zone_pages)))
+
+
+def finish_pages(written, granularity):
+    """Pages a finish writes after `written` pages (0 at a unit boundary)."""
+    return (-np.asarray(written, dtype=np.int64)) % np.asarray(granularity, dtype=np.int64)
+
+
+def finish_dlwa(written, granularity):
+    """(written + padded) / written, 0 for an empty zone (as femu_logs.dlwa)."""
+    written = np.asarray(written, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wa = (written + finish_pages(written, granularity)) / written
+    return np.where(written == 0, 0.0, wa)
+
+
+def finish_seconds(written, granularity, emulator=EMULATOR_US):
+    """Host-side latency of a finish: the FTL pads one page at a time."""
+    return finish_pages(written, granularity) * emulator["ftl_write"] / 1e6
+
+
+# === Allocation ===
+def allocation_ms(mode, chunk, units=UNITS_PER_ZONE, emulator=EMULATOR_US, timing=TIMING_US):
+    """
+    Zone allocation latency: one parallel erase plus the setup of each chunk
+    for full/flexible allocation, 0 for lazy (deferred to the write path) and
+    NaN where the model has no allocation step (direct, stripe).
+    """
+    mode = np.asarray(mode)
+    chunks = np.ceil(np.asarray(units) / np.maximum(np.asarray(chunk), 1))
+    alloc = (timing["block_erase"] + chunks * emulator["chunk_alloc"]) / 1000.0
+    return np.where(np.isin(mode, ALLOCATING_MODES), alloc, np.where(mode == 1, 0.0, np.nan))
+
+
+# === Throughput ===
+def mva(n_max, think, stations):
+    """
+    Exact MVA of a closed network with `think` (us) of delay and stations
+    (demand_us, servers, copies): `copies` identical queues of `servers`
+    servers, each with that demand per I/O. Arguments broadcast over any
+    number of configurations. Returns I/O/s for 1..n_max customers, with the
+    customer count as the last axis.
+    """
+    think = np.asarray(think, dtype=np.float64)
+    specs = [(np.asarray(d, dtype=np.float64), np.asarray(m), np.asarray(k, dtype=np.float64))
+             for d, m, k in stations]
+    shape = np.broadcast_shapes(think.shape, *[np.broadcast_shapes(d.shape, m.shape, k.shape)
+                                               for d, m, k in specs])
+    # Marginal queue-length probabilities p[..., j] of one copy of each station
+    probs = [np.zeros(shape + (n_max + 1,)) for _ in specs]
+    for p in probs:
+        p[..., 0] = 1.0
+    rates = np.zeros(shape + (n_max,))
+
+    for n in range(1, n_max + 1):
+        j = np.arange(1, n + 1)
+        # Time per visit with j customers at a copy: j * demand / min(j, servers)
+        scaled = [d[..., None] / np.minimum(j, m[..., None]) for d, m, _ in specs]
+        residence = np.broadcast_to(think, shape).copy()
+        for (_, _, k), s, p in zip(specs, scaled, probs):
+            residence += k * np.sum(j * s * p[..., :n], axis=-1)
+        x = n / residence  # I/O per us
+        for (_, _, k), s, p in zip(specs, scaled, probs):
+            p[..., 1:n + 1] = (x / k)[..., None] * s * p[..., :n]
+            p[..., 0] = np.maximum(1.0 - p[..., 1:n + 1].sum(axis=-1), 0.0)
+        rates[..., n - 1] = x * 1e6
+    return rates
+
+
+def throughput(mode, access, n_max, geometry=GEOMETRY, timing=TIMING_US, emulator=EMULATOR_US):
+    """
+    Predicted IOPS of 1..n_max sync workers of one page each, for vtable
+    `mode` (array) and `access` in write / read_seq / read_rand.
+
+    Writes of the flexible modes (FLEXIBLE_MODES) reuse the random-LUN model
+    fitted on random reads and ignore the units and minimum-LUN settings of
+    the strategy; validate_model.py shows them off by tens of percent, so
+    screen_configs.py leaves them out.
+    """
+    mode = np.asarray(mode)
+    luns = geometry["channels"] * geometry["ways"]
+    if access == "write":
+        service = timing["page_write"] + timing["transfer"]
+        think, ftl = emulator["host_write"], emulator["ftl_write"]
+        random = np.isin(mode, FLEXIBLE_MODES)
+    else:
+        service = timing["page_read"] + timing["transfer"]
+        think, ftl = emulator["host_read"], emulator["ftl_read"]
+        random = np.full(mode.shape, access == "read_rand")
+
+    n = np.arange(1, n_max + 1)
+    spread = np.minimum(n / (think + ftl + service), min(1.0 / ftl, luns / service)) * 1e6
+    queues = int(emulator["random_luns"])
+    scattered = mva(n_max, think, [(ftl, 1, 1), (service / queues, 1, queues)])
+    return np.where(random[..., None], scattered, spread)
+
+
+# === Calibration and validation ===
+def calibrate(table, alloc_means=None, timing=TIMING_US):
+    """
+    Fit EMULATOR_US from direct-mode ("0") fio results (fio_results table of
+    the threads experiment): the FTL time from the saturated throughput, the
+    host time from one worker, random_luns from the random reads. With
+    `alloc_means` ({'<mode>_<chunk>': (n, mean_ms)}, as returned by
+    femu_logs.allocation_latency_stats) it also fits the per-chunk setup time.
+    """
+    fitted = dict(EMULATOR_US)
+    for access, ftl, host, service in (
+            ("write", "ftl_write", "host_write", timing["page_write"] + timing["transfer"]),
+            ("read_seq", "ftl_read", "host_read", timing["page_read"] + timing["transfer"])):
+        rows = (table["strategy"] == "0") & (table["access"] == access) & (table["job"] == 0)
+        if not rows.any():
+            continue
+        iops, threads = table["iops"][rows], table["threads"][rows]
+        fitted[ftl] = 1e6 / iops.max()
+        single = iops[threads == threads.min()].mean()
+        fitted[host] = max(1e6 / single - service - fitted[ftl], 0.0)
+
+    rows = (table["strategy"] == "0") & (table["access"] == "read_rand") & (table["job"] == 0)
+    if rows.any():
+        threads, measured = table["threads"][rows], table["iops"][rows]
+        errors = []
+        for queues in range(1, GEOMETRY["channels"] * GEOMETRY["ways"] + 1):
+            trial = dict(fitted, random_luns=queues)
+            predicted = throughput(np.zeros(1, dtype=int), "read_rand", int(threads.max()), emulator=trial)[0]
+            errors.append(np.mean(np.abs(relative_error(predicted[threads - 1], measured))))
+        fitted["random_luns"] = int(np.argmin(errors)) + 1
+
+    if alloc_means:
+        excess, chunks = [], []
+        for key, (_, mean_ms) in alloc_means.items():
+            mode, chunk = (int(v) for v in key.split("_"))
+            if mode in ALLOCATING_MODES:
+                excess.append(mean_ms * 1000.0 - timing["block_erase"])
+                chunks.append(np.ceil(UNITS_PER_ZONE / max(chunk, 1)))
+        if chunks:
+            chunks = np.array(chunks)
+            fitted["chunk_alloc"] = max(float(np.dot(chunks, excess) / np.dot(chunks, chunks)), 0.0)
+    return fitted
+
+
+def relative_error(predicted, measured):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(measured != 0, (predicted - measured) / measured, np.nan)
@@ -0,0 +1,67 @@
+import os
+import re
+import glob
+import numpy as np
+
+from femu_logs import mode_keys, dlwa
+
+# Per-zone results of the occupancy experiment (exp_occupancy/fill): the host
+# side finish latencies in results/<EXP_NAME>-time and the FEMU finish-log.
+#
+# Percentage k of a run uses zones k * n ... (k + 1) * n - 1, where n is the
+# number of zones per percentage (fill -n, OCC_ZONES), so a zone's level
+# follows from its rank among the zones a mode finished.
+
+TIME_LINE_RE = re.compile(r"^zone_(\d+),([\d.]+)%,([\d.]+)\(s\)$")
+
+
+def read_finish_times(path):
+    """Return (zone, pct, seconds) arrays from a '<EXP_NAME>-time' file."""
+    rows = []
+    with open(path, "r") as f:
+        for line in f:
+            m = TIME_LINE_RE.match(line.strip())
+            if m:
+                rows.append((int(m.group(1)), float(m.group(2)), float(m.group(3))))
+    data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return data[:, 0].astype(np.int64), data[:, 1], data[:, 2]
+
+
+def time_files(times_dir, key):
+    """'<key>-time' and its repetitions '<key>-time_r<N>' (run_matrix.py --repeat)."""
+    base = os.path.join(times_dir, f"{key}-time")
+    return sorted([base] * os.path.exists(base) + glob.glob(base + "_r[0-9]*"))
+
+
+def times_by_level(paths, percentages):
+    """Finish latencies (s) of one or more '-time' files grouped by occupancy level."""
+    if isinstance(paths, str):
+        paths = [paths]
+    pct, seconds = [], []
+    for path in paths:
+        _, p, s = read_finish_times(path)
+        pct.append(p)
+        seconds.append(s)
+    pct, seconds = np.concatenate(pct), np.concatenate(seconds)
+    return [seconds[np.isclose(pct, p)] for p in percentages]
+
+
+def dlwa_by_level(records, n_levels):
+    """
+    Group finish-log DLWA by mode and occupancy level.
+
+    Returns ({mode_key: [values of level 0, ..., level n_levels - 1]},
+    {mode_key: skipped records}). Repeated finishes of a zone (appended
+    re-runs, run_matrix.py --repeat) are kept as extra samples of its level;
+    only zones beyond an even split over the levels are skipped.
+    """
+    keys = mode_keys(records)
+    wa = dlwa(records)
+    levels, skipped = {}, {}
+    for key in np.unique(keys):
+        idx = np.flatnonzero(keys == key)
+        zones, rank = np.unique(records["zone_slba"][idx], return_inverse=True)
+        level = rank // max(1, len(zones) // n_levels)
+        levels[key.item()] = [wa[idx[level == k]] for k in range(n_levels)]
+        skipped[key.item()] = int(np.count_nonzero(level >= n_levels))
+    return levels, skipped
@@ -1,9 +1,11 @@
 import os
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import numpy as np
 from matplotlib import rcParams
 
+from femu_logs import allocation_latency_stats
+from alloc_hist import concurrency_stats
+
 # === Font and style settings ===
 rcParams["font.family"] = "Linux Libertine O"
 TITLE_FONT_SIZE = 18
@@ -17,6 +19,11 @@ SPINE_WIDTH = 1.2
 # === File paths ===
 input_path = "../exp_allocation/results/allocation-log"
 output_path = "results/exp_allocation_latency_means.pdf"
+# Host-side histograms of the concurrent benchmark (<EXP_NAME>_alloc_t<threads>.txt,
+# exp_allocation/run.sh HIST_DIR)
+hist_dir = "../exp_allocation/new_results"
+concurrency_output = "results/exp_allocation_latency_threads_{stat}.pdf"
+TAIL_PERCENTILE = 99
 
 # === Mode → label mapping ===
 mode_labels = {
@@ -37,6 +44,32 @@ color_map = {
     "direct": "black"
 }
 
+# Line styles for the concurrency plots
+line_color_map = {
+    "chunk-1": "#6b92b9",
+    "chunk-2": "#6b92b9",
+    "chunk-11": "#6b92b9",
+    "stripe": "#6ca768",
+    "lazy": "black",
+    "direct": "black"
+}
+marker_map = {
+    "chunk-1": "o",
+    "chunk-2": "s",
+    "chunk-11": "^",
+    "stripe": "D",
+    "lazy": "+",
+    "direct": "x"
+}
+linestyle_map = {
+    "chunk-1": "-",
+    "chunk-2": "--",
+    "chunk-11": ":",
+    "stripe": "-",
+    "lazy": "-",
+    "direct": "--"
+}
+
 hatch_map = {
     "chunk-1": None,
     "chunk-2": "///",
@@ -44,39 +77,12 @@ hatch_map = {
     "stripe": None,
 }
 
-# === Step 1: Parse log file and collect latencies ===
-latencies_by_label = defaultdict(list)
-
-with open(input_path, 'r') as f:
-    for line in f:
-        line = line.strip()
-        if not line.startswith("mode"):
-            continue
-
-        parts = line.split(',')
-        if len(parts) < 6:
-            continue
-
-        mode = parts[1]
-        chunk = parts[3]
-        time_us = parts[5]
-
-        if mode == "0":
-            continue  # skip direct
-
-        key = f"{mode}_{chunk}"
-        label = mode_labels.get(key)
-        if not label:
-            continue
-
-        try:
-            latency = int(time_us.replace("(us)", "")) / 1000  # µs → ms
-            latencies_by_label[label].append(latency)
-        except ValueError:
-            continue
+# === Step 1: Stream log file and aggregate latencies (direct is skipped) ===
+latency_stats = allocation_latency_stats(input_path)
 
 # === Step 2: Compute means ===
-mean_latencies = {label: np.mean(latencies) for label, latencies in latencies_by_label.items()}
+mean_latencies = {label: latency_stats[key][1] for key, label in mode_labels.items()
+                  if key in latency_stats}
 
 # === Step 3: Print all means (incl. lazy) ===
 print("\n📊 (d) Allocation Latency (ms):")
@@ -135,3 +141,57 @@ os.makedirs("results", exist_ok=True)
 plt.savefig(output_path)
 plt.close()
 print(f"\n✅ Mean latency barplot saved to {output_path}")
+
+# === Step 7: Allocation latency vs concurrency (first write per zone) ===
+concurrency = concurrency_stats(hist_dir, op="write", pcts=[TAIL_PERCENTILE])
+if not concurrency:
+    print(f"\n⚠️ No concurrent allocation histograms in {hist_dir}, skipping concurrency plots")
+else:
+    print(f"\n📊 First-write latency vs threads (ms, mean / p{TAIL_PERCENTILE}):")
+    for key, label in mode_labels.items():
+        if key not in concurrency:
+            continue
+        threads, mean_ms, pct_ms = concurrency[key]
+        points = "  ".join(f"{t}: {m:.3f}/{p:.3f}" for t, m, p in zip(threads, mean_ms, pct_ms[:, 0]))
+        print(f"  {label:10s} {points}")
+
+    for stat, ylabel in [("mean", "Mean Alloc. Latency (ms)"),
+                         (f"p{TAIL_PERCENTILE}", f"p{TAIL_PERCENTILE} Alloc. Latency (ms)")]:
+        plt.figure(figsize=(4, 3))
+        ax = plt.gca()
+        all_threads = set()
+        for key, label in mode_labels.items():
+            if key not in concurrency:
+                continue
+            threads, mean_ms, pct_ms = concurrency[key]
+            all_threads.update(threads.tolist())
+            ax.plot(
+                threads,
+                mean_ms if stat == "mean" else pct_ms[:, 0],
+                label=label,
+                color=line_color_map[label],
+                marker=marker_map[label],
+                linestyle=linestyle_map[label],
+                linewidth=LINE_WIDTH,
+                markersize=MARKER_SIZE - 4
+            )
+
+        ax.set_xscale("log", base=2)
+        ax.set_xticks(sorted(all_threads))
+        ax.set_xticklabels([str(t) for t in sorted(all_threads)])
+        ax.set_ylabel(ylabel, fontsize=LABEL_FONT_SIZE)
+        ax.set_xlabel("Number of Threads", fontsize=LABEL_FONT_SIZE)
+        ax.tick_params(axis='both', labelsize=TICK_FONT_SIZE)
+        ax.set_ylim(bottom=0)
+        ax.grid(False)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_linewidth(SPINE_WIDTH)
+        ax.spines['bottom'].set_linewidth(SPINE_WIDTH)
+        ax.legend(loc="upper left", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+
+        plt.tight_layout()
+        path = concurrency_output.format(stat=stat)
+        plt.savefig(path)
+        plt.close()
+        print(f"✅ Saved: {path}")
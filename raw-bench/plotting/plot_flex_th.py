@@ -1,15 +1,16 @@
 import os
 import re
-import json
 import matplotlib.pyplot as plt
 
+from fio_results import load_results, select, iter_rows, rep_means
+
 # Directory with JSON files
 RESULTS_DIR = "../exp_rw_bench/results"
 OUTPUT_PATH = "results/mode3_chnk1_maxchunks_plot.pdf"
 
-# Patterns
-pattern_chunked = re.compile(r"3-chnk-1-(\d+)_threads_(\d+)\.json")
-pattern_full = re.compile(r"2_threads_(\d+)\.json")
+# Strategy patterns
+pattern_chunked = re.compile(r"3-chnk-1-(\d+)$")
+full_strategy = "2"
 
 # Store results by maxchunks: {maxchunks: {threads: iops}}
 chunk_grouped_results = {}
@@ -17,32 +18,21 @@ chunk_grouped_results = {}
 # Store "full" configuration: {threads: iops}
 full_iops_results = {}
 
-# Parse all files
-for fname in os.listdir(RESULTS_DIR):
-    fpath = os.path.join(RESULTS_DIR, fname)
-
-    chunked_match = pattern_chunked.match(fname)
-    full_match = pattern_full.match(fname)
-
-    try:
-        with open(fpath) as f:
-            data = json.load(f)
-            iops = float(data["jobs"][0]["write"]["iops"]) / 1000.0  # KIOPS
-
-            if chunked_match:
-                maxchunks = int(chunked_match.group(1))
-                thread_count = int(chunked_match.group(2))
-
-                if maxchunks not in chunk_grouped_results:
-                    chunk_grouped_results[maxchunks] = {}
-                chunk_grouped_results[maxchunks][thread_count] = iops
-
-            elif full_match:
-                thread_count = int(full_match.group(1))
-                full_iops_results[thread_count] = iops
-
-    except Exception as e:
-        print(f"⚠️ Failed to read {fname}: {e}")
+# Collect write results
+table = rep_means(select(load_results(RESULTS_DIR), experiment="threads", access="write", job=0))
+for row in iter_rows(table):
+    iops = row["iops"] / 1000.0  # KIOPS
+    thread_count = row["threads"]
+    chunked_match = pattern_chunked.match(row["strategy"])
+
+    if chunked_match:
+        maxchunks = int(chunked_match.group(1))
+        if maxchunks not in chunk_grouped_results:
+            chunk_grouped_results[maxchunks] = {}
+        chunk_grouped_results[maxchunks][thread_count] = iops
+
+    elif row["strategy"] == full_strategy:
+        full_iops_results[thread_count] = iops
 
 # --- Plotting ---
 plt.figure(figsize=(10, 7))
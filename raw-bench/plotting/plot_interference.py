@@ -1,8 +1,11 @@
 import os
-import json
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import rcParams
 
+from fio_results import load_results, select, iter_rows
+from stats import ratio_ci, reject_outliers
+
 # === Font and style settings ===
 rcParams["font.family"] = "Linux Libertine O"
 
@@ -60,32 +63,37 @@ linestyle_map = {
 
 
 
-# Data collection
+# Data collection: every repetition (_r<N> files) of a (strategy, threads)
+# cell is one sample, outliers are dropped before the ratio of means
+def write_iops_by_strategy_threads(table):
+    samples = {}
+    for row in iter_rows(select(table, access="write", job=0)):
+        samples.setdefault((row["strategy"], row["threads"]), []).append(row["iops"])
+    return {key: reject_outliers(values)[0] for key, values in samples.items()}
+
+baseline_iops = write_iops_by_strategy_threads(
+    select(load_results(BASELINE_DIR), experiment="threads"))
+interfere_iops = write_iops_by_strategy_threads(
+    select(load_results(INTERFERE_DIR), experiment="finish"))
+
 ratios_by_strategy = {label: [] for label in strategies.values()}
+ratio_err_by_strategy = {label: [] for label in strategies.values()}
 
 for strategy_key, label in strategies.items():
     for t in THREAD_RANGE:
-        baseline_file = os.path.join(BASELINE_DIR, f"{strategy_key}_threads_{t}.json")
-        interfere_file = os.path.join(INTERFERE_DIR, f"{strategy_key}_finish_{t}jobs.json")
-
-        try:
-            with open(baseline_file) as f:
-                base_data = json.load(f)
-                base_iops = float(base_data["jobs"][0]["write"]["iops"])
-        except Exception as e:
-            print(f"⚠️ Missing baseline file: {baseline_file} — {e}")
-            base_iops = 0
-
-        try:
-            with open(interfere_file) as f:
-                int_data = json.load(f)
-                int_iops = float(int_data["jobs"][0]["write"]["iops"])
-        except Exception as e:
-            print(f"⚠️ Missing interference file: {interfere_file} — {e}")
-            int_iops = 0
-
-        ratio = int_iops / base_iops if base_iops > 0 else 0
+        base_iops = baseline_iops.get((strategy_key, t), [])
+        if (strategy_key, t) not in baseline_iops:
+            print(f"⚠️ Missing baseline result: {strategy_key}_threads_{t}.json")
+
+        int_iops = interfere_iops.get((strategy_key, t), [])
+        if (strategy_key, t) not in interfere_iops:
+            print(f"⚠️ Missing interference result: {strategy_key}_finish_{t}jobs.json")
+
+        ratio, low, high = ratio_ci(int_iops, base_iops)
+        if np.isnan(ratio):
+            ratio = low = high = 0
         ratios_by_strategy[label].append(ratio)
+        ratio_err_by_strategy[label].append((ratio - low, high - ratio))
 
 # ✅ Print interference ratios to terminal
 print("\n📊 Interference IOPS Ratios:")
@@ -104,9 +112,12 @@ ax = plt.gca()
 
 for label in strategies.values():
     ratios = ratios_by_strategy[label]
-    ax.plot(
+    ax.errorbar(
         THREAD_RANGE,
         ratios,
+        yerr=np.transpose(ratio_err_by_strategy[label]),
+        capsize=2,
+        elinewidth=0.8,
         label=label,
         marker=marker_map[label],
         color=color_map[label],
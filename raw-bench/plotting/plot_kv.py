@@ -0,0 +1,131 @@
+import os
+import csv
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+from femu_logs import load_events, LBAS_PER_PAGE
+from latency import tail_latencies
+import kv_results
+import model
+
+# KV stage (exp_kv/run.sh, db_bench on ZenFS): per strategy, the ops/s and
+# p99 latency of every workload and op class, and the device-level DLWA of
+# the whole stage:
+#
+#   DLWA = (pages the guest wrote + pages FEMU padded when ZenFS finished
+#           zones) / pages the guest wrote
+#
+# with the guest's pages summed over the workloads and repetitions of the
+# strategy, and the padding over the finish-log records of its vtable mode.
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 12
+LEGEND_FONT_SIZE = 10
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+KV_DIR = "../exp_kv/results"
+FINISH_LOG = os.path.join(KV_DIR, "finish-log")
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "kv_summary.csv")
+OUTPUT_PLOT = os.path.join(OUTPUT_DIR, "kv_workloads.pdf")
+
+WORKLOADS = ["fillseq", "overwrite", "readrandom", "mixed"]
+CLASS_OF = {"write": "write", "read_rand": "read"}
+
+# === Data ===
+if not os.path.isdir(KV_DIR) or not kv_results.normalize(KV_DIR):
+    raise SystemExit(f"❌ No KV results (*_kv_*.log) in {KV_DIR}; run EXP_ID=11")
+table = rep_means(select(load_results(KV_DIR), experiment="kv"))
+if len(table["filename"]) == 0:
+    raise SystemExit(f"❌ No KV results (*_kv_*.log) in {KV_DIR}; run EXP_ID=11")
+p99_ms = tail_latencies(table, (99,))[:, 0] / 1e6
+sectors = kv_results.device_sectors(KV_DIR)
+strategies = sorted(set(table["strategy"].tolist()), key=lambda s: model.parse_strategy(s) or (99, 0, 0))
+
+
+# Padded pages per strategy from the finish-log (non-chunk modes log chunk 0)
+padded = {}
+if os.path.exists(FINISH_LOG):
+    records = load_events(FINISH_LOG)
+    for strategy in strategies:
+        parsed = model.parse_strategy(strategy)
+        if parsed is None:
+            continue
+        mode, chunk, _ = parsed
+        mask = (records["mode"] == mode) & np.isin(records["chunk_size"], (0, chunk))
+        padded[strategy] = float(records["pages_finished"][mask].sum())
+else:
+    print(f"⚠️ No finish-log in {KV_DIR}; DLWA needs run.sh EXP_ID=11 to log finishes")
+
+dlwa = {}
+for strategy in strategies:
+    host_pages = sum(n for (s, _, _), n in sectors.items() if s == strategy) / LBAS_PER_PAGE
+    dlwa[strategy] = (host_pages + padded[strategy]) / host_pages if host_pages and strategy in padded else np.nan
+
+# (strategy, workload, class) → (KOPS, p99 ms)
+points = {}
+for i, (strategy, workload, access) in enumerate(zip(table["strategy"], table["workload"], table["access"])):
+    points[(strategy, workload, CLASS_OF.get(access, access))] = (table["iops"][i] / 1000.0, p99_ms[i])
+
+rows = []
+print("\n📊 KV stage (KOPS and p99 ms per workload and op class, DLWA of the stage):")
+print(f"{'Strategy':<12s}{'workload':<12s}{'class':<7s}{'KOPS':>9s}{'p99':>9s}{'DLWA':>8s}")
+for strategy in strategies:
+    for workload in WORKLOADS:
+        for cls in ("write", "read"):
+            if (strategy, workload, cls) not in points:
+                continue
+            kops, p99 = points[(strategy, workload, cls)]
+            rows.append({"strategy": strategy, "workload": workload, "class": cls, "kops": round(kops, 3),
+                         "p99_ms": round(p99, 4), "dlwa": round(dlwa[strategy], 4)})
+            print(f"{model.strategy_label(strategy):<12s}{workload:<12s}{cls:<7s}{kops:>9.2f}{p99:>9.3f}"
+                  f"{dlwa[strategy]:>8.3f}")
+with open(OUTPUT_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=["strategy", "workload", "class", "kops", "p99_ms", "dlwa"])
+    writer.writeheader()
+    writer.writerows(rows)
+print(f"\n✅ Saved: {OUTPUT_CSV}")
+
+# === Plot: (a) KOPS and (b) p99 per workload/class, (c) DLWA per strategy ===
+cells = [(w, c) for w in WORKLOADS for c in ("write", "read") if any((s, w, c) in points for s in strategies)]
+colors = plt.cm.tab10(np.arange(len(strategies)) % 10)
+width = 0.8 / max(1, len(strategies))
+x = np.arange(len(cells))
+
+fig, (ax_ops, ax_p99, ax_wa) = plt.subplots(1, 3, figsize=(13, 3.2), gridspec_kw={"width_ratios": [3, 3, 1.4]})
+for k, (color, strategy) in enumerate(zip(colors, strategies)):
+    values = np.array([points.get((strategy, w, c), (np.nan, np.nan)) for w, c in cells]).reshape(-1, 2)
+    offset = (k - (len(strategies) - 1) / 2) * width
+    ax_ops.bar(x + offset, values[:, 0], width, color=color, label=model.strategy_label(strategy))
+    ax_p99.bar(x + offset, values[:, 1], width, color=color)
+    ax_wa.bar(k, dlwa[strategy], 0.8, color=color)
+
+ticks = [f"{w}\n{c}" for w, c in cells]
+ax_ops.set_ylabel("Throughput (KOPS)", fontsize=LABEL_FONT_SIZE)
+ax_p99.set_ylabel("p99 Latency (ms)", fontsize=LABEL_FONT_SIZE)
+ax_wa.set_ylabel("DLWA", fontsize=LABEL_FONT_SIZE)
+for ax in (ax_ops, ax_p99):
+    ax.set_xticks(x)
+    ax.set_xticklabels(ticks, fontsize=TICK_FONT_SIZE - 2)
+ax_wa.set_xticks(np.arange(len(strategies)))
+ax_wa.set_xticklabels([model.strategy_label(s) for s in strategies], rotation=45, ha="right",
+                      fontsize=TICK_FONT_SIZE - 2)
+ax_wa.set_ylim(bottom=1.0 if np.all(np.nan_to_num(list(dlwa.values()), nan=1.0) >= 1.0) else 0.0)
+ax_ops.legend(loc="upper right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+for ax in (ax_ops, ax_p99, ax_wa):
+    ax.tick_params(axis="y", labelsize=TICK_FONT_SIZE)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PLOT)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PLOT}")
@@ -0,0 +1,233 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+from latency import TAIL_PERCENTILES, tail_latencies, tail_inflation, percentile_cdf, histogram_cdf, curves_by_strategy
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+TITLE_FONT_SIZE = 18
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 16
+LEGEND_FONT_SIZE = 11
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+RW_RESULTS_DIR = "../exp_rw_bench/results"
+INTERFERE_DIR = "../exp_interference/results"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_INFLATION = os.path.join(OUTPUT_DIR, "exp_interference_tail_inflation.pdf")
+OUTPUT_CDF = os.path.join(OUTPUT_DIR, "exp_interference_clat_cdf.pdf")
+OUTPUT_TAIL = os.path.join(OUTPUT_DIR, "exp_interference_lat_tail.pdf")
+
+# Percentile plotted in the tail-vs-threads figures and the inflation figure
+TAIL_PLOTS = [99, 99.99]
+INFLATION_PERCENTILE = 99
+
+# Thread count whose full clat CDF and bucket tail are plotted
+CDF_THREADS = 7
+
+# === Strategy mappings (same keys as plot_rw_th.py / plot_interference.py) ===
+rw_strategies = {
+    "0": "direct",
+    "1": "lazy",
+    "2-chnk-1-22": "chunk-1",
+    "2-chnk-2-22": "chunk-2",
+    "2-chnk-11-22": "chunk-11",
+    "4": "stripe"
+}
+interference_strategies = {
+    "0": "direct",
+    "1": "lazy",
+    "2": "chunk-1",
+    "2-chnk-2-22": "chunk-2",
+    "2-chnk-11-22": "chunk-11",
+    "4": "stripe"
+}
+
+color_map = {
+    "chunk-1": "#6b92b9",
+    "chunk-2": "#6b92b9",
+    "chunk-11": "#6b92b9",
+    "stripe": "#6ca768",
+    "lazy": "black",
+    "direct": "black"
+}
+marker_map = {
+    "chunk-1": "o",
+    "chunk-2": "s",
+    "chunk-11": "^",
+    "stripe": "D",
+    "lazy": "+",
+    "direct": "x"
+}
+linestyle_map = {
+    "chunk-1": "-",
+    "chunk-2": "--",
+    "chunk-11": ":",
+    "stripe": "-",
+    "lazy": "-",
+    "direct": "--"
+}
+
+# === Load write runs ===
+rw_write = rep_means(select(load_results(RW_RESULTS_DIR), experiment="threads", access="write", job=0))
+interfered = rep_means(select(load_results(INTERFERE_DIR), experiment="finish", access="write", job=0))
+
+
+def style_axes(ax, xlabel, ylabel, xticks=None):
+    ax.set_xlabel(xlabel, fontsize=LABEL_FONT_SIZE)
+    ax.set_ylabel(ylabel, fontsize=LABEL_FONT_SIZE)
+    if xticks is not None:
+        ax.set_xticks(xticks)
+    ax.tick_params(axis='both', labelsize=TICK_FONT_SIZE)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_linewidth(SPINE_WIDTH)
+    ax.spines['bottom'].set_linewidth(SPINE_WIDTH)
+    ax.grid(False)
+
+
+def plot_curves(curves, strategies, ylabel, xlabel, output_file):
+    plt.figure(figsize=(4, 3))
+    ax = plt.gca()
+    all_threads = set()
+
+    for key, label in strategies.items():
+        if key not in curves:
+            print(f"⚠️ No runs for {label} ({key})")
+            continue
+        threads, values = curves[key]
+        all_threads.update(threads.tolist())
+        ax.plot(
+            threads,
+            values,
+            label=label,
+            marker=marker_map[label],
+            color=color_map[label],
+            linestyle=linestyle_map[label],
+            linewidth=LINE_WIDTH,
+            markersize=MARKER_SIZE
+        )
+
+    style_axes(ax, xlabel, ylabel, sorted(all_threads))
+    ax.set_ylim(bottom=0)
+    ax.legend(loc="upper left", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close()
+    print(f"✅ Saved: {output_file}")
+
+
+# === Print tail percentiles per run ===
+print("\n📊 Write completion latency (ms):")
+header = "Strategy     Thr  " + "  ".join(f"p{p:<7g}" for p in TAIL_PERCENTILES)
+for name, table, strategies in [("baseline", rw_write, rw_strategies),
+                                ("finish", interfered, interference_strategies)]:
+    print(f"\n  [{name}]")
+    print("  " + header)
+    tails_ms = tail_latencies(table) / 1e6
+    order = np.lexsort((table["threads"], table["strategy"]))
+    for i in order:
+        label = strategies.get(str(table["strategy"][i]))
+        if label is None:
+            continue
+        values = "  ".join(f"{v:8.3f}" for v in tails_ms[i])
+        print(f"  {label:<12s}{table['threads'][i]:>3d}  {values}")
+
+# === Tail latency vs threads ===
+for pct in TAIL_PLOTS:
+    values_ms = tail_latencies(rw_write, [pct])[:, 0] / 1e6
+    curves = curves_by_strategy(rw_write["strategy"], rw_write["threads"], values_ms)
+    plot_curves(
+        curves, rw_strategies,
+        ylabel=f"p{pct:g} Write Latency (ms)",
+        xlabel="Number of Threads",
+        output_file=os.path.join(OUTPUT_DIR, f"exp_rw-write-p{pct:g}.pdf")
+    )
+
+# === Interference tail inflation ===
+strategy, threads, ratios = tail_inflation(rw_write, interfered, [INFLATION_PERCENTILE])
+curves = curves_by_strategy(strategy, threads, ratios[:, 0])
+plot_curves(
+    curves, interference_strategies,
+    ylabel=f"p{INFLATION_PERCENTILE:g} Inflation",
+    xlabel="(a) Number of Threads",
+    output_file=OUTPUT_INFLATION
+)
+
+# === Completion latency CDF under finish interference ===
+plt.figure(figsize=(4, 3))
+ax = plt.gca()
+cdf_runs = select(interfered, threads=CDF_THREADS)
+x_ns, y = percentile_cdf(cdf_runs)
+
+for key, label in interference_strategies.items():
+    rows = np.flatnonzero(cdf_runs["strategy"] == key)
+    if len(rows) == 0:
+        continue
+    ax.plot(
+        x_ns[rows[0]] / 1e6,
+        y,
+        label=label,
+        color=color_map[label],
+        linestyle=linestyle_map[label],
+        marker=marker_map[label],
+        linewidth=LINE_WIDTH,
+        markersize=MARKER_SIZE - 2
+    )
+
+style_axes(ax, f"Write Latency (ms), {CDF_THREADS} Threads", "CDF")
+ax.set_xscale("log")
+ax.set_ylim(0, 1.01)
+ax.legend(loc="lower right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=1)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_CDF)
+plt.close()
+print(f"✅ Saved: {OUTPUT_CDF}")
+
+# === Latency tail under finish interference, from fio's latency buckets ===
+# The percentiles stop at p99.99; the buckets (total latency, up to >= 2 s,
+# in 0.01 % steps) show how far the slowest I/Os go
+plt.figure(figsize=(4, 3))
+ax = plt.gca()
+edges_ns, cdf = histogram_cdf(cdf_runs)
+finite = np.isfinite(edges_ns)
+
+for key, label in interference_strategies.items():
+    rows = np.flatnonzero(cdf_runs["strategy"] == key)
+    if len(rows) == 0:
+        continue
+    slower = 1.0 - cdf[rows[0], finite]
+    # Only the buckets from just below the fastest to just above the slowest I/O
+    busy = np.flatnonzero((slower > 0) & (slower < 1))
+    if len(busy) == 0:
+        continue
+    shown = slice(max(busy[0] - 1, 0), busy[-1] + 2)
+    ax.step(
+        edges_ns[finite][shown] / 1e6,
+        np.maximum(slower[shown], 1e-5),
+        where="post",
+        label=label,
+        color=color_map[label],
+        linestyle=linestyle_map[label],
+        linewidth=LINE_WIDTH
+    )
+
+style_axes(ax, f"Write Latency (ms), {CDF_THREADS} Threads", "Fraction Slower")
+ax.set_xscale("log")
+ax.set_yscale("log")
+ax.set_ylim(1e-5, 1.5)
+ax.legend(loc="upper right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=1)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_TAIL)
+plt.close()
+print(f"✅ Saved: {OUTPUT_TAIL}")
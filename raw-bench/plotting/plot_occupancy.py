@@ -1,10 +1,13 @@
 import os
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import matplotlib.ticker as mticker
 import numpy as np
 from matplotlib import rcParams
 
+from femu_logs import load_events, FINISH_DTYPE
+from occupancy import dlwa_by_level, time_files, times_by_level
+from stats import ci_table
+
 # === Font and style settings ===
 rcParams["font.family"] = "Linux Libertine O"
 # Font size settings (to match other plots)
@@ -16,11 +19,25 @@ LEGEND_FONT_SIZE = 11
 # Path to results
 input_path = "../exp_occupancy/results/finish-log-new"
 output_path = "results/exp_occupancy_dlwa_barplot.pdf"
+# Host-side finish latencies, results/<EXP_NAME>-time[_r<N>]
+times_dir = "../exp_occupancy/results"
+times_output_path = "results/exp_occupancy_finish_latency.pdf"
+os.makedirs("results", exist_ok=True)
 
 # Updated percentages (removed 0.001)
 percentages = [10, 25, 50, 75, 95]
 num_percentages = len(percentages)
 
+# Strategy (-time file prefix) to label mapping
+time_labels = {
+    "0": "direct",
+    "1": "lazy",
+    "4": "stripe",
+    "2-chnk-1-22": "chunk-1",
+    "2-chnk-2-22": "chunk-2",
+    "2-chnk-11-22": "chunk-11"
+}
+
 # Mode to label mapping
 mode_labels = {
     "0_0": "direct",
@@ -49,73 +66,42 @@ hatch_map = {
     "direct": "..."
 }
 
-# Step 1: Parse log and compute DLWA
-raw_wa = defaultdict(list)
-
+# Step 1: Parse log and compute DLWA per zone, grouped by occupancy level
 print("\n🔍 Parsing DLWA values:")
-with open(input_path, 'r') as f:
-    for line in f:
-        line = line.strip()
-        if not line or not line.startswith("mode"):
-            continue
-
-        parts = line.split(',')
-        if len(parts) % 2 != 0:
-            print("⚠️ Malformed line skipped:", line)
-            continue
-
-        entry = {parts[i]: parts[i+1] for i in range(0, len(parts) - 1, 2)}
-        mode = entry.get("mode")
-        chunk = entry.get("chunk_size")
-        zone_slba = entry.get("zone_slba")
-        wptr = entry.get("wptr")
-        pages_finished = entry.get("pages_finished")
-
-        if not all([mode, chunk, zone_slba, wptr, pages_finished]):
-            print("⚠️ Missing values in line:", entry)
-            continue
-
-        key = f"{mode}_{chunk}"
-        label = mode_labels.get(key)
-        if label is None:
-            print("⚠️ Unknown key skipped:", key)
-            continue
-
-        try:
-            zone_slba = int(zone_slba)
-            wptr = int(wptr)
-            pages_finished = int(pages_finished)
-            pages_written = (wptr - zone_slba) / 32
-
-            if pages_written == 0:
-                dlwa = 0
-            else:
-                dlwa = (pages_written + pages_finished) / pages_written
-
-            if len(raw_wa[label]) < num_percentages:
-                raw_wa[label].append(dlwa)
-                print(f"  ✅ {label}: {len(raw_wa[label])}/{num_percentages} entries (DLWA = {dlwa:.3f})", flush=True)
-            else:
-                print(f"  ⚠️ Extra entry for {label} skipped (already has {num_percentages})")
-
-        except ValueError:
-            print(f"⚠️ Skipping invalid values in entry: {entry}")
-            continue
+records = load_events(input_path, FINISH_DTYPE)
+levels, skipped = dlwa_by_level(records, num_percentages)
+
+for key in levels:
+    if key not in mode_labels:
+        print("⚠️ Unknown key skipped:", key)
+
+raw_wa = {}      # label → per-level DLWA arrays (one value per zone)
+wa_mean = {}     # label → (mean, ci low, ci high) arrays over levels
+for key, label in mode_labels.items():
+    if key not in levels:
+        print(f"⚠️ No finish records for {label}")
+        continue
+    raw_wa[label] = levels[key]
+    wa_mean[label] = ci_table(levels[key])
+    for pct, values, mean in zip(percentages, levels[key], wa_mean[label][0]):
+        print(f"  ✅ {label}: {pct}% occupancy, {len(values)} samples (DLWA = {mean:.3f})", flush=True)
+    if skipped[key]:
+        print(f"  ⚠️ {skipped[key]} extra entries for {label} skipped")
 
 # Step 2: Validate number of entries
-for label in raw_wa:
-    if len(raw_wa[label]) != num_percentages:
-        print(f"⚠️ {label} has {len(raw_wa[label])} values, expected {num_percentages}")
+for label, values in raw_wa.items():
+    if any(len(v) == 0 for v in values):
+        print(f"⚠️ {label} is missing occupancy levels")
 
 # Step 3: Labels to plot
 labels_to_plot = ["chunk-1", "chunk-2", "chunk-11", "stripe", "lazy", "direct"]
 
 # Step 3.5: Compare DLWA reduction vs. direct for each percentage
 print("\n📉 DLWA Reduction Compared to 'direct' (per occupancy level):")
-baseline = raw_wa["direct"]
+baseline = wa_mean["direct"][0]
 
 for label in ["chunk-1", "chunk-2", "chunk-11", "stripe"]:
-    values = raw_wa[label]
+    values = wa_mean[label][0]
     if len(values) != len(baseline):
         print(f"  ⚠️ Skipping {label} due to unequal number of entries.")
         continue
@@ -138,18 +124,28 @@ x = np.arange(len(percentages))
 n = len(labels_to_plot)
 offsets = np.linspace(-bar_width * (n - 1) / 2, bar_width * (n - 1) / 2, n)
 
-for i, label in enumerate(labels_to_plot):
-    values = raw_wa[label]
-    ax.bar(
-        x + offsets[i],
-        values,
-        width=bar_width,
-        label=label,
-        color=color_map[label],
-        hatch=hatch_map[label],
-        edgecolor="black",
-        linewidth=0.8
-    )
+
+def grouped_bars(ax, stats):
+    """Bars of the per-level means with CI error bars, one group per level."""
+    for i, label in enumerate(labels_to_plot):
+        if label not in stats:
+            continue
+        mean, low, high = stats[label]
+        ax.bar(
+            x + offsets[i],
+            mean,
+            width=bar_width,
+            label=label,
+            color=color_map[label],
+            hatch=hatch_map[label],
+            edgecolor="black",
+            linewidth=0.8,
+            yerr=np.vstack([mean - low, high - mean]),
+            error_kw={"elinewidth": 0.8, "capsize": 1.5}
+        )
+
+
+grouped_bars(ax, wa_mean)
 
 # Axis styling
 ax.set_xticks(x)
@@ -178,3 +174,38 @@ plt.tight_layout()
 plt.savefig(output_path)
 plt.close()
 print(f"\n✅ DLWA barplot saved to {output_path}")
+
+
+# Step 5: Finish latency per occupancy level (host-side, one value per zone)
+print("\n⏱️  Finish latency (s, mean [95% CI]):")
+finish_stats = {}
+for key, label in time_labels.items():
+    paths = time_files(times_dir, key)
+    if not paths:
+        print(f"  ⚠️ No {key}-time file in {times_dir}, skipping {label}")
+        continue
+    finish_stats[label] = ci_table(times_by_level(paths, percentages))
+    mean, low, high = finish_stats[label]
+    cells = "  ".join(f"{m:.3f} [{lo:.3f}, {hi:.3f}]" for m, lo, hi in zip(mean, low, high))
+    print(f"  {label:10s} {cells}")
+
+plt.figure(figsize=(4, 3))
+ax = plt.gca()
+grouped_bars(ax, finish_stats)
+
+ax.set_xticks(x)
+ax.set_xticklabels([f"{p}%" for p in percentages], fontsize=TICK_FONT_SIZE)
+ax.set_xlabel("(b) Zone Occupancy (%)", fontsize=LABEL_FONT_SIZE)
+ax.set_ylabel("Finish Latency (s)", fontsize=LABEL_FONT_SIZE)
+ax.tick_params(axis='y', labelsize=TICK_FONT_SIZE)
+ax.yaxis.grid(False)
+ax.spines['top'].set_visible(False)
+ax.spines['right'].set_visible(False)
+ax.spines['left'].set_linewidth(1.2)
+ax.spines['bottom'].set_linewidth(1.2)
+ax.legend(loc="upper right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=1)
+
+plt.tight_layout()
+plt.savefig(times_output_path)
+plt.close()
+print(f"\n✅ Finish latency barplot saved to {times_output_path}")
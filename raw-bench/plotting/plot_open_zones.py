@@ -0,0 +1,155 @@
+import os
+import re
+import csv
+import glob
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+import model
+
+# Open-zone scaling (exp_rw_bench/run-zones.sh, ../zappend.c): a fixed number
+# of sync writers spread round-robin over P open zones, per strategy and P:
+# throughput, write latency and the allocation latency (first write into each
+# zone the run opened).
+#
+# The summary CSV also carries an estimate of the channels' utilization
+# (chan_util_est_*), not a measurement: FEMU exposes no per-channel counters
+# to the guest, so it is derived from the measured page rate and the zones'
+# placement. With sync regular writes every open zone has one write in
+# flight, so the open zones get equal shares of the rate. A zone of a fixed
+# layout covers channels_per_zone consecutive channels (the chnl- of the
+# EXP_NAME, zone z from channel z × channels_per_zone on), a flexibly
+# allocated one spreads over all of them; a channel is busy max(transfer,
+# page program / ways) per page (model.GEOMETRY, model.TIMING_US).
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 12
+LEGEND_FONT_SIZE = 10
+LINE_WIDTH = 1.8
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+RESULTS_DIR = "../exp_rw_bench/results"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "open_zones_summary.csv")
+OUTPUT_PLOT = os.path.join(OUTPUT_DIR, "open-zones-throughput.pdf")
+
+# <strategy>_zones[_r<rep>].csv
+FILE_RE = re.compile(r"^(?P<strategy>.+)_zones(?:_r\d+)?\.csv$")
+CHANNELS_RE = re.compile(r"_chnl-(?P<channels>\d+)_w-(?P<ways>\d+)")
+METRICS = ("iops", "mib_s", "lat_mean_us", "lat_p99_us", "zones_opened", "alloc_mean_us", "alloc_p99_us")
+
+
+def channel_util(strategy, open_zones, writers, mib_s, geometry=model.GEOMETRY, timing=model.TIMING_US):
+    """Estimated busy fraction of every channel during a run (see the top of the file)."""
+    channels = geometry["channels"]
+    parsed = model.parse_strategy(strategy)
+    placement = CHANNELS_RE.search(strategy)
+    per_zone = min(int(placement["channels"]), channels) if placement else channels
+    ways = geometry["ways"]
+
+    pages_s = mib_s * 1024 * 1024 / geometry["page_bytes"]
+    load = np.zeros(channels)
+    if parsed is not None and parsed[0] in model.FLEXIBLE_MODES:
+        load += pages_s / channels
+    else:
+        busy_zones = min(open_zones, writers)
+        for zone in range(busy_zones):
+            load[(zone * per_zone + np.arange(per_zone)) % channels] += pages_s / busy_zones / per_zone
+    page_us = max(timing["transfer"], timing["page_write"] / ways)
+    return np.minimum(load * page_us / 1e6, 1.0)
+
+
+# === Data ===
+# (strategy, open zones) → {metric: [value per repetition]}, writers per strategy
+runs = {}
+writers = {}
+request_sizes = set()
+for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*_zones*.csv"))):
+    match = FILE_RE.match(os.path.basename(path))
+    if not match:
+        continue  # <stem>_<P>z.guest.csv
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            key = (match["strategy"], int(row["active_zones"]))
+            writers[match["strategy"]] = int(row["threads"])
+            request_sizes.add(int(row["request_size"]))
+            cell = runs.setdefault(key, {m: [] for m in METRICS})
+            for m in METRICS:
+                cell[m].append(float(row[m]))
+if not runs:
+    raise SystemExit(f"❌ No open-zone results (*_zones*.csv) in {RESULTS_DIR}; run EXP_ID=12")
+
+points = {key: {m: float(np.mean(v)) for m, v in cell.items()} for key, cell in runs.items()}
+for (strategy, p), point in points.items():
+    util = channel_util(strategy, p, writers[strategy], point["mib_s"])
+    point["chan_util_est_mean"], point["chan_util_est_max"] = float(util.mean()), float(util.max())
+strategies = sorted({s for s, _ in points}, key=lambda s: model.parse_strategy(s) or (99, 0, 0))
+
+rows = []
+print("\n📊 Open-zone scaling (MiB/s, p99 ms, allocation mean/p99 ms, estimated channel utilization mean/max):")
+print(f"{'Strategy':<12s}{'P':>5s}{'MiB/s':>9s}{'p99':>8s}{'opened':>8s}{'alloc':>8s}{'a-p99':>8s}"
+      f"{'est mean':>9s}{'est max':>8s}")
+for strategy in strategies:
+    for p in sorted(q for s, q in points if s == strategy):
+        point = points[(strategy, p)]
+        rows.append({"strategy": strategy, "open_zones": p, "writers": writers[strategy],
+                     "mib_s": round(point["mib_s"], 2), "kiops": round(point["iops"] / 1000.0, 3),
+                     "lat_p99_ms": round(point["lat_p99_us"] / 1000.0, 4),
+                     "zones_opened": round(point["zones_opened"], 1),
+                     "alloc_mean_ms": round(point["alloc_mean_us"] / 1000.0, 4),
+                     "alloc_p99_ms": round(point["alloc_p99_us"] / 1000.0, 4),
+                     "chan_util_est_mean": round(point["chan_util_est_mean"], 4),
+                     "chan_util_est_max": round(point["chan_util_est_max"], 4)})
+        print(f"{model.strategy_label(strategy):<12s}{p:>5d}{point['mib_s']:>9.1f}{point['lat_p99_us'] / 1000.0:>8.2f}"
+              f"{point['zones_opened']:>8.0f}{point['alloc_mean_us'] / 1000.0:>8.2f}"
+              f"{point['alloc_p99_us'] / 1000.0:>8.2f}{point['chan_util_est_mean']:>9.2f}"
+              f"{point['chan_util_est_max']:>8.2f}")
+with open(OUTPUT_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+print(f"\n✅ Saved: {OUTPUT_CSV}")
+
+# === Plot: (a) throughput, (b) allocation latency vs open zones ===
+colors = plt.cm.tab10(np.arange(len(strategies)) % 10)
+fig, (ax_io, ax_alloc) = plt.subplots(1, 2, figsize=(9, 3.4))
+open_zones = set()
+for color, strategy in zip(colors, strategies):
+    series = sorted((p, points[(s, p)]) for s, p in points if s == strategy)
+    x = np.array([p for p, _ in series])
+    open_zones.update(x.tolist())
+    ax_io.plot(x, [pt["mib_s"] for _, pt in series], marker="o", linewidth=LINE_WIDTH, color=color,
+               label=model.strategy_label(strategy))
+    ax_alloc.plot(x, [pt["alloc_p99_us"] / 1000.0 for _, pt in series], marker="o", linewidth=LINE_WIDTH,
+                  color=color)
+    ax_alloc.plot(x, [pt["alloc_mean_us"] / 1000.0 for _, pt in series], marker=".", linewidth=1,
+                  color=color, linestyle="--")
+
+ax_io.set_ylabel("Throughput (MiB/s)", fontsize=LABEL_FONT_SIZE)
+ax_alloc.set_ylabel("Allocation (ms)\np99 solid, mean dashed", fontsize=LABEL_FONT_SIZE - 2)
+ax_io.legend(loc="best", fontsize=LEGEND_FONT_SIZE, frameon=False)
+for ax in (ax_io, ax_alloc):
+    ax.set_xscale("log", base=2)
+    ax.set_xticks(sorted(open_zones))
+    ax.set_xticklabels([str(p) for p in sorted(open_zones)])
+    ax.set_xlabel("Open Zones", fontsize=LABEL_FONT_SIZE)
+    ax.set_ylim(bottom=0)
+    ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+    ax.yaxis.grid(True, linestyle="--", linewidth=0.5)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+
+sizes = ", ".join(f"{size // 1024}k" for size in sorted(request_sizes))
+fig.suptitle(f"{sizes} sync writes, {max(writers.values())} writers round-robin over the open zones",
+             fontsize=LABEL_FONT_SIZE)
+plt.tight_layout()
+plt.savefig(OUTPUT_PLOT)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PLOT}")
@@ -0,0 +1,138 @@
+import os
+import re
+import csv
+import glob
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+import model
+
+# Block-trace replay (exp_rw_bench/run-replay.sh, ../replay.c): per trace,
+# replay mode and worker count, the throughput, per-op latency and lag behind
+# the trace timeline of every strategy, and the latency CDFs from the
+# replay's histograms.
+#
+# Usage: python plot_replay.py [--mode open] [--workers N]
+#   the CDF panels show one mode and worker count (default: open, the most
+#   workers replayed)
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 10
+LINE_WIDTH = 1.5
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+RESULTS_DIR = "../exp_rw_bench/results"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "replay_summary.csv")
+OUTPUT_CDF = os.path.join(OUTPUT_DIR, "replay_lat_cdf.pdf")
+
+# <strategy>_replay_<trace>_<mode>_<workers>w[_r<rep>].csv
+FILE_RE = re.compile(r"^(?P<strategy>.+)_replay_(?P<trace>[^_]+)_(?P<mode>open|closed)_(?P<workers>\d+)w"
+                     r"(?:_r\d+)?\.csv$")
+METRICS = ("iops", "mib_s", "lat_mean_us", "lat_p50_us", "lat_p99_us", "lat_p999_us", "lag_mean_us",
+           "lag_p99_us", "seconds", "trace_seconds", "speed", "zone_resets")
+OPS = ("read", "write")
+
+parser = argparse.ArgumentParser(description="Report and plot the trace replays.")
+parser.add_argument("--mode", choices=("open", "closed"), default="open", help="replay mode of the CDFs")
+parser.add_argument("--workers", type=int, default=None, help="worker count of the CDFs (default: largest)")
+args = parser.parse_args()
+
+
+# === Data ===
+# (strategy, trace, mode, workers, op) → {metric: [value per repetition]}
+runs = {}
+# (strategy, trace, mode, workers, op) → {bucket_us: count}, repetitions summed
+hists = {}
+for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*_replay_*.csv"))):
+    match = FILE_RE.match(os.path.basename(path))
+    if not match:
+        continue  # .hist.csv / .guest.csv
+    key = (match["strategy"], match["trace"], match["mode"], int(match["workers"]))
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            cell = runs.setdefault(key + (row["op"],), {m: [] for m in METRICS})
+            for m in METRICS:
+                cell[m].append(float(row[m]))
+    hist_path = path[:-len(".csv")] + ".hist.csv"
+    if os.path.exists(hist_path):
+        with open(hist_path, newline="") as f:
+            for row in csv.DictReader(f):
+                if row["metric"] == "lat":
+                    buckets = hists.setdefault(key + (row["op"],), {})
+                    bucket = float(row["bucket_us"])
+                    buckets[bucket] = buckets.get(bucket, 0) + int(row["count"])
+if not runs:
+    raise SystemExit(f"❌ No replay results (*_replay_*.csv) in {RESULTS_DIR}; run EXP_ID=10 with REPLAY_TRACES")
+
+points = {key: {m: float(np.mean(v)) for m, v in cell.items()} for key, cell in runs.items()}
+strategies = sorted({k[0] for k in points}, key=lambda s: model.parse_strategy(s) or (99, 0, 0))
+traces = sorted({k[1] for k in points})
+
+rows = []
+for (strategy, trace, mode, workers, op), p in sorted(points.items()):
+    rows.append({"strategy": strategy, "trace": trace, "mode": mode, "workers": workers, "op": op,
+                 **{m: round(v, 3) for m, v in p.items()}})
+with open(OUTPUT_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+print("\n📊 Trace replay (KIOPS, p99 ms per op, lag p99 ms, replay time / trace time at the replay speed):")
+print(f"{'Trace':<14s}{'Strategy':<12s}{'mode':<8s}{'W':>4s}{'KIOPS':>8s}{'rd p99':>8s}{'wr p99':>8s}"
+      f"{'lag p99':>9s}{'time×':>7s}")
+for trace in traces:
+    for strategy in strategies:
+        for (s, t, mode, workers, op), p in sorted(points.items()):
+            if (s, t, op) != (strategy, trace, "all"):
+                continue
+            rd = points.get((s, t, mode, workers, "read"), {})
+            wr = points.get((s, t, mode, workers, "write"), {})
+            stretch = p["seconds"] * p["speed"] / p["trace_seconds"] if p["trace_seconds"] else np.nan
+            lag = f"{p['lag_p99_us'] / 1000.0:>9.2f}" if mode == "open" else f"{'-':>9s}"
+            print(f"{trace:<14s}{model.strategy_label(strategy):<12s}{mode:<8s}{workers:>4d}{p['iops'] / 1000.0:>8.2f}"
+                  f"{rd.get('lat_p99_us', np.nan) / 1000.0:>8.2f}{wr.get('lat_p99_us', np.nan) / 1000.0:>8.2f}"
+                  f"{lag}{stretch:>7.2f}")
+print(f"\n✅ Saved: {OUTPUT_CSV}")
+
+# === Plot: latency CDF per trace (rows) and op (columns) ===
+workers = args.workers or max(k[3] for k in points if k[2] == args.mode) if any(
+    k[2] == args.mode for k in points) else None
+if workers is None:
+    raise SystemExit(f"❌ No {args.mode}-loop replays to plot")
+
+colors = plt.cm.tab10(np.arange(len(strategies)) % 10)
+fig, axes = plt.subplots(len(traces), len(OPS), figsize=(4 * len(OPS), 3 * len(traces)), squeeze=False)
+for r, trace in enumerate(traces):
+    for c, op in enumerate(OPS):
+        ax = axes[r, c]
+        for color, strategy in zip(colors, strategies):
+            buckets = hists.get((strategy, trace, args.mode, workers, op))
+            if not buckets:
+                continue
+            x = np.array(sorted(buckets))
+            counts = np.array([buckets[b] for b in x], dtype=np.float64)
+            ax.plot(x / 1000.0, np.cumsum(counts) / counts.sum(), color=color, linewidth=LINE_WIDTH,
+                    label=model.strategy_label(strategy))
+        ax.set_xscale("log")
+        ax.set_ylim(0, 1.02)
+        ax.set_xlabel(f"{op.capitalize()} latency (ms), {trace}", fontsize=LABEL_FONT_SIZE)
+        ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.spines["left"].set_linewidth(SPINE_WIDTH)
+        ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+    axes[r, 0].set_ylabel("CDF", fontsize=LABEL_FONT_SIZE)
+axes[0, 0].legend(loc="lower right", fontsize=LEGEND_FONT_SIZE, frameon=False)
+fig.suptitle(f"{args.mode}-loop replay, {workers} workers", fontsize=LABEL_FONT_SIZE)
+plt.tight_layout()
+plt.savefig(OUTPUT_CDF)
+plt.close()
+print(f"✅ Saved: {OUTPUT_CDF}")
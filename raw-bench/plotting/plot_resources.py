@@ -0,0 +1,94 @@
+import os
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, iter_rows
+from resources import CPU_BOUND, run_resources
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 10
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+# Usage: python plot_resources.py [<results dir>] [<access>]
+RESULTS_DIR = sys.argv[1] if len(sys.argv) > 1 else "../exp_rw_bench/results"
+ACCESS = sys.argv[2] if len(sys.argv) > 2 else "write"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_PATH = os.path.join(OUTPUT_DIR, f"resources_threads_{ACCESS}.pdf")
+
+# === Strategy mapping (as in plot_rw_th.py) ===
+strategies = {
+    "0": "direct",
+    "1": "lazy",
+    "2-chnk-1-22": "chunk-1",
+    "2-chnk-2-22": "chunk-2",
+    "2-chnk-11-22": "chunk-11",
+    "4": "stripe"
+}
+marker_map = {
+    "chunk-1": "o",
+    "chunk-2": "s",
+    "chunk-11": "^",
+    "lazy": "+",
+    "direct": "x",
+    "stripe": "D"
+}
+
+# === Collect the samples of every run ===
+table = select(load_results(RESULTS_DIR), experiment="threads", access=ACCESS, job=0)
+runs = {}
+for row in iter_rows(table):
+    summary = run_resources(os.path.join(RESULTS_DIR, row["filename"]))
+    if summary is None:
+        continue
+    label = strategies.get(row["strategy"], row["strategy"])
+    runs.setdefault(label, []).append((row["threads"], row["rep"], summary))
+
+if not runs:
+    sys.exit(f"❌ No resource samples (*.qemu.csv / *.guest.csv) next to the results in {RESULTS_DIR}")
+
+print(f"\n🖥️  Resource usage ({ACCESS}; qemu threads in cores, others as fractions; top thread and"
+      f" CPU-bound flag leave out FEMU's pollers):")
+print(f"{'Strategy':<12s}{'T':>4s}  {'top qemu thread':<18s}{'util':>6s}{'qemu':>7s}{'poll':>6s}{'host':>7s}"
+      f"{'guest':>7s}{'steal':>7s}{'dev':>6s}")
+for label in sorted(runs):
+    for threads, rep, s in sorted(runs[label], key=lambda r: r[:2]):
+        flag = f"  ⚠️ CPU-bound ({', '.join(s['cpu_bound'])})" if s["cpu_bound"] else ""
+        print(f"{label:<12s}{threads:>4d}  {s['qemu_top_thread'][:17]:<18s}{s['qemu_top_util']:6.2f}"
+              f"{s['qemu_cores']:7.2f}{s['qemu_pollers']:6.2f}{s['host_cpu']:7.2f}{s['guest_cpu']:7.2f}{s['guest_steal']:7.2f}"
+              f"{s['device_busy']:6.2f}{flag}")
+
+# === Plot: busiest QEMU thread and guest CPU per thread count ===
+fig, axes = plt.subplots(1, 2, figsize=(8, 3), sharex=True)
+panels = [("qemu_top_util", "Busiest Non-Poller\nQEMU Thread (cores)"), ("guest_cpu", "Guest CPU Busy")]
+for ax, (key, ylabel) in zip(axes, panels):
+    for label in sorted(runs):
+        points = sorted((t, s[key]) for t, _, s in runs[label])
+        threads = sorted({t for t, _ in points})
+        values = [np.nanmean([v for t2, v in points if t2 == t]) for t in threads]
+        ax.plot(threads, values, label=label, marker=marker_map.get(label, "o"),
+                markerfacecolor="none", markeredgewidth=1.5, linewidth=LINE_WIDTH,
+                markersize=MARKER_SIZE)
+    ax.axhline(CPU_BOUND, color="red", linestyle=":", linewidth=1)
+    ax.set_xlabel("Number of Threads", fontsize=LABEL_FONT_SIZE)
+    ax.set_ylabel(ylabel, fontsize=LABEL_FONT_SIZE - 2)
+    ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+    ax.set_ylim(bottom=0)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+axes[0].legend(loc="upper left", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PATH)
+plt.close()
+print(f"\n✅ Saved: {OUTPUT_PATH}  (dotted: CPU-bound threshold {CPU_BOUND:g})")
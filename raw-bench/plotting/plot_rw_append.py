@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+import csv
+import glob
+import numpy as np
+import matplotlib.pyplot as plt
+
+import model
+
+# Zone Append vs regular writes into shared zones (exp_rw_bench/run-append.sh,
+# ../zappend.c): throughput and p99 latency vs queue depth per vtable
+# strategy, append solid and serialized writes dashed, at one thread count.
+#
+# Usage: python plot_rw_append.py [<prefix>] [--threads N]
+#   <prefix>  only the results <prefix>_append*.csv (default: every strategy)
+#   N         writer threads of the plots (default: the largest measured)
+
+# Directory where result CSV files are stored
+RESULTS_DIR = "../exp_rw_bench/results"
+
+# Output plot paths
+OUTPUT_IOPS = "results/rw-append-io.pdf"
+OUTPUT_P99  = "results/rw-append-p99.pdf"
+os.makedirs("results", exist_ok=True)
+
+argv = sys.argv[1:]
+THREADS = None
+if "--threads" in argv:
+    i = argv.index("--threads")
+    THREADS = int(argv[i + 1])
+    del argv[i:i + 2]
+PREFIX = argv[0] if argv else None
+
+# <strategy>_append[_r<rep>].csv
+FILE_RE = re.compile(r"^(?P<strategy>.+)_append(?:_r\d+)?\.csv$")
+METRICS = ("iops", "mib_s", "lat_mean_us", "lat_p99_us")
+
+
+# (strategy, op, threads, qd) → {metric: [value per repetition]}
+runs = {}
+request_sizes = set()
+for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*_append*.csv"))):
+    match = FILE_RE.match(os.path.basename(path))
+    if not match or (PREFIX and match["strategy"] != PREFIX):
+        continue
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            key = (match["strategy"], row["op"], int(row["threads"]), int(row["qd"]))
+            request_sizes.add(int(row["request_size"]))
+            cell = runs.setdefault(key, {m: [] for m in METRICS})
+            for m in METRICS:
+                cell[m].append(float(row[m]))
+if not runs:
+    raise SystemExit(f"❌ No zone append results (*_append*.csv) in {RESULTS_DIR}; run EXP_ID=9")
+
+# Repetitions averaged
+points = {key: {m: float(np.mean(v)) for m, v in cell.items()} for key, cell in runs.items()}
+strategies = sorted({s for s, _, _, _ in points}, key=lambda s: model.parse_strategy(s) or (99, 0, 0))
+threads = THREADS or max(t for _, _, t, _ in points)
+
+print("\n📊 Zone Append vs serialized writes (KIOPS, p99 ms, append/write speedup):")
+print(f"{'Strategy':<14s}{'threads':>8s}{'qd':>5s}{'append':>9s}{'write':>9s}{'×':>7s}{'p99 app':>9s}{'p99 wr':>9s}")
+for strategy in strategies:
+    for t, qd in sorted({(t, qd) for s, _, t, qd in points if s == strategy}):
+        app = points.get((strategy, "append", t, qd), {})
+        wr = points.get((strategy, "write", t, qd), {})
+        a_iops, w_iops = app.get("iops", np.nan) / 1000.0, wr.get("iops", np.nan) / 1000.0
+        print(f"{model.strategy_label(strategy):<14s}{t:>8d}{qd:>5d}{a_iops:>9.2f}{w_iops:>9.2f}{a_iops / w_iops:>7.2f}"
+              f"{app.get('lat_p99_us', np.nan) / 1000.0:>9.2f}{wr.get('lat_p99_us', np.nan) / 1000.0:>9.2f}")
+
+
+def minimalist_plot(metric, scale, ylabel, title, save_path):
+    plt.figure(figsize=(8, 6))
+    colors = plt.cm.tab10(np.arange(len(strategies)) % 10)
+    qdepths = set()
+    for color, strategy in zip(colors, strategies):
+        for op, linestyle in (("append", "-"), ("write", "--")):
+            series = sorted((qd, p[metric] * scale) for (s, o, t, qd), p in points.items()
+                            if s == strategy and o == op and t == threads)
+            if not series:
+                continue
+            x, y = zip(*series)
+            qdepths.update(x)
+            plt.plot(x, y, marker='o', linewidth=2, color=color, linestyle=linestyle,
+                     label=f"{model.strategy_label(strategy)} {op}")
+
+    plt.xlabel("Queue Depth", fontsize=14)
+    plt.ylabel(ylabel, fontsize=14)
+    plt.title(title, fontsize=16)
+
+    # Remove top and right spines
+    ax = plt.gca()
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_linewidth(1.5)
+    ax.spines['left'].set_linewidth(1.5)
+
+    # Keep only left and bottom ticks
+    ax.yaxis.set_ticks_position('left')
+    ax.xaxis.set_ticks_position('bottom')
+
+    # Enable only horizontal grid lines
+    ax.yaxis.grid(True, linestyle='--', linewidth=0.5)
+    ax.xaxis.grid(False)
+
+    plt.xticks(sorted(qdepths))
+    plt.xlim(left=0)
+    plt.ylim(bottom=0)
+    plt.legend(frameon=False, fontsize=10, ncol=2)
+    plt.tight_layout()
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Plot saved to: {save_path}")
+
+
+sizes = ", ".join(f"{size // 1024}k" for size in sorted(request_sizes))
+title = f"{sizes} zone append vs write, {threads} threads"
+
+# Plot IOPS
+minimalist_plot("iops", 1 / 1000.0, ylabel="Throughput (KIOPS)", title=title, save_path=OUTPUT_IOPS)
+
+# Plot p99 latency
+minimalist_plot("lat_p99_us", 1 / 1000.0, ylabel="p99 Latency (ms)", title=title, save_path=OUTPUT_P99)
@@ -0,0 +1,178 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+from latency import tail_latencies
+import model
+
+# Mixed workload suite (exp_rw_bench/run-mixed.sh): N sequential writers and
+# M readers at the same time. Per strategy and writers:readers ratio, the
+# throughput of each class and the readers' p99 latency, next to the
+# same readers without writers (the 0:M run of the suite, or else the
+# read-scaling run with M threads).
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 11
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+RESULTS_DIR = "../exp_rw_bench/results"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_IOPS = os.path.join(OUTPUT_DIR, "exp_rw-mixed-iops.pdf")
+OUTPUT_P99 = os.path.join(OUTPUT_DIR, "exp_rw-mixed-p99.pdf")
+
+READS = ("read_seq", "read_rand")
+
+# === Same colors and line styles as plot_rw_th.py ===
+access_color_map = {
+    "read_seq": "#cba6e3",
+    "read_rand": "#5e3c99",
+    "write": "#000000"
+}
+class_linestyle_map = {
+    "read": "-",
+    "write": ":"
+}
+marker_map = {
+    "chunk-1": "o",
+    "chunk-2": "s",
+    "chunk-11": "^",
+    "lazy": "+",
+    "direct": "x",
+    "stripe": "D"
+}
+EXTRA_MARKERS = ["v", "<", ">", "p", "h", "*"]
+
+# === Data ===
+table = rep_means(load_results(RESULTS_DIR))
+mixed = select(table, experiment="mixed")
+if len(mixed["filename"]) == 0:
+    raise SystemExit(f"❌ No mixed results (*_mixed_*.json) in {RESULTS_DIR}; run EXP_ID=8")
+reads_alone = select(table, experiment="threads")
+p99 = tail_latencies(mixed, (99,))[:, 0] / 1e6
+p99_alone = tail_latencies(reads_alone, (99,))[:, 0] / 1e6
+
+
+# (label, read access) → {(writers, readers): {"write": KIOPS, "read": KIOPS, "p99": ms}}
+points = {}
+strategy_of = {}
+for i, (strategy, mix, access) in enumerate(zip(mixed["strategy"], mixed["mix"], mixed["access"])):
+    counts, read = mix.split("_", 1)
+    writers, readers = (int(v) for v in counts[:-1].split("w"))
+    key = (model.strategy_label(strategy), read)
+    strategy_of[key] = strategy
+    point = points.setdefault(key, {}).setdefault((writers, readers), {})
+    if access == "write":
+        point["write"] = mixed["iops"][i] / 1000.0
+    else:
+        point["read"] = mixed["iops"][i] / 1000.0
+        point["p99"] = p99[i]
+
+# Readers alone: the run of this suite without writers, else read-scaling
+for (label, read), series in points.items():
+    for (writers, readers), point in series.items():
+        if "p99" not in point:
+            continue
+        alone = series.get((0, readers), {}).get("p99")
+        if alone is None:
+            rows = np.flatnonzero((reads_alone["strategy"] == strategy_of[(label, read)])
+                                  & (reads_alone["access"] == read) & (reads_alone["threads"] == readers))
+            alone = p99_alone[rows[0]] if len(rows) else np.nan
+        point["p99_alone"] = alone
+
+labels = sorted({label for label, _ in points}, key=lambda l: list(marker_map).index(l) if l in marker_map else 99)
+extra_markers = iter(EXTRA_MARKERS * len(labels))
+for label in labels:
+    marker_map.setdefault(label, next(extra_markers))
+
+print("\n📊 Mixed readers/writers (KIOPS per class, read p99 ms and its inflation over readers alone):")
+print(f"{'Strategy':<12s}{'Reads':<11s}{'W:R':>6s}{'write':>9s}{'read':>9s}{'p99':>9s}{'×alone':>8s}")
+for (label, read), series in sorted(points.items()):
+    for (writers, readers), point in sorted(series.items(), key=lambda kv: (kv[0][1] / sum(kv[0]), sum(kv[0]))):
+        inflation = point["p99"] / point["p99_alone"] if point.get("p99_alone") else np.nan
+        print(f"{label:<12s}{read:<11s}{f'{writers}:{readers}':>6s}{point.get('write', np.nan):>9.2f}"
+              f"{point.get('read', np.nan):>9.2f}{point.get('p99', np.nan):>9.2f}{inflation:>8.2f}")
+
+
+def read_share(writers, readers):
+    return readers / (writers + readers) * 100
+
+
+def style_axes(ax):
+    ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+    ax.set_xlim(-5, 105)
+    ax.set_ylim(bottom=0)
+    ax.grid(False)
+
+
+def series_by_total(series, metric):
+    """{writers + readers: (read shares, values)} of the points that have `metric`."""
+    out = {}
+    for (writers, readers), point in sorted(series.items(), key=lambda kv: read_share(*kv[0])):
+        if metric in point:
+            x, y = out.setdefault(writers + readers, ([], []))
+            x.append(read_share(writers, readers))
+            y.append(point[metric])
+    return out
+
+
+def strategy_legend(ax):
+    ax.legend(handles=[Line2D([0], [0], color="black", marker=marker_map[label], linestyle="",
+                              markersize=MARKER_SIZE, markerfacecolor="none", markeredgewidth=1.5, label=label)
+                       for label in labels],
+              loc="upper center", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=3)
+
+
+# === Plot: per-class throughput vs share of readers ===
+fig, axes = plt.subplots(1, len(READS), figsize=(4 * len(READS), 3), sharey=True)
+for ax, read in zip(axes, READS):
+    for label in labels:
+        series = points.get((label, read), {})
+        for cls, color in (("write", access_color_map["write"]), ("read", access_color_map[read])):
+            for x, y in series_by_total(series, cls).values():
+                ax.plot(x, y, color=color, linestyle=class_linestyle_map[cls], marker=marker_map[label],
+                        markerfacecolor="none", markeredgewidth=1.5, linewidth=LINE_WIDTH, markersize=MARKER_SIZE)
+    ax.set_xlabel(f"Readers (%), {read}", fontsize=LABEL_FONT_SIZE)
+    style_axes(ax)
+axes[0].set_ylabel("Throughput (KIOps)", fontsize=LABEL_FONT_SIZE)
+strategy_legend(axes[0])
+axes[-1].legend(handles=[Line2D([0], [0], color=access_color_map[READS[-1]], lw=LINE_WIDTH, label="read"),
+                         Line2D([0], [0], color=access_color_map["write"], lw=LINE_WIDTH,
+                                linestyle=class_linestyle_map["write"], label="write")],
+                loc="upper center", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+plt.tight_layout()
+plt.savefig(OUTPUT_IOPS)
+plt.close()
+print(f"\n✅ Saved: {OUTPUT_IOPS}")
+
+# === Plot: read p99 vs share of readers (dashed: readers alone) ===
+fig, axes = plt.subplots(1, len(READS), figsize=(4 * len(READS), 3), sharey=True)
+for ax, read in zip(axes, READS):
+    for label in labels:
+        series = points.get((label, read), {})
+        for x, y in series_by_total(series, "p99").values():
+            ax.plot(x, y, color=access_color_map[read], marker=marker_map[label], markerfacecolor="none",
+                    markeredgewidth=1.5, linewidth=LINE_WIDTH, markersize=MARKER_SIZE)
+        for x, y in series_by_total(series, "p99_alone").values():
+            ax.plot(x, y, color="#b0b0b0", linestyle="--", linewidth=1, zorder=0)
+    ax.set_xlabel(f"Readers (%), {read}", fontsize=LABEL_FONT_SIZE)
+    style_axes(ax)
+axes[0].set_ylabel("Read p99 (ms)", fontsize=LABEL_FONT_SIZE)
+strategy_legend(axes[0])
+plt.tight_layout()
+plt.savefig(OUTPUT_P99)
+plt.close()
+print(f"✅ Saved: {OUTPUT_P99}")
@@ -1,8 +1,9 @@
 import os
-import json
-import re
+import sys
 import matplotlib.pyplot as plt
 
+from fio_results import load_results, select, iter_rows, rep_means
+
 # Directory where result JSON files are stored
 RESULTS_DIR = "../exp_rw_bench/results"
 
@@ -10,35 +11,19 @@ RESULTS_DIR = "../exp_rw_bench/results"
 OUTPUT_IOPS = "results/rw-qd-io.pdf"
 OUTPUT_BW   = "results/rw-qd-bw.pdf"
 
+# Result prefix: <prefix>_qd_<depth>.json, e.g. ZN540 or a run.sh EXP_NAME
+# Usage: python plot_rw_qd.py [<prefix>]
+QD_PREFIX = sys.argv[1] if len(sys.argv) > 1 else "ZN540"
+
 qdepths = []
 k_iops = []
 mb_bw = []
 
-# Pattern: ZN540_qd_<depth>.json
-pattern = re.compile(r"ZN540_qd_(\d+)\.json")
-
-for filename in sorted(os.listdir(RESULTS_DIR)):
-    match = pattern.match(filename)
-    if not match:
-        continue
-
-    qd = int(match.group(1))
-    filepath = os.path.join(RESULTS_DIR, filename)
-
-    try:
-        with open(filepath, "r") as f:
-            data = json.load(f)
-
-        job = data["jobs"][0]
-        iops = float(job["write"]["iops"])
-        bw_bytes = float(job["write"]["bw_bytes"])
-
-        qdepths.append(qd)
-        k_iops.append(iops / 1000.0)         # Convert to KIOPS
-        mb_bw.append(bw_bytes / (1024 ** 2)) # Convert to MB/s
-
-    except Exception as e:
-        print(f"Skipping {filename}: {e}")
+table = rep_means(select(load_results(RESULTS_DIR), experiment="qd", strategy=QD_PREFIX, job=0))
+for row in iter_rows(table):
+    qdepths.append(row["qd"])
+    k_iops.append(row["iops"] / 1000.0)         # Convert to KIOPS
+    mb_bw.append(row["bw_bytes"] / (1024 ** 2)) # Convert to MB/s
 
 # Sort all metrics by queue depth
 sorted_all = sorted(zip(qdepths, k_iops, mb_bw))
@@ -1,10 +1,13 @@
 import os
-import json
-import re
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from matplotlib import rcParams
 
+from fio_results import load_results, select, iter_rows
+from stats import bootstrap_ci, reject_outliers
+from resources import run_resources
+
 # === Font and style settings ===
 rcParams["font.family"] = "Linux Libertine O"
 TITLE_FONT_SIZE = 18
@@ -56,55 +59,48 @@ marker_map = {
     "stripe": "D"
 }
 
-# === Filename parser ===
-pattern = re.compile(r"(?P<mode>[a-zA-Z0-9\-]+)_threads_(?P<threads>\d+)(?:_(?P<rwtype>read_(?:seq|rand)))?\.json")
-
 # === Data collector ===
-results = {}
-
-for filename in os.listdir(RESULTS_DIR):
-    match = pattern.match(filename)
-    if not match:
+# One sample per repetition (_r<N> files), averaged per thread count with a
+# bootstrap CI after outlier rejection
+samples = {}
+# Points where a repetition ran CPU-bound (RESOURCE_STATS=1 samples, see
+# resources.py): the emulator, not the strategy, limited them
+cpu_bound = {}
+
+table = select(load_results(RESULTS_DIR), experiment="threads", job=0)
+for row in iter_rows(table):
+    mode = row["strategy"]
+    if mode not in strategies:
         continue
 
-    mode = match.group("mode")
-    threads = int(match.group("threads"))
-    rwtype = match.group("rwtype")
-    access_type = "write" if rwtype is None else rwtype
+    key = (strategies[mode], row["access"], row["threads"])
+    samples.setdefault(key, {"k_iops": [], "mb_bw": []})
+    samples[key]["k_iops"].append(row["iops"] / 1000.0)
+    samples[key]["mb_bw"].append(row["bw_bytes"] / (1024 ** 2))
 
-    if mode not in strategies:
-        continue
+    usage = run_resources(os.path.join(RESULTS_DIR, row["filename"]))
+    if usage and usage["cpu_bound"]:
+        cpu_bound.setdefault(key, set()).update(usage["cpu_bound"])
 
-    label = strategies[mode]
-    key = (label, access_type)
-    filepath = os.path.join(RESULTS_DIR, filename)
-
-    try:
-        with open(filepath, "r") as f:
-            data = json.load(f)
-        job = data["jobs"][0]
-        metric_key = "read" if access_type.startswith("read") else "write"
-        iops = float(job[metric_key]["iops"]) / 1000.0
-        bw = float(job[metric_key]["bw_bytes"]) / (1024 ** 2)
-
-        if key not in results:
-            results[key] = {"threads": [], "k_iops": [], "mb_bw": []}
-        results[key]["threads"].append(threads)
-        results[key]["k_iops"].append(iops)
-        results[key]["mb_bw"].append(bw)
-
-    except Exception as e:
-        print(f"⚠️ Skipping {filename}: {e}")
-
-# === Sort threads for each result key ===
-for key in results:
-    zipped = sorted(zip(results[key]["threads"],
-                        results[key]["k_iops"],
-                        results[key]["mb_bw"]))
-    threads_sorted, iops_sorted, bw_sorted = zip(*zipped)
-    results[key]["threads"] = threads_sorted
-    results[key]["k_iops"] = iops_sorted
-    results[key]["mb_bw"] = bw_sorted
+results = {}
+for (label, access, threads), values in sorted(samples.items()):
+    data = results.setdefault((label, access), {"threads": [], "reps": []})
+    data["threads"].append(threads)
+    for metric, metric_values in values.items():
+        kept, rejected = reject_outliers(metric_values)
+        mean, low, high = bootstrap_ci(kept)
+        data.setdefault(metric, []).append(mean)
+        data.setdefault(metric + "_err", []).append((mean - low, high - mean))
+        if len(rejected):
+            print(f"⚠️ {label} {access} {threads}T: {len(rejected)} outlier {metric} rep(s) dropped")
+    data["reps"].append(len(values["k_iops"]))
+
+for (label, access), data in sorted(results.items()):
+    if max(data["reps"]) > 1:
+        print(f"📊 {label:9s} {access:9s} reps per thread count: {data['reps']}")
+
+for (label, access, threads), limits in sorted(cpu_bound.items()):
+    print(f"⚠️ {label} {access} {threads}T ran CPU-bound ({', '.join(sorted(limits))}), marked with *")
 
 # === Plotting function ===
 def plot_combined_metric(metric_key, ylabel, output_file, title):
@@ -116,9 +112,12 @@ def plot_combined_metric(metric_key, ylabel, output_file, title):
         linestyle = access_linestyle_map[access_type]
         marker = marker_map[label]
 
-        ax.plot(
+        ax.errorbar(
             data["threads"],
             data[metric_key],
+            yerr=np.transpose(data[metric_key + "_err"]),
+            capsize=2,
+            elinewidth=0.8,
             label=label,
             marker=marker,
             linestyle=linestyle,
@@ -129,6 +128,11 @@ def plot_combined_metric(metric_key, ylabel, output_file, title):
             markersize=MARKER_SIZE
         )
 
+        flagged = [(t, v) for t, v in zip(data["threads"], data[metric_key])
+                   if (label, access_type, t) in cpu_bound]
+        if flagged:
+            ax.scatter(*zip(*flagged), marker="*", s=40, color="red", zorder=3)
+
     # === Access Type Legend (Top) ===
     color_legend = [
         Line2D([0], [0], color=access_color_map["read_seq"], lw=LINE_WIDTH, label="read_seq", linestyle=access_linestyle_map["read_seq"]),
@@ -0,0 +1,159 @@
+import os
+import sys
+import csv
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+from latency import tail_latencies
+from scaling import (TAIL_PERCENTILE, BLOWUP_FACTOR, strategy_label, load_curves,
+                     analyze, best_configs, heatmap_grid)
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 12
+LEGEND_FONT_SIZE = 10
+CELL_FONT_SIZE = 7
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+# Usage: python plot_scaling.py [<results dir>] [<p99 budget ms>]
+RESULTS_DIR = sys.argv[1] if len(sys.argv) > 1 else "../exp_rw_bench/results"
+LATENCY_BUDGET_MS = float(sys.argv[2]) if len(sys.argv) > 2 else None
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_SUMMARY = os.path.join(OUTPUT_DIR, "scaling_summary.csv")
+OUTPUT_KNEES = os.path.join(OUTPUT_DIR, "scaling_knees.pdf")
+
+ENGINE_ORDER = ["sync", "libaio", "io_uring"]
+
+table = rep_means(select(load_results(RESULTS_DIR), experiment="scale", job=0))
+if len(table["filename"]) == 0:
+    sys.exit(f"❌ No scaling results (*_scale_*.json) in {RESULTS_DIR}")
+
+strategies = sorted(set(table["strategy"].tolist()), key=strategy_label)
+mb_s = table["bw_bytes"] / (1024 ** 2)
+tail_ms = tail_latencies(table, [TAIL_PERCENTILE])[:, 0] / 1e6
+print(f"🔍 {len(table['filename'])} scaling runs, {len(strategies)} strategies")
+
+# === Knee / blow-up per (strategy, engine, bs) ===
+curves = load_curves(table)
+summary = analyze(curves)
+best = best_configs(table)
+best_budget = best_configs(table, LATENCY_BUDGET_MS) if LATENCY_BUDGET_MS else {}
+
+
+def fmt_load(load):
+    return "-" if load is None else str(int(load))
+
+
+print(f"\n📈 Throughput knee and p{TAIL_PERCENTILE:g} blow-up (≥{BLOWUP_FACTOR:g}× lowest-load latency), "
+      f"load = iodepth × numjobs:")
+print(f"  {'Strategy':<18s} {'Engine':<9s} {'BS':>5s}  {'Knee':>5s} {'MB/s':>8s}  {'Blowup':>6s}  {'Peak':>5s} {'MB/s':>8s}")
+for row in summary:
+    print(f"  {strategy_label(row['strategy']):<18s} {row['engine']:<9s} {row['bs_bytes'] // 1024:>4d}K  "
+          f"{fmt_load(row['knee_load']):>5s} {row['knee_mb_s']:8.1f}  {fmt_load(row['blowup_load']):>6s}  "
+          f"{row['peak_load']:>5d} {row['peak_mb_s']:8.1f}")
+
+# === Best configuration per strategy ===
+print("\n🏆 Best configuration per strategy:")
+with open(OUTPUT_SUMMARY, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(["strategy", "label", "selection", "engine", "bs_bytes", "iodepth", "numjobs",
+                     "mb_s", "kiops", f"p{TAIL_PERCENTILE:g}_ms", "knee_load", "blowup_load"])
+    for strategy in strategies:
+        for selection, picks in [("max_bw", best), (f"p{TAIL_PERCENTILE:g}<={LATENCY_BUDGET_MS}ms", best_budget)]:
+            if strategy not in picks:
+                continue
+            i = picks[strategy]
+            engine, bs = str(table["engine"][i]), int(table["bs_bytes"][i])
+            row = next(r for r in summary if (r["strategy"], r["engine"], r["bs_bytes"]) == (strategy, engine, bs))
+            writer.writerow([strategy, strategy_label(strategy), selection, engine, bs, int(table["qd"][i]),
+                             int(table["threads"][i]), f"{mb_s[i]:.1f}", f"{table['iops'][i] / 1000:.2f}",
+                             f"{tail_ms[i]:.3f}", fmt_load(row["knee_load"]), fmt_load(row["blowup_load"])])
+            print(f"  {strategy_label(strategy):<18s} [{selection}] {engine} bs={bs // 1024}K "
+                  f"iodepth={table['qd'][i]} numjobs={table['threads'][i]}: {mb_s[i]:.1f} MB/s, "
+                  f"p{TAIL_PERCENTILE:g} {tail_ms[i]:.3f} ms")
+print(f"✅ Saved: {OUTPUT_SUMMARY}")
+
+
+def style_axes(ax):
+    ax.tick_params(axis='both', labelsize=TICK_FONT_SIZE)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_linewidth(SPINE_WIDTH)
+    ax.spines['bottom'].set_linewidth(SPINE_WIDTH)
+    ax.grid(False)
+
+
+# === Heatmaps: MB/s over iodepth × numjobs, one panel per engine and block size ===
+for strategy in strategies:
+    rows = table["strategy"] == strategy
+    engines = [e for e in ENGINE_ORDER if e in set(table["engine"][rows].tolist())]
+    block_sizes = sorted(set(table["bs_bytes"][rows].tolist()))
+    vmax = np.nanmax(mb_s[rows])
+
+    fig, axes = plt.subplots(len(engines), len(block_sizes), squeeze=False,
+                             figsize=(2.2 * len(block_sizes) + 0.8, 1.9 * len(engines) + 0.6))
+    for r, engine in enumerate(engines):
+        for c, bs in enumerate(block_sizes):
+            ax = axes[r, c]
+            qds, jobs, grid = heatmap_grid(table, strategy, engine, bs, mb_s)
+            if len(qds) == 0:
+                ax.axis("off")
+                continue
+            image = ax.imshow(grid, origin="lower", aspect="auto", cmap="Blues", vmin=0, vmax=vmax)
+            for (j, q), value in np.ndenumerate(grid):
+                if not np.isnan(value):
+                    ax.text(q, j, f"{value:.0f}", ha="center", va="center", fontsize=CELL_FONT_SIZE,
+                            color="white" if value > 0.6 * vmax else "black")
+            ax.set_xticks(range(len(qds)))
+            ax.set_xticklabels(qds, fontsize=CELL_FONT_SIZE + 1)
+            ax.set_yticks(range(len(jobs)))
+            ax.set_yticklabels(jobs, fontsize=CELL_FONT_SIZE + 1)
+            if r == 0:
+                ax.set_title(f"bs={bs // 1024}K", fontsize=LEGEND_FONT_SIZE)
+            if c == 0:
+                ax.set_ylabel(f"{engine}\nnumjobs", fontsize=LEGEND_FONT_SIZE)
+            if r == len(engines) - 1:
+                ax.set_xlabel("iodepth", fontsize=LEGEND_FONT_SIZE)
+
+    fig.colorbar(image, ax=axes, shrink=0.8, label="MB/s")
+    fig.suptitle(strategy_label(strategy), fontsize=LEGEND_FONT_SIZE + 2)
+    path = os.path.join(OUTPUT_DIR, f"scaling_heatmap_{strategy}.pdf")
+    plt.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+    print(f"✅ Saved: {path}")
+
+# === Throughput vs load at each strategy's best engine / block size ===
+plt.figure(figsize=(5, 3.5))
+ax = plt.gca()
+colors = plt.cm.tab10(np.linspace(0, 1, 10))
+for n, strategy in enumerate(strategies):
+    i = best[strategy]
+    key = (strategy, str(table["engine"][i]), int(table["bs_bytes"][i]))
+    c = curves[key]
+    row = next(r for r in summary if (r["strategy"], r["engine"], r["bs_bytes"]) == key)
+    color = colors[n % len(colors)]
+    ax.plot(c["load"], c["mb_s"], marker="o", color=color, linewidth=LINE_WIDTH, markersize=MARKER_SIZE - 2,
+            label=f"{strategy_label(strategy)} ({key[1]}, {key[2] // 1024}K)")
+    if row["knee_load"] is not None:
+        ax.plot(row["knee_load"], row["knee_mb_s"], marker="*", color=color, markersize=MARKER_SIZE + 6,
+                markeredgecolor="black", linestyle="none")
+    if row["blowup_load"] is not None:
+        ax.axvline(row["blowup_load"], color=color, linestyle=":", linewidth=1.0)
+
+ax.set_xscale("log", base=2)
+ax.set_xlabel("Outstanding I/Os (iodepth × numjobs)", fontsize=LABEL_FONT_SIZE - 2)
+ax.set_ylabel("Bandwidth (MB/s)", fontsize=LABEL_FONT_SIZE - 2)
+ax.set_ylim(bottom=0)
+style_axes(ax)
+ax.legend(loc="upper left", fontsize=LEGEND_FONT_SIZE - 2, frameon=False)
+plt.tight_layout()
+plt.savefig(OUTPUT_KNEES)
+plt.close()
+print(f"✅ Saved: {OUTPUT_KNEES}  (★ knee, dotted: p{TAIL_PERCENTILE:g} blow-up)")
@@ -0,0 +1,74 @@
+import os
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from timeseries import BUCKET_MS, log_files, bin_logs, throughput, read_markers
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 11
+LINE_WIDTH = 1.2
+SPINE_WIDTH = 1.2
+
+# === Run to plot ===
+# Usage: python plot_timeseries.py [<timeseries prefix>] [<bucket ms>]
+# The prefix is the fio log prefix written by the drivers with FIO_TIMESERIES=1,
+# e.g. ../exp_interference/results/timeseries/0_finish_4jobs
+RUN_PREFIX = sys.argv[1] if len(sys.argv) > 1 else "../exp_interference/results/timeseries/0_finish_4jobs"
+BUCKET = int(sys.argv[2]) if len(sys.argv) > 2 else BUCKET_MS
+
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_PATH = os.path.join(OUTPUT_DIR, f"timeseries_{os.path.basename(RUN_PREFIX)}.pdf")
+
+# === Bin per-I/O completion-latency logs ===
+paths = log_files(RUN_PREFIX, "clat") or log_files(RUN_PREFIX, "lat")
+if not paths:
+    sys.exit(f"❌ No fio latency logs found for prefix {RUN_PREFIX}")
+
+print(f"🔍 Binning {len(paths)} log(s) into {BUCKET} ms buckets...")
+binned = bin_logs(paths, bucket_ms=BUCKET)
+k_iops, mb_bw = throughput(binned)
+markers = read_markers(f"{RUN_PREFIX}_finish.csv", binned["t0_ms"])
+
+print(f"  {binned['ios'].sum()} I/Os over {len(binned['time_s'])} buckets")
+for slba, start_s, end_s in markers:
+    print(f"  finish zone {slba}: {start_s:.2f}s → {end_s:.2f}s")
+
+# === Plot throughput and latency over time ===
+fig, (ax_bw, ax_lat) = plt.subplots(2, 1, figsize=(6, 4), sharex=True)
+t = binned["time_s"]
+
+ax_bw.plot(t, mb_bw, color="black", linewidth=LINE_WIDTH)
+ax_bw.set_ylabel("MB/s", fontsize=LABEL_FONT_SIZE)
+ax_bw.set_ylim(bottom=0)
+
+ax_lat.plot(t, binned["value_mean"] / 1e6, color="#6b92b9", linewidth=LINE_WIDTH, label="mean")
+ax_lat.plot(t, binned["value_max"] / 1e6, color="#6ca768", linewidth=LINE_WIDTH, linestyle=":", label="max")
+ax_lat.set_ylabel("Latency (ms)", fontsize=LABEL_FONT_SIZE)
+ax_lat.set_xlabel("Time (s)", fontsize=LABEL_FONT_SIZE)
+ax_lat.set_yscale("log")
+ax_lat.legend(loc="upper right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+
+# Finish-zone markers: start (solid) and end (dashed) of every finish command
+for ax in (ax_bw, ax_lat):
+    for _, start_s, end_s in markers:
+        ax.axvline(start_s, color="#b0b0b0", linewidth=0.8)
+        if not np.isnan(end_s):
+            ax.axvline(end_s, color="#b0b0b0", linewidth=0.8, linestyle="--")
+
+    ax.tick_params(axis='both', labelsize=TICK_FONT_SIZE)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_linewidth(SPINE_WIDTH)
+    ax.spines['bottom'].set_linewidth(SPINE_WIDTH)
+    ax.grid(False)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PATH)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PATH}")
@@ -0,0 +1,109 @@
+import os
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from zones import read_zone_log, zone_series, write_rates, transitions, zone_summary
+from timeseries import log_files, bin_logs, throughput
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 9
+LINE_WIDTH = 1.2
+SPINE_WIDTH = 1.2
+
+# === Run to plot ===
+# Usage: python plot_zones.py [<zones csv>] [<bucket ms>]
+# The zones csv is written next to the fio JSON by the drivers with
+# ZONE_STATS=1, e.g. ../exp_interference/results/0_finish_4jobs.zones.csv.
+# When the run also has FIO_TIMESERIES=1 logs, fio's throughput is overlaid.
+ZONES_PATH = sys.argv[1] if len(sys.argv) > 1 else "../exp_interference/results/0_finish_4jobs.zones.csv"
+BUCKET = int(sys.argv[2]) if len(sys.argv) > 2 else 0  # 0: the sampling interval
+
+STEM = os.path.basename(ZONES_PATH)[:-len(".zones.csv")]
+FIO_PREFIX = os.path.join(os.path.dirname(ZONES_PATH), "timeseries", STEM)
+
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_PATH = os.path.join(OUTPUT_DIR, f"zones_{STEM}.pdf")
+
+if not os.path.exists(ZONES_PATH):
+    sys.exit(f"❌ No zone log {ZONES_PATH} (run with ZONE_STATS=1)")
+
+# === Zone series ===
+meta, log = read_zone_log(ZONES_PATH)
+series = zone_series(log)
+if not series:
+    sys.exit(f"❌ Zone log {ZONES_PATH} is empty")
+
+bucket_ms = BUCKET or max(meta.get("interval_ms", 100), 1)
+capacity = meta.get("zone_capacity") or meta.get("zone_size", 0)
+t0_ms = int(log["epoch_ms"].min())
+time_s, rates = write_rates(series, bucket_ms, t0_ms)
+summary = zone_summary(series, capacity)
+
+def rel_s(t_ms):
+    return np.nan if t_ms is None else (t_ms - t0_ms) / 1000.0
+
+def fmt_s(t_ms):
+    return "-" if t_ms is None else f"{rel_s(t_ms):.2f}"
+
+print(f"🔍 {len(series)} zones, {len(log['zone'])} changes over {time_s[-1] if len(time_s) else 0:.1f}s "
+      f"({meta.get('interval_ms', '?')} ms reports)")
+print(f"{'Zone':>6s}  {'fill':>13s}  {'writing (s)':>15s}  {'full at':>8s}  states")
+for zone, s in sorted(summary.items()):
+    print(f"{zone:>6d}  {s['start_fill']:5.0%} → {s['end_fill']:5.0%}  "
+          f"{fmt_s(s['write_start_ms']):>6s} → {fmt_s(s['write_end_ms']):>6s}  "
+          f"{fmt_s(s['full_ms']):>8s}  {s['start_cond']} → {s['end_cond']}")
+
+changes = transitions(series)
+for t_ms, zone, before, after in changes:
+    print(f"  {rel_s(t_ms):7.2f}s  zone {zone}: {before} → {after}")
+
+# === Plot: host write rate and fill per zone, state transitions ===
+fig, (ax_bw, ax_fill) = plt.subplots(2, 1, figsize=(6, 4), sharex=True)
+colors = plt.cm.viridis(np.linspace(0, 0.9, len(series)))
+
+written = [z for z in sorted(rates) if rates[z].any()]
+if written:
+    ax_bw.stackplot(time_s, [rates[z] for z in written], colors=colors[:len(written)], step="post",
+                    labels=[f"zone {z}" for z in written] if len(written) <= 8 else None)
+paths = log_files(FIO_PREFIX, "bw")
+if paths:
+    binned = bin_logs(paths, bucket_ms=bucket_ms, t0_ms=t0_ms)
+    _, mb_bw = throughput(binned)
+    ax_bw.plot(binned["time_s"], mb_bw, color="black", linewidth=LINE_WIDTH, label="fio")
+ax_bw.set_ylabel("MiB/s", fontsize=LABEL_FONT_SIZE)
+ax_bw.set_ylim(bottom=0)
+if (written and len(written) <= 8) or paths:
+    ax_bw.legend(loc="upper right", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+
+for color, (zone, (t_ms, wp, _)) in zip(colors, sorted(series.items())):
+    t = np.append((t_ms - t0_ms) / 1000.0, time_s[-1] + bucket_ms / 1000.0 if len(time_s) else 0)
+    fill = np.append(wp, wp[-1]) / capacity * 100 if capacity else np.append(wp, wp[-1])
+    ax_fill.step(t, fill, where="post", color=color, linewidth=LINE_WIDTH)
+ax_fill.set_ylabel("Zone Fill (%)", fontsize=LABEL_FONT_SIZE)
+ax_fill.set_xlabel("Time (s)", fontsize=LABEL_FONT_SIZE)
+ax_fill.set_ylim(0, 105)
+
+# State transitions: into full (dashed), any other change (dotted)
+for t_ms, _, _, after in changes:
+    for ax in (ax_bw, ax_fill):
+        ax.axvline(rel_s(t_ms), color="#b0b0b0", linewidth=0.8,
+                   linestyle="--" if after == "full" else ":")
+
+for ax in (ax_bw, ax_fill):
+    ax.tick_params(axis='both', labelsize=TICK_FONT_SIZE)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_linewidth(SPINE_WIDTH)
+    ax.spines['bottom'].set_linewidth(SPINE_WIDTH)
+    ax.grid(False)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PATH)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PATH}")
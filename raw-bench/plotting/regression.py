@@ -0,0 +1,207 @@
+import time
+import sqlite3
+import hashlib
+import numpy as np
+
+from fio_results import select, rep_means
+from latency import tail_latencies
+from femu_logs import load_events, FINISH_DTYPE
+from occupancy import dlwa_by_level
+
+# Performance history and regression checks across runs.
+#
+# Every recorded run stores one value per (experiment, strategy, access,
+# point, metric) in a SQLite database, where point is the thread count (fio
+# experiments) or the occupancy percentage (DLWA). A new run is compared with
+# the same key in the previous WINDOW runs: a change counts when it moves in
+# the bad direction by more than max(NOISE_K robust sigmas of the baseline,
+# REL_FLOOR of its median), so noisy metrics need bigger moves.
+
+# metric → True if higher is better
+METRICS = {
+    "iops": True,
+    "bw_mb_s": True,
+    "p99_ms": False,
+    "p999_ms": False,
+    "dlwa": False,
+}
+
+# fio_results experiment → history experiment name
+FIO_EXPERIMENTS = {
+    "threads": "rw_bench",
+    "finish": "interference",
+}
+
+WINDOW = 5          # previous runs forming the baseline
+MIN_BASELINE = 2    # fewer baseline values: reported as "new", never flagged
+NOISE_K = 3.0       # robust sigmas a change must exceed
+REL_FLOOR = 0.05    # ... and at least this fraction of the baseline median
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    build TEXT,
+    recorded_at REAL NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    experiment TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    access TEXT NOT NULL,
+    point REAL NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (run_id, experiment, strategy, access, point, metric)
+);
+CREATE INDEX IF NOT EXISTS metrics_key ON metrics (experiment, strategy, access, point, metric);
+"""
+
+
+# === Collecting metrics ===
+
+def fio_metrics(table):
+    """
+    Metric rows (experiment, strategy, access, point, metric, value, n) of
+    the fio experiments in a fio_results table; repetitions are averaged.
+    """
+    rows = []
+    for fio_exp, experiment in FIO_EXPERIMENTS.items():
+        t = rep_means(select(table, experiment=fio_exp, job=0))
+        if len(t["filename"]) == 0:
+            continue
+        tails_ms = tail_latencies(t, [99, 99.9]) / 1e6
+        values = {
+            "iops": t["iops"],
+            "bw_mb_s": t["bw_bytes"] / (1024 ** 2),
+            "p99_ms": tails_ms[:, 0],
+            "p999_ms": tails_ms[:, 1],
+        }
+        for i in range(len(t["filename"])):
+            key = (experiment, str(t["strategy"][i]), str(t["access"][i]), float(t["threads"][i]))
+            for metric, column in values.items():
+                if np.isfinite(column[i]):
+                    rows.append((*key, metric, float(column[i]), int(t["rep"][i])))
+    return rows
+
+
+def dlwa_metrics(finish_log, percentages):
+    """DLWA rows per (mode_key, occupancy level) of a FEMU finish-log."""
+    levels, _ = dlwa_by_level(load_events(finish_log, FINISH_DTYPE), len(percentages))
+    rows = []
+    for key, values in levels.items():
+        for pct, v in zip(percentages, values):
+            if len(v):
+                rows.append(("occupancy", key, "finish", float(pct), "dlwa", float(np.mean(v)), len(v)))
+    return rows
+
+
+def fingerprint(rows):
+    """Content hash of a run's metric rows (identical inputs → same hash)."""
+    digest = hashlib.sha1()
+    for row in sorted(rows):
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+# === History database ===
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def last_run(conn):
+    """(id, label, fingerprint) of the newest run, or None."""
+    return conn.execute("SELECT id, label, fingerprint FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+
+
+def record_run(conn, rows, label, build=None):
+    """Store one run's metric rows; returns its run id."""
+    with conn:
+        cur = conn.execute("INSERT INTO runs (label, build, recorded_at, fingerprint) VALUES (?, ?, ?, ?)",
+                           (label, build, time.time(), fingerprint(rows)))
+        run_id = cur.lastrowid
+        conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(run_id, *row) for row in rows])
+    return run_id
+
+
+def baseline_values(conn, before_run_id=None, window=WINDOW):
+    """
+    {(experiment, strategy, access, point, metric): [values]} of the `window`
+    runs before `before_run_id` (default: the newest runs), oldest first.
+    """
+    query = "SELECT id FROM runs"
+    args = ()
+    if before_run_id is not None:
+        query += " WHERE id < ?"
+        args = (before_run_id,)
+    run_ids = [r[0] for r in conn.execute(query + " ORDER BY id DESC LIMIT ?", (*args, window))]
+    if not run_ids:
+        return {}
+    marks = ",".join("?" * len(run_ids))
+    values = {}
+    for *key, value in conn.execute(
+            f"SELECT experiment, strategy, access, point, metric, value FROM metrics "
+            f"WHERE run_id IN ({marks}) ORDER BY run_id", run_ids):
+        values.setdefault(tuple(key), []).append(value)
+    return values
+
+
+# === Comparison ===
+
+def robust_sigma(values):
+    """1.4826 × MAD: the standard deviation for normal data, robust to outliers."""
+    values = np.asarray(values, dtype=np.float64)
+    return 1.4826 * np.median(np.abs(values - np.median(values)))
+
+
+def compare(rows, baseline, noise_k=NOISE_K, rel_floor=REL_FLOOR, min_baseline=MIN_BASELINE):
+    """
+    One finding dict per metric row: status "regression", "improvement",
+    "ok", or "new" (not enough baseline runs).
+    """
+    findings = []
+    for experiment, strategy, access, point, metric, value, n in rows:
+        key = (experiment, strategy, access, point, metric)
+        history = baseline.get(key, [])
+        finding = {
+            "experiment": experiment,
+            "strategy": strategy,
+            "access": access,
+            "point": point,
+            "metric": metric,
+            "value": value,
+            "reps": n,
+            "baseline_runs": len(history),
+        }
+        if len(history) < min_baseline:
+            finding["status"] = "new"
+            findings.append(finding)
+            continue
+
+        median = float(np.median(history))
+        sigma = float(robust_sigma(history))
+        threshold = max(noise_k * sigma, rel_floor * abs(median))
+        # positive delta = worse
+        delta = (median - value) if METRICS[metric] else (value - median)
+        if delta > threshold:
+            status = "regression"
+        elif -delta > threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        finding.update({
+            "baseline_median": median,
+            "baseline_sigma": sigma,
+            "threshold": threshold,
+            "change_pct": 100.0 * (value - median) / median if median else None,
+            "status": status,
+        })
+        findings.append(finding)
+    return findings
@@ -0,0 +1,141 @@
+import os
+import numpy as np
+
+# Resource samples recorded next to each fio JSON with RESOURCE_STATS=1:
+#
+#   <stem>.qemu.csv   per-thread CPU ticks of the QEMU process (hoststat.py)
+#   <stem>.host.csv   host CPU ticks and memory (hoststat.py)
+#   <stem>.guest.csv  guest CPU ticks and /proc/diskstats (sample_guest.sh)
+#
+# All counters are cumulative; a run's utilization is the counter delta over
+# the first and last sample. FEMU's FTL and NVMe poller threads spin on their
+# queues at about one core each whether or not the device is saturated, so
+# they are told apart by comm (run-zns-exp.sh names QEMU's threads with
+# debug-threads=on; Linux cuts comm to 15 characters) and left out: a run
+# counts as CPU-bound when another QEMU thread (vCPUs, main loop), the host
+# without the pollers, or the guest was busy for at least CPU_BOUND of the
+# time. Samples of unnamed threads cannot separate the pollers, so only the
+# guest is judged for them.
+
+CPU_BOUND = 0.9
+
+
+def is_poller(comm):
+    """FEMU's threads ("FEMU-FTL-Thread", "femu-nvme-poller", ...) all poll."""
+    return comm.lower().startswith("femu")
+
+
+def read_samples(path):
+    """Return (meta dict from the '# k=v' line, {column: array}) of a sample CSV."""
+    meta, header, rows = {}, None, []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                meta.update(kv.split("=", 1) for kv in line[1:].split() if "=" in kv)
+            elif header is None:
+                header = line.split(",")
+            else:
+                rows.append(line.split(","))
+    columns = {}
+    for i, name in enumerate(header or []):
+        values = [r[i] if i < len(r) else "" for r in rows]
+        if name == "comm":
+            columns[name] = np.array(values, dtype=str)
+        else:
+            columns[name] = np.array([float(v) if v else np.nan for v in values])
+    return meta, columns
+
+
+def _span_s(ts_ms):
+    return (ts_ms[-1] - ts_ms[0]) / 1000.0 if len(ts_ms) > 1 else 0.0
+
+
+def qemu_threads(path):
+    """
+    Per-thread CPU utilization (cores) of QEMU over the samples:
+    {(tid, comm): utilization}, sorted busiest first.
+    """
+    meta, c = read_samples(path)
+    tck = float(meta.get("clk_tck", 100))
+    util = {}
+    for tid in np.unique(c.get("tid", [])):
+        rows = np.flatnonzero(c["tid"] == tid)
+        span = _span_s(c["epoch_ms"][rows])
+        if span <= 0:
+            continue
+        ticks = c["utime_ticks"][rows] + c["stime_ticks"][rows]
+        util[(int(tid), str(c["comm"][rows[0]]))] = (ticks[-1] - ticks[0]) / tck / span
+    return dict(sorted(util.items(), key=lambda kv: -kv[1]))
+
+
+def host_usage(path):
+    """(CPU busy fraction, min MemAvailable fraction, CPU count) of the host over the samples."""
+    meta, c = read_samples(path)
+    cpus = int(meta.get("host_cpus", 0)) or np.nan
+    if len(c.get("epoch_ms", [])) < 2:
+        return np.nan, np.nan, cpus
+    busy = np.diff(c["cpu_busy_ticks"][[0, -1]])[0]
+    total = np.diff(c["cpu_total_ticks"][[0, -1]])[0]
+    mem = np.min(c["mem_available_kb"] / c["mem_total_kb"])
+    return (busy / total if total else np.nan), mem, cpus
+
+
+GUEST_BUSY = ("cpu_user", "cpu_nice", "cpu_system", "cpu_irq", "cpu_softirq")
+
+
+def guest_usage(path):
+    """
+    Guest (CPU busy fraction, steal fraction, device busy fraction) over the
+    samples; device busy is the io_ms delta over elapsed time.
+    """
+    _, c = read_samples(path)
+    span = _span_s(c.get("epoch_ms", []))
+    if span <= 0:
+        return np.nan, np.nan, np.nan
+    delta = {k: c[k][-1] - c[k][0] for k in c if k != "epoch_ms"}
+    busy = sum(delta[k] for k in GUEST_BUSY)
+    total = busy + delta["cpu_idle"] + delta["cpu_iowait"] + delta["cpu_steal"]
+    device = delta.get("io_ms", np.nan) / 1000.0 / span
+    if not total:
+        return np.nan, np.nan, device
+    return busy / total, delta["cpu_steal"] / total, device
+
+
+def run_resources(json_path):
+    """
+    Resource summary of one fio run from the sample files next to its JSON,
+    or None if it has none. Missing sample kinds give NaN fields.
+    """
+    stem = json_path[:-len(".json")] if json_path.endswith(".json") else json_path
+    paths = {kind: f"{stem}.{kind}.csv" for kind in ("qemu", "host", "guest")}
+    if not any(os.path.exists(p) for p in paths.values()):
+        return None
+
+    summary = {"qemu_top_thread": "", "qemu_top_util": np.nan, "qemu_cores": np.nan, "qemu_pollers": np.nan,
+               "host_cpu": np.nan, "host_mem_avail": np.nan,
+               "guest_cpu": np.nan, "guest_steal": np.nan, "device_busy": np.nan}
+    if os.path.exists(paths["qemu"]):
+        threads = qemu_threads(paths["qemu"])
+        pollers = [util for (_, comm), util in threads.items() if is_poller(comm)]
+        others = [(comm, util) for (_, comm), util in threads.items() if not is_poller(comm)]
+        if threads:
+            summary["qemu_cores"] = sum(threads.values())
+        if pollers:
+            summary["qemu_pollers"] = sum(pollers)
+            if others:
+                summary["qemu_top_thread"], summary["qemu_top_util"] = others[0]
+    host_cpus = np.nan
+    if os.path.exists(paths["host"]):
+        summary["host_cpu"], summary["host_mem_avail"], host_cpus = host_usage(paths["host"])
+    if os.path.exists(paths["guest"]):
+        summary["guest_cpu"], summary["guest_steal"], summary["device_busy"] = guest_usage(paths["guest"])
+
+    # NaN (never bound) without named pollers to take out
+    host_other = summary["host_cpu"] - summary["qemu_pollers"] / host_cpus
+    limits = {"qemu thread": summary["qemu_top_util"], "host CPU": host_other,
+              "guest CPU": summary["guest_cpu"]}
+    summary["cpu_bound"] = [name for name, value in limits.items() if value >= CPU_BOUND]
+    return summary
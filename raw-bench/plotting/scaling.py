@@ -0,0 +1,157 @@
+import re
+import numpy as np
+
+from latency import tail_latencies
+
+# Analysis of the iodepth × bs × numjobs × ioengine scaling matrix
+# (exp_rw_bench/run-scaling.sh, fio_results experiment "scale").
+#
+# Load is the number of outstanding I/Os, iodepth × numjobs. For every
+# (strategy, engine, block size) the best run at each load forms a throughput
+# curve; its knee is where adding load stops paying off, and the latency
+# blow-up is the first load whose tail latency reaches BLOWUP_FACTOR × the
+# tail latency at the lowest load.
+
+TAIL_PERCENTILE = 99
+BLOWUP_FACTOR = 2.0
+
+# A knee needs at least this many load points
+KNEE_MIN_POINTS = 3
+
+# vtable mode → strategy name (chunked modes get "-<chunk>")
+VTABLE_NAMES = {
+    "0": "direct",
+    "1": "lazy",
+    "2": "chunk",
+    "3": "flex",
+    "4": "stripe",
+    "5": "flex",
+}
+EXP_NAME_RE = re.compile(r"vt-(?P<mode>\d+)_chnk-(?P<chunk>\d+)_.*?zsz-(?P<zsz>\d+)")
+
+
+def strategy_label(strategy):
+    """Short label of a run.sh EXP_NAME, e.g. 'chunk-2 128M'; other keys as is."""
+    m = EXP_NAME_RE.match(strategy)
+    if not m:
+        return strategy
+    name = VTABLE_NAMES.get(m.group("mode"), f"vt-{m.group('mode')}")
+    if name in ("chunk", "flex"):
+        name += f"-{m.group('chunk')}"
+    return f"{name} {int(m.group('zsz')) >> 20}M"
+
+
+def outstanding(table):
+    """Outstanding I/Os of every run (iodepth × numjobs)."""
+    return table["qd"].astype(np.int64) * table["threads"]
+
+
+def knee(x, y):
+    """
+    Kneedle knee of a rising, saturating curve: the point farthest above the
+    chord between its ends, with x on a log2 scale. None if there is none.
+    """
+    if len(x) < KNEE_MIN_POINTS:
+        return None
+    lx = np.log2(np.asarray(x, dtype=np.float64))
+    y = np.asarray(y, dtype=np.float64)
+    x_span, y_span = lx[-1] - lx[0], y.max() - y.min()
+    if x_span <= 0 or y_span <= 0:
+        return None
+    diff = (y - y.min()) / y_span - (lx - lx[0]) / x_span
+    idx = int(np.argmax(diff))
+    return x[idx] if diff[idx] > 0 else None
+
+
+def blowup(x, latency, factor=BLOWUP_FACTOR):
+    """First x whose latency is at least `factor` × the latency at x[0]."""
+    if len(x) == 0 or not latency[0] > 0:
+        return None
+    hits = np.flatnonzero(latency >= factor * latency[0])
+    return x[hits[0]] if len(hits) else None
+
+
+def load_curves(table):
+    """
+    Per-(strategy, engine, bs) curves of the best run at every load.
+
+    Returns {(strategy, engine, bs_bytes): dict(load, mb_s, kiops, tail_ms,
+    qd, threads)} with arrays sorted by load.
+    """
+    load = outstanding(table)
+    mb_s = table["bw_bytes"] / (1024 ** 2)
+    tail_ms = tail_latencies(table, [TAIL_PERCENTILE])[:, 0] / 1e6
+
+    curves = {}
+    groups = np.char.add(np.char.add(table["strategy"], "|"),
+                         np.char.add(np.char.add(table["engine"], "|"), table["bs_bytes"].astype(str)))
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        # Best throughput per load: sort by (load, -bw) and keep the first of each load
+        rows = rows[np.lexsort((-mb_s[rows], load[rows]))]
+        _, first = np.unique(load[rows], return_index=True)
+        rows = rows[first]
+        strategy, engine, bs = str(group).split("|")
+        curves[(strategy, engine, int(bs))] = {
+            "load": load[rows],
+            "mb_s": mb_s[rows],
+            "kiops": table["iops"][rows] / 1000.0,
+            "tail_ms": tail_ms[rows],
+            "qd": table["qd"][rows],
+            "threads": table["threads"][rows],
+        }
+    return curves
+
+
+def analyze(curves):
+    """One summary row per curve: knee and blow-up load, peak and knee MB/s."""
+    rows = []
+    for (strategy, engine, bs), c in sorted(curves.items()):
+        knee_load = knee(c["load"], c["mb_s"])
+        blowup_load = blowup(c["load"], c["tail_ms"])
+        peak = int(np.argmax(c["mb_s"]))
+        knee_idx = np.flatnonzero(c["load"] == knee_load)
+        rows.append({
+            "strategy": strategy,
+            "engine": engine,
+            "bs_bytes": bs,
+            "knee_load": knee_load,
+            "knee_mb_s": float(c["mb_s"][knee_idx[0]]) if len(knee_idx) else np.nan,
+            "blowup_load": blowup_load,
+            "peak_load": int(c["load"][peak]),
+            "peak_mb_s": float(c["mb_s"][peak]),
+        })
+    return rows
+
+
+def best_configs(table, latency_budget_ms=None):
+    """
+    Highest-bandwidth run per strategy (ties: lower tail latency), optionally
+    only among runs whose p<TAIL_PERCENTILE> latency is within the budget.
+    Returns {strategy: row index into table}.
+    """
+    mb_s = table["bw_bytes"]
+    tail = tail_latencies(table, [TAIL_PERCENTILE])[:, 0] / 1e6
+    ok = np.ones(len(mb_s), dtype=bool) if latency_budget_ms is None else tail <= latency_budget_ms
+    best = {}
+    for strategy in np.unique(table["strategy"]):
+        rows = np.flatnonzero((table["strategy"] == strategy) & ok)
+        if len(rows) == 0:
+            continue
+        best[str(strategy)] = int(rows[np.lexsort((tail[rows], -mb_s[rows]))[0]])
+    return best
+
+
+def heatmap_grid(table, strategy, engine, bs_bytes, values):
+    """
+    Values of one (strategy, engine, bs) on an iodepth × numjobs grid.
+    Returns (qds, jobs, grid) with grid[j, q] = NaN where no run exists.
+    """
+    rows = np.flatnonzero((table["strategy"] == strategy) & (table["engine"] == engine)
+                          & (table["bs_bytes"] == bs_bytes))
+    qds = np.unique(table["qd"][rows])
+    jobs = np.unique(table["threads"][rows])
+    grid = np.full((len(jobs), len(qds)), np.nan)
+    grid[np.searchsorted(jobs, table["threads"][rows]),
+         np.searchsorted(qds, table["qd"][rows])] = values[rows]
+    return qds, jobs, grid
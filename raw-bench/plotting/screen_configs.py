@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import os
+import csv
+import time
+import argparse
+import itertools
+import numpy as np
+
+import model
+
+# Screens vtable configurations with the analytical model (model.py) instead
+# of emulating each one: every (mode, chunk, units, channels) combination gets
+# its predicted write/read IOPS per thread count, zone allocation latency and
+# finish DLWA / latency over a set of zone fill levels. Only the promising
+# ones need a run.sh / run_matrix.py run afterwards.
+#
+# The write model of the flexible modes is not validated (see
+# model.throughput): their write IOPS are left empty and write_modeled is 0,
+# so they rank last on those columns and need an emulated run to judge.
+#
+#   python screen_configs.py --modes 1 2 3 4 --chunks 1 2 4 8 11 22 --channels 4 8 16
+#
+# Writes results/model_screen.csv and prints the best configurations.
+
+DEFAULT_OUTPUT = "results/model_screen.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict metrics of vtable configurations with the analytical model.")
+    parser.add_argument("--modes", type=int, nargs="+", default=[0, 1, 2, 3, 4], help="zns_vtable_mode values")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 2, 4, 8, 11, 22], help="zns_chunk_size values")
+    parser.add_argument("--units", type=int, nargs="+", default=[model.UNITS_PER_ZONE],
+                        help="allocation units per zone")
+    parser.add_argument("--channels", type=int, nargs="+", default=[model.GEOMETRY["channels"]],
+                        help="device channels")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="worker counts to report")
+    parser.add_argument("--fills", type=float, nargs="+", default=[10, 25, 50, 75, 95],
+                        help="zone fill levels (%%) a finish is predicted at")
+    parser.add_argument("--zone-pages", type=int, default=model.ZONE_PAGES, help="pages per zone")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="fit the FEMU constants from the existing results first")
+    parser.add_argument("--sort", default="dlwa_mean", help="column to rank by (ascending; *_kiops descending)")
+    parser.add_argument("--top", type=int, default=10, help="configurations to print")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="CSV path")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # paths are relative to plotting/
+
+    emulator = dict(model.EMULATOR_US)
+    if args.calibrate:
+        from fio_results import load_results, select, rep_means
+        from femu_logs import allocation_latency_stats
+        table = rep_means(select(load_results("../exp_rw_bench/results"), experiment="threads", job=0))
+        alloc_log = "../exp_allocation/results/allocation-log"
+        emulator = model.calibrate(table, allocation_latency_stats(alloc_log) if os.path.exists(alloc_log) else None)
+
+    start = time.perf_counter()
+    # Chunk size only matters for the chunked modes: one config per other mode
+    combos = sorted({(m, c if m in (2, 3, 5) else 1, u)
+                     for m, c, u in itertools.product(args.modes, args.chunks, args.units)})
+    mode = np.array([c[0] for c in combos])
+    chunk = np.array([c[1] for c in combos])
+    units = np.array([c[2] for c in combos])
+    fills = np.asarray(args.fills, dtype=np.float64)
+    n_max = max(args.threads)
+    threads = np.asarray(args.threads)
+
+    # === Finish and allocation: configs × fill levels ===
+    written = np.ceil(fills / 100 * args.zone_pages).astype(np.int64)
+    granularity = model.finish_granularity(mode, chunk, units, args.zone_pages)[:, None]
+    wa = model.finish_dlwa(written[None, :], granularity)
+    finish_s = model.finish_seconds(written[None, :], granularity, emulator)
+    alloc = model.allocation_ms(mode, chunk, units, emulator)
+
+    rows = []
+    for channels in args.channels:
+        geometry = dict(model.GEOMETRY, channels=channels)
+        write = model.throughput(mode, "write", n_max, geometry, emulator=emulator)[:, threads - 1]
+        read_seq = model.throughput(mode, "read_seq", n_max, geometry, emulator=emulator)[:, threads - 1]
+        read_rand = model.throughput(mode, "read_rand", n_max, geometry, emulator=emulator)[:, threads - 1]
+        for i in range(len(combos)):
+            row = {
+                "strategy": model.strategy_name(mode[i], chunk[i]),
+                "mode": int(mode[i]),
+                "chunk": int(chunk[i]),
+                "units": int(units[i]),
+                "channels": channels,
+                "alloc_ms": round(float(alloc[i]), 3),
+                "dlwa_mean": round(float(wa[i].mean()), 4),
+                "dlwa_max": round(float(wa[i].max()), 4),
+                "finish_s_mean": round(float(finish_s[i].mean()), 4),
+                "write_modeled": int(mode[i] not in model.FLEXIBLE_MODES),
+            }
+            for j, t in enumerate(threads):
+                row[f"write_kiops_t{t}"] = round(float(write[i, j]) / 1000, 3) if row["write_modeled"] else np.nan
+            row[f"read_seq_kiops_t{threads[-1]}"] = round(float(read_seq[i, -1]) / 1000, 3)
+            row[f"read_rand_kiops_t{threads[-1]}"] = round(float(read_rand[i, -1]) / 1000, 3)
+            rows.append(row)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if args.sort not in rows[0]:
+        parser.error(f"unknown --sort column '{args.sort}' (one of: {', '.join(rows[0])})")
+    descending = args.sort.endswith("kiops") or "_kiops_" in args.sort
+    # Missing predictions (NaN) rank last either way
+    ranked = sorted(rows, key=lambda r: (np.isnan(r[args.sort]) if isinstance(r[args.sort], float) else False,
+                                         r[args.sort] * (-1 if descending else 1)))
+
+    print(f"📊 {len(rows)} configurations in {elapsed * 1000:.0f} ms "
+          f"({'calibrated' if args.calibrate else 'default'} FEMU constants)")
+    write_col = f"write_kiops_t{threads[-1]}"
+    print(f"\n{'Strategy':<12s}{'units':>6s}{'chnl':>6s}{'DLWA':>8s}{'max':>8s}{'finish s':>10s}"
+          f"{'alloc ms':>10s}{'write K':>9s}")
+    for r in ranked[:args.top]:
+        write = f"{r[write_col]:>9.2f}" if r["write_modeled"] else f"{'n/a':>9s}"
+        print(f"{r['strategy']:<12s}{r['units']:>6d}{r['channels']:>6d}{r['dlwa_mean']:>8.3f}{r['dlwa_max']:>8.3f}"
+              f"{r['finish_s_mean']:>10.3f}{r['alloc_ms']:>10.2f}{write}")
+    if any(not r["write_modeled"] for r in rows):
+        print("n/a: flexible-mode writes are not modelled (see model.throughput); emulate them to compare")
+    print(f"\n✅ Saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+import os
+import csv
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+import finish_sim
+import model
+
+# Predicts finish interference with the discrete-event simulator
+# (finish_sim.py) beyond what exp_interference measured:
+#
+#   1. calibrates the FEMU constants on direct mode (model.calibrate) and the
+#      finish pass size on the measured IOPS ratios of exp_interference
+#   2. compares simulated and measured ratios / mean latency per strategy
+#   3. sweeps writer counts × fill levels per strategy
+#
+# Zones are shrunk by --scale to keep the runs short; ratios do not depend
+# on the zone size since writes and padding shrink together.
+#
+# Usage: python simulate_interference.py [--scale 0.1] [--batch N] [--jobs 1 2 4 8 16] [--fills 10 40 70]
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 9
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+BASELINE_DIR = "../exp_rw_bench/results"
+INTERFERE_DIR = "../exp_interference/results"
+OUTPUT_DIR = "results"
+VALIDATION_CSV = os.path.join(OUTPUT_DIR, "finish_sim_validation.csv")
+SWEEP_CSV = os.path.join(OUTPUT_DIR, "finish_sim_sweep.csv")
+OUTPUT_PLOT = os.path.join(OUTPUT_DIR, "finish_sim.pdf")
+
+MEASURED_FILL = 40.0  # PERCENTAGE of exp_interference/run_finish.sh
+BATCH_CANDIDATES = [1, 4, 8, 16, 32, 64]
+
+parser = argparse.ArgumentParser(description="Simulate finish interference and validate it against exp_interference.")
+parser.add_argument("--scale", type=float, default=0.1, help="zone size relative to the emulated one")
+parser.add_argument("--batch", type=int, default=None, help="finish pass size in pages (default: fitted)")
+parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="writer counts of the sweep")
+parser.add_argument("--fills", type=float, nargs="+", default=[10, 25, 40, 60, 80, 95],
+                    help="fill levels (%%) of the finished zones in the sweep")
+parser.add_argument("--plot-jobs", type=int, default=4, help="writer count of the fill panel")
+parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="parallel simulations")
+args = parser.parse_args()
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+ZONE_PAGES = max(int(model.ZONE_PAGES * args.scale), model.UNITS_PER_ZONE)
+
+# === Measurements ===
+baseline = rep_means(select(load_results(BASELINE_DIR), experiment="threads", access="write", job=0))
+interfere = rep_means(select(load_results(INTERFERE_DIR), experiment="finish", access="write", job=0))
+emulator = model.calibrate(rep_means(select(load_results(BASELINE_DIR), experiment="threads", job=0)))
+
+
+def cells(table):
+    return {(s, int(t)): (float(i), float(c)) for s, t, i, c in
+            zip(table["strategy"], table["threads"], table["iops"], table["clat_mean_ns"])}
+
+
+base_cells, finish_cells = cells(baseline), cells(interfere)
+measured = {}
+for (strategy, jobs), (iops, clat_ns) in sorted(finish_cells.items()):
+    parsed = model.parse_strategy(strategy)
+    if parsed is None or (strategy, jobs) not in base_cells:
+        continue
+    measured[(strategy, jobs)] = (iops / base_cells[(strategy, jobs)][0], clat_ns / 1000.0)
+strategies = sorted({s for s, _ in measured}, key=lambda s: model.parse_strategy(s))
+if not measured:
+    raise SystemExit("❌ No matching exp_interference / exp_rw_bench results")
+
+
+# === Simulation runs (spread over processes) ===
+def run(task):
+    """task = (strategy, writers, finishes, fill, batch) → (iops, mean lat us, p99 lat us, mean finish s)."""
+    strategy, writers, finishes, fill, batch = task
+    mode, chunk, units = model.parse_strategy(strategy)
+    result = finish_sim.simulate(mode, writers, finishes, fill=fill, chunk=chunk, units=units,
+                                 zone_pages=ZONE_PAGES, batch=batch or finish_sim.FINISH_BATCH,
+                                 emulator=emulator)
+    finish_s = result["finish_s"] / args.scale if finishes else np.zeros(1)
+    return (result["iops"], float(result["lat_us"].mean()), float(np.percentile(result["lat_us"], 99)),
+            float(np.nanmean(finish_s)))
+
+
+def run_all(tasks):
+    tasks = list(dict.fromkeys(tasks))
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if args.workers <= 1 or not can_fork:
+        return dict(zip(tasks, map(run, tasks)))
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("fork")) as pool:
+        return dict(zip(tasks, pool.map(run, tasks, chunksize=max(1, len(tasks) // (args.workers * 4)))))
+
+
+def ratios(results, keys, batch, fill):
+    """Simulated (strategy, jobs) → (IOPS ratio, mean latency us, p99 us, finish s)."""
+    out = {}
+    for strategy, jobs in keys:
+        base = results[(strategy, jobs, 0, 0.0, None)]
+        inter = results[(strategy, jobs, jobs, fill, batch)]
+        out[(strategy, jobs)] = (inter[0] / base[0],) + inter[1:]
+    return out
+
+
+# === 1. Fit the finish pass size ===
+batches = [args.batch] if args.batch else BATCH_CANDIDATES
+keys = sorted(measured)
+# Writers alone do not depend on it; flexible placement is not captured by
+# the simulator (see the validation) and is left out of the fit
+results = run_all([(s, j, 0, 0.0, None) for s, j in keys]
+                  + [(s, j, j, MEASURED_FILL, b) for s, j in keys for b in batches])
+fixed = [k for k in keys if model.parse_strategy(k[0])[0] not in model.FLEXIBLE_MODES] or keys
+errors = {}
+for b in batches:
+    sim = ratios(results, keys, b, MEASURED_FILL)
+    errors[b] = np.mean([abs(sim[k][0] - measured[k][0]) / measured[k][0] for k in fixed])
+batch = min(errors, key=errors.get)
+print(f"🔧 FEMU constants: " + ", ".join(f"{k}={float(v):.1f}" for k, v in emulator.items()))
+if not args.batch:
+    print("🔧 Finish pass size: " + ", ".join(f"{b}: {e:.1%}" for b, e in errors.items()) + f" → {batch} pages")
+
+# === 2. Validation ===
+simulated = ratios(results, keys, batch, MEASURED_FILL)
+rows = []
+for key in keys:
+    (strategy, jobs), (m_ratio, m_lat), (s_ratio, s_lat, _, _) = key, measured[key], simulated[key]
+    rows.append({"strategy": strategy, "jobs": jobs, "measured_ratio": round(m_ratio, 4),
+                 "simulated_ratio": round(s_ratio, 4), "ratio_err": round((s_ratio - m_ratio) / m_ratio, 4),
+                 "measured_lat_us": round(m_lat, 1), "simulated_lat_us": round(s_lat, 1),
+                 "lat_err": round((s_lat - m_lat) / m_lat, 4)})
+with open(VALIDATION_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+print(f"\n📊 Simulated vs measured interference ({MEASURED_FILL:.0f}% fills):")
+print(f"{'Strategy':<14s}{'ratio err':>10s}{'max':>8s}{'lat err':>10s}")
+for strategy in strategies:
+    r = [row for row in rows if row["strategy"] == strategy]
+    ratio_err = np.abs([row["ratio_err"] for row in r])
+    lat_err = np.abs([row["lat_err"] for row in r])
+    flag = "  ⚠️ not captured" if ratio_err.mean() > 0.05 else ""
+    print(f"{model.strategy_name(*model.parse_strategy(strategy)[:2]):<14s}{ratio_err.mean():>10.1%}"
+          f"{ratio_err.max():>8.1%}{lat_err.mean():>10.1%}{flag}")
+print(f"✅ Saved: {VALIDATION_CSV}")
+
+# === 3. Sweep: writers × fill levels ===
+sweep_keys = [(s, j) for s in strategies for j in args.jobs]
+sweep_results = run_all([(s, j, 0, 0.0, None) for s, j in sweep_keys]
+                        + [(s, j, j, f, batch) for s, j in sweep_keys for f in args.fills])
+sweep = []
+for fill in args.fills:
+    for (strategy, jobs), (ratio, lat, p99, finish_s) in ratios(sweep_results, sweep_keys, batch, fill).items():
+        sweep.append({"strategy": strategy, "jobs": jobs, "fill": fill, "ratio": round(ratio, 4),
+                      "lat_us": round(lat, 1), "p99_us": round(p99, 1), "finish_s": round(finish_s, 3)})
+with open(SWEEP_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(sweep[0]))
+    writer.writeheader()
+    writer.writerows(sweep)
+print(f"✅ Saved: {SWEEP_CSV}")
+
+# === Plot: (a) measured vs simulated per thread count, (b) ratio vs fill ===
+fig, (ax_jobs, ax_fill) = plt.subplots(1, 2, figsize=(8, 3))
+colors = plt.cm.tab10(np.arange(len(strategies)) % 10)
+for color, strategy in zip(colors, strategies):
+    label = model.strategy_name(*model.parse_strategy(strategy)[:2])
+    jobs = [j for s, j in keys if s == strategy]
+    ax_jobs.plot(jobs, [simulated[(strategy, j)][0] for j in jobs], color=color, linewidth=LINE_WIDTH, label=label)
+    ax_jobs.plot(jobs, [measured[(strategy, j)][0] for j in jobs], color=color, marker="o", linestyle="none",
+                 markerfacecolor="none", markersize=MARKER_SIZE)
+    points = [r for r in sweep if r["strategy"] == strategy and r["jobs"] == args.plot_jobs]
+    ax_fill.plot([r["fill"] for r in points], [r["ratio"] for r in points], color=color,
+                 linewidth=LINE_WIDTH, marker=".", label=label)
+
+ax_jobs.set_xlabel("(a) Number of Threads", fontsize=LABEL_FONT_SIZE)
+ax_jobs.set_ylabel("Finish Interference", fontsize=LABEL_FONT_SIZE)
+ax_jobs.legend(loc="lower left", fontsize=LEGEND_FONT_SIZE, frameon=False, ncol=2)
+ax_fill.set_xlabel(f"(b) Zone Fill (%), {args.plot_jobs} threads", fontsize=LABEL_FONT_SIZE)
+for ax in (ax_jobs, ax_fill):
+    ax.set_ylim(0, 1.05)
+    ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PLOT)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PLOT}")
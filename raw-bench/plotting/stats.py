@@ -0,0 +1,217 @@
+import math
+import numpy as np
+
+# Small statistics helpers shared by the plotting scripts (numpy only).
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+
+
+def bootstrap_ci(values, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """
+    Mean and percentile-bootstrap confidence interval of `values`.
+
+    Returns (mean, low, high); a single value gives a zero-width interval and
+    an empty input gives NaNs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.nan, np.nan, np.nan
+    mean = values.mean()
+    if len(values) == 1:
+        return mean, mean, mean
+
+    rng = np.random.default_rng(seed)
+    samples = rng.choice(values, size=(resamples, len(values)), replace=True).mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(samples, [alpha, 1 - alpha])
+    return mean, low, high
+
+
+def ci_table(groups, **kwargs):
+    """bootstrap_ci() of every group: arrays (mean, low, high) in group order."""
+    stats = np.array([bootstrap_ci(g, **kwargs) for g in groups]).reshape(-1, 3)
+    return stats[:, 0], stats[:, 1], stats[:, 2]
+
+
+# === Outlier rejection ===
+# Modified z-score (Iglewicz & Hoaglin): 0.6745 * (x - median) / MAD, values
+# above the threshold are dropped. Robust for the handful of repetitions a
+# cell gets, where a mean/stddev rule is dragged by the outlier itself.
+OUTLIER_Z = 3.5
+
+
+def reject_outliers(values, threshold=OUTLIER_Z):
+    """Return (kept, rejected) arrays; nothing is rejected when the MAD is 0."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 3:
+        return values, values[:0]
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return values, values[:0]
+    z = 0.6745 * (values - median) / mad
+    keep = np.abs(z) <= threshold
+    return values[keep], values[~keep]
+
+
+def group_ci(keys, values, reject=True, **kwargs):
+    """
+    bootstrap_ci() of `values` grouped by equal `keys` (any hashable per row,
+    e.g. zip(strategy, threads)). Returns {key: (n, mean, low, high, rejected)}
+    with outliers removed first unless reject=False.
+    """
+    groups = {}
+    for key, value in zip(keys, values):
+        groups.setdefault(key, []).append(value)
+    out = {}
+    for key, group in groups.items():
+        kept, rejected = reject_outliers(group) if reject else (np.asarray(group, dtype=np.float64), [])
+        out[key] = (len(kept), *bootstrap_ci(kept, **kwargs), len(rejected))
+    return out
+
+
+def ratio_ci(numerator, denominator, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """
+    Ratio of means of two independent samples with a bootstrap CI (each
+    resampled on its own). Returns (ratio, low, high); NaNs if either is
+    empty or the denominator mean is 0.
+    """
+    num = np.asarray(numerator, dtype=np.float64)
+    den = np.asarray(denominator, dtype=np.float64)
+    if len(num) == 0 or len(den) == 0 or den.mean() == 0:
+        return np.nan, np.nan, np.nan
+    ratio = num.mean() / den.mean()
+    if len(num) == 1 and len(den) == 1:
+        return ratio, ratio, ratio
+
+    rng = np.random.default_rng(seed)
+    num_means = rng.choice(num, size=(resamples, len(num)), replace=True).mean(axis=1)
+    den_means = rng.choice(den, size=(resamples, len(den)), replace=True).mean(axis=1)
+    ok = den_means != 0
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(num_means[ok] / den_means[ok], [alpha, 1 - alpha])
+    return ratio, low, high
+
+
+def relative_half_width(mean, low, high):
+    """CI half-width relative to the mean (inf when undefined)."""
+    if not np.isfinite(mean) or mean == 0:
+        return np.inf
+    return (high - low) / 2 / abs(mean)
+
+
+# === Significance tests (two-sided) ===
+
+def _betacf(a, b, x, iterations=200, eps=3e-14):
+    """Continued fraction of the regularized incomplete beta (modified Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1, a - 1
+    c, d = 1.0, 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < eps:
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _betacf(a, b, x) / a
+    return 1 - math.exp(log_front) * _betacf(b, a, 1 - x) / b
+
+
+def welch_t_test(a, b):
+    """
+    Welch's unequal-variance t-test. Returns (t, dof, p); p is NaN when either
+    sample has fewer than 2 values, and 0/1 when both variances are 0.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if len(a) < 2 or len(b) < 2:
+        return np.nan, np.nan, np.nan
+    va, vb = a.var(ddof=1) / len(a), b.var(ddof=1) / len(b)
+    diff = a.mean() - b.mean()
+    if va + vb == 0:
+        return (np.inf if diff else 0.0), np.nan, (0.0 if diff else 1.0)
+    t = diff / math.sqrt(va + vb)
+    dof = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    p = betainc(dof / 2, 0.5, dof / (dof + t * t))
+    return t, dof, p
+
+
+def _u_distribution(n1, n2):
+    """Exact null distribution of U (no ties): counts of each U over C(n1+n2, n1)."""
+    # f[i][j] = counts of U for i values from a and j from b
+    f = [[None] * (n2 + 1) for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        for j in range(n2 + 1):
+            if i == 0 or j == 0:
+                f[i][j] = np.array([1.0])
+                continue
+            # largest value from a: it beats all j of b, adding j to U
+            with_a = np.concatenate([np.zeros(j), f[i - 1][j]])
+            with_b = f[i][j - 1]
+            size = max(len(with_a), len(with_b))
+            f[i][j] = np.pad(with_a, (0, size - len(with_a))) + np.pad(with_b, (0, size - len(with_b)))
+    return f[n1][n2]
+
+
+# Exact Mann-Whitney p-values up to this n1 * n2, normal approximation above
+MWU_EXACT_MAX = 400
+
+
+def mann_whitney_u(a, b):
+    """
+    Mann-Whitney U test. Returns (U of a, p). Exact for small untied samples,
+    otherwise the normal approximation with tie and continuity correction.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return np.nan, np.nan
+
+    pooled = np.concatenate([a, b])
+    uniq, inverse, counts = np.unique(pooled, return_inverse=True, return_counts=True)
+    # average rank of each distinct value
+    avg_rank = np.cumsum(counts) - (counts - 1) / 2
+    ranks = avg_rank[inverse]
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    ties = counts[counts > 1]
+
+    if len(ties) == 0 and n1 * n2 <= MWU_EXACT_MAX:
+        dist = _u_distribution(n1, n2)
+        dist = dist / dist.sum()
+        k = int(round(min(u, n1 * n2 - u)))
+        return u, min(1.0, 2 * dist[:k + 1].sum())
+
+    n = n1 + n2
+    mu = n1 * n2 / 2
+    var = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if var <= 0:
+        return u, 1.0
+    z = (abs(u - mu) - 0.5) / math.sqrt(var)
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
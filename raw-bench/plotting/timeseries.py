@@ -0,0 +1,131 @@
+import os
+import glob
+import numpy as np
+
+# Streaming reducer for fio per-I/O logs (--write_lat_log / --write_bw_log /
+# --write_iops_log with --log_avg_msec=0 --log_unix_epoch=1), as recorded by
+# the drivers when FIO_TIMESERIES=1.
+#
+# Log lines are "time_ms, value, ddir, bs[, offset, prio]"; lat/clat values
+# are in ns. Logs are read in bounded chunks and every chunk is folded into
+# fixed time buckets with np.bincount, so tens of millions of rows reduce to
+# a few thousand buckets without ever being held in memory at once.
+
+# Bytes of text read per chunk (whole lines, see io.IOBase.readlines)
+CHUNK_BYTES = 16 * 1024 * 1024
+
+# Default bucket width
+BUCKET_MS = 100
+
+# fio "ddir" column
+DDIR_READ = 0
+DDIR_WRITE = 1
+
+
+def log_files(prefix, kind="clat"):
+    """Return the per-job fio logs of one run, e.g. <prefix>_clat.1.log."""
+    return sorted(glob.glob(f"{prefix}_{kind}.*.log"))
+
+
+def iter_log_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """Yield (time_ms, value, ddir, bs) arrays for bounded chunks of one log."""
+    with open(path, "r") as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            data = np.loadtxt(lines, delimiter=",", dtype=np.int64,
+                              usecols=(0, 1, 2, 3), ndmin=2)
+            yield data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def first_timestamp(paths):
+    """Earliest timestamp (ms) over the first line of every log."""
+    starts = []
+    for path in paths:
+        with open(path, "r") as f:
+            line = f.readline()
+        if line:
+            starts.append(int(line.split(",", 1)[0]))
+    return min(starts) if starts else 0
+
+
+def _grow(array, size, fill=0):
+    if len(array) >= size:
+        return array
+    grown = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def bin_logs(paths, bucket_ms=BUCKET_MS, t0_ms=None, ddir=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Fold per-I/O logs into fixed time buckets.
+
+    Returns a dict of equal-length arrays: "time_s" (bucket start relative to
+    t0), "ios", "bytes", "value_mean" and "value_max" (log values, e.g. ns for
+    latency logs). Buckets without I/O have ios == 0 and NaN means.
+    """
+    t0_ms = first_timestamp(paths) if t0_ms is None else t0_ms
+    ios = np.zeros(0, dtype=np.int64)
+    nbytes = np.zeros(0, dtype=np.int64)
+    value_sum = np.zeros(0, dtype=np.float64)
+    value_max = np.zeros(0, dtype=np.float64)
+
+    for path in paths:
+        for t_ms, value, io_dir, bs in iter_log_chunks(path, chunk_bytes):
+            if ddir is not None:
+                keep = io_dir == ddir
+                t_ms, value, bs = t_ms[keep], value[keep], bs[keep]
+            if len(t_ms) == 0:
+                continue
+
+            bucket = np.maximum((t_ms - t0_ms) // bucket_ms, 0)
+            size = int(bucket.max()) + 1
+            ios, nbytes = _grow(ios, size), _grow(nbytes, size)
+            value_sum, value_max = _grow(value_sum, size), _grow(value_max, size)
+
+            ios[:size] += np.bincount(bucket, minlength=size)
+            nbytes[:size] += np.bincount(bucket, weights=bs, minlength=size).astype(np.int64)
+            value_sum[:size] += np.bincount(bucket, weights=value, minlength=size)
+            np.maximum.at(value_max, bucket, value)
+
+    used = int(np.flatnonzero(ios).max()) + 1 if ios.any() else 0
+    ios, nbytes = ios[:used], nbytes[:used]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value_mean = np.where(ios > 0, value_sum[:used] / ios, np.nan)
+    value_max = np.where(ios > 0, value_max[:used], np.nan)
+
+    return {
+        "time_s": np.arange(used) * bucket_ms / 1000.0,
+        "ios": ios,
+        "bytes": nbytes,
+        "value_mean": value_mean,
+        "value_max": value_max,
+        "bucket_ms": bucket_ms,
+        "t0_ms": t0_ms,
+    }
+
+
+def throughput(binned):
+    """Per-bucket (KIOPS, MB/s) from a bin_logs() result."""
+    seconds = binned["bucket_ms"] / 1000.0
+    return binned["ios"] / seconds / 1000.0, binned["bytes"] / seconds / (1024 ** 2)
+
+
+def read_markers(path, t0_ms):
+    """
+    Read the finish-zone markers written by run_finish.sh
+    ("start|end,<slba>,<epoch_ms>") as a list of (slba, start_s, end_s).
+    """
+    if not os.path.exists(path):
+        return []
+    starts, ends = {}, {}
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.strip().split(",")
+            if len(parts) != 3:
+                continue
+            event, slba, t_ms = parts
+            (starts if event == "start" else ends)[slba] = (int(t_ms) - t0_ms) / 1000.0
+    return [(slba, starts[slba], ends.get(slba, np.nan)) for slba in sorted(starts, key=int)]
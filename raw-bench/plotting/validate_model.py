@@ -0,0 +1,177 @@
+import os
+import sys
+import csv
+import glob
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+
+from fio_results import load_results, select, rep_means
+from femu_logs import load_events, allocation_latency_stats, dlwa, FINISH_DTYPE, LBAS_PER_PAGE
+from occupancy import read_finish_times
+import model
+
+# Validates the analytical model (model.py) against the emulated results:
+# thread-scaling IOPS (exp_rw_bench), finish DLWA (finish-log), host-side
+# finish latency (exp_occupancy *-time) and zone allocation latency
+# (allocation-log). The FEMU constants are calibrated on direct mode first,
+# so everything else is a prediction.
+#
+# Usage: python validate_model.py [--no-calibrate]
+
+# === Font and style settings ===
+rcParams["font.family"] = "Linux Libertine O"
+LABEL_FONT_SIZE = 16
+TICK_FONT_SIZE = 14
+LEGEND_FONT_SIZE = 10
+LINE_WIDTH = 1.5
+MARKER_SIZE = 6
+SPINE_WIDTH = 1.2
+
+# === Paths ===
+RW_RESULTS = "../exp_rw_bench/results"
+FINISH_LOG = "../exp_occupancy/results/finish-log-new"
+TIMES_DIR = "../exp_occupancy/results"
+ALLOCATION_LOG = "../exp_allocation/results/allocation-log"
+OUTPUT_DIR = "results"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "model_validation.csv")
+OUTPUT_PLOT = os.path.join(OUTPUT_DIR, "model_validation.pdf")
+
+CALIBRATE = "--no-calibrate" not in sys.argv[1:]
+
+# Absolute differences below these count as exact: a finish at a unit boundary
+# takes tens of microseconds, lazy allocation a few nanoseconds
+FINISH_FLOOR_S = 0.005
+ALLOC_FLOOR_MS = 0.05
+
+table = rep_means(select(load_results(RW_RESULTS), experiment="threads", job=0))
+alloc_means = allocation_latency_stats(ALLOCATION_LOG) if os.path.exists(ALLOCATION_LOG) else {}
+emulator = model.calibrate(table, alloc_means) if CALIBRATE else dict(model.EMULATOR_US)
+print("🔧 FEMU constants" + (" (calibrated on direct mode)" if CALIBRATE else "") + ": "
+      + ", ".join(f"{k}={float(v):.1f}" for k, v in emulator.items()))
+
+rows = []
+
+
+def add_rows(metric, strategy, access, points, measured, predicted, floor=0.0):
+    """Record points; differences within `floor` (absolute) count as exact."""
+    predicted, measured = np.asarray(predicted, dtype=float), np.asarray(measured, dtype=float)
+    err = model.relative_error(predicted, measured)
+    err = np.where(np.abs(predicted - measured) <= floor, 0.0, err)
+    for point, m, p, e in zip(points, measured, predicted, err):
+        rows.append({"metric": metric, "strategy": strategy, "access": access, "point": point,
+                     "measured": float(m), "predicted": float(p), "rel_err": float(e)})
+
+
+# === Thread scaling (IOPS) ===
+for strategy in sorted(set(table["strategy"].tolist())):
+    parsed = model.parse_strategy(strategy)
+    if parsed is None:
+        continue
+    for access in ("write", "read_seq", "read_rand"):
+        rows_idx = np.flatnonzero((table["strategy"] == strategy) & (table["access"] == access))
+        if len(rows_idx) == 0:
+            continue
+        threads = table["threads"][rows_idx]
+        order = np.argsort(threads)
+        rows_idx, threads = rows_idx[order], threads[order]
+        curve = model.throughput(np.array([parsed[0]]), access, int(threads.max()), emulator=emulator)[0]
+        add_rows("iops", strategy, access, threads.tolist(), table["iops"][rows_idx], curve[threads - 1])
+
+# === Finish DLWA, from the pages each finished zone had written ===
+if os.path.exists(FINISH_LOG):
+    records = load_events(FINISH_LOG, FINISH_DTYPE)
+    written = (records["wptr"] - records["zone_slba"]) // LBAS_PER_PAGE
+    granularity = model.finish_granularity(records["mode"], records["chunk_size"])
+    for mode, chunk in sorted(set(zip(records["mode"].tolist(), records["chunk_size"].tolist()))):
+        idx = np.flatnonzero((records["mode"] == mode) & (records["chunk_size"] == chunk))
+        fill = np.round(written[idx] / model.ZONE_PAGES * 100, 1)
+        add_rows("dlwa", f"{mode}_{chunk}", "finish", fill.tolist(), dlwa(records[idx]),
+                 model.finish_dlwa(written[idx], granularity[idx]))
+
+# === Finish latency (host side), zones filled to a percentage ===
+for path in sorted(glob.glob(os.path.join(TIMES_DIR, "*-time"))):
+    key = os.path.basename(path)[:-len("-time")]
+    parsed = model.parse_strategy(key)
+    if parsed is None:
+        continue
+    mode, chunk, units = parsed
+    _, pct, seconds = read_finish_times(path)
+    written = np.ceil(pct / 100 * model.ZONE_PAGES).astype(np.int64)
+    granularity = model.finish_granularity(mode, chunk, units)
+    add_rows("finish_s", key, "finish", pct.tolist(), seconds,
+             model.finish_seconds(written, granularity, emulator), floor=FINISH_FLOOR_S)
+
+# === Allocation latency ===
+for key, (_, mean_ms) in alloc_means.items():
+    mode, chunk = (int(v) for v in key.split("_"))
+    add_rows("alloc_ms", key, "allocation", [chunk], [mean_ms],
+             [model.allocation_ms(mode, chunk, emulator=emulator)], floor=ALLOC_FLOOR_MS)
+
+if not rows:
+    sys.exit("❌ No results to validate against")
+
+# === Report ===
+with open(OUTPUT_CSV, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+print(f"\n📊 Mean absolute relative error (prediction vs emulation):")
+print(f"{'Metric':<10s}{'Strategy':<16s}{'Access':<12s}{'n':>4s}{'MAPE':>9s}{'max':>9s}")
+groups = {}
+for row in rows:
+    groups.setdefault((row["metric"], row["strategy"], row["access"]), []).append(row["rel_err"])
+for (metric, strategy, access), errors in groups.items():
+    errors = np.abs(np.array(errors, dtype=float))
+    errors = errors[np.isfinite(errors)]
+    if len(errors) == 0:
+        print(f"{metric:<10s}{strategy:<16s}{access:<12s}{0:>4d}{'n/a':>9s}   (not modeled)")
+        continue
+    flag = "  ⚠️" if errors.mean() > 0.15 else ""
+    print(f"{metric:<10s}{strategy:<16s}{access:<12s}{len(errors):>4d}"
+          f"{errors.mean():>9.1%}{errors.max():>9.1%}{flag}")
+print(f"\n✅ Saved: {OUTPUT_CSV}")
+
+# === Plot: predicted vs measured for every point ===
+fig, axes = plt.subplots(1, 2, figsize=(8, 3))
+markers = {"write": "o", "read_seq": "s", "read_rand": "^"}
+ax = axes[0]
+for access, marker in markers.items():
+    points = [r for r in rows if r["metric"] == "iops" and r["access"] == access]
+    if points:
+        ax.scatter([r["measured"] / 1000 for r in points], [r["predicted"] / 1000 for r in points],
+                   marker=marker, facecolors="none", edgecolors="black", s=MARKER_SIZE * 4, label=access)
+ax.set_xlabel("Emulated KIOPS", fontsize=LABEL_FONT_SIZE)
+ax.set_ylabel("Predicted KIOPS", fontsize=LABEL_FONT_SIZE)
+ax.set_xscale("log")
+ax.set_yscale("log")
+
+ax = axes[1]
+for metric, marker in (("dlwa", "o"), ("finish_s", "s"), ("alloc_ms", "^")):
+    points = [r for r in rows if r["metric"] == metric and np.isfinite(r["predicted"]) and r["measured"] > 0]
+    if points:
+        ax.scatter([r["measured"] for r in points], [r["predicted"] for r in points],
+                   marker=marker, facecolors="none", edgecolors="black", s=MARKER_SIZE * 4,
+                   label={"dlwa": "DLWA", "finish_s": "finish (s)", "alloc_ms": "alloc (ms)"}[metric])
+ax.set_xlabel("Emulated", fontsize=LABEL_FONT_SIZE)
+ax.set_ylabel("Predicted", fontsize=LABEL_FONT_SIZE)
+ax.set_xscale("log")
+ax.set_yscale("log")
+
+for ax in axes:
+    low, high = ax.get_xlim()
+    low, high = min(low, ax.get_ylim()[0]), max(high, ax.get_ylim()[1])
+    ax.plot([low, high], [low, high], color="#b0b0b0", linewidth=1, linestyle="--", zorder=0)
+    ax.legend(loc="upper left", fontsize=LEGEND_FONT_SIZE, frameon=False)
+    ax.tick_params(axis="both", labelsize=TICK_FONT_SIZE)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_linewidth(SPINE_WIDTH)
+    ax.spines["bottom"].set_linewidth(SPINE_WIDTH)
+
+plt.tight_layout()
+plt.savefig(OUTPUT_PLOT)
+plt.close()
+print(f"✅ Saved: {OUTPUT_PLOT}")
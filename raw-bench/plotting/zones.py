@@ -0,0 +1,105 @@
+import numpy as np
+
+# Zone telemetry written by zonestat.c with ZONE_STATS=1 (<json stem>.zones.csv):
+#
+#   # device=... zone_size=... zone_capacity=... lblock_size=... interval_ms=...
+#   epoch_ms,zone,cond,wp_bytes
+#
+# A line is only logged when a zone's condition or write pointer changed, and
+# every zone is logged in the first and the last report, so each zone's write
+# pointer is a step function over the whole run: its value at time t is the
+# one of the last line at or before t.
+
+
+def read_zone_log(path):
+    """Return (meta dict, {"epoch_ms", "zone", "cond", "wp_bytes": array})."""
+    meta, rows = {}, []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#"):
+                meta.update(kv.split("=", 1) for kv in line[1:].split() if "=" in kv)
+            elif line and not line.startswith("epoch_ms"):
+                rows.append(line.split(","))
+    for key in ("zone_size", "zone_capacity", "lblock_size", "interval_ms"):
+        if key in meta:
+            meta[key] = int(meta[key])
+    columns = list(zip(*rows)) if rows else [(), (), (), ()]
+    return meta, {
+        "epoch_ms": np.array(columns[0], dtype=np.int64),
+        "zone": np.array(columns[1], dtype=np.int64),
+        "cond": np.array(columns[2], dtype=str),
+        "wp_bytes": np.array(columns[3], dtype=np.int64),
+    }
+
+
+def zone_series(log):
+    """{zone: (epoch_ms, wp_bytes, cond)} with each zone's lines in time order."""
+    series = {}
+    for zone in np.unique(log["zone"]):
+        rows = np.flatnonzero(log["zone"] == zone)
+        rows = rows[np.argsort(log["epoch_ms"][rows], kind="stable")]
+        series[int(zone)] = (log["epoch_ms"][rows], log["wp_bytes"][rows], log["cond"][rows])
+    return series
+
+
+def step_values(t_ms, values, at_ms):
+    """Value of the step function (t_ms, values) at each of `at_ms`."""
+    idx = np.searchsorted(t_ms, at_ms, side="right") - 1
+    return values[np.clip(idx, 0, len(values) - 1)]
+
+
+def write_rates(series, bucket_ms, t0_ms=None, skip_finish=True):
+    """
+    Per-zone write rate from write-pointer advance in fixed buckets.
+
+    Returns (bucket start in s relative to t0, {zone: MiB/s}). Resets (the
+    write pointer moving back) count as zero, not as negative writes. With
+    `skip_finish`, the jump on the report a zone turns full is left out, so a
+    finish-zone moving the write pointer to the end is not counted as host
+    writes (a zone filled by writes loses at most one interval of them).
+    """
+    if not series:
+        return np.zeros(0), {}
+    start = min(t[0] for t, _, _ in series.values()) if t0_ms is None else t0_ms
+    end = max(t[-1] for t, _, _ in series.values())
+    edges = np.arange(start, end + bucket_ms, bucket_ms)
+    rates = {}
+    for zone, (t_ms, wp, cond) in series.items():
+        advance = np.maximum(np.diff(wp), 0)
+        if skip_finish:
+            advance[(cond[1:] == "full") & (cond[:-1] != "full")] = 0
+        written = np.concatenate(([0], np.cumsum(advance)))
+        rates[zone] = np.diff(step_values(t_ms, written, edges)) / (bucket_ms / 1000.0) / (1024 ** 2)
+    return (edges[:-1] - start) / 1000.0, rates
+
+
+def transitions(series):
+    """Every condition change as (epoch_ms, zone, from_cond, to_cond), in time order."""
+    changes = []
+    for zone, (t_ms, _, cond) in series.items():
+        for i in np.flatnonzero(cond[1:] != cond[:-1]) + 1:
+            changes.append((int(t_ms[i]), zone, str(cond[i - 1]), str(cond[i])))
+    return sorted(changes)
+
+
+def zone_summary(series, capacity):
+    """
+    Per-zone {zone: dict} with first/last write pointer (fraction of
+    `capacity`), the time its write pointer moved and the time it became full
+    (epoch ms, None if it never did).
+    """
+    summary = {}
+    for zone, (t_ms, wp, cond) in series.items():
+        moved = np.flatnonzero(np.diff(wp) > 0)
+        into_full = np.flatnonzero((cond[1:] == "full") & (cond[:-1] != "full")) + 1
+        summary[zone] = {
+            "start_fill": wp[0] / capacity if capacity else np.nan,
+            "end_fill": wp[-1] / capacity if capacity else np.nan,
+            "write_start_ms": int(t_ms[moved[0] + 1]) if len(moved) else None,
+            "write_end_ms": int(t_ms[moved[-1] + 1]) if len(moved) else None,
+            "full_ms": int(t_ms[into_full[0]]) if len(into_full) else None,
+            "start_cond": str(cond[0]),
+            "end_cond": str(cond[-1]),
+        }
+    return summary
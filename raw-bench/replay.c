@@ -0,0 +1,570 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <stdint.h>
+#include <string.h>
+#include <errno.h>
+#include <time.h>
+#include <pthread.h>
+#include <libzbd/zbd.h>
+
+#include "loghist.h"
+
+/*
+ * Block-trace replay onto a zoned device. The trace is streamed from a file
+ * (or stdin, "-", e.g. from zcat) by a reader thread into a bounded queue, so
+ * its size does not matter. Two line formats are accepted, anything else
+ * (headers, blkparse summaries) is skipped:
+ *
+ *   CSV       timestamp_s,op,zone,offset,size   op R|W, offset/size in bytes
+ *   blkparse  default blkparse output; only queue (Q) events of reads and
+ *             writes are replayed, sector × 512 split into zone and offset
+ *             with the device's zone size
+ *
+ * Remapping: trace zone z goes to zone first + z % count of the given range.
+ * Writes are appended at that zone's write pointer (the trace offset is
+ * dropped, a zone only takes sequential writes) with the zone locked across
+ * the write; a write that does not fit resets the zone and starts it over,
+ * as a log-structured store would reclaim it. Reads go to the trace offset
+ * folded into the zone's written part. Sizes are rounded up to the logical
+ * block and capped at MAX_REQUEST.
+ *
+ * <workers> synchronous workers take the I/Os in trace order:
+ *
+ *   open    each I/O is issued at its trace time (relative to the first one,
+ *           divided by [speed]); lag is how late it was issued
+ *   closed  as fast as possible; lag is not meaningful (0)
+ *
+ * Results go to <output_stem>.csv, one line per op (read, write, all):
+ *
+ *   op,mode,workers,speed,ios,bytes,seconds,trace_seconds,iops,mib_s,
+ *   lat_mean_us,lat_p50_us,lat_p90_us,lat_p99_us,lat_p999_us,lat_max_us,
+ *   lag_mean_us,lag_p99_us,lag_max_us,zone_resets
+ *
+ * and the latency / lag distributions to <output_stem>.hist.csv
+ * (op,metric,bucket_us,count; non-empty buckets only). Latencies are kept in
+ * log-linear histograms (loghist.h, < 2% error) so memory does not grow
+ * with the trace. Run by exp_rw_bench/run-replay.sh.
+ */
+
+#define QUEUE_DEPTH 65536
+#define MAX_REQUEST (1 << 20)
+
+enum { OP_READ, OP_WRITE, NR_OPS };
+static const char *op_names[] = { "read", "write" };
+
+struct trace_io {
+    double ts;
+    int op;
+    unsigned long long zone;
+    unsigned long long offset;
+    unsigned int size;
+};
+
+/**
+ * Bounded FIFO between the trace reader and the workers.
+ */
+struct io_queue {
+    pthread_mutex_t lock;
+    pthread_cond_t not_empty, not_full;
+    struct trace_io *ios;
+    size_t head, count;
+    int eof, stop;
+};
+
+/**
+ * A zone of the range and its write pointer, relative to the zone start.
+ */
+struct zone_state {
+    pthread_mutex_t lock;
+    unsigned long long start, capacity, wp;
+    unsigned long resets;
+};
+
+struct hist {
+    unsigned long long buckets[LOGHIST_BUCKETS];
+    unsigned long long n, max;
+    double sum;
+};
+
+struct replay {
+    int fd;
+    FILE *trace;
+    struct zbd_info info;
+    struct zone_state *zones;
+    unsigned int nr_zones;
+    int open_loop;
+    double speed;
+    double start;              /* replay start (monotonic s) */
+    double ts0, ts_last;       /* first and last trace time, set by the reader */
+    struct io_queue queue;
+    unsigned long long ios_read;
+    unsigned long skipped;
+};
+
+struct worker {
+    struct replay *r;
+    struct hist lat[NR_OPS], lag[NR_OPS];
+    unsigned long long bytes[NR_OPS];
+    unsigned long errors;
+    int failed; /* could not set up; the run is void */
+};
+
+static double now_seconds(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static void hist_add(struct hist *h, unsigned long long v) {
+    h->buckets[loghist_index(v)]++;
+    h->n++;
+    h->sum += v;
+    if (v > h->max) {
+        h->max = v;
+    }
+}
+
+static void hist_merge(struct hist *into, const struct hist *h) {
+    for (int i = 0; i < LOGHIST_BUCKETS; i++) {
+        into->buckets[i] += h->buckets[i];
+    }
+    into->n += h->n;
+    into->sum += h->sum;
+    if (h->max > into->max) {
+        into->max = h->max;
+    }
+}
+
+static double hist_percentile(const struct hist *h, double p) {
+    if (h->n == 0) {
+        return 0;
+    }
+    unsigned long long rank = (unsigned long long)((h->n - 1) * p) + 1, seen = 0;
+    for (int i = 0; i < LOGHIST_BUCKETS; i++) {
+        seen += h->buckets[i];
+        if (seen >= rank) {
+            double v = loghist_value(i);
+            return v < (double)h->max ? v : (double)h->max;
+        }
+    }
+    return (double)h->max;
+}
+
+/**
+ * Parse one trace line; returns 1 for an I/O, 0 for a line to skip.
+ */
+static int parse_line(const char *line, const struct zbd_info *info, struct trace_io *io) {
+    char op[16], action[16], rwbs[16];
+    unsigned long long sector;
+    unsigned int sectors;
+
+    if (sscanf(line, " %lf , %15[^, ] , %llu , %llu , %u", &io->ts, op, &io->zone, &io->offset, &io->size) == 5) {
+        if (op[0] == 'R' || op[0] == 'r') {
+            io->op = OP_READ;
+        } else if (op[0] == 'W' || op[0] == 'w') {
+            io->op = OP_WRITE;
+        } else {
+            return 0;
+        }
+        return io->size > 0;
+    }
+
+    // blkparse: dev cpu seq time pid action rwbs sector + sectors [process]
+    if (sscanf(line, " %*s %*d %*u %lf %*d %15s %15s %llu + %u", &io->ts, action, rwbs, &sector, &sectors) != 5
+        || strcmp(action, "Q") != 0 || sectors == 0) {
+        return 0;
+    }
+    if (strchr(rwbs, 'D')) {
+        return 0;  /* discard */
+    } else if (strchr(rwbs, 'W')) {
+        io->op = OP_WRITE;
+    } else if (strchr(rwbs, 'R')) {
+        io->op = OP_READ;
+    } else {
+        return 0;
+    }
+    unsigned long long bytes = sector * 512;
+    io->zone = bytes / info->zone_size;
+    io->offset = bytes % info->zone_size;
+    io->size = sectors * 512;
+    return 1;
+}
+
+static void *reader_worker(void *arg) {
+    struct replay *r = arg;
+    struct io_queue *q = &r->queue;
+    char *line = NULL;
+    size_t len = 0;
+    struct trace_io io;
+
+    while (getline(&line, &len, r->trace) > 0) {
+        if (!parse_line(line, &r->info, &io)) {
+            r->skipped++;
+            continue;
+        }
+        if (r->ios_read++ == 0) {
+            r->ts0 = io.ts;
+        }
+        if (io.ts > r->ts_last) {
+            r->ts_last = io.ts;
+        }
+        pthread_mutex_lock(&q->lock);
+        while (q->count == QUEUE_DEPTH && !q->stop) {
+            pthread_cond_wait(&q->not_full, &q->lock);
+        }
+        if (q->stop) {
+            pthread_mutex_unlock(&q->lock);
+            break;
+        }
+        q->ios[(q->head + q->count) % QUEUE_DEPTH] = io;
+        q->count++;
+        pthread_cond_signal(&q->not_empty);
+        pthread_mutex_unlock(&q->lock);
+    }
+    free(line);
+
+    pthread_mutex_lock(&q->lock);
+    q->eof = 1;
+    pthread_cond_broadcast(&q->not_empty);
+    pthread_mutex_unlock(&q->lock);
+    return NULL;
+}
+
+static int next_io(struct io_queue *q, struct trace_io *io) {
+    pthread_mutex_lock(&q->lock);
+    while (q->count == 0 && !q->eof) {
+        pthread_cond_wait(&q->not_empty, &q->lock);
+    }
+    if (q->count == 0 || q->stop) {
+        pthread_mutex_unlock(&q->lock);
+        return 0;
+    }
+    *io = q->ios[q->head];
+    q->head = (q->head + 1) % QUEUE_DEPTH;
+    q->count--;
+    pthread_cond_signal(&q->not_full);
+    pthread_mutex_unlock(&q->lock);
+    return 1;
+}
+
+/**
+ * Make the reader and the workers return without taking the rest of the trace.
+ */
+static void stop_queue(struct io_queue *q) {
+    pthread_mutex_lock(&q->lock);
+    q->stop = 1;
+    pthread_cond_broadcast(&q->not_empty);
+    pthread_cond_broadcast(&q->not_full);
+    pthread_mutex_unlock(&q->lock);
+}
+
+static void sleep_until(double t) {
+    struct timespec ts = { .tv_sec = (time_t)t, .tv_nsec = (long)((t - (time_t)t) * 1e9) };
+    while (clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &ts, NULL) == EINTR)
+        ;
+}
+
+/**
+ * Issue one remapped I/O; returns 0 or -1 with errno set.
+ */
+static int issue(struct replay *r, const struct trace_io *io, void *buffer, size_t size) {
+    struct zone_state *z = &r->zones[io->zone % r->nr_zones];
+    unsigned long long lblock = r->info.lblock_size;
+
+    pthread_mutex_lock(&z->lock);
+    if (io->op == OP_READ) {
+        unsigned long long wp = z->wp, offset = 0;
+        pthread_mutex_unlock(&z->lock);
+        if (wp > size) {
+            offset = io->offset % (wp - size + lblock) / lblock * lblock;
+        }
+        return pread(r->fd, buffer, size, (off_t)(z->start + offset)) == (ssize_t)size ? 0 : -1;
+    }
+
+    if (z->wp + size > z->capacity) {
+        if (zbd_reset_zones(r->fd, z->start, r->info.zone_size) < 0) {
+            pthread_mutex_unlock(&z->lock);
+            return -1;
+        }
+        z->wp = 0;
+        z->resets++;
+    }
+    ssize_t n = pwrite(r->fd, buffer, size, (off_t)(z->start + z->wp));
+    if (n == (ssize_t)size) {
+        z->wp += size;
+    }
+    pthread_mutex_unlock(&z->lock);
+    return n == (ssize_t)size ? 0 : -1;
+}
+
+static void *replay_worker(void *arg) {
+    struct worker *w = arg;
+    struct replay *r = w->r;
+    unsigned long long lblock = r->info.lblock_size;
+    struct trace_io io;
+
+    void *buffer;
+    int err = posix_memalign(&buffer, 4096, MAX_REQUEST);
+    if (err != 0) {
+        fprintf(stderr, "posix_memalign failed: %s\n", strerror(err));
+        w->failed = 1;
+        stop_queue(&r->queue);
+        return NULL;
+    }
+    memset(buffer, 0xAC, MAX_REQUEST);
+
+    while (next_io(&r->queue, &io)) {
+        // ts0 was set before the first I/O was queued
+        double due = r->start + (io.ts - r->ts0) / r->speed;
+        size_t size = (io.size + lblock - 1) / lblock * lblock;
+        unsigned long long capacity = r->zones[io.zone % r->nr_zones].capacity;
+        if (size > MAX_REQUEST) {
+            size = MAX_REQUEST;
+        }
+        if (size > capacity) {
+            size = capacity;
+        }
+
+        double lag = 0;
+        if (r->open_loop) {
+            sleep_until(due);
+            lag = now_seconds() - due;
+        }
+        double start = now_seconds();
+        if (issue(r, &io, buffer, size) < 0) {
+            if (w->errors++ == 0) {
+                fprintf(stderr, "%s of %zu bytes to trace zone %llu: %s\n",
+                        op_names[io.op], size, io.zone, strerror(errno));
+            }
+            continue;
+        }
+        hist_add(&w->lat[io.op], (unsigned long long)((now_seconds() - start) * 1e9));
+        hist_add(&w->lag[io.op], lag > 0 ? (unsigned long long)(lag * 1e9) : 0);
+        w->bytes[io.op] += size;
+    }
+
+    free(buffer);
+    return NULL;
+}
+
+/**
+ * Parse "<zone>" or "<first>-<last>".
+ */
+static int parse_zones(const char *arg, unsigned int nr_zones, unsigned int *first, unsigned int *count) {
+    char *end;
+    unsigned long lo = strtoul(arg, &end, 10), hi = lo;
+    if (end == arg) {
+        return -1;
+    }
+    if (*end == '-') {
+        const char *hi_str = end + 1;
+        hi = strtoul(hi_str, &end, 10);
+        if (end == hi_str) {
+            return -1;
+        }
+    }
+    if (*end != '\0' || hi < lo || hi >= nr_zones) {
+        return -1;
+    }
+    *first = (unsigned int)lo;
+    *count = (unsigned int)(hi - lo + 1);
+    return 0;
+}
+
+static void write_summary(FILE *out, const char *op, const struct replay *r, int workers, const struct hist *lat,
+                          const struct hist *lag, unsigned long long bytes, double seconds, unsigned long resets) {
+    fprintf(out, "%s,%s,%d,%.3f,%llu,%llu,%.3f,%.3f,%.1f,%.2f,%.1f,%.1f,%.1f,%.1f,%.1f,%.1f,%.1f,%.1f,%.1f,%lu\n",
+            op, r->open_loop ? "open" : "closed", workers, r->speed, lat->n, bytes, seconds, r->ts_last - r->ts0,
+            lat->n / seconds, bytes / seconds / (1024.0 * 1024.0), lat->n ? lat->sum / lat->n / 1e3 : 0.0,
+            hist_percentile(lat, 0.5) / 1e3, hist_percentile(lat, 0.9) / 1e3, hist_percentile(lat, 0.99) / 1e3,
+            hist_percentile(lat, 0.999) / 1e3, lat->max / 1e3, lag->n ? lag->sum / lag->n / 1e3 : 0.0,
+            hist_percentile(lag, 0.99) / 1e3, lag->max / 1e3, resets);
+}
+
+static void write_hist(FILE *out, const char *op, const char *metric, const struct hist *h) {
+    for (int i = 0; i < LOGHIST_BUCKETS; i++) {
+        if (h->buckets[i]) {
+            fprintf(out, "%s,%s,%.3f,%llu\n", op, metric, loghist_value(i) / 1e3, h->buckets[i]);
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
+    if (argc != 7 && argc != 8) {
+        fprintf(stderr, "Usage: %s <device> <trace>|- <open|closed> <workers> <output_stem> "
+                "<zone>|<first>-<last> [speed]\n", argv[0]);
+        fprintf(stderr, "Example: %s /dev/nvme0n1 trace.blkparse open 8 results/ZN540_replay 0-31 2\n", argv[0]);
+        return EXIT_FAILURE;
+    }
+
+    const char *dev_path = argv[1];
+    const char *trace_path = argv[2];
+    const char *mode = argv[3];
+    int workers = atoi(argv[4]);
+    const char *stem = argv[5];
+    double speed = argc == 8 ? atof(argv[7]) : 1.0;
+
+    if (strcmp(mode, "open") != 0 && strcmp(mode, "closed") != 0) {
+        fprintf(stderr, "Invalid mode '%s' (open or closed)\n", mode);
+        return EXIT_FAILURE;
+    }
+    if (workers <= 0 || speed <= 0) {
+        fprintf(stderr, "Invalid workers or speed\n");
+        return EXIT_FAILURE;
+    }
+
+    struct replay r = { .open_loop = strcmp(mode, "open") == 0, .speed = speed };
+    r.fd = zbd_open(dev_path, O_RDWR | O_DIRECT, &r.info);
+    if (r.fd < 0) {
+        perror("zbd_open");
+        return EXIT_FAILURE;
+    }
+
+    int ret = EXIT_FAILURE;
+    unsigned int first, count;
+    struct zbd_zone *report = NULL;
+    pthread_t *tids = NULL;
+    struct worker *ws = NULL;
+    FILE *out = NULL, *hist_out = NULL;
+
+    if (parse_zones(argv[6], r.info.nr_zones, &first, &count) < 0) {
+        fprintf(stderr, "Invalid zone range '%s' (device has %u zones)\n", argv[6], r.info.nr_zones);
+        goto out;
+    }
+    r.nr_zones = count;
+    r.trace = strcmp(trace_path, "-") == 0 ? stdin : fopen(trace_path, "r");
+    if (!r.trace) {
+        perror("Failed to open trace");
+        goto out;
+    }
+
+    report = calloc(count, sizeof(struct zbd_zone));
+    r.zones = calloc(count, sizeof(struct zone_state));
+    r.queue.ios = calloc(QUEUE_DEPTH, sizeof(struct trace_io));
+    tids = calloc(workers, sizeof(pthread_t));
+    ws = calloc(workers, sizeof(struct worker));
+    if (!report || !r.zones || !r.queue.ios || !tids || !ws) {
+        perror("calloc failed");
+        goto out;
+    }
+    unsigned int nr = count;
+    if (zbd_report_zones(r.fd, (off_t)first * r.info.zone_size, (off_t)count * r.info.zone_size,
+                         ZBD_RO_ALL, report, &nr) < 0 || nr != count) {
+        perror("zbd_report_zones");
+        goto out;
+    }
+    for (unsigned int i = 0; i < count; i++) {
+        struct zone_state *z = &r.zones[i];
+        pthread_mutex_init(&z->lock, NULL);
+        z->start = report[i].start;
+        z->capacity = report[i].capacity;
+        z->wp = report[i].cond == ZBD_ZONE_COND_FULL ? report[i].capacity : report[i].wp - report[i].start;
+    }
+    pthread_mutex_init(&r.queue.lock, NULL);
+    pthread_cond_init(&r.queue.not_empty, NULL);
+    pthread_cond_init(&r.queue.not_full, NULL);
+
+    printf("replay: %s -> zones %u-%u of %s, %s loop, %d workers, speed %.2f\n",
+           trace_path, first, first + count - 1, dev_path, mode, workers, speed);
+
+    pthread_t reader;
+    r.start = now_seconds();
+    int err = pthread_create(&reader, NULL, reader_worker, &r);
+    if (err != 0) {
+        fprintf(stderr, "pthread_create failed: %s\n", strerror(err));
+        goto out;
+    }
+    int started = 0;
+    for (; started < workers; started++) {
+        ws[started].r = &r;
+        err = pthread_create(&tids[started], NULL, replay_worker, &ws[started]);
+        if (err != 0) {
+            fprintf(stderr, "pthread_create failed: %s\n", strerror(err));
+            stop_queue(&r.queue);
+            break;
+        }
+    }
+    pthread_join(reader, NULL);
+    for (int i = 0; i < started; i++) {
+        pthread_join(tids[i], NULL);
+    }
+    if (started < workers) {
+        fprintf(stderr, "Only %d of %d workers started; no result recorded\n", started, workers);
+        goto out;
+    }
+    int failed = 0;
+    for (int i = 0; i < workers; i++) {
+        failed += ws[i].failed;
+    }
+    if (failed) {
+        fprintf(stderr, "%d of %d workers failed; no result recorded\n", failed, workers);
+        goto out;
+    }
+    double seconds = now_seconds() - r.start;
+
+    // Merge the per-worker histograms
+    static struct hist lat[NR_OPS + 1], lag[NR_OPS + 1];
+    unsigned long long bytes[NR_OPS + 1] = {0};
+    unsigned long errors = 0, resets = 0;
+    for (int i = 0; i < workers; i++) {
+        for (int op = 0; op < NR_OPS; op++) {
+            hist_merge(&lat[op], &ws[i].lat[op]);
+            hist_merge(&lag[op], &ws[i].lag[op]);
+            hist_merge(&lat[NR_OPS], &ws[i].lat[op]);
+            hist_merge(&lag[NR_OPS], &ws[i].lag[op]);
+            bytes[op] += ws[i].bytes[op];
+            bytes[NR_OPS] += ws[i].bytes[op];
+        }
+        errors += ws[i].errors;
+    }
+    for (unsigned int i = 0; i < count; i++) {
+        resets += r.zones[i].resets;
+    }
+
+    char path[4096];
+    snprintf(path, sizeof(path), "%s.csv", stem);
+    out = fopen(path, "w");
+    snprintf(path, sizeof(path), "%s.hist.csv", stem);
+    hist_out = fopen(path, "w");
+    if (!out || !hist_out) {
+        perror("Failed to open result file");
+        goto out;
+    }
+    fprintf(out, "op,mode,workers,speed,ios,bytes,seconds,trace_seconds,iops,mib_s,lat_mean_us,lat_p50_us,"
+            "lat_p90_us,lat_p99_us,lat_p999_us,lat_max_us,lag_mean_us,lag_p99_us,lag_max_us,zone_resets\n");
+    fprintf(hist_out, "op,metric,bucket_us,count\n");
+    for (int op = 0; op <= NR_OPS; op++) {
+        const char *name = op < NR_OPS ? op_names[op] : "all";
+        write_summary(out, name, &r, workers, &lat[op], &lag[op], bytes[op], seconds, resets);
+        write_hist(hist_out, name, "lat", &lat[op]);
+        if (r.open_loop) {
+            write_hist(hist_out, name, "lag", &lag[op]);
+        }
+    }
+    printf("replay: %llu I/Os (%lu errors, %lu lines skipped, %lu zone resets) in %.2fs "
+           "(trace %.2fs), %.1f IOPS, p99 %.1f us, lag p99 %.1f us -> %s.csv\n",
+           lat[NR_OPS].n, errors, r.skipped, resets, seconds, r.ts_last - r.ts0, lat[NR_OPS].n / seconds,
+           hist_percentile(&lat[NR_OPS], 0.99) / 1e3, hist_percentile(&lag[NR_OPS], 0.99) / 1e3, stem);
+    ret = errors ? EXIT_FAILURE : EXIT_SUCCESS;
+
+out:
+    if (out) {
+        fclose(out);
+    }
+    if (hist_out) {
+        fclose(hist_out);
+    }
+    if (r.trace && r.trace != stdin) {
+        fclose(r.trace);
+    }
+    free(ws);
+    free(tids);
+    free(r.queue.ios);
+    free(r.zones);
+    free(report);
+    zbd_close(r.fd);
+    return ret;
+}
@@ -2,7 +2,16 @@
 set -e
 
 # Image directory
-OSIMGF=/home/teona/femu.qcow2
+OSIMGF=${OSIMGF:-/home/teona/femu.qcow2} # run.sh WARM_START=1 points this at the prepared image
+
+# Per-VM settings; overridden by run_matrix.py --vms so several VMs can share one host
+SSH_PORT=${SSH_PORT:-8080}
+QMP_SOCK=${QMP_SOCK:-./qmp-sock}
+QEMU_LOG=${QEMU_LOG:-log}
+VM_SMP=${VM_SMP:-20}
+VM_MEM=${VM_MEM:-64G}
+VM_OVERLAY=${VM_OVERLAY:-} # if set, boot from a fresh qcow2 overlay backed by $OSIMGF
+QEMU_IMG=${QEMU_IMG:-qemu-img}
 
 if [ $# -ne 10 ]; then
     echo "Usage: $0 <VTABLE_MODE>"
@@ -31,6 +40,14 @@ if [[ ! -e "$OSIMGF" ]]; then
     exit
 fi
 
+BOOT_IMG="$OSIMGF"
+if [[ -n "$VM_OVERLAY" ]]; then
+    mkdir -p "$(dirname "$VM_OVERLAY")"
+    rm -f "$VM_OVERLAY"
+    "$QEMU_IMG" create -q -f qcow2 -F qcow2 -b "$OSIMGF" "$VM_OVERLAY"
+    BOOT_IMG="$VM_OVERLAY"
+fi
+
 # devsz_mb=$((1024*64))
 devsz_mb=$((1024*16))
 femu_mode=3 # use 3 for ZNS mode
@@ -57,14 +74,14 @@ zns_debug=1
 
 # QEMU Launch
 sudo x86_64-softmmu/qemu-system-x86_64 \
-    -name "FEMU-ZNSSD" \
+    -name "FEMU-ZNSSD,debug-threads=on" \
     -enable-kvm \
     -cpu host \
-    -smp 20 \
-    -m 64G \
+    -smp ${VM_SMP} \
+    -m ${VM_MEM} \
     -device virtio-scsi-pci,id=scsi0 \
     -device scsi-hd,drive=hd0 \
-    -drive file=$OSIMGF,if=none,aio=native,cache=none,format=qcow2,id=hd0 \
+    -drive file=$BOOT_IMG,if=none,aio=native,cache=none,format=qcow2,id=hd0 \
     -device femu,devsz_mb=${devsz_mb},id=nvme0,femu_mode=${femu_mode},queues=${queues},\
 zns_zonesize=${zns_zonesize},zns_zonecap=${zns_zonecap},\
 zns_channels=${zns_channels},zns_channels_per_zone=${zns_channels_per_zone},\
@@ -75,9 +92,9 @@ zns_channel_transfer_latency=${zns_channel_transfer_latency},zns_block_erasure_l
 zns_allow_partial_resets=${zns_allow_partial_resets},zns_asynchronous_resets=${zns_asynchronous_resets},\
 zns_vtable_mode=${zns_vtable_mode},zns_block_size_pages=${zns_block_size_pages},\
 zns_chunk_size=${zns_chunk_size},zns_max_chunks_per_lun=${zns_max_chunks_per_lun},zns_min_luns=${zns_min_luns},zns_debug=${zns_debug},zns_log_path=${zns_log_path},zns_log_path_time=${zns_log_path_time} \
-    -net user,hostfwd=tcp::8080-:22 \
+    -net user,hostfwd=tcp::${SSH_PORT}-:22 \
     -net nic,model=virtio \
     -nographic \
-    -qmp unix:./qmp-sock,server,nowait 2>&1 | tee log
+    -qmp unix:${QMP_SOCK},server,nowait 2>&1 | tee "$QEMU_LOG"
 
 
@@ -1,9 +1,11 @@
 #!/bin/bash
 set -e  # Exit on any error
 
-EXP_ID=3 # 0: all, 1: interference, 2: occupancy, 3: write-scaling, 4: read-scaling, 5: queue depth, 6: allocation
-SSD_ID=10 # 0: lazy (size = 128MB), 1: stripe (size = 128MB) 2: full (chunk = 1, size = 128MB), 3: vchunk (chunk = 2, size = 128MB), 4: vchunk (chunk = 8, size = 128MB),
+# EXP_ID / SSD_ID may be set from the environment (run_matrix.py does this)
+EXP_ID=${EXP_ID:-3} # 0: all, 1: interference, 2: occupancy, 3: write-scaling, 4: read-scaling, 5: queue depth, 6: allocation, 7: qd×bs×jobs×engine scaling matrix, 8: mixed readers/writers, 9: zone append vs write into shared zones, 10: block-trace replay, 11: RocksDB db_bench on ZenFS, 12: open-zone scaling
+SSD_ID=${SSD_ID:-10} # 0: lazy (size = 128MB), 1: stripe (size = 128MB) 2: full (chunk = 1, size = 128MB), 3: vchunk (chunk = 2, size = 128MB), 4: vchunk (chunk = 8, size = 128MB),
 # 5: lazy (size = 512MB), 6: stripe (size = 256MB) 7: full (chunk = 1, size = 256MB), 8: vchunk (chunk = 2, size = 256MB), 9: vchunk (chunk = 8, size = 256MB),
+# 10: lazy (size = 64MB), custom: zns_* taken from ZNS_* environment variables (see matrix.toml)
 
 
 # ------- adjust this to run new experiments ------
@@ -121,9 +123,25 @@ set_ssd_config() {
       INCREMENT=131072
       ;;
 
+    # ------------------------------------------------------------
+    # Explicit config from the environment (run_matrix.py)
+    # ------------------------------------------------------------
+    custom)
+      zns_vtable_mode="${ZNS_VTABLE_MODE:?ZNS_VTABLE_MODE is required for SSD_ID=custom}"
+      zns_zonesize="${ZNS_ZONESIZE:?ZNS_ZONESIZE is required for SSD_ID=custom}"
+      zns_zonecap="${ZNS_ZONECAP:-$zns_zonesize}"
+      zns_chunk_size="${ZNS_CHUNK_SIZE:-$zns_chunk_size}"
+      zns_max_chunks_per_lun="${ZNS_MAX_CHUNKS_PER_LUN:-$zns_max_chunks_per_lun}"
+      zns_min_luns="${ZNS_MIN_LUNS:-$zns_min_luns}"
+      zns_channels_per_zone="${ZNS_CHANNELS_PER_ZONE:-$zns_channels_per_zone}"
+      zns_ways_per_zone="${ZNS_WAYS_PER_ZONE:-$zns_ways_per_zone}"
+      REQUEST_SIZE="${ZNS_REQUEST_SIZE:-$REQUEST_SIZE}"
+      INCREMENT=$((zns_zonesize / 512))
+      ;;
+
     *)
       echo "ERROR: Unknown SSD_ID='$SSD_ID'"
-      echo "Valid SSD_IDs: 0-4 (128MiB zones), 5-9 (256MiB zones)"
+      echo "Valid SSD_IDs: 0-4 (128MiB zones), 5-9 (256MiB zones), 10 (64MiB zones), custom"
       exit 1
       ;;
   esac
@@ -135,7 +153,40 @@ set_ssd_config
 
 
 # specify experiment config
-PARALLEL_ZONES=32
+PARALLEL_ZONES=32 # writers of the open-zone scaling (EXP_ID 12), which keeps 1..limit zones open
+FIO_TIMESERIES=${FIO_TIMESERIES:-0} # 1: also record fio per-I/O bw/lat/iops logs (results/*/timeseries/)
+THREADS=${THREADS:-}   # optional thread counts for the scaling/interference scripts, e.g. "1 2 4"
+QDEPTHS=${QDEPTHS:-}   # optional queue depths for run-qd.sh, e.g. "2 4 8"
+# 1: sample QEMU per-thread CPU and host CPU/memory (hoststat.py) and guest
+# CPU / diskstats (sample_guest.sh) every RESOURCE_INTERVAL seconds during fio;
+# the samples are stored next to each fio JSON as <stem>.{qemu,host,guest}.csv
+RESOURCE_STATS=${RESOURCE_STATS:-0}
+RESOURCE_INTERVAL=${RESOURCE_INTERVAL:-0.5}
+# 1: report the zones each fio run uses every ZONE_INTERVAL_MS (zonestat.c) and
+# store state changes / write pointer advance next to its JSON as <stem>.zones.csv
+ZONE_STATS=${ZONE_STATS:-0}
+ZONE_INTERVAL_MS=${ZONE_INTERVAL_MS:-100}
+
+# Experiment knobs passed through to the scripts inside the VM when set, e.g.
+# FILL_WORKERS (interference), ALLOC_ROUNDS (allocation), OCC_ZONES/OCC_WORKERS (occupancy),
+# SCALE_ENGINES/SCALE_BLOCK_SIZES (scaling matrix),
+# MIX_RATIOS/MIX_READS/MIX_RUNTIME (mixed readers/writers),
+# APPEND_THREADS/APPEND_QDEPTHS/APPEND_ZONES/APPEND_RUNTIME (zone append),
+# REPLAY_TRACES/REPLAY_MODES/REPLAY_WORKERS/REPLAY_SPEED/REPLAY_ZONES (trace replay),
+# KV_WORKLOADS/KV_NUM/KV_VALUE_SIZE/KV_THREADS/KV_DURATION/KV_READ_PCT/DB_BENCH/ZENFS (KV stage),
+# ZONES_OPEN/ZONES_WRITERS/ZONES_RUNTIME (open-zone scaling),
+# REP (repetition tag of the result files, run_matrix.py --repeat)
+GUEST_ENV_VARS=(FIO_TIMESERIES THREADS QDEPTHS FILL_WORKERS ALLOC_ROUNDS OCC_ZONES OCC_WORKERS
+                SCALE_ENGINES SCALE_BLOCK_SIZES REP RESOURCE_STATS RESOURCE_INTERVAL
+                ZONE_STATS ZONE_INTERVAL_MS MIX_RATIOS MIX_READS MIX_RUNTIME
+                APPEND_THREADS APPEND_QDEPTHS APPEND_ZONES APPEND_RUNTIME
+                REPLAY_TRACES REPLAY_MODES REPLAY_WORKERS REPLAY_SPEED REPLAY_ZONES
+                KV_WORKLOADS KV_NUM KV_VALUE_SIZE KV_THREADS KV_DURATION KV_READ_PCT DB_BENCH ZENFS
+                ZONES_OPEN ZONES_WRITERS ZONES_RUNTIME)
+GUEST_ENV=""
+for var in "${GUEST_ENV_VARS[@]}"; do
+    GUEST_ENV+="${var}='${!var:-}' "
+done
 
 # ----- following should stay the same --------
 DEVICE_PATH="/dev/nvme0n1"
@@ -143,31 +194,99 @@ DEVICE_PATH="/dev/nvme0n1"
 # Set EXP_NAME depending on whether chunk config is used
 EXP_NAME="vt-${zns_vtable_mode}_chnk-${zns_chunk_size}_maxc-${zns_max_chunks_per_lun}_minl-${zns_min_luns}_zsz-${zns_zonesize}_chnl-${zns_channels_per_zone}_w-${zns_ways_per_zone}"
 
+# Host directory that receives results and FEMU logs (run_matrix.py --vms gives
+# every VM its own per-config directory here)
+HOST_RESULTS_ROOT=${HOST_RESULTS_ROOT:-/home/teona/CIDR/raw-bench}
+
 zns_log_path=""
 zns_log_path_time=""
 
 # Set log path based on EXP_ID
 if [[ "$EXP_ID" -eq 2 ]]; then
-    zns_log_path="/home/teona/CIDR/raw-bench/exp_occupancy/new_results/finish-log"
+    zns_log_path="${HOST_RESULTS_ROOT}/exp_occupancy/new_results/finish-log"
+    mkdir -p "$(dirname "$zns_log_path")"
     echo "Log path set to: $zns_log_path"
 elif [[ "$EXP_ID" -eq 6 ]]; then
-    zns_log_path_time="/home/teona/CIDR/raw-bench/exp_allocation/new_results/allocation-log"
+    zns_log_path_time="${HOST_RESULTS_ROOT}/exp_allocation/new_results/allocation-log"
+    mkdir -p "$(dirname "$zns_log_path_time")"
     echo "Log path set to: $zns_log_path_time"
+elif [[ "$EXP_ID" -eq 11 ]]; then
+    # Padding of the zones ZenFS finishes, for the KV stage's DLWA
+    zns_log_path="${HOST_RESULTS_ROOT}/exp_kv/results/finish-log"
+    mkdir -p "$(dirname "$zns_log_path")"
+    echo "Log path set to: $zns_log_path"
 fi
 
 # Paths
 VM_SCRIPT="./run-zns-exp.sh"
 VM_SCRIPT_PATH="/home/teona/CIDR/confznsplusplus/build-femu"
-SSH_PORT=8080
+export SSH_PORT=${SSH_PORT:-8080} # also read by run-zns-exp.sh
 VM_USER="teona"
 VM_HOME="/home/${VM_USER}"
 VM_RAW_BENCH="${VM_HOME}/raw-bench"
 HOST_RAW_BENCH="/home/teona/CIDR/raw-bench"
-RESULT_DIRS=("exp_allocation/new_results" "exp_interference/results" "exp_occupancy/new_results" "exp_rw_bench/new_results")
+RESULT_DIRS=("exp_allocation/new_results" "exp_interference/results" "exp_occupancy/new_results" "exp_occupancy/results" "exp_rw_bench/new_results" "exp_rw_bench/results" "exp_kv/results")
+
+# Warm start: boot a prepared image that keeps raw-bench and its built tools
+# between runs instead of femu.qcow2, push only files whose content changed and
+# rebuild only tools whose source changed. The image is created on first use
+# as an overlay of femu.qcow2; with VM_OVERLAY (run_matrix.py --vms) each VM
+# boots a throwaway overlay of it instead. Guest RAM snapshots (QMP savevm /
+# loadvm) are not used: they would also restore the FEMU device, whose
+# geometry and vtable mode change with every SSD config.
+WARM_START=${WARM_START:-0}
+WARM_IMAGE=${WARM_IMAGE:-/home/teona/femu-warm.qcow2}
+QEMU_IMG=${QEMU_IMG:-qemu-img}
+
+# Startup-time breakdown, appended per run
+STARTUP_LOG=${STARTUP_LOG:-${HOST_RESULTS_ROOT}/startup-times.csv}
+PHASES=(boot sync build run collect)
+
+# One multiplexed SSH connection for every ssh/rsync call of this run
+SSH_OPTS="-p $SSH_PORT -o StrictHostKeyChecking=no -o ControlMaster=auto -o ControlPath=/tmp/femu-ssh-%r@%h:%p -o ControlPersist=60"
+
+# Host-side files that never go to the VM: results, run_matrix.py bookkeeping,
+# plot caches and tools built inside the VM (see build_tools.sh)
+SYNC_EXCLUDES=(
+  --exclude '*/new_results/*'
+  --exclude '*/results/*'
+  --exclude '/fleet/'
+  --exclude '/.matrix-done/'
+  --exclude '/plotting/cache/'
+  --exclude '/exp_*/fill'
+  --exclude '.fill.sha256'
+  --exclude '/zonestat'
+  --exclude '/zappend'
+  --exclude '/replay'
+  --exclude '/.*.sha256'
+)
+
+now_ms() {
+    echo $(( $(date +%s%N) / 1000000 ))
+}
+
+declare -A PHASE_MS
+phase_mark=$(now_ms)
+end_phase() {
+    local now
+    now=$(now_ms)
+    PHASE_MS[$1]=$(( now - phase_mark ))
+    phase_mark=$now
+}
 
 echo "Starting FEMU VM (vtable_mode=${zns_vtable_mode})"
 echo "Experiment: EXP_ID=${EXP_ID}, REQUEST_SIZE=${REQUEST_SIZE}, INCREMENT=${INCREMENT}, PARALLEL_ZONES=${PARALLEL_ZONES}"
 
+if [[ "$WARM_START" -eq 1 ]]; then
+    BASE_IMAGE=${OSIMGF:-/home/teona/femu.qcow2}
+    if [[ ! -e "$WARM_IMAGE" ]]; then
+        echo "Creating warm image ${WARM_IMAGE} (backed by ${BASE_IMAGE})..."
+        "$QEMU_IMG" create -q -f qcow2 -F qcow2 -b "$BASE_IMAGE" "$WARM_IMAGE"
+    fi
+    export OSIMGF="$WARM_IMAGE" # read by run-zns-exp.sh
+    echo "Warm start from ${WARM_IMAGE}"
+fi
+
 # Change directory to actual VM script location
 cd "$VM_SCRIPT_PATH"
 
@@ -179,63 +298,118 @@ FEMU_PID=$!
 
 # Wait until SSH is ready
 echo "Waiting for VM SSH to be reachable..."
-until ssh -p $SSH_PORT -o ConnectTimeout=2 -o StrictHostKeyChecking=no "${VM_USER}@localhost" 'echo VM Ready' &>/dev/null; do
-    sleep 2
+until ssh $SSH_OPTS -o ConnectTimeout=2 "${VM_USER}@localhost" 'echo VM Ready' &>/dev/null; do
+    sleep 0.5
 done
 echo "VM SSH is reachable."
+end_phase boot
+
+if [[ "$WARM_START" -eq 1 ]]; then
+    # Drop the previous run's results (they were already copied back) and push
+    # only files whose checksum differs from the guest's copy
+    echo "Clearing previous results in VM..."
+    ssh $SSH_OPTS "${VM_USER}@localhost" "
+      mkdir -p '${VM_RAW_BENCH}'
+      cd '${VM_RAW_BENCH}'
+      for dir in ${RESULT_DIRS[*]}; do
+        [ -d \"\$dir\" ] && find \"\$dir\" -mindepth 1 -delete
+      done
+      true
+    "
+
+    echo "Syncing changed files to VM (content checksums)..."
+    rsync -a --checksum --delete --itemize-changes -e "ssh $SSH_OPTS" \
+      "${SYNC_EXCLUDES[@]}" \
+      "$HOST_RAW_BENCH/" \
+      "${VM_USER}@localhost:${VM_RAW_BENCH}/"
+else
+    # Clean the raw-bench directory inside the guest before copying
+    echo "Deleting previous raw-bench directory in VM..."
+    ssh $SSH_OPTS "${VM_USER}@localhost" "rm -rf '${VM_RAW_BENCH}'"
+
+    # Copy raw-bench to VM, excluding result contents
+    # IMPORTANT: This copies your updated .c files into the VM every run.
+    echo "Copying raw-bench to VM (fresh source files)..."
+    rsync -avz -e "ssh $SSH_OPTS" \
+      "${SYNC_EXCLUDES[@]}" \
+      "$HOST_RAW_BENCH/" \
+      "${VM_USER}@localhost:${VM_RAW_BENCH}/"
+fi
+end_phase sync
 
-# Clean the raw-bench directory inside the guest before copying
-echo "Deleting previous raw-bench directory in VM..."
-ssh -p $SSH_PORT -o StrictHostKeyChecking=no "${VM_USER}@localhost" "rm -rf '${VM_RAW_BENCH}'"
-
-# Copy raw-bench to VM, excluding result contents
-# IMPORTANT: This copies your updated .c files into the VM every run.
-echo "Copying raw-bench to VM (fresh source files)..."
-rsync -avz -e "ssh -p $SSH_PORT -o StrictHostKeyChecking=no" \
-  --exclude '*/new_results/*' \
-  --exclude '*/results/*' \
-  "$HOST_RAW_BENCH/" \
-  "${VM_USER}@localhost:${VM_RAW_BENCH}/"
-
-# Compile inside VM (so you never run stale binaries)
-# We compile occupancy/fill because you changed it to use pthreads and extra arg.
+# Compile inside VM (so you never run stale binaries); build_tools.sh skips
+# tools whose source is unchanged since their last build in this guest
 echo "Compiling updated C tools inside the VM..."
-ssh -p $SSH_PORT -o StrictHostKeyChecking=no "${VM_USER}@localhost" "
+ssh $SSH_OPTS "${VM_USER}@localhost" "
   set -e
   cd '${VM_RAW_BENCH}'
-
-  # Compile occupancy fill tool (updated to use pthreads)
-  if [ -f 'exp_allocation/fill.c' ]; then
-    echo '[VM] Building exp_occupancy/fill ...'
-    cd exp_allocation
-    mkdir -p new_results
-    gcc -O2 -o fill fill.c -lzbd -lm -lpthread -Wall
-    cd ..
-  fi
+  mkdir -p exp_allocation/new_results
+  bash build_tools.sh
 "
+end_phase build
+
+# Host resource samples for the whole run; split per fio JSON after collection
+STATS_PID=""
+RUN_START_MS=$(now_ms)
+if [[ "$RESOURCE_STATS" -eq 1 ]]; then
+    QEMU_PID=$(pgrep -n -f "hostfwd=tcp::${SSH_PORT}-" || true)
+    if [[ -n "$QEMU_PID" ]]; then
+        STATS_PREFIX="${HOST_RESULTS_ROOT}/resources/${EXP_NAME}_exp${EXP_ID}${REP:+_r${REP}}"
+        python3 "${HOST_RAW_BENCH}/hoststat.py" sample "$QEMU_PID" "$STATS_PREFIX" --interval "$RESOURCE_INTERVAL" &
+        STATS_PID=$!
+        echo "Sampling QEMU (pid ${QEMU_PID}) and host resources to ${STATS_PREFIX}_*.csv"
+    else
+        echo "⚠️ QEMU process not found, no host resource samples"
+    fi
+fi
 
 # Run experiment inside VM (pass PARALLEL_ZONES as 6th arg)
 echo "Running run_all.sh inside the VM..."
-ssh -p $SSH_PORT -o StrictHostKeyChecking=no "${VM_USER}@localhost" \
-  "cd '${VM_RAW_BENCH}' && bash run_all.sh '${EXP_NAME}' '${DEVICE_PATH}' '${REQUEST_SIZE}' '${EXP_ID}' '${INCREMENT}' '${PARALLEL_ZONES}'"
+ssh $SSH_OPTS "${VM_USER}@localhost" \
+  "cd '${VM_RAW_BENCH}' && ${GUEST_ENV}bash run_all.sh '${EXP_NAME}' '${DEVICE_PATH}' '${REQUEST_SIZE}' '${EXP_ID}' '${INCREMENT}' '${PARALLEL_ZONES}'"
+if [[ -n "$STATS_PID" ]]; then
+    kill "$STATS_PID" 2>/dev/null || true
+    wait "$STATS_PID" 2>/dev/null || true
+fi
+end_phase run
 
 # Copy result files back to host
 echo "Copying result files back from VM..."
 for dir in "${RESULT_DIRS[@]}"; do
-    LOCAL_RESULT_DIR="${HOST_RAW_BENCH}/${dir}"
+    LOCAL_RESULT_DIR="${HOST_RESULTS_ROOT}/${dir}"
     REMOTE_RESULT_DIR="${VM_RAW_BENCH}/${dir}"
 
     mkdir -p "${LOCAL_RESULT_DIR}"
 
-    rsync -avz -e "ssh -p $SSH_PORT -o StrictHostKeyChecking=no" \
+    rsync -avz -e "ssh $SSH_OPTS" \
       "${VM_USER}@localhost:${REMOTE_RESULT_DIR}/" \
       "${LOCAL_RESULT_DIR}/"
 done
+if [[ -n "$STATS_PID" ]]; then
+    python3 "${HOST_RAW_BENCH}/hoststat.py" split "$STATS_PREFIX" \
+      "${RESULT_DIRS[@]/#/${HOST_RESULTS_ROOT}/}" --since "$RUN_START_MS"
+fi
+end_phase collect
 
 # Shutdown VM
 echo "Shutting down the VM..."
-ssh -p $SSH_PORT -o StrictHostKeyChecking=no "${VM_USER}@localhost" "sudo /sbin/shutdown -h now"
+ssh $SSH_OPTS "${VM_USER}@localhost" "sudo /sbin/shutdown -h now" || true
+ssh $SSH_OPTS -O exit "${VM_USER}@localhost" &>/dev/null || true
 
 # Wait for FEMU to finish
 wait $FEMU_PID
+
+# Report where the time went
+echo "⏱️  Startup-time breakdown (s):"
+row="${EXP_NAME},${EXP_ID},${WARM_START}"
+for phase in "${PHASES[@]}"; do
+    seconds=$(awk -v ms="${PHASE_MS[$phase]}" 'BEGIN { printf "%.1f", ms / 1000 }')
+    printf "  %-8s %8s\n" "$phase" "$seconds"
+    row="${row},${seconds}"
+done
+mkdir -p "$(dirname "$STARTUP_LOG")"
+if [[ ! -s "$STARTUP_LOG" ]]; then
+    echo "exp_name,exp_id,warm_start,$(IFS=,; echo "${PHASES[*]/%/_s}")" > "$STARTUP_LOG"
+fi
+echo "$row" >> "$STARTUP_LOG"
 echo "✅ VM shutdown complete. All experiments done."
@@ -0,0 +1,58 @@
+#!/bin/bash
+set -e
+
+# Runs inside the VM (called by run.sh): dispatch EXP_ID to its experiment script.
+# THREADS / QDEPTHS / FIO_TIMESERIES (and the knobs listed in run.sh) are read
+# from the environment by the scripts.
+
+if [ "$#" -ne 6 ]; then
+    echo "Usage: $0 <EXP_NAME> <DEVICE_PATH> <REQUEST_SIZE> <EXP_ID> <INCREMENT> <PARALLEL_ZONES>"
+    echo "Example: $0 vt-1_chnk-1_maxc-1_minl-64_zsz-67108864_chnl-8_w-1 /dev/nvme0n1 4096 3 131072 32"
+    exit 1
+fi
+
+EXP_NAME="$1"
+DEVICE_PATH="$2"
+REQUEST_SIZE="$3"
+EXP_ID="$4"
+INCREMENT="$5"
+PARALLEL_ZONES="$6"
+
+# Run a script from its experiment directory (scripts use relative result paths)
+run_in() {
+    local dir="$1"
+    shift
+    echo "▶️  [${dir}] $*"
+    (cd "$dir" && bash "$@")
+}
+
+case "$EXP_ID" in
+  0)
+    # Everything, in order. Occupancy and allocation only log through FEMU
+    # when run.sh sets zns_log_path / zns_log_path_time for their EXP_ID.
+    # The scaling matrix (7) takes hours, trace replay (10) needs
+    # REPLAY_TRACES and the KV stage (11) RocksDB/ZenFS in the guest; they
+    # are only run on request.
+    for id in 1 2 3 4 5 6 8 9 12; do
+      bash "$0" "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" "$id" "$INCREMENT" "$PARALLEL_ZONES"
+    done
+    ;;
+  1) run_in exp_interference run_finish.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" "$INCREMENT" ;;
+  2) run_in exp_occupancy run.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  3) run_in exp_rw_bench run-th.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  4) run_in exp_rw_bench run-th-read.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  5) run_in exp_rw_bench run-qd.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  6) run_in exp_allocation run.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  7) run_in exp_rw_bench run-scaling.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+  8) run_in exp_rw_bench run-mixed.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" "$INCREMENT" ;;
+  9) run_in exp_rw_bench run-append.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+ 10) run_in exp_rw_bench run-replay.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+ 11) run_in exp_kv run.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" ;;
+ 12) run_in exp_rw_bench run-zones.sh "$EXP_NAME" "$DEVICE_PATH" "$REQUEST_SIZE" "$PARALLEL_ZONES" ;;
+  *)
+    echo "ERROR: Unknown EXP_ID='$EXP_ID'"
+    exit 1
+    ;;
+esac
+
+echo "✅ run_all.sh done (EXP_ID=${EXP_ID}, EXP_NAME=${EXP_NAME})"
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Declarative experiment runner: expands matrix.toml (SSD configs × experiments
+# × thread counts / queue depths), skips points whose results already exist on
+# the host, and calls run.sh once per (SSD config, experiment) cell with only
+# the missing points.
+#
+# With --vms N, up to N cells run at once, each in its own FEMU VM with its own
+# SSH port, QMP socket, QEMU log and qcow2 overlay, sized to fit the host. Their
+# results go to per-config directories under fleet/<EXP_NAME>/.
+#
+# With --warm, run.sh boots the prepared warm image (WARM_START=1) and only
+# syncs and rebuilds what changed since the image was last used. Parallel VMs
+# boot throwaway overlays of it, so prepare it with one single-VM --warm run.
+#
+# With --repeat K, every cell runs K times, one round of all cells after the
+# other and in a random order within each round, so slow drift of the host
+# does not line up with one strategy. Repetition r > 0 tags its result files
+# _r<r> (REP in the guest). With --ci-width, a cell stops repeating once it
+# has --min-repeat runs and the bootstrap CI of every point's bandwidth is
+# within that fraction of the mean.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MATRIX = os.path.join(HERE, "matrix.toml")
+RUN_SCRIPT = os.path.join(HERE, "run.sh")
+
+# Completion markers for experiments without per-point result files
+DONE_DIR = os.path.join(HERE, ".matrix-done")
+
+# Per-config result directories of parallel (--vms) runs
+FLEET_DIR = os.path.join(HERE, "fleet")
+
+# Shared statistics helpers (bootstrap CI, outlier rejection) for --ci-width
+PLOTTING_DIR = os.path.join(HERE, "plotting")
+
+# Fleet sizing: every VM gets at least this much, plus the FEMU device's
+# backing memory (devsz_mb in run-zns-exp.sh) on the host
+BASE_SSH_PORT = 8080
+VM_MIN_SMP = 4
+VM_MIN_MEM_GB = 8
+FEMU_DEVSZ_GB = 16
+HOST_MEM_FRACTION = 0.9
+
+# SSD config fields → run.sh environment variables (SSD_ID=custom)
+SSD_ENV = {
+    "zns_vtable_mode": "ZNS_VTABLE_MODE",
+    "zns_chunk_size": "ZNS_CHUNK_SIZE",
+    "zns_max_chunks_per_lun": "ZNS_MAX_CHUNKS_PER_LUN",
+    "zns_min_luns": "ZNS_MIN_LUNS",
+    "zns_zonesize": "ZNS_ZONESIZE",
+    "zns_zonecap": "ZNS_ZONECAP",
+    "zns_channels_per_zone": "ZNS_CHANNELS_PER_ZONE",
+    "zns_ways_per_zone": "ZNS_WAYS_PER_ZONE",
+    "request_size": "ZNS_REQUEST_SIZE",
+}
+
+# Sweep key in matrix.toml → run.sh environment variable
+SWEEPS = {
+    "threads": "THREADS",
+    "qdepths": "QDEPTHS",
+}
+
+
+def load_matrix(path):
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def ssd_config(entry, defaults):
+    """Merge one [[ssd]] entry over [defaults] and fill derived fields."""
+    cfg = {**defaults, **entry}
+    missing = [k for k in ("name", "zns_vtable_mode", "zns_zonesize") if k not in cfg]
+    if missing:
+        raise ValueError(f"[[ssd]] entry {entry} is missing {', '.join(missing)}")
+    cfg.setdefault("zns_zonecap", cfg["zns_zonesize"])
+    cfg["increment"] = cfg["zns_zonesize"] // 512
+    return cfg
+
+
+def exp_name(cfg):
+    """The EXP_NAME run.sh derives for an SSD config (result filename prefix)."""
+    return (f"vt-{cfg['zns_vtable_mode']}_chnk-{cfg['zns_chunk_size']}"
+            f"_maxc-{cfg['zns_max_chunks_per_lun']}_minl-{cfg['zns_min_luns']}"
+            f"_zsz-{cfg['zns_zonesize']}_chnl-{cfg['zns_channels_per_zone']}"
+            f"_w-{cfg['zns_ways_per_zone']}")
+
+
+def expand(matrix, only_ssd=None, only_exp=None):
+    """Return one cell dict per (SSD config, experiment) pair."""
+    defaults = matrix.get("defaults", {})
+    cells = []
+    for entry in matrix.get("ssd", []):
+        cfg = ssd_config(entry, defaults)
+        if only_ssd and cfg["name"] not in only_ssd:
+            continue
+        for exp_key, exp in matrix.get("experiments", {}).items():
+            if only_exp and exp_key not in only_exp:
+                continue
+            sweep = next((k for k in SWEEPS if k in exp), None)
+            cells.append({
+                "ssd": cfg["name"],
+                "experiment": exp_key,
+                "exp_id": exp["exp_id"],
+                "exp_name": exp_name(cfg),
+                "cfg": cfg,
+                "result_dir": os.path.join(HERE, exp["result_dir"]) if "result_dir" in exp else None,
+                "results": exp.get("results", []),
+                "sweep": sweep,
+                "points": exp[sweep] if sweep else [None],
+                "env": {k: str(v) for k, v in exp.get("env", {}).items()},
+                "rep": 0,
+                "repeat": 1,
+            })
+    return cells
+
+
+def schedule(cells, repeat=1, seed=None):
+    """
+    One copy of every cell per repetition, round after round; each round is
+    shuffled when there is more than one.
+    """
+    if repeat <= 1:
+        return cells
+    rng = random.Random(seed)
+    order = []
+    for rep in range(repeat):
+        round_cells = [{**cell, "rep": rep, "repeat": repeat} for cell in cells]
+        rng.shuffle(round_cells)
+        order += round_cells
+    return order
+
+
+def rep_tag(rep):
+    """Result filename tag of a repetition; the first run (0) has none."""
+    return f"_r{rep}" if rep else ""
+
+
+def cell_label(cell):
+    rep = f" #{cell['rep']}" if cell["repeat"] > 1 else ""
+    return f"{cell['ssd']} × {cell['experiment']}{rep}"
+
+
+def marker_path(cell):
+    return os.path.join(DONE_DIR, f"{cell['exp_name']}_{cell['experiment']}{rep_tag(cell['rep'])}")
+
+
+def fleet_root(cell):
+    """Per-config results root used when the cell runs in a parallel VM."""
+    return os.path.join(FLEET_DIR, cell["exp_name"])
+
+
+def result_path(cell, n, pattern, rep=None):
+    """
+    Path of one result file of a point (of repetition `rep`, default the
+    cell's), in the shared tree or else in the cell's fleet dir; None if absent.
+    """
+    rep = cell["rep"] if rep is None else rep
+    filename = pattern.format(exp_name=cell["exp_name"], n=n, rep=rep_tag(rep))
+    rel_dir = os.path.relpath(cell["result_dir"], HERE)
+    for root in (HERE, fleet_root(cell)):
+        path = os.path.join(root, rel_dir, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def result_exists(cell, n, pattern):
+    """A result counts if it is in the shared tree or in the cell's fleet dir."""
+    return result_path(cell, n, pattern) is not None
+
+
+def missing_points(cell):
+    """Points of a cell whose result files are not all present yet."""
+    if not cell["results"]:
+        return [] if os.path.exists(marker_path(cell)) else cell["points"]
+    return [n for n in cell["points"]
+            if not all(result_exists(cell, n, pattern) for pattern in cell["results"])]
+
+
+def fio_bandwidth(path):
+    """Read + write bandwidth (bytes/s) of the first job of a fio JSON, or None."""
+    try:
+        with open(path) as f:
+            job = json.load(f)["jobs"][0]
+        return float(job["read"]["bw_bytes"]) + float(job["write"]["bw_bytes"])
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+
+
+def ci_half_width(cell, min_repeat):
+    """
+    Widest relative CI half-width over the cell's points, from the bandwidth
+    of its finished repetitions. None if the cell has no fio JSON results or
+    any point has fewer than `min_repeat` of them.
+    """
+    if PLOTTING_DIR not in sys.path:
+        sys.path.insert(0, PLOTTING_DIR)
+    from stats import bootstrap_ci, reject_outliers, relative_half_width
+
+    patterns = [p for p in cell["results"] if p.endswith(".json")]
+    widest = None
+    for n in cell["points"]:
+        for pattern in patterns:
+            paths = (result_path(cell, n, pattern, rep) for rep in range(cell["repeat"]))
+            values = [bw for bw in map(fio_bandwidth, filter(None, paths)) if bw is not None]
+            if len(values) < min_repeat:
+                return None
+            width = relative_half_width(*bootstrap_ci(reject_outliers(values)[0]))
+            widest = width if widest is None else max(widest, width)
+    return widest
+
+
+def converged(cell, min_repeat, ci_width):
+    """True if later repetitions of the cell can be skipped (see --ci-width)."""
+    if not ci_width or cell["rep"] < min_repeat:
+        return False
+    width = ci_half_width(cell, min_repeat)
+    if width is None or width > ci_width:
+        return False
+    print(f"⏭️  {cell_label(cell)}: skipped, bandwidth CI ±{width:.1%} after earlier runs", flush=True)
+    return True
+
+
+def cell_env(cell, points):
+    env = dict(os.environ)
+    env["EXP_ID"] = str(cell["exp_id"])
+    env["SSD_ID"] = "custom"
+    env.update(cell["env"])
+    if cell["rep"]:
+        env["REP"] = str(cell["rep"])
+    else:
+        env.pop("REP", None)
+    for key, var in SSD_ENV.items():
+        env[var] = str(cell["cfg"][key])
+    if cell["sweep"]:
+        env[SWEEPS[cell["sweep"]]] = " ".join(str(n) for n in points)
+    return env
+
+
+def host_resources():
+    """Return (cpus, memory in GiB) of this host."""
+    mem_gb = 0
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                mem_gb = int(line.split()[1]) // (1024 * 1024)
+                break
+    return os.cpu_count() or 1, mem_gb
+
+
+def plan_fleet(requested, n_cells):
+    """
+    Decide how many VMs run at once and how big each is.
+
+    `requested` = 0 means as many as the host fits. Returns (vms, smp, mem_gb).
+    """
+    cpus, mem_gb = host_resources()
+    usable_mem = int(mem_gb * HOST_MEM_FRACTION)
+    fits = max(1, min(cpus // VM_MIN_SMP, usable_mem // (VM_MIN_MEM_GB + FEMU_DEVSZ_GB)))
+    vms = max(1, min(requested or fits, fits, n_cells))
+    smp = max(VM_MIN_SMP, cpus // vms)
+    mem = max(VM_MIN_MEM_GB, usable_mem // vms - FEMU_DEVSZ_GB)
+    return vms, smp, mem
+
+
+def slot_env(slot, cell, smp, mem_gb):
+    """Environment that isolates one parallel VM (see run-zns-exp.sh)."""
+    return {
+        "SSH_PORT": str(BASE_SSH_PORT + slot),
+        "QMP_SOCK": f"./qmp-sock-{slot}",
+        "QEMU_LOG": f"log-{slot}",
+        "VM_OVERLAY": os.path.join(FLEET_DIR, "overlays", f"vm-{slot}.qcow2"),
+        "VM_SMP": str(smp),
+        "VM_MEM": f"{mem_gb}G",
+        "HOST_RESULTS_ROOT": fleet_root(cell),
+    }
+
+
+def run_cell(cell, points, log_dir=None, extra_env=None):
+    """Run run.sh for one cell; returns True on success."""
+    label = cell_label(cell)
+    sweep = f" ({cell['sweep']}: {' '.join(map(str, points))})" if cell["sweep"] else ""
+    port = f" [ssh {extra_env['SSH_PORT']}]" if extra_env else ""
+    print(f"▶️  {label}{sweep} → {cell['exp_name']}{port}", flush=True)
+
+    env = cell_env(cell, points)
+    env.update(extra_env or {})
+    start = time.time()
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, f"{cell['exp_name']}_{cell['experiment']}{rep_tag(cell['rep'])}.log")
+        with open(log_path, "w") as log:
+            ret = subprocess.call(["bash", RUN_SCRIPT], env=env, cwd=HERE,
+                                  stdout=log, stderr=subprocess.STDOUT)
+    else:
+        ret = subprocess.call(["bash", RUN_SCRIPT], env=env, cwd=HERE)
+    elapsed = time.time() - start
+
+    if ret != 0:
+        print(f"❌ {label} failed (exit {ret}) after {elapsed:.0f}s")
+        return False
+    if not cell["results"]:
+        os.makedirs(DONE_DIR, exist_ok=True)
+        open(marker_path(cell), "w").close()
+
+    still_missing = missing_points(cell)
+    if still_missing:
+        print(f"⚠️ {label}: still missing {still_missing} after {elapsed:.0f}s")
+        return False
+    print(f"✅ {label} done in {elapsed:.0f}s")
+    return True
+
+
+def run_fleet(todo, requested_vms, log_dir=None, skip=None):
+    """
+    Run cells concurrently, one VM per free slot. Returns the failed cells.
+    `skip(cell)` is asked once a slot is free; True drops the cell.
+    """
+    vms, smp, mem_gb = plan_fleet(requested_vms, len(todo))
+    print(f"🚀 Running {len(todo)} cells on {vms} VMs ({smp} vCPUs, {mem_gb}G each)")
+    # Parallel VMs always log to files; interleaved console output is unreadable
+    log_dir = log_dir or os.path.join(FLEET_DIR, "logs")
+
+    def worker(cell, points, slot):
+        return (skip is not None and skip(cell)) or \
+            run_cell(cell, points, log_dir, slot_env(slot, cell, smp, mem_gb))
+
+    pending = list(todo)
+    free_slots = list(range(vms))
+    running = {}  # future → (cell, slot)
+    busy = set()  # exp_names with a running cell
+    failed = []
+    done = 0
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=vms) as pool:
+        while pending or running:
+            # Repetitions of one config share its fleet dir and FEMU logs: a cell
+            # waits here, without holding a slot, while another of its config runs
+            for item in list(pending):
+                if not free_slots:
+                    break
+                cell, points = item
+                if cell["exp_name"] in busy:
+                    continue
+                pending.remove(item)
+                slot = free_slots.pop(0)
+                busy.add(cell["exp_name"])
+                running[pool.submit(worker, cell, points, slot)] = (cell, slot)
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                cell, slot = running.pop(future)
+                busy.discard(cell["exp_name"])
+                free_slots.append(slot)
+                error = future.exception()
+                if error is not None:
+                    print(f"❌ {cell_label(cell)} raised {error!r}")
+                done += 1
+                if error is not None or not future.result():
+                    failed.append(cell)
+                elapsed = time.time() - start
+                eta = elapsed / done * (len(todo) - done)
+                print(f"📈 {done}/{len(todo)} cells finished, {len(failed)} failed, "
+                      f"{elapsed / 60:.0f} min elapsed, ~{eta / 60:.0f} min left", flush=True)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the missing points of the experiment matrix.")
+    parser.add_argument("matrix", nargs="?", default=DEFAULT_MATRIX, help="matrix TOML file")
+    parser.add_argument("--ssd", action="append", help="only these [[ssd]] names (repeatable)")
+    parser.add_argument("--exp", action="append", help="only these experiments (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without running")
+    parser.add_argument("--log-dir", help="write each cell's run.sh output to a log file here")
+    parser.add_argument("--vms", type=int, default=1,
+                        help="VMs to run concurrently (0 = as many as the host fits)")
+    parser.add_argument("--warm", action="store_true",
+                        help="boot the prepared warm image instead of a fresh guest (run.sh WARM_START=1)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run every cell this many times, in random order within each round")
+    parser.add_argument("--min-repeat", type=int, default=3,
+                        help="runs a cell always gets before --ci-width may stop it")
+    parser.add_argument("--ci-width", type=float,
+                        help="stop repeating a cell once every point's 95%% CI half-width is "
+                             "within this fraction of its mean bandwidth, e.g. 0.02")
+    parser.add_argument("--seed", type=int, help="seed of the repetition order")
+    args = parser.parse_args()
+
+    cells = schedule(expand(load_matrix(args.matrix), args.ssd, args.exp), args.repeat, args.seed)
+    plan = [(cell, missing_points(cell)) for cell in cells]
+    todo = [(cell, points) for cell, points in plan if points]
+
+    print(f"📋 {len(cells)} cells, {len(todo)} with missing points:")
+    for cell, points in plan:
+        state = "skip" if not points else ("run " + " ".join(map(str, points)) if cell["sweep"] else "run")
+        rep = f" #{cell['rep']}" if args.repeat > 1 else ""
+        print(f"  {cell['ssd']:<14s} {cell['experiment'] + rep:<18s} {cell['exp_name']:<60s} {state}")
+
+    if args.dry_run or not todo:
+        return 0
+    if args.warm:
+        os.environ["WARM_START"] = "1"
+
+    def skip(cell):
+        return converged(cell, args.min_repeat, args.ci_width)
+
+    if args.vms == 1:
+        failed = [cell for cell, points in todo
+                  if not skip(cell) and not run_cell(cell, points, args.log_dir)]
+    else:
+        failed = run_fleet(todo, args.vms, args.log_dir, skip)
+    print(f"\n🎉 {len(todo) - len(failed)}/{len(todo)} cells completed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
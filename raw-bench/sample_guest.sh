@@ -0,0 +1,31 @@
+#!/bin/bash
+
+# Guest-side resource sampler, started in the background around a fio run by
+# the experiment scripts when RESOURCE_STATS=1. Every INTERVAL seconds appends
+# one line of cumulative guest CPU ticks (/proc/stat) and the device's
+# /proc/diskstats counters until killed.
+
+if [ "$#" -lt 2 ]; then
+    echo "Usage: $0 <DEVICE_PATH> <OUTPUT_CSV> [<INTERVAL_S>]"
+    echo "Example: $0 /dev/nvme0n1 results/ZN540_threads_4.guest.csv 0.5"
+    exit 1
+fi
+
+DEVICE_PATH="$1"
+OUTPUT="$2"
+INTERVAL="${3:-0.5}"
+DEVICE=$(basename "$DEVICE_PATH")
+
+{
+    echo "# clk_tck=$(getconf CLK_TCK) guest_cpus=$(nproc) device=${DEVICE} interval_s=${INTERVAL}"
+    # cpu_*: /proc/stat ticks; reads..weighted_ms: /proc/diskstats fields 4-14
+    echo "epoch_ms,cpu_user,cpu_nice,cpu_system,cpu_idle,cpu_iowait,cpu_irq,cpu_softirq,cpu_steal,reads,reads_merged,read_sectors,read_ms,writes,writes_merged,write_sectors,write_ms,in_flight,io_ms,weighted_ms"
+} > "$OUTPUT"
+
+while true; do
+    ts=$(( $(date +%s%N) / 1000000 ))
+    read -r _ user nice system idle iowait irq softirq steal _ < /proc/stat
+    disk=$(awk -v dev="$DEVICE" '$3 == dev { print $4","$5","$6","$7","$8","$9","$10","$11","$12","$13","$14; exit }' /proc/diskstats)
+    echo "${ts},${user},${nice},${system},${idle},${iowait},${irq},${softirq},${steal},${disk}" >> "$OUTPUT"
+    sleep "$INTERVAL"
+done
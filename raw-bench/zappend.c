@@ -0,0 +1,444 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <stdint.h>
+#include <string.h>
+#include <errno.h>
+#include <time.h>
+#include <pthread.h>
+#include <sys/ioctl.h>
+#include <linux/nvme_ioctl.h>
+#include <libzbd/zbd.h>
+
+/*
+ * Shared-zone writer: <threads> writers fill a set of zones that they share,
+ * <active_zones> at a time (writer t writes the active zone t % active_zones),
+ * with one of two commands:
+ *
+ *   append  NVMe Zone Append through the passthrough ioctl; the device picks
+ *           each command's LBA, so a zone takes any number of commands at once
+ *   write   regular writes at the write pointer; the writers of a zone take
+ *           turns (a per-zone lock held across the write), as a storage engine
+ *           must to keep a zone sequential without append
+ *
+ * fio only issues regular writes, at most one writer per zone. Each writer
+ * keeps <qd> commands in flight with <qd> synchronous submitters (the
+ * passthrough ioctl blocks until completion). Space is reserved per command,
+ * so a zone is never overrun; when it is full the active zone moves on to
+ * the next one of the range (zone first + slot, + active_zones, ...). The run
+ * ends when every zone of the range is full or after <runtime_s> (0: no
+ * limit), and appends one line to <result_csv>:
+ *
+ *   op,threads,qd,active_zones,request_size,ios,errors,bytes,seconds,iops,mib_s,
+ *   lat_mean_us,lat_p50_us,lat_p99_us,lat_p999_us,lat_max_us,
+ *   zones_opened,alloc_mean_us,alloc_p99_us,alloc_max_us
+ *
+ * Latency is submission to completion of each command. The alloc_* columns
+ * are the latencies of the first command into each zone, which opens it and
+ * makes the device allocate it. The zones must be empty (reset) beforehand.
+ * Run by exp_rw_bench/run-append.sh and run-zones.sh.
+ */
+
+#define NVME_CMD_ZONE_APPEND 0x7d
+
+/**
+ * A zone being written and the space reserved in it so far.
+ */
+struct zone_slot {
+    pthread_mutex_t lock;
+    unsigned int zone;         /* index into bench.zones */
+    unsigned long long used;   /* bytes reserved */
+    int done;                  /* no zone left for this slot */
+};
+
+struct bench {
+    int fd;
+    unsigned int nsid;
+    int append;
+    size_t request_size;
+    unsigned int lblock_size;
+    struct zbd_zone *zones;
+    unsigned int nr_zones;
+    struct zone_slot *slots;
+    unsigned int active;
+    double deadline;           /* 0: until the zones are full */
+    int stop;                  /* set when the run is aborted */
+};
+
+/**
+ * One synchronous submitter: a queue slot of writer `writer`.
+ */
+struct submitter {
+    struct bench *b;
+    unsigned int writer;
+    double *lat_us;
+    size_t nr_lat, cap_lat;
+    double *alloc_us;          /* first command into a zone */
+    size_t nr_alloc, cap_alloc;
+    unsigned long long bytes;
+    unsigned long errors;
+    int failed;                /* stopped on a buffer allocation failure */
+};
+
+static double now_seconds(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static int cmp_double(const void *a, const void *b) {
+    double x = *(const double *)a, y = *(const double *)b;
+    return (x > y) - (x < y);
+}
+
+/**
+ * Reserve `request_size` bytes in the slot's zone, moving to its next zone
+ * when the current one is full. Returns the zone index and sets `offset`,
+ * or -1 when the slot has no space left. Called with the slot locked.
+ */
+static int reserve(struct bench *b, struct zone_slot *s, unsigned long long *offset) {
+    while (!s->done && s->used + b->request_size > b->zones[s->zone].capacity) {
+        s->zone += b->active;
+        s->used = 0;
+        s->done = s->zone >= b->nr_zones;
+    }
+    if (s->done) {
+        return -1;
+    }
+    *offset = s->used;
+    s->used += b->request_size;
+    return (int)s->zone;
+}
+
+/**
+ * Zone Append of one request to the zone starting at byte `start`.
+ * Returns 0, the NVMe status (> 0) or -1 with errno set.
+ */
+static int zone_append(struct bench *b, unsigned long long start, void *buf) {
+    unsigned long long zslba = start / b->lblock_size;
+    struct nvme_passthru_cmd64 cmd = {
+        .opcode = NVME_CMD_ZONE_APPEND,
+        .nsid = b->nsid,
+        .addr = (uintptr_t)buf,
+        .data_len = (uint32_t)b->request_size,
+        .cdw10 = (uint32_t)zslba,
+        .cdw11 = (uint32_t)(zslba >> 32),
+        .cdw12 = (uint32_t)(b->request_size / b->lblock_size - 1), /* 0-based block count */
+    };
+    return ioctl(b->fd, NVME_IOCTL_IO64_CMD, &cmd);
+}
+
+static int record(double **values, size_t *nr, size_t *cap, double value) {
+    if (*nr == *cap) {
+        size_t new_cap = *cap ? *cap * 2 : 4096;
+        double *v = realloc(*values, new_cap * sizeof(double));
+        if (!v) {
+            return -1;
+        }
+        *values = v;
+        *cap = new_cap;
+    }
+    (*values)[(*nr)++] = value;
+    return 0;
+}
+
+/**
+ * Concatenate the submitters' samples of one kind into one sorted array.
+ * Returns NULL on allocation failure; sets `total` and `sum`.
+ */
+static double *merge_sorted(struct submitter *subs, int nr_subs, int alloc, size_t *total, double *sum) {
+    size_t n = 0;
+    for (int i = 0; i < nr_subs; i++) {
+        n += alloc ? subs[i].nr_alloc : subs[i].nr_lat;
+    }
+    double *all = malloc((n ? n : 1) * sizeof(double));
+    if (!all) {
+        return NULL;
+    }
+    size_t k = 0;
+    for (int i = 0; i < nr_subs; i++) {
+        size_t nr = alloc ? subs[i].nr_alloc : subs[i].nr_lat;
+        memcpy(all + k, alloc ? subs[i].alloc_us : subs[i].lat_us, nr * sizeof(double));
+        k += nr;
+    }
+    *sum = 0;
+    for (size_t i = 0; i < n; i++) {
+        *sum += all[i];
+    }
+    qsort(all, n, sizeof(double), cmp_double);
+    *total = n;
+    return all;
+}
+
+static void *submit_worker(void *arg) {
+    struct submitter *sub = arg;
+    struct bench *b = sub->b;
+    struct zone_slot *s = &b->slots[sub->writer % b->active];
+
+    void *buffer;
+    if (posix_memalign(&buffer, 4096, b->request_size) != 0) {
+        perror("posix_memalign failed");
+        sub->failed = 1;
+        return NULL;
+    }
+    memset(buffer, 0xAC, b->request_size);
+
+    while (!__atomic_load_n(&b->stop, __ATOMIC_RELAXED) &&
+           (b->deadline == 0 || now_seconds() < b->deadline)) {
+        unsigned long long offset;
+        int ret;
+        double start;
+
+        pthread_mutex_lock(&s->lock);
+        int zone = reserve(b, s, &offset);
+        if (zone < 0) {
+            pthread_mutex_unlock(&s->lock);
+            break;
+        }
+        if (b->append) {
+            pthread_mutex_unlock(&s->lock);
+            start = now_seconds();
+            ret = zone_append(b, b->zones[zone].start, buffer);
+        } else {
+            // The zone's write pointer only moves with this write: keep it locked
+            start = now_seconds();
+            ssize_t n = pwrite(b->fd, buffer, b->request_size, (off_t)(b->zones[zone].start + offset));
+            ret = n == (ssize_t)b->request_size ? 0 : -1;
+            pthread_mutex_unlock(&s->lock);
+        }
+        double lat_us = (now_seconds() - start) * 1e6;
+
+        if (ret != 0) {
+            sub->errors++;
+            if (ret < 0) {
+                fprintf(stderr, "%s to zone %u: %s\n", b->append ? "zone append" : "pwrite",
+                        zone, strerror(errno));
+            } else {
+                fprintf(stderr, "zone append to zone %u: NVMe status 0x%x\n", zone, ret);
+            }
+            break;
+        }
+        sub->bytes += b->request_size;
+        if (record(&sub->lat_us, &sub->nr_lat, &sub->cap_lat, lat_us) < 0 ||
+            (offset == 0 && record(&sub->alloc_us, &sub->nr_alloc, &sub->cap_alloc, lat_us) < 0)) {
+            perror("realloc failed");
+            sub->failed = 1;
+            break;
+        }
+    }
+
+    free(buffer);
+    return NULL;
+}
+
+/**
+ * Parse "<zone>" or "<first>-<last>".
+ */
+static int parse_zones(const char *arg, unsigned int nr_zones, unsigned int *first, unsigned int *count) {
+    char *end;
+    unsigned long lo = strtoul(arg, &end, 10), hi = lo;
+    if (end == arg) {
+        return -1;
+    }
+    if (*end == '-') {
+        const char *hi_str = end + 1;
+        hi = strtoul(hi_str, &end, 10);
+        if (end == hi_str) {
+            return -1;
+        }
+    }
+    if (*end != '\0' || hi < lo || hi >= nr_zones) {
+        return -1;
+    }
+    *first = (unsigned int)lo;
+    *count = (unsigned int)(hi - lo + 1);
+    return 0;
+}
+
+int main(int argc, char *argv[]) {
+    if (argc != 10) {
+        fprintf(stderr, "Usage: %s <device> <append|write> <threads> <qd> <active_zones> <request_size> "
+                "<runtime_s> <result_csv> <zone>|<first>-<last>\n", argv[0]);
+        fprintf(stderr, "Example: %s /dev/nvme0n1 append 8 4 1 16384 30 append.csv 0-7\n", argv[0]);
+        return EXIT_FAILURE;
+    }
+
+    const char *dev_path = argv[1];
+    const char *op = argv[2];
+    int threads = atoi(argv[3]);
+    int qd = atoi(argv[4]);
+    int active = atoi(argv[5]);
+    size_t request_size = strtoull(argv[6], NULL, 10);
+    double runtime_s = atof(argv[7]);
+    const char *out_path = argv[8];
+
+    if (strcmp(op, "append") != 0 && strcmp(op, "write") != 0) {
+        fprintf(stderr, "Invalid operation '%s' (append or write)\n", op);
+        return EXIT_FAILURE;
+    }
+    if (threads <= 0 || qd <= 0 || active <= 0 || request_size == 0 || runtime_s < 0) {
+        fprintf(stderr, "Invalid threads, qd, active zones, request size or runtime\n");
+        return EXIT_FAILURE;
+    }
+
+    struct zbd_info info;
+    int fd = zbd_open(dev_path, O_RDWR | O_DIRECT, &info);
+    if (fd < 0) {
+        perror("zbd_open");
+        return EXIT_FAILURE;
+    }
+    if (request_size % info.lblock_size != 0) {
+        fprintf(stderr, "Request size %zu is not a multiple of the %u-byte logical block\n",
+                request_size, info.lblock_size);
+        zbd_close(fd);
+        return EXIT_FAILURE;
+    }
+
+    unsigned int first, count;
+    if (parse_zones(argv[9], info.nr_zones, &first, &count) < 0) {
+        fprintf(stderr, "Invalid zone range '%s' (device has %u zones)\n", argv[9], info.nr_zones);
+        zbd_close(fd);
+        return EXIT_FAILURE;
+    }
+    if ((unsigned int)active > count) {
+        active = (int)count;
+    }
+
+    struct bench b = {
+        .fd = fd,
+        .append = strcmp(op, "append") == 0,
+        .request_size = request_size,
+        .lblock_size = info.lblock_size,
+        .nr_zones = count,
+        .active = (unsigned int)active,
+    };
+    int ret = EXIT_FAILURE;
+    int nr_subs = threads * qd;
+    FILE *out = NULL;
+    pthread_t *tids = calloc(nr_subs, sizeof(pthread_t));
+    struct submitter *subs = calloc(nr_subs, sizeof(struct submitter));
+    b.zones = calloc(count, sizeof(struct zbd_zone));
+    b.slots = calloc(active, sizeof(struct zone_slot));
+    if (!tids || !subs || !b.zones || !b.slots) {
+        perror("calloc failed");
+        goto out;
+    }
+
+    if (b.append) {
+        int nsid = ioctl(fd, NVME_IOCTL_ID);
+        if (nsid < 0) {
+            perror("NVME_IOCTL_ID (zone append needs an NVMe namespace)");
+            goto out;
+        }
+        b.nsid = (unsigned int)nsid;
+    }
+
+    unsigned int nr = count;
+    if (zbd_report_zones(fd, (off_t)first * info.zone_size, (off_t)count * info.zone_size,
+                         ZBD_RO_ALL, b.zones, &nr) < 0 || nr != count) {
+        perror("zbd_report_zones");
+        goto out;
+    }
+    for (unsigned int i = 0; i < count; i++) {
+        if (b.zones[i].cond != ZBD_ZONE_COND_EMPTY) {
+            fprintf(stderr, "Zone %u is not empty; reset the zones first\n", first + i);
+            goto out;
+        }
+    }
+    for (int i = 0; i < active; i++) {
+        pthread_mutex_init(&b.slots[i].lock, NULL);
+        b.slots[i].zone = (unsigned int)i;
+    }
+
+    printf("zappend: %s, %d threads x qd %d into %d of zones %u-%u, %zu-byte requests\n",
+           op, threads, qd, active, first, first + count - 1, request_size);
+
+    double start = now_seconds();
+    b.deadline = runtime_s > 0 ? start + runtime_s : 0;
+    int started = 0;
+    for (; started < nr_subs; started++) {
+        subs[started].b = &b;
+        subs[started].writer = (unsigned int)(started / qd);
+        int err = pthread_create(&tids[started], NULL, submit_worker, &subs[started]);
+        if (err != 0) {
+            fprintf(stderr, "pthread_create: %s\n", strerror(err));
+            __atomic_store_n(&b.stop, 1, __ATOMIC_RELAXED);
+            break;
+        }
+    }
+    for (int i = 0; i < started; i++) {
+        pthread_join(tids[i], NULL);
+    }
+    double seconds = now_seconds() - start;
+    if (started < nr_subs) {
+        fprintf(stderr, "Only %d of %d submitters started; no result recorded\n", started, nr_subs);
+        goto out;
+    }
+
+    // Merge the per-submitter latencies
+    unsigned long errors = 0;
+    unsigned long long bytes = 0;
+    int failed = 0;
+    for (int i = 0; i < nr_subs; i++) {
+        errors += subs[i].errors;
+        bytes += subs[i].bytes;
+        failed += subs[i].failed;
+    }
+    if (failed) {
+        fprintf(stderr, "%d submitter(s) stopped early on allocation failure\n", failed);
+    }
+    size_t ios, opened;
+    double sum, alloc_sum;
+    double *lat = merge_sorted(subs, nr_subs, 0, &ios, &sum);
+    double *alloc = merge_sorted(subs, nr_subs, 1, &opened, &alloc_sum);
+    if (!lat || !alloc) {
+        perror("malloc failed");
+        free(lat);
+        free(alloc);
+        goto out;
+    }
+#define PCT(p) (ios ? lat[(size_t)((ios - 1) * (p))] : 0.0)
+#define ALLOC_PCT(p) (opened ? alloc[(size_t)((opened - 1) * (p))] : 0.0)
+
+    out = fopen(out_path, "a");
+    if (!out) {
+        perror("Failed to open result file");
+        free(lat);
+        free(alloc);
+        goto out;
+    }
+    if (ftell(out) == 0) {
+        fprintf(out, "op,threads,qd,active_zones,request_size,ios,errors,bytes,seconds,iops,mib_s,"
+                "lat_mean_us,lat_p50_us,lat_p99_us,lat_p999_us,lat_max_us,"
+                "zones_opened,alloc_mean_us,alloc_p99_us,alloc_max_us\n");
+    }
+    fprintf(out, "%s,%d,%d,%d,%zu,%zu,%lu,%llu,%.3f,%.1f,%.2f,%.1f,%.1f,%.1f,%.1f,%.1f,%zu,%.1f,%.1f,%.1f\n",
+            op, threads, qd, active, request_size, ios, errors, bytes, seconds, ios / seconds,
+            bytes / seconds / (1024.0 * 1024.0), ios ? sum / ios : 0.0,
+            PCT(0.5), PCT(0.99), PCT(0.999), PCT(1.0),
+            opened, opened ? alloc_sum / opened : 0.0, ALLOC_PCT(0.99), ALLOC_PCT(1.0));
+    printf("zappend: %zu I/Os (%lu errors) in %.2fs, %.1f IOPS, p99 %.1f us, %zu zones opened -> %s\n",
+           ios, errors, seconds, ios / seconds, PCT(0.99), opened, out_path);
+#undef PCT
+#undef ALLOC_PCT
+    free(lat);
+    free(alloc);
+    ret = errors || failed ? EXIT_FAILURE : EXIT_SUCCESS;
+
+out:
+    if (out) {
+        fclose(out);
+    }
+    for (int i = 0; i < nr_subs && subs; i++) {
+        free(subs[i].lat_us);
+        free(subs[i].alloc_us);
+    }
+    free(subs);
+    free(tids);
+    free(b.slots);
+    free(b.zones);
+    zbd_close(fd);
+    return ret;
+}
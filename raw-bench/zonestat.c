@@ -0,0 +1,225 @@
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <stdint.h>
+#include <string.h>
+#include <errno.h>
+#include <time.h>
+#include <signal.h>
+#include <libzbd/zbd.h>
+
+/*
+ * Zone-state sampler: every <interval_ms> report the zones in use and log
+ * only what changed since the previous report, one line per zone change:
+ *
+ *   epoch_ms,zone,cond,wp_bytes
+ *
+ * wp_bytes is the write pointer relative to the zone start. The first and
+ * the last report (on SIGTERM/SIGINT) log every zone, so each zone's write
+ * pointer is a step function known over the whole run. Started around fio
+ * runs by the experiment scripts when ZONE_STATS=1.
+ */
+
+/**
+ * A contiguous range of zones reported with a single zbd_report_zones().
+ */
+struct zone_range {
+    unsigned int first;
+    unsigned int count;
+    struct zbd_zone *zones;   /* last report */
+    struct zbd_zone *scratch; /* report in progress */
+};
+
+static volatile sig_atomic_t stop;
+
+static void on_signal(int sig) {
+    (void)sig;
+    stop = 1;
+}
+
+static const char *cond_name(const struct zbd_zone *z) {
+    switch (z->cond) {
+    case ZBD_ZONE_COND_NOT_WP:   return "not_wp";
+    case ZBD_ZONE_COND_EMPTY:    return "empty";
+    case ZBD_ZONE_COND_IMP_OPEN: return "imp_open";
+    case ZBD_ZONE_COND_EXP_OPEN: return "exp_open";
+    case ZBD_ZONE_COND_CLOSED:   return "closed";
+    case ZBD_ZONE_COND_READONLY: return "read_only";
+    case ZBD_ZONE_COND_FULL:     return "full";
+    case ZBD_ZONE_COND_OFFLINE:  return "offline";
+    default:                     return "unknown";
+    }
+}
+
+static long long epoch_ms(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_REALTIME, &ts);
+    return ts.tv_sec * 1000LL + ts.tv_nsec / 1000000;
+}
+
+/**
+ * Parse "<zone>", "<first>-<last>" or "@<lba>" (the zone holding a logical
+ * block, as passed to nvme zns finish-zone --start-lba) into a range.
+ */
+static int parse_range(const char *arg, const struct zbd_info *info, struct zone_range *r) {
+    char *end;
+    if (arg[0] == '@') {
+        unsigned long long lba = strtoull(arg + 1, &end, 0);
+        if (end == arg + 1 || *end != '\0') {
+            return -1;
+        }
+        r->first = (unsigned int)(lba * info->lblock_size / info->zone_size);
+        r->count = 1;
+    } else {
+        unsigned long first = strtoul(arg, &end, 10);
+        unsigned long last = first;
+        if (end == arg || (*end != '\0' && *end != '-')) {
+            return -1;
+        }
+        if (*end == '-') {
+            const char *last_str = end + 1;
+            last = strtoul(last_str, &end, 10);
+            if (end == last_str || *end != '\0' || last < first) {
+                return -1;
+            }
+        }
+        r->first = (unsigned int)first;
+        r->count = (unsigned int)(last - first + 1);
+    }
+    if (r->first + r->count > info->nr_zones) {
+        return -1;
+    }
+    return 0;
+}
+
+static int report(int fd, const struct zbd_info *info, struct zone_range *r, struct zbd_zone *out) {
+    unsigned int nr = r->count;
+    if (zbd_report_zones(fd, (off_t)r->first * info->zone_size, (off_t)r->count * info->zone_size,
+                         ZBD_RO_ALL, out, &nr) < 0) {
+        return -1;
+    }
+    return nr == r->count ? 0 : -1;
+}
+
+/**
+ * Log the zones of `r` whose condition or write pointer changed (all of them
+ * when `all`), then keep the new report.
+ */
+static void log_changes(FILE *out, long long ts, struct zone_range *r, int all) {
+    for (unsigned int i = 0; i < r->count; i++) {
+        struct zbd_zone *prev = &r->zones[i], *cur = &r->scratch[i];
+        if (all || cur->cond != prev->cond || cur->wp != prev->wp) {
+            fprintf(out, "%lld,%u,%s,%llu\n", ts, r->first + i, cond_name(cur),
+                    (unsigned long long)(cur->wp - cur->start));
+        }
+    }
+    struct zbd_zone *tmp = r->zones;
+    r->zones = r->scratch;
+    r->scratch = tmp;
+}
+
+int main(int argc, char *argv[]) {
+    if (argc < 5) {
+        fprintf(stderr, "Usage: %s <device> <output_csv> <interval_ms> <zone>|<first>-<last>|@<lba>...\n", argv[0]);
+        fprintf(stderr, "Example: %s /dev/nvme0n1 zones.csv 100 0-3 30-33\n", argv[0]);
+        return EXIT_FAILURE;
+    }
+
+    const char *dev_path = argv[1];
+    const char *out_path = argv[2];
+    long interval_ms = atol(argv[3]);
+    int nr_ranges = argc - 4;
+    if (interval_ms <= 0) {
+        fprintf(stderr, "Invalid interval: %s ms\n", argv[3]);
+        return EXIT_FAILURE;
+    }
+
+    struct zbd_info info;
+    int fd = zbd_open(dev_path, O_RDONLY, &info);
+    if (fd < 0) {
+        perror("zbd_open");
+        return EXIT_FAILURE;
+    }
+
+    struct zone_range *ranges = calloc(nr_ranges, sizeof(*ranges));
+    if (!ranges) {
+        perror("calloc failed");
+        zbd_close(fd);
+        return EXIT_FAILURE;
+    }
+    int ret = EXIT_FAILURE;
+    FILE *out = NULL;
+    for (int i = 0; i < nr_ranges; i++) {
+        struct zone_range *r = &ranges[i];
+        if (parse_range(argv[4 + i], &info, r) < 0) {
+            fprintf(stderr, "Invalid zone range '%s' (device has %u zones)\n", argv[4 + i], info.nr_zones);
+            goto out;
+        }
+        r->zones = calloc(r->count, sizeof(struct zbd_zone));
+        r->scratch = calloc(r->count, sizeof(struct zbd_zone));
+        if (!r->zones || !r->scratch) {
+            perror("calloc failed");
+            goto out;
+        }
+    }
+
+    out = fopen(out_path, "w");
+    if (!out) {
+        perror("Failed to open output file");
+        goto out;
+    }
+    struct zbd_zone *first = NULL;
+    for (int i = 0; i < nr_ranges && !first; i++) {
+        if (report(fd, &info, &ranges[i], ranges[i].scratch) == 0) {
+            first = &ranges[i].scratch[0];
+        }
+    }
+    fprintf(out, "# device=%s zone_size=%llu zone_capacity=%llu lblock_size=%u interval_ms=%ld\n",
+            dev_path, (unsigned long long)info.zone_size,
+            first ? (unsigned long long)first->capacity : 0ULL, info.lblock_size, interval_ms);
+    fprintf(out, "epoch_ms,zone,cond,wp_bytes\n");
+
+    struct sigaction sa = { .sa_handler = on_signal };
+    sigaction(SIGTERM, &sa, NULL);
+    sigaction(SIGINT, &sa, NULL);
+
+    struct timespec next;
+    clock_gettime(CLOCK_MONOTONIC, &next);
+    unsigned long reports = 0;
+    for (int last = 0; !last;) {
+        last = stop;
+        long long ts = epoch_ms();
+        for (int i = 0; i < nr_ranges; i++) {
+            if (report(fd, &info, &ranges[i], ranges[i].scratch) < 0) {
+                perror("zbd_report_zones");
+                goto out;
+            }
+            log_changes(out, ts, &ranges[i], reports == 0 || last);
+        }
+        fflush(out);
+        reports++;
+
+        // Fixed-rate schedule; a signal cuts the sleep short for the last report
+        next.tv_nsec += (interval_ms % 1000) * 1000000;
+        next.tv_sec += interval_ms / 1000 + next.tv_nsec / 1000000000;
+        next.tv_nsec %= 1000000000;
+        while (!stop && clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &next, NULL) == EINTR)
+            ;
+    }
+    printf("zonestat: %lu reports of %d zone range(s) in %s\n", reports, nr_ranges, out_path);
+    ret = EXIT_SUCCESS;
+
+out:
+    if (out) {
+        fclose(out);
+    }
+    for (int i = 0; i < nr_ranges; i++) {
+        free(ranges[i].zones);
+        free(ranges[i].scratch);
+    }
+    free(ranges);
+    zbd_close(fd);
+    return ret;
+}